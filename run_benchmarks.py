@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Tetris Game - Benchmark Runner
+Runs headless performance benchmarks with proper path configuration
+"""
+
+import sys
+import os
+import logging
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Benchmarks never open a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+def bench_analytics():
+    """Streaming analytics over replay files and event logs, 1x and 4x archives"""
+    from analytics import run_benchmark
+    return run_benchmark()
+
+
+def bench_archive():
+    """Replay archive appends, lookups by id/seed and sequential scans"""
+    from archive import run_benchmark
+    return run_benchmark()
+
+
+def bench_bot():
+    """Bot decision latency and headless pieces per second"""
+    from bot import run_benchmark
+    results = []
+    for beam_width, lookahead in ((1, 0), (8, 1), (16, 2)):
+        results.append(run_benchmark(pieces=300, beam_width=beam_width, lookahead=lookahead))
+    return results
+
+
+def bench_dashboard():
+    """Dashboard draw time for 16 and 64 bot games, batched vs naive per-cell drawing"""
+    from dashboard import run_benchmark
+    return run_benchmark()
+
+
+def bench_export():
+    """Replay frame export to PNG and raw RGB, serial and pooled"""
+    from export import run_benchmark
+    return run_benchmark()
+
+
+def bench_input_engine():
+    """Input-to-photon latency through the DAS/ARR input engine"""
+    from input_engine import run_benchmark
+    return run_benchmark()
+
+
+def bench_lod():
+    """Draw cost per detail level and budget overruns with and without adaptive LOD"""
+    from lod import run_benchmark
+    return run_benchmark()
+
+
+def bench_metrics():
+    """Cost of recording metrics on the hot path, and of rendering them"""
+    from metrics import run_benchmark
+    return run_benchmark()
+
+
+def bench_opening_book():
+    """Opening book build, mmap lookup cost and bot decision latency with and without it"""
+    from opening_book import run_benchmark
+    return run_benchmark()
+
+
+def bench_profiling():
+    """Frame time of a bot game with no profiler, the sampling profiler and cProfile"""
+    from profiling import run_benchmark
+    return run_benchmark()
+
+
+def bench_protocol():
+    """Binary delta protocol throughput and bandwidth versus full JSON state"""
+    from protocol import run_benchmark
+    return run_benchmark()
+
+
+def bench_reachability():
+    """Reachability search on empty, mid-game and garbage-heavy boards"""
+    from reachability import run_benchmark
+    return run_benchmark()
+
+
+def bench_rl_env():
+    """RL environment steps per second for 1, 8 and 64 environments"""
+    from rl_env import run_benchmark
+    return run_benchmark()
+
+
+def bench_rollback():
+    """Rollback depth and resimulation cost under latency and packet loss"""
+    from rollback import run_benchmark
+    return run_benchmark()
+
+
+def bench_rotation():
+    """Rotations per second per rotation system on empty and kick-heavy boards"""
+    from rotation import run_benchmark
+    return run_benchmark()
+
+
+def bench_scaling():
+    """Scaled backbuffer frame cost at 1x, 2x and 4x, full rescale vs cached layers"""
+    from scaling import run_benchmark
+    return run_benchmark()
+
+
+def bench_server():
+    """Game server load test with 1k loopback marathon and versus games"""
+    from server import run_load_test
+    return [run_load_test(games=1000, duration=10.0),
+            run_load_test(games=1000, duration=10.0, versus=True)]
+
+
+def bench_sim_thread():
+    """Input latency and tick jitter, serial loop vs simulation thread, with a slow flip"""
+    from sim_thread import run_benchmark
+    return run_benchmark()
+
+
+def bench_soak():
+    """Short random-input soak of the main loop: loop speed and memory drift"""
+    from soak import run_benchmark
+    return run_benchmark()
+
+
+def bench_store():
+    """Game store inserts and leaderboard queries at 10k, 100k and 1M games"""
+    from store import run_benchmark
+    return run_benchmark()
+
+
+def bench_stress():
+    """Per-operation cost from 10x20 to 100x1000 boards, and stress games on the largest"""
+    from stress import run_benchmark
+    return run_benchmark()
+
+
+def bench_terminal():
+    """Terminal renderer bytes per frame, diff updates vs full redraws"""
+    from terminal import run_benchmark
+    return run_benchmark()
+
+
+def bench_texture_ui():
+    """Frame time of the texture render backend vs GameUI Surface drawing"""
+    from texture_ui import run_benchmark
+    return run_benchmark()
+
+
+def bench_tournament():
+    """Tournament time with a cold cache, a warm cache and one bot added"""
+    from tournament import run_benchmark
+    return run_benchmark()
+
+
+def bench_tuner():
+    """Weight tuner generations with a cold and a warm fitness cache"""
+    from tuner import run_benchmark
+    return run_benchmark()
+
+
+BENCHMARKS = {
+    'bot': bench_bot,
+    'tuner': bench_tuner,
+    'reachability': bench_reachability,
+    'rl_env': bench_rl_env,
+    'server': bench_server,
+    'protocol': bench_protocol,
+    'rollback': bench_rollback,
+    'store': bench_store,
+    'analytics': bench_analytics,
+    'archive': bench_archive,
+    'export': bench_export,
+    'terminal': bench_terminal,
+    'dashboard': bench_dashboard,
+    'texture_ui': bench_texture_ui,
+    'scaling': bench_scaling,
+    'sim_thread': bench_sim_thread,
+    'lod': bench_lod,
+    'input_engine': bench_input_engine,
+    'profiling': bench_profiling,
+    'metrics': bench_metrics,
+    'tournament': bench_tournament,
+    'soak': bench_soak,
+    'stress': bench_stress,
+    'rotation': bench_rotation,
+    'opening_book': bench_opening_book,
+}
+
+
+def print_result(result):
+    """Print one benchmark result dictionary"""
+    for key, value in result.items():
+        if isinstance(value, float):
+            print(f"   {key}: {value:.3f}")
+        else:
+            print(f"   {key}: {value}")
+    print()
+
+
+def run_benchmarks(names):
+    """Run the named benchmarks (all when no names are given)"""
+    # Game logging at INFO level would dominate the measurements
+    logging.disable(logging.INFO)
+
+    selected = names or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Unknown benchmark(s): {', '.join(unknown)}")
+        print(f"   Available: {', '.join(BENCHMARKS)}")
+        return 1
+
+    print("⏱️  Running Tetris Benchmarks")
+    print("=" * 40)
+    for name in selected:
+        print(f"\n▶ {name}: {BENCHMARKS[name].__doc__}")
+        results = BENCHMARKS[name]()
+        for result in results if isinstance(results, list) else [results]:
+            print_result(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmarks(sys.argv[1:]))
@@ -0,0 +1,263 @@
+"""
+Streaming analytics over replay and event-log archives
+Replay files, indexed replay archives and (optionally gzipped) event logs are
+read lazily record by record and folded into fixed-size counters, so memory
+stays constant however large the archive is. Replays are
+re-simulated one game at a time; several files can be processed in parallel.
+"""
+
+import os
+import time
+import random
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from pieces import get_piece_count, get_piece_name
+from archive import ARCHIVE_VERSIONS, ReplayArchive
+from replay import (REPLAY_MAGIC, REPLAY_VERSIONS, GameEvents, ReplayRecorder, ReplayWriter, EventLogWriter,
+                    read_replays, read_event_log, play_replay, replay_game, game_rules)
+
+logger = logging.getLogger(__name__)
+
+# Line clear names, matching the cases scored by Tetris.add_score_for_lines
+CLEAR_NAMES = {1: 'single', 2: 'double', 3: 'triple', 4: 'tetris'}
+
+
+def file_kind(path):
+    """'replay', 'archive' or 'event_log', judged by the file's magic bytes"""
+    if path.endswith('.gz'):
+        return 'event_log'
+    with open(path, 'rb') as archive_file:
+        magic = archive_file.read(len(REPLAY_MAGIC))
+    if magic in REPLAY_VERSIONS:
+        return 'replay'
+    if magic in ARCHIVE_VERSIONS:
+        return 'archive'
+    return 'event_log'
+
+
+def _archive_replays(path):
+    with ReplayArchive(path) as archive:
+        yield from archive.scan()
+
+
+def replay_events(replays, game=None):
+    """Re-simulate replays one by one, yielding the event records of each game
+
+    Only one game's records are held at a time.
+    """
+    for replay in replays:
+        if game is None or game_rules(game) != (replay.width, replay.height, replay.rotation_system):
+            game = replay_game(replay)
+        records = []
+        events = GameEvents(game, records.append, itertools.repeat(replay.game_id), announce=False)
+        try:
+            play_replay(replay, game)
+        finally:
+            events.close()
+        # Drop the start record of the game that begins after the game over
+        yield from records[:-1] if records and records[-1]['event'] == 'start' else records
+
+
+def file_events(path, replay_filter=None):
+    """Lazily yield the event records stored in (or replayed from) one file
+
+    replay_filter(replay) can skip replays before the costly re-simulation.
+    """
+    kind = file_kind(path)
+    if kind != 'event_log':
+        replays = read_replays(path) if kind == 'replay' else _archive_replays(path)
+        if replay_filter is not None:
+            replays = filter(replay_filter, replays)
+        return replay_events(replays)
+    return read_event_log(path)
+
+
+def archive_events(paths, replay_filter=None):
+    """Chain the records of several files"""
+    for path in paths:
+        yield from file_events(path, replay_filter)
+
+
+def select(records, event=None, **equals):
+    """Keep records of one event type whose fields equal the given values"""
+    for record in records:
+        if event is not None and record['event'] != event:
+            continue
+        if all(record.get(key) == value for key, value in equals.items()):
+            yield record
+
+
+class ArchiveStats:
+    """Constant-size aggregates over a stream of event records"""
+
+    def __init__(self):
+        self.records = 0
+        self.games = 0
+        self.pieces = 0
+        self.play_ms = 0.0
+        self.piece_counts = [0] * get_piece_count()
+        self.clear_counts = {lines: 0 for lines in CLEAR_NAMES}
+        # level -> [total ms into the game when it was reached, times reached]
+        self.level_up_ms = {}
+        # Current level of games still in progress (bounded by interleaved games)
+        self._levels = {}
+
+    def add(self, record):
+        self.records += 1
+        event = record['event']
+        game_id = record['game']
+        if event == 'lock':
+            self.pieces += 1
+            self.piece_counts[record['piece']] += 1
+            lines = record['lines']
+            if lines in self.clear_counts:
+                self.clear_counts[lines] += 1
+            level = record['level']
+            if level > self._levels.get(game_id, 0):
+                totals = self.level_up_ms.setdefault(level, [0.0, 0])
+                totals[0] += record['t']
+                totals[1] += 1
+            self._levels[game_id] = level
+        elif event == 'start':
+            self._levels[game_id] = 0
+        elif event == 'game_over':
+            self.games += 1
+            self.play_ms += record['t']
+            self._levels.pop(game_id, None)
+
+    def consume(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def merge(self, other):
+        """Fold in the aggregates of another (e.g. per-file) instance"""
+        self.records += other.records
+        self.games += other.games
+        self.pieces += other.pieces
+        self.play_ms += other.play_ms
+        self.piece_counts = [a + b for a, b in zip(self.piece_counts, other.piece_counts)]
+        for lines, count in other.clear_counts.items():
+            self.clear_counts[lines] += count
+        for level, (total, count) in other.level_up_ms.items():
+            totals = self.level_up_ms.setdefault(level, [0.0, 0])
+            totals[0] += total
+            totals[1] += count
+        return self
+
+    def summary(self):
+        return {
+            'games': self.games,
+            'pieces': self.pieces,
+            'piece_distribution': {get_piece_name(piece): count / self.pieces if self.pieces else 0.0
+                                   for piece, count in enumerate(self.piece_counts)},
+            'pieces_per_second': self.pieces / (self.play_ms / 1000.0) if self.play_ms else 0.0,
+            'line_clears': {CLEAR_NAMES[lines]: count for lines, count in self.clear_counts.items()},
+            'mean_level_up_seconds': {level: total / count / 1000.0
+                                      for level, (total, count) in sorted(self.level_up_ms.items())},
+        }
+
+
+def _init_worker():
+    """Prepare a pool worker for headless replay simulation"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    logging.disable(logging.INFO)
+
+
+def _analyze_file(job):
+    """Pool entry point: job is (path, replay_filter)"""
+    path, replay_filter = job
+    return ArchiveStats().consume(file_events(path, replay_filter))
+
+
+def analyze(paths, replay_filter=None, workers=1):
+    """Aggregate statistics over replay and event-log files
+
+    With workers > 1 files are spread over a process pool and the per-file
+    aggregates merged; replay_filter must then be a module-level function.
+    """
+    stats = ArchiveStats()
+    jobs = [(path, replay_filter) for path in paths]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            for file_stats in executor.map(_analyze_file, jobs):
+                stats.merge(file_stats)
+    else:
+        for job in jobs:
+            stats.merge(_analyze_file(job))
+    return stats
+
+
+def record_sample_games(replay_path, log_path, games, seed=0, frame_ms=16):
+    """Write games played by a random-placement player as a replay file and an event log
+
+    Each piece waits some frames (gravity runs) before its inputs, like a
+    person thinking, so timing statistics are meaningful.
+    """
+    from main import Tetris
+    from bot import PLACEMENTS
+
+    rng = random.Random(seed)
+    game = Tetris(seed=seed, headless=True)
+    with ReplayWriter(replay_path) as writer, EventLogWriter(game, log_path):
+        recorder = ReplayRecorder(game, writer.write)
+        while writer.count < games:
+            for _ in range(rng.randint(5, 40)):
+                game.update(frame_ms)
+            if writer.count >= games:
+                break
+            rotation, x = rng.choice(PLACEMENTS[game.current_piece_type])
+            for _ in range(rotation):
+                game.apply_input('rotate')
+            for _ in range(abs(x - game.piece_x)):
+                game.apply_input('right' if x > game.piece_x else 'left')
+            game.apply_input('hard_drop')
+        recorder.close()
+    return writer.count
+
+
+def run_benchmark(games=200, copies=(1, 4), seed=0):
+    """Records per second and peak memory, replays vs event logs, serial vs pool"""
+    import shutil
+    import tempfile
+    import tracemalloc
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        replay_path = os.path.join(tmp, 'games_0.replay')
+        log_path = os.path.join(tmp, 'games_0.jsonl')
+        record_sample_games(replay_path, log_path, games, seed=seed)
+
+        for count in copies:
+            # Larger archives are copies of the same files
+            for kind, source in (('replay', replay_path), ('event_log', log_path)):
+                paths = [source]
+                for i in range(1, count):
+                    path = source.replace('_0.', f'_{i}.')
+                    if not os.path.exists(path):
+                        shutil.copyfile(source, path)
+                    paths.append(path)
+                size = sum(os.path.getsize(path) for path in paths)
+
+                for workers in sorted({1, os.cpu_count() or 1}):
+                    if workers > 1 and count == 1:
+                        continue
+                    tracemalloc.start()
+                    start = time.perf_counter()
+                    stats = analyze(paths, workers=workers)
+                    elapsed = time.perf_counter() - start
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    results.append({
+                        'source': kind,
+                        'files': count,
+                        'archive_bytes': size,
+                        'workers': workers,
+                        'games': stats.games,
+                        'records_per_second': stats.records / elapsed if elapsed > 0 else 0.0,
+                        'games_per_second': stats.games / elapsed if elapsed > 0 else 0.0,
+                        'peak_traced_kb': peak / 1024.0,
+                    })
+    return results
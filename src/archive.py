@@ -0,0 +1,328 @@
+"""
+Indexed, compressed replay archive
+Many replays packed into zlib-compressed segments, followed by index tables
+sorted by game id and by seed. Readers memory-map the file and binary-search
+the tables in place, so one game is found and decompressed without loading
+the index or touching any other segment.
+
+Layout: magic | segment ... | game id table | seed table | footer
+Reopening an archive appends new segments and a new index after the old
+one; only the index named by the last footer is live.
+"""
+
+import os
+import mmap
+import time
+import zlib
+import struct
+import random
+import logging
+from replay import encode_replay, decode_replay
+from protocol import write_varint, read_varint
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_MAGIC = b'TRA2'
+# Archive format version by magic, matching the replay body version inside it
+ARCHIVE_VERSIONS = {b'TRA1': 1, ARCHIVE_MAGIC: 2}
+
+# game_id, seed, score, segment offset, compressed size, offset in segment, length
+_ENTRY = struct.Struct('<qqqQIII')
+# seed, entry number in the game id table
+_SEED_ENTRY = struct.Struct('<qQ')
+# game id table offset, entry count, seed table offset, magic
+_FOOTER = struct.Struct('<QQQ4s')
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024
+
+
+class ArchiveError(Exception):
+    """Raised for missing or corrupt archives"""
+    pass
+
+
+def _parse_footer(head, footer, footer_offset, path):
+    """(index offset, count, seed table offset, format version) from the magic and footer bytes"""
+    if len(footer) < _FOOTER.size or head not in ARCHIVE_VERSIONS:
+        raise ArchiveError(f"{path} is not a replay archive")
+    index_offset, count, seed_offset, magic = _FOOTER.unpack(footer)
+    if magic != head:
+        raise ArchiveError(f"{path} has no index (was the writer closed?)")
+    # The tables sit directly in front of the footer that names them
+    if (seed_offset != index_offset + count * _ENTRY.size
+            or footer_offset != seed_offset + count * _SEED_ENTRY.size):
+        raise ArchiveError(f"{path} has a corrupt index")
+    return index_offset, count, seed_offset, ARCHIVE_VERSIONS[head]
+
+
+def _recover_footer(data, head, path):
+    """Footer fields of the last complete index before the end of the file
+
+    A writer that dies while appending leaves segments after the previous
+    footer; that footer still names every game archived before it.
+    """
+    end = len(data) - 1
+    while True:
+        position = data.rfind(head, len(head), end)
+        if position < 0:
+            return None
+        footer_offset = position + len(head) - _FOOTER.size
+        if footer_offset >= len(head):
+            try:
+                return _parse_footer(head, data[footer_offset:footer_offset + _FOOTER.size], footer_offset, path)
+            except ArchiveError:
+                pass
+        end = position + len(head) - 1
+
+
+def _read_footer(data, path):
+    """Footer fields of a mapped archive"""
+    if len(data) < len(ARCHIVE_MAGIC) + _FOOTER.size:
+        raise ArchiveError(f"{path} is not a replay archive")
+    head = bytes(data[:len(ARCHIVE_MAGIC)])
+    footer_offset = len(data) - _FOOTER.size
+    try:
+        return _parse_footer(head, data[footer_offset:], footer_offset, path)
+    except ArchiveError:
+        recovered = _recover_footer(data, head, path) if head in ARCHIVE_VERSIONS else None
+        if recovered is None:
+            raise
+        logger.warning(f"{path} ends in an unfinished append; using the previous index")
+        return recovered
+
+
+class ArchiveWriter:
+    """Appends replays to an archive, writing a new index on close"""
+
+    def __init__(self, path, segment_bytes=DEFAULT_SEGMENT_BYTES, level=6):
+        """Open a new archive, or reopen an existing one to append to it"""
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.level = level
+        self.entries = []
+        self._segment = bytearray()
+        self._pending = []
+        # Entries already covered by the file's index (None for a new archive)
+        self._indexed = None
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # Only the magic, the footer and the game id table are read
+            with open(path, 'rb') as archive_file, \
+                    mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                index_offset, count, _, version = _read_footer(data, path)
+                if version != ARCHIVE_VERSIONS[ARCHIVE_MAGIC]:
+                    raise ArchiveError(f"{path} is an older archive version and cannot be appended to")
+                self.entries = list(_ENTRY.iter_unpack(data[index_offset:index_offset + count * _ENTRY.size]))
+            self._indexed = count
+            # New segments go after the old index, which stays in place until
+            # the new index and footer are written; if the writer dies before
+            # close, readers fall back to the old footer
+            self._file = open(path, 'ab')
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(ARCHIVE_MAGIC)
+        self._ids = {entry[0] for entry in self.entries}
+
+    def add(self, replay):
+        if replay.game_id in self._ids:
+            raise ValueError(f"Game {replay.game_id} is already in {self.path}")
+        self._ids.add(replay.game_id)
+        body = encode_replay(replay)
+        write_varint(self._segment, len(body))
+        self._pending.append((replay.game_id, replay.seed, replay.score, len(self._segment), len(body)))
+        self._segment.extend(body)
+        if len(self._segment) >= self.segment_bytes:
+            self._flush_segment()
+
+    def _flush_segment(self):
+        if not self._pending:
+            return
+        compressed = zlib.compress(bytes(self._segment), self.level)
+        offset = self._file.tell()
+        self._file.write(compressed)
+        for game_id, seed, score, start, length in self._pending:
+            self.entries.append((game_id, seed, score, offset, len(compressed), start, length))
+        self._segment = bytearray()
+        self._pending = []
+
+    def close(self):
+        """Write the last segment and the index tables"""
+        if self._file is None:
+            return
+        self._flush_segment()
+        if len(self.entries) == self._indexed:
+            # Nothing appended: the existing index is still current
+            self._file.close()
+            self._file = None
+            return
+        entries = sorted(self.entries, key=lambda entry: entry[0])
+        index_offset = self._file.tell()
+        self._file.write(b''.join(_ENTRY.pack(*entry) for entry in entries))
+        seed_offset = self._file.tell()
+        seeds = sorted((entry[1], number) for number, entry in enumerate(entries))
+        self._file.write(b''.join(_SEED_ENTRY.pack(*pair) for pair in seeds))
+        self._file.write(_FOOTER.pack(index_offset, len(entries), seed_offset, ARCHIVE_MAGIC))
+        self._file.close()
+        self._file = None
+        self.entries = entries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayArchive:
+    """Memory-mapped read access to an archive"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ArchiveError(f"{path} is empty")
+        self._index_offset, self.count, self._seed_offset, self.version = _read_footer(self._data, path)
+        # The most recently decompressed segment, for lookups of neighbouring games
+        self._cached = (None, b'', None)
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def entry(self, number):
+        """Index entry number (in game id order) as a tuple"""
+        return _ENTRY.unpack_from(self._data, self._index_offset + number * _ENTRY.size)
+
+    def _bisect(self, key, table_offset, record):
+        """First position in a table sorted by its first field where field >= key"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if record.unpack_from(self._data, table_offset + middle * record.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _load(self, entry):
+        """Decompress a segment only as far as the replay's end"""
+        _, _, _, offset, size, start, length = entry
+        end = start + length
+        cached_offset, raw, decompressor = self._cached
+        if cached_offset != offset:
+            decompressor = zlib.decompressobj()
+            raw = decompressor.decompress(self._data[offset:offset + size], end)
+        elif len(raw) < end:
+            # A later game in the cached segment: continue where decompression stopped
+            raw += decompressor.decompress(decompressor.unconsumed_tail, end - len(raw))
+        self._cached = (offset, raw, decompressor)
+        return decode_replay(raw[start:end], self.version)
+
+    def get(self, game_id):
+        """The replay with this game id; KeyError if absent"""
+        number = self._bisect(game_id, self._index_offset, _ENTRY)
+        if number < self.count:
+            entry = self.entry(number)
+            if entry[0] == game_id:
+                return self._load(entry)
+        raise KeyError(game_id)
+
+    def find_seed(self, seed):
+        """Every replay played from this seed"""
+        replays = []
+        position = self._bisect(seed, self._seed_offset, _SEED_ENTRY)
+        while position < self.count:
+            found_seed, number = _SEED_ENTRY.unpack_from(self._data, self._seed_offset + position * _SEED_ENTRY.size)
+            if found_seed != seed:
+                break
+            replays.append(self._load(self.entry(number)))
+            position += 1
+        return replays
+
+    def segments(self):
+        """(offset, compressed size) of every live segment, in file order
+
+        Segments are taken from the index, which skips the stale index
+        tables that earlier writers left between segments.
+        """
+        table = self._data[self._index_offset:self._index_offset + self.count * _ENTRY.size]
+        return sorted({entry[3:5] for entry in _ENTRY.iter_unpack(table)})
+
+    def scan(self):
+        """Yield every replay in storage order, decompressing each segment once"""
+        for offset, size in self.segments():
+            try:
+                raw = zlib.decompress(self._data[offset:offset + size])
+            except zlib.error as e:
+                raise ArchiveError(f"Corrupt segment at {offset} in {self.path}: {e}")
+            pos = 0
+            while pos < len(raw):
+                length, pos = read_varint(raw, pos)
+                yield decode_replay(raw[pos:pos + length], self.version)
+                pos += length
+
+
+def run_benchmark(counts=(10000, 100000), lookups=2000, seed=0):
+    """Append, random lookup and sequential scan throughput"""
+    import tempfile
+    from analytics import record_sample_games
+    from replay import read_replays
+
+    results = []
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Real recorded games, reused under new ids and seeds
+        sample_path = os.path.join(tmp, 'sample.replay')
+        record_sample_games(sample_path, os.path.join(tmp, 'sample.jsonl'), games=50, seed=seed)
+        samples = list(read_replays(sample_path))
+        raw_bytes = sum(len(encode_replay(replay)) for replay in samples) / len(samples)
+
+        for count in counts:
+            path = os.path.join(tmp, f'archive_{count}.tra')
+            replays = [samples[i % len(samples)]._replace(game_id=i, seed=rng.randrange(count))
+                       for i in range(count)]
+            start = time.perf_counter()
+            with ArchiveWriter(path) as writer:
+                for replay in replays:
+                    writer.add(replay)
+            append_seconds = time.perf_counter() - start
+            size = os.path.getsize(path)
+
+            with ReplayArchive(path) as archive:
+                ids = [rng.randrange(count) for _ in range(lookups)]
+                start = time.perf_counter()
+                for game_id in ids:
+                    archive.get(game_id)
+                id_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for game_id in ids:
+                    archive.find_seed(game_id)
+                seed_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                scanned = sum(1 for _ in archive.scan())
+                scan_seconds = time.perf_counter() - start
+
+            results.append({
+                'replays': count,
+                'archive_mb': size / 1e6,
+                'compression_ratio': raw_bytes * count / size,
+                'appends_per_second': count / append_seconds,
+                'lookup_by_id_us': id_seconds * 1e6 / lookups,
+                'lookup_by_seed_us': seed_seconds * 1e6 / lookups,
+                'scan_replays_per_second': scanned / scan_seconds,
+            })
+    return results
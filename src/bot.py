@@ -0,0 +1,355 @@
+"""
+Heuristic Tetris bot
+Chooses placements with a weighted board evaluation and a beam search over the
+upcoming piece queue, then plays them through the public Tetris API
+"""
+
+import time
+import logging
+from collections import namedtuple
+from config import GRID_WIDTH, GRID_HEIGHT, SPAWN_X, SPAWN_Y, Scoring
+from pieces import PIECES
+
+logger = logging.getLogger(__name__)
+
+# A placement is "rotate at the top, shift to column x, hard drop"
+Placement = namedtuple('Placement', ['rotation', 'x'])
+
+# Board features scored by the evaluation, in weight-vector order
+FEATURES = ('aggregate_height', 'complete_lines', 'holes', 'bumpiness')
+
+# Well-known hand-tuned weights for the four features above
+DEFAULT_WEIGHTS = (-0.510066, 0.760666, -0.35663, -0.184483)
+
+# Decision budget: the bot must choose before a level 29 piece falls one row
+DECISION_BUDGET_MS = Scoring.LEVEL_SPEEDS[29]
+
+# Everything the row-bitmask model needs to know about a board size
+Board = namedtuple('Board', ['width', 'height', 'spawn_x', 'full_row', 'placements'])
+
+
+def _popcount(value):
+    """Count set bits in an integer"""
+    return bin(value).count('1')
+
+
+def _compile_shapes():
+    """Precompute per-rotation block offsets for every piece type"""
+    shapes = []
+    for rotations in PIECES:
+        compiled = []
+        for rotation in rotations:
+            cells = [(px, py) for py, row in enumerate(rotation)
+                     for px, cell in enumerate(row) if cell == '#']
+            # Row masks are stored relative to the leftmost block so that
+            # shifting by (x + min_x) never needs a negative shift
+            min_x = min(px for px, _ in cells)
+            rows = {}
+            for px, py in cells:
+                rows[py] = rows.get(py, 0) | (1 << (px - min_x))
+            bottoms = {}
+            for px, py in cells:
+                bottoms[px] = max(bottoms.get(px, -1), py)
+            compiled.append({
+                'rows': sorted(rows.items()),
+                'bottoms': sorted(bottoms.items()),
+                'min_x': min_x,
+                'max_x': max(px for px, _ in cells),
+            })
+        shapes.append(compiled)
+    return shapes
+
+
+SHAPES = _compile_shapes()
+
+
+def grid_to_rows(grid):
+    """Convert a Tetris grid into a tuple of row bitmasks (bit x = column x)"""
+    rows = []
+    for row in grid:
+        mask = 0
+        for x, cell in enumerate(row):
+            if cell:
+                mask |= 1 << x
+        rows.append(mask)
+    return tuple(rows)
+
+
+def fits(rows, shape, x, y):
+    """Check whether a compiled shape fits on a row-bitmask board"""
+    shift = x + shape['min_x']
+    height = len(rows)
+    for py, mask in shape['rows']:
+        row = y + py
+        if row >= height:
+            return False
+        if row >= 0 and rows[row] & (mask << shift):
+            return False
+    return True
+
+
+def column_tops(rows, board=None):
+    """Return the index of the topmost filled row per column (the board height if empty)"""
+    board = board or DEFAULT_BOARD
+    full_row = board.full_row
+    tops = [len(rows)] * board.width
+    covered = 0
+    for y, row in enumerate(rows):
+        new = row & ~covered
+        while new:
+            bit = new & -new
+            tops[bit.bit_length() - 1] = y
+            new ^= bit
+        covered |= row
+        if covered == full_row:
+            break
+    return tops
+
+
+def drop_placement(rows, piece_type, placement, board=None):
+    """Hard drop a placement onto a board (default: the configured size)
+
+    Returns (new_rows, lines_cleared), or None if the placement is unreachable
+    with a plain rotate-shift-drop from the spawn position.
+    """
+    board = board or DEFAULT_BOARD
+    shape = SHAPES[piece_type][placement.rotation]
+    x = placement.x
+    if not fits(rows, shape, x, SPAWN_Y):
+        return None
+    spawn_x = board.spawn_x
+    step = 1 if x > spawn_x else -1
+    for path_x in range(spawn_x, x, step):
+        if not fits(rows, shape, path_x, SPAWN_Y):
+            return None
+
+    # Landing row is limited by the highest block under each piece column
+    tops = column_tops(rows, board)
+    y = len(rows)
+    for px, bottom in shape['bottoms']:
+        y = min(y, tops[x + px] - bottom - 1)
+    if y < SPAWN_Y:
+        return None
+    return lock_piece(rows, piece_type, placement.rotation, x, y, board)
+
+
+def lock_piece(rows, piece_type, rotation, x, y, board=None):
+    """Write a piece into the board at (x, y) and clear full rows
+
+    Returns (new_rows, lines_cleared).
+    """
+    full_row = (board or DEFAULT_BOARD).full_row
+    shape = SHAPES[piece_type][rotation]
+    shift = x + shape['min_x']
+    new_rows = list(rows)
+    for py, mask in shape['rows']:
+        if y + py >= 0:
+            new_rows[y + py] |= mask << shift
+    kept = [row for row in new_rows if row != full_row]
+    cleared = len(rows) - len(kept)
+    if cleared:
+        kept = [0] * cleared + kept
+    return tuple(kept), cleared
+
+
+def board_features(rows, lines, board=None):
+    """Compute the evaluation features of a board"""
+    height = len(rows)
+    heights = [height - top for top in column_tops(rows, board)]
+    holes = 0
+    covered = 0
+    for row in rows:
+        holes += _popcount(covered & ~row)
+        covered |= row
+    bumpiness = sum(abs(heights[i] - heights[i + 1]) for i in range(len(heights) - 1))
+    return (sum(heights), lines, holes, bumpiness)
+
+
+def evaluate(rows, lines, weights=DEFAULT_WEIGHTS, board=None):
+    """Weighted sum of board features (higher is better)"""
+    return sum(w * f for w, f in zip(weights, board_features(rows, lines, board)))
+
+
+def placements_for(piece_type, width=GRID_WIDTH):
+    """Enumerate every (rotation, x) the placement model can express"""
+    result = []
+    for rotation, shape in enumerate(SHAPES[piece_type]):
+        for x in range(-shape['min_x'], width - shape['max_x']):
+            result.append(Placement(rotation, x))
+    return result
+
+
+_BOARDS = {}
+
+
+def board_model(width=GRID_WIDTH, height=GRID_HEIGHT, spawn_x=SPAWN_X):
+    """Compiled Board for a size, built once per size"""
+    key = (width, height, spawn_x)
+    board = _BOARDS.get(key)
+    if board is None:
+        placements = [placements_for(piece_type, width) for piece_type in range(len(PIECES))]
+        board = _BOARDS[key] = Board(width, height, spawn_x, (1 << width) - 1, placements)
+    return board
+
+
+def game_board(game):
+    """Compiled Board for a Tetris game's size and spawn column"""
+    return board_model(game.width, game.height, game.spawn_x)
+
+
+DEFAULT_BOARD = board_model()
+PLACEMENTS = DEFAULT_BOARD.placements
+
+
+class TetrisBot:
+    """Autoplayer that drives a Tetris game through move/rotate/hard_drop"""
+
+    def __init__(self, weights=DEFAULT_WEIGHTS, beam_width=8, lookahead=1, tucks=False, book=None):
+        """Initialize bot with evaluation weights and search settings
+
+        lookahead is the number of preview pieces searched after the current
+        one; beam_width is how many boards survive each search depth. With
+        tucks enabled the current piece also considers slides, tucks and
+        kick placements found by the reachability search. book (an
+        opening_book.OpeningBook) answers covered boards without searching.
+        """
+        if len(weights) != len(FEATURES):
+            raise ValueError(f"Expected {len(FEATURES)} weights, got {len(weights)}")
+        self.weights = tuple(weights)
+        self.beam_width = max(1, beam_width)
+        self.lookahead = max(0, lookahead)
+        self.tucks = tucks
+        self.book = book
+        self.book_hits = 0
+        self.latencies_ms = []
+
+    def _rank(self, candidates):
+        """Keep the best beam_width candidates"""
+        candidates.sort(key=lambda entry: entry[0], reverse=True)
+        return candidates[:self.beam_width]
+
+    def search(self, rows, piece_queue, first_moves=None, board=None):
+        """Beam search over the piece queue, returning the best first placement
+
+        first_moves optionally replaces the first piece's placements with
+        precomputed (placement, new_rows, lines_cleared) entries. board is
+        the compiled Board for the rows' size (default: the configured size).
+        """
+        board = board or DEFAULT_BOARD
+        # Each beam entry: (score, rows, total_lines, first_placement)
+        beam = [(0.0, rows, 0, None)]
+        if first_moves is not None:
+            candidates = [(evaluate(new_rows, cleared, self.weights, board), new_rows, cleared, placement)
+                          for placement, new_rows, cleared in first_moves]
+            if not candidates:
+                return None
+            beam = self._rank(candidates)
+            piece_queue = piece_queue[1:]
+        for piece_type in piece_queue:
+            candidates = []
+            for _, rows, lines, first in beam:
+                for placement in board.placements[piece_type]:
+                    result = drop_placement(rows, piece_type, placement, board)
+                    if result is None:
+                        continue
+                    new_rows, cleared = result
+                    total_lines = lines + cleared
+                    score = evaluate(new_rows, total_lines, self.weights, board)
+                    candidates.append((score, new_rows, total_lines, first or placement))
+            if not candidates:
+                break
+            beam = self._rank(candidates)
+        return beam[0][3]
+
+    def choose_move(self, game):
+        """Pick a placement for the game's current piece"""
+        rows = grid_to_rows(game.grid)
+        board = game_board(game)
+        # Books are built for the configured board size only
+        if self.book is not None and board is DEFAULT_BOARD:
+            placement = self.book.lookup(rows, game.current_piece_type)
+            if placement is not None and drop_placement(rows, game.current_piece_type, placement) is not None:
+                self.book_hits += 1
+                return placement
+        queue = [game.current_piece_type] + game.get_next_pieces(self.lookahead)[:self.lookahead]
+        first_moves = None
+        if self.tucks:
+            from reachability import find_reachable
+            piece_type = game.current_piece_type
+            first_moves = [(found,) + lock_piece(rows, piece_type, found.rotation, found.x, found.y, board)
+                           for found in find_reachable(game)]
+        return self.search(rows, queue, first_moves, board)
+
+    def execute(self, game, placement):
+        """Play a placement with rotate/move inputs followed by a hard drop"""
+        if hasattr(placement, 'inputs'):
+            from reachability import execute_inputs
+            execute_inputs(game, placement.inputs)
+            return
+        if placement is not None:
+            for _ in range(placement.rotation):
+                game.apply_input('rotate')
+            while game.piece_x != placement.x:
+                before = game.piece_x
+                game.apply_input('right' if placement.x > game.piece_x else 'left')
+                if game.piece_x == before:
+                    logger.debug(f"Bot move blocked at x={before}, target {placement.x}")
+                    break
+        game.apply_input('hard_drop')
+
+    def play_piece(self, game):
+        """Decide and play one piece, recording decision latency"""
+        start = time.perf_counter()
+        placement = self.choose_move(game)
+        self.latencies_ms.append((time.perf_counter() - start) * 1000.0)
+        self.execute(game, placement)
+        return placement
+
+    def latency_report(self):
+        """Summarize decision latency against the level 29 fall speed"""
+        if not self.latencies_ms:
+            return {'decisions': 0}
+        ordered = sorted(self.latencies_ms)
+        count = len(ordered)
+        return {
+            'decisions': count,
+            'mean_ms': sum(ordered) / count,
+            'p95_ms': ordered[min(count - 1, int(count * 0.95))],
+            'max_ms': ordered[-1],
+            'budget_ms': DECISION_BUDGET_MS,
+            'within_budget': sum(1 for value in ordered if value <= DECISION_BUDGET_MS) / count,
+        }
+
+
+def play_game(game, bot, max_pieces=1000):
+    """Let the bot play until game over or max_pieces, returning final stats"""
+    games_before = game.games_played
+    for _ in range(max_pieces):
+        bot.play_piece(game)
+        if game.games_played != games_before:
+            return dict(game.last_game)
+    return {'score': game.score, 'level': game.level,
+            'lines': game.lines_cleared, 'pieces': game.total_pieces}
+
+
+def run_benchmark(pieces=500, beam_width=8, lookahead=1, seed=0):
+    """Headless throughput benchmark in pieces per second"""
+    from main import Tetris
+
+    game = Tetris(seed=seed, headless=True)
+    bot = TetrisBot(beam_width=beam_width, lookahead=lookahead)
+    start = time.perf_counter()
+    for _ in range(pieces):
+        bot.play_piece(game)
+    elapsed = time.perf_counter() - start
+
+    report = bot.latency_report()
+    report.update({
+        'pieces': pieces,
+        'beam_width': beam_width,
+        'lookahead': lookahead,
+        'pieces_per_second': pieces / elapsed if elapsed > 0 else 0.0,
+        'games_over': game.games_played,
+        'lines': game.lines_cleared,
+    })
+    return report
@@ -10,11 +10,21 @@ BLOCK_SIZE = 30
 # Grid settings
 GRID_WIDTH = 10
 GRID_HEIGHT = 20
+MAX_BOARD_WIDTH = 100    # Largest supported stress board (main.py --board, stress.py)
+MAX_BOARD_HEIGHT = 1000
 
 # Game mechanics
 FALL_SPEED_MS = 500
 SPAWN_X = 3
 SPAWN_Y = 0
+PREVIEW_PIECES = 5  # Upcoming pieces visible to players and bots
+ROTATION_KICKS = (0, -1, 1)  # Horizontal offsets tried in order by the classic rotation system
+ROTATION_SYSTEM = 'classic'  # Default rotation system (see rotation.ROTATION_SYSTEMS)
+INPUT_ACTIONS = (None, 'left', 'right', 'down', 'rotate', 'hard_drop',
+                 'rotate_ccw', 'rotate_180')  # Index is the input's wire/replay code
+DAS_MS = 170          # Delayed auto-shift: hold time before a held left/right starts repeating
+ARR_MS = 50           # Auto-repeat rate: time between repeated moves (0 = straight to the wall)
+SOFT_DROP_MS = 50     # Repeat interval of a held soft drop
 
 # Frame rate
 FPS = 60
@@ -81,6 +91,10 @@ class PieceColors:
     Z_PIECE_BORDER = (192, 0, 0)      # Darker red
     J_PIECE_BORDER = (0, 0, 192)      # Darker blue
     
+    # Garbage lines received in versus play
+    GARBAGE = (128, 128, 128)         # Gray
+    GARBAGE_BORDER = (80, 80, 80)     # Darker gray
+    
     # Grid colors
     GRID_BACKGROUND = (32, 32, 32)    # Dark gray background
     GRID_BORDER = (96, 96, 96)        # Medium gray borders
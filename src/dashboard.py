@@ -0,0 +1,269 @@
+"""
+Multi-board dashboard
+Shows a tiled grid of many live games in one window. Blocks come from one
+pre-rendered atlas, each board is drawn at reduced scale onto its own cached
+surface, and only boards whose state changed are redrawn and blitted.
+"""
+
+import sys
+import math
+import time
+import logging
+import argparse
+import pygame
+from config import FPS, Colors
+from pieces import PieceColors, get_piece_color, get_piece_border_color
+
+logger = logging.getLogger(__name__)
+
+# Grid cell values drawn by the atlas: 0 empty, 1-7 pieces, 8 garbage
+ATLAS_VALUES = 9
+TILE_PADDING = 4
+HEADER_HEIGHT = 12
+
+
+class BlockAtlas:
+    """All block images at one scale on a single surface"""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.surface = pygame.Surface((cell_size * ATLAS_VALUES, cell_size))
+        self.areas = []
+        border = 1 if cell_size >= 4 else 0
+        for value in range(ATLAS_VALUES):
+            area = pygame.Rect(value * cell_size, 0, cell_size, cell_size)
+            if value == 0:
+                self.surface.fill(PieceColors.GRID_BACKGROUND, area)
+            else:
+                self.surface.fill(get_piece_color(value - 1), area)
+                if border:
+                    # Same bordered block look as GameField, scaled down
+                    pygame.draw.rect(self.surface, get_piece_border_color(value - 1), area, border)
+            self.areas.append(area)
+
+    def blit_cell(self, target, value, x, y):
+        target.blit(self.surface, (x, y), self.areas[value])
+
+
+class BoardTile:
+    """One game's cached board and composed tile surfaces"""
+
+    def __init__(self, game, atlas, font, label=''):
+        self.game = game
+        self.atlas = atlas
+        self.font = font
+        self.label = label
+        size = atlas.cell_size
+        self.board_size = (game.width * size, game.height * size)
+        self.board = pygame.Surface(self.board_size)
+        self.surface = pygame.Surface((self.board_size[0], self.board_size[1] + HEADER_HEIGHT))
+        self._board_dirty = True
+        self._signature = None
+        self._header_text = None
+        game.add_listener(self._on_event)
+
+    def close(self):
+        self.game.remove_listener(self._on_event)
+
+    def _on_event(self, event, data):
+        # Locked cells only change on these events; piece moves are caught by the signature
+        if event in ('lock', 'garbage', 'reset'):
+            self._board_dirty = True
+
+    def _draw_board(self):
+        atlas = self.atlas
+        size = atlas.cell_size
+        board = self.board
+        board.fill(PieceColors.GRID_BACKGROUND)
+        for y, row in enumerate(self.game.grid):
+            for x, value in enumerate(row):
+                if value:
+                    atlas.blit_cell(board, value, x * size, y * size)
+        self._board_dirty = False
+
+    def refresh(self):
+        """Recompose the tile if the game changed; returns whether it did"""
+        game = self.game
+        signature = (game.current_piece_type, game.current_rotation, game.piece_x, game.piece_y,
+                     game.score)
+        if not self._board_dirty and signature == self._signature:
+            return False
+        if self._board_dirty:
+            self._draw_board()
+        self._signature = signature
+
+        surface = self.surface
+        size = self.atlas.cell_size
+        header = f"{self.label} {game.score}"
+        if header != self._header_text:
+            surface.fill(Colors.BLACK, (0, 0, self.board_size[0], HEADER_HEIGHT))
+            surface.blit(self.font.render(header, True, Colors.LIGHT_GRAY), (0, 0))
+            self._header_text = header
+        surface.blit(self.board, (0, HEADER_HEIGHT))
+        value = game.current_piece_type + 1
+        for py, row in enumerate(game.current_piece):
+            for px, cell in enumerate(row):
+                x, y = game.piece_x + px, game.piece_y + py
+                if cell == '#' and 0 <= x < game.width and 0 <= y < game.height:
+                    self.atlas.blit_cell(surface, value, x * size, HEADER_HEIGHT + y * size)
+        return True
+
+
+class Dashboard:
+    """Tiled view of many games"""
+
+    def __init__(self, games, cell_size=5, columns=None, labels=None):
+        self.atlas = BlockAtlas(cell_size)
+        pygame.font.init()
+        self.font = pygame.font.Font(None, HEADER_HEIGHT + 2)
+        labels = labels or [f"#{i}" for i in range(len(games))]
+        self.tiles = [BoardTile(game, self.atlas, self.font, label) for game, label in zip(games, labels)]
+        self.columns = columns or max(1, math.ceil(math.sqrt(len(games))))
+        # Games may have different board sizes: every slot fits the largest tile
+        sizes = [tile.surface.get_size() for tile in self.tiles] or [(0, 0)]
+        tile_width, tile_height = max(width for width, _ in sizes), max(height for _, height in sizes)
+        self.tile_step = (tile_width + TILE_PADDING, tile_height + TILE_PADDING)
+        rows = math.ceil(len(self.tiles) / self.columns)
+        self.size = (self.columns * self.tile_step[0] + TILE_PADDING,
+                     rows * self.tile_step[1] + TILE_PADDING)
+        self._full_redraw = True
+        self.redrawn = 0
+
+    def position(self, index):
+        column, row = index % self.columns, index // self.columns
+        return (TILE_PADDING + column * self.tile_step[0], TILE_PADDING + row * self.tile_step[1])
+
+    def draw(self, screen):
+        """Blit changed tiles; returns the dirty rects for pygame.display.update"""
+        dirty = []
+        if self._full_redraw:
+            screen.fill(Colors.BLACK)
+        for index, tile in enumerate(self.tiles):
+            if tile.refresh() or self._full_redraw:
+                dirty.append(screen.blit(tile.surface, self.position(index)))
+        if self._full_redraw:
+            dirty = [screen.get_rect()]
+            self._full_redraw = False
+        self.redrawn += len(dirty)
+        return dirty
+
+    def invalidate(self):
+        self._full_redraw = True
+
+    def close(self):
+        for tile in self.tiles:
+            tile.close()
+
+
+def draw_naive(screen, games, dashboard):
+    """Baseline: every cell of every board with pygame.draw.rect, every frame"""
+    size = dashboard.atlas.cell_size
+    screen.fill(Colors.BLACK)
+    for index, game in enumerate(games):
+        left, top = dashboard.position(index)
+        top += HEADER_HEIGHT
+        pygame.draw.rect(screen, PieceColors.GRID_BACKGROUND,
+                         (left, top, game.width * size, game.height * size))
+        cells = [row[:] for row in game.grid]
+        for py, row in enumerate(game.current_piece):
+            for px, cell in enumerate(row):
+                x, y = game.piece_x + px, game.piece_y + py
+                if cell == '#' and 0 <= x < game.width and 0 <= y < game.height:
+                    cells[y][x] = game.current_piece_type + 1
+        for y, row in enumerate(cells):
+            for x, value in enumerate(row):
+                rect = (left + x * size, top + y * size, size, size)
+                if value:
+                    pygame.draw.rect(screen, get_piece_color(value - 1), rect)
+                    pygame.draw.rect(screen, get_piece_border_color(value - 1), rect, 1)
+                else:
+                    pygame.draw.rect(screen, PieceColors.GRID_BACKGROUND, rect)
+        screen.blit(dashboard.font.render(f"#{index} {game.score}", True, Colors.LIGHT_GRAY),
+                    (left, top - HEADER_HEIGHT))
+
+
+class BotFleet:
+    """Headless bot games advanced one frame at a time, with staggered thinking"""
+
+    def __init__(self, count, seed=0, think_frames=12):
+        from main import Tetris
+        from bot import TetrisBot
+
+        self.games = [Tetris(seed=seed + i, headless=True) for i in range(count)]
+        self.bot = TetrisBot(beam_width=1, lookahead=0)
+        self.think_frames = think_frames
+        self.frame = 0
+
+    def step(self, frame_ms=1000.0 / FPS):
+        """Gravity for every game; each game's bot places a piece every think_frames"""
+        for index, game in enumerate(self.games):
+            if (self.frame + index) % self.think_frames == 0:
+                self.bot.play_piece(game)
+            game.update(frame_ms)
+        self.frame += 1
+
+
+def run_benchmark(board_counts=(16, 64), frames=300, seed=0):
+    """Draw time per frame for the batched dashboard against naive per-cell drawing"""
+    results = []
+    for count in board_counts:
+        fleet = BotFleet(count, seed=seed)
+        dashboard = Dashboard(fleet.games)
+        screen = pygame.Surface(dashboard.size)
+        batched = naive = simulate = 0.0
+        tiles = 0
+        for _ in range(frames):
+            start = time.perf_counter()
+            fleet.step()
+            simulate += time.perf_counter() - start
+
+            start = time.perf_counter()
+            tiles += len(dashboard.draw(screen))
+            batched += time.perf_counter() - start
+
+            start = time.perf_counter()
+            draw_naive(screen, fleet.games, dashboard)
+            naive += time.perf_counter() - start
+        dashboard.close()
+        results.append({
+            'boards': count,
+            'frames': frames,
+            'batched_draw_ms': batched * 1000.0 / frames,
+            'naive_draw_ms': naive * 1000.0 / frames,
+            'simulate_ms': simulate * 1000.0 / frames,
+            'tiles_redrawn_per_frame': tiles / frames,
+            'batched_draw_fps': frames / batched if batched > 0 else 0.0,
+        })
+    return results
+
+
+def main(argv=None):
+    """Command line entry point: watch a fleet of bot games"""
+    parser = argparse.ArgumentParser(description="Dashboard of live bot games")
+    parser.add_argument('--games', type=int, default=16)
+    parser.add_argument('--cell-size', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    fleet = BotFleet(args.games, seed=args.seed)
+    dashboard = Dashboard(fleet.games, cell_size=args.cell_size)
+    screen = pygame.display.set_mode(dashboard.size)
+    pygame.display.set_caption(f"Tetris dashboard - {args.games} games")
+    clock = pygame.time.Clock()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.VIDEOEXPOSE:
+                dashboard.invalidate()
+        fleet.step(clock.tick(FPS))
+        pygame.display.update(dashboard.draw(screen))
+    dashboard.close()
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
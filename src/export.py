@@ -0,0 +1,238 @@
+"""
+Headless replay-to-video frame export
+Renders every frame of a replay through GameUI onto an off-screen surface and
+writes PNG sequences or raw RGB24 video. The replay is simulated once to take
+snapshots at segment boundaries; segments are then rendered in a process pool
+and written in frame order.
+
+Raw output can be encoded with e.g.
+ffmpeg -f rawvideo -pix_fmt rgb24 -s 550x750 -r 60 -i frames.rgb out.mp4
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from replay import iter_ops, replay_game
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('png', 'raw')
+
+# Per-process renderer state, created lazily by the worker
+_worker_game = None
+_worker_surface = None
+
+
+def _init_worker():
+    """Prepare a pool worker for off-screen rendering"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    logging.disable(logging.INFO)
+
+
+def replay_frames(replay):
+    """Split a replay into frames: (inputs applied first, dt passed to update)
+
+    Inputs after the last tick form a final frame with dt None.
+    """
+    frames = []
+    inputs = []
+    for op in iter_ops(replay.ops):
+        if op[0] == 'input':
+            inputs.append(op[1])
+        else:
+            _, dt, count = op
+            frames.append((tuple(inputs), dt))
+            inputs = []
+            frames.extend([((), dt)] * (count - 1))
+    if inputs:
+        frames.append((tuple(inputs), None))
+    return frames
+
+
+def step_frame(game, frame):
+    """Advance the game by one frame; False once the game is over"""
+    inputs, dt = frame
+    games_before = game.games_played
+    for action in inputs:
+        game.apply_input(action)
+        if game.games_played != games_before:
+            return False
+    if dt is not None:
+        game.update(dt)
+    return game.games_played == games_before
+
+
+def plan_segments(replay, frames, segment_frames):
+    """Simulate once, snapshotting the game at every segment start
+
+    Returns [(first_frame, snapshot)] and the number of frames before game over.
+    """
+    game = replay_game(replay)
+    segments = []
+    played = 0
+    for index, frame in enumerate(frames):
+        if index % segment_frames == 0:
+            segments.append((index, game.snapshot()))
+        if not step_frame(game, frame):
+            break
+        played += 1
+    return segments, played
+
+
+def _frame_name(directory, index):
+    return os.path.join(directory, f'frame_{index:06d}.png')
+
+
+def render_segment(job):
+    """Pool entry point: render frames [start, end) of a replay from its snapshot
+
+    job is (replay, snapshot, frames, start, end, every, fmt, target); the
+    replay's ops are not needed, only its board size and rotation system.
+    PNGs are named by frame; raw frames go to one file per segment for the
+    parent to join. Returns the number of frames rendered.
+    """
+    import pygame
+    from replay import game_rules
+
+    global _worker_game, _worker_surface
+    replay, snapshot, frames, start, end, every, fmt, target = job
+    if _worker_game is None or game_rules(_worker_game) != (replay.width, replay.height, replay.rotation_system):
+        _worker_game = replay_game(replay)
+        _worker_game.init_ui()
+        _worker_surface = pygame.Surface(_worker_game.ui.logical_size)
+    game, surface = _worker_game, _worker_surface
+    game.restore(snapshot)
+
+    rendered = 0
+    raw_file = open(target, 'wb') if fmt == 'raw' else None
+    try:
+        for index in range(start, end):
+            step_frame(game, frames[index - start])
+            if index % every:
+                continue
+            game.draw(surface)
+            if raw_file is not None:
+                raw_file.write(pygame.image.tostring(surface, 'RGB'))
+            else:
+                pygame.image.save(surface, _frame_name(target, index))
+            rendered += 1
+    finally:
+        if raw_file is not None:
+            raw_file.close()
+    return rendered
+
+
+def export_replay(replay, output, fmt='png', workers=None, segment_frames=120, every=1,
+                  max_frames=None):
+    """Render a replay's frames to a PNG directory or a raw RGB24 file
+
+    every=N keeps one frame in N; max_frames stops early. Returns a report
+    with export throughput.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    start = time.perf_counter()
+    frames = replay_frames(replay)[:max_frames]
+    segments, played = plan_segments(replay, frames, segment_frames)
+    plan_seconds = time.perf_counter() - start
+
+    if fmt == 'png':
+        os.makedirs(output, exist_ok=True)
+    parts_dir = output + '.parts' if fmt == 'raw' else None
+    if parts_dir:
+        os.makedirs(parts_dir, exist_ok=True)
+
+    rules = replay._replace(ops=b'')
+    jobs = []
+    for number, (first, snapshot) in enumerate(segments):
+        last = min(first + segment_frames, played)
+        target = os.path.join(parts_dir, f'{number:05d}.rgb') if parts_dir else output
+        jobs.append((rules, snapshot, frames[first:last], first, last, every, fmt, target))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                rendered = sum(executor.map(render_segment, jobs))
+        else:
+            rendered = sum(map(render_segment, jobs))
+
+        if parts_dir:
+            # Join the segment files in frame order
+            with open(output, 'wb') as out_file:
+                for job in jobs:
+                    with open(job[-1], 'rb') as part:
+                        shutil.copyfileobj(part, out_file)
+    finally:
+        if parts_dir:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': rendered,
+        'segments': len(jobs),
+        'workers': workers,
+        'format': fmt,
+        'plan_seconds': plan_seconds,
+        'seconds': elapsed,
+        'frames_per_second': rendered / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def run_benchmark(frames=600, seed=0):
+    """Export throughput for PNG and raw output, serial and pooled"""
+    import tempfile
+    from analytics import record_sample_games
+    from replay import read_replays
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        replay_path = os.path.join(tmp, 'games.replay')
+        record_sample_games(replay_path, os.path.join(tmp, 'games.jsonl'), games=20, seed=seed)
+        # Longest recorded game, cut to the requested frame count by max_frames
+        replay = max(read_replays(replay_path), key=lambda r: r.duration_ms)
+        for fmt in FORMATS:
+            for workers in sorted({1, os.cpu_count() or 1}):
+                output = os.path.join(tmp, f'{fmt}_{workers}')
+                report = export_replay(replay, output + ('.rgb' if fmt == 'raw' else ''),
+                                       fmt=fmt, workers=workers, max_frames=frames)
+                results.append(report)
+    return results
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Export replay frames")
+    parser.add_argument('source', help="replay file or replay archive")
+    parser.add_argument('output', help="PNG directory, or file for --format raw")
+    parser.add_argument('--game', type=int, default=None, help="game id (default: first game)")
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--segment-frames', type=int, default=120)
+    parser.add_argument('--every', type=int, default=1, help="keep one frame in N")
+    args = parser.parse_args(argv)
+
+    _init_worker()
+    from analytics import file_kind
+    if file_kind(args.source) == 'archive':
+        from archive import ReplayArchive
+        with ReplayArchive(args.source) as archive:
+            replay = archive.get(args.game) if args.game is not None else next(archive.scan())
+    else:
+        from replay import read_replays
+        replay = next(r for r in read_replays(args.source) if args.game in (None, r.game_id))
+
+    report = export_replay(replay, args.output, fmt=args.format, workers=args.workers,
+                           segment_frames=args.segment_frames, every=args.every)
+    print(f"Exported {report['frames']} frames in {report['seconds']:.1f}s "
+          f"({report['frames_per_second']:.1f} frames/s, {report['workers']} workers)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Input engine with delayed auto-shift and auto-repeat
+Tracks which keys are held and generates repeated moves on the game's own
+clock: a held left/right moves once, waits DAS_MS, then repeats every
+ARR_MS; a held soft drop repeats every SOFT_DROP_MS. Key presses are
+timestamped on the same clock and, with the repeats, applied in time order
+inside the logic tick, with gravity advanced up to each input's time.
+The same timestamped presses therefore give the same inputs however the
+time is split into frames.
+"""
+
+import time
+import heapq
+import logging
+from collections import deque
+from config import DAS_MS, ARR_MS, SOFT_DROP_MS
+from sim_thread import summarize
+
+logger = logging.getLogger(__name__)
+
+HORIZONTAL = ('left', 'right')
+REPEATING = HORIZONTAL + ('down',)
+
+
+class InputEngine:
+    """Turns key presses and releases into timed game inputs"""
+
+    def __init__(self, game, das_ms=DAS_MS, arr_ms=ARR_MS, soft_drop_ms=SOFT_DROP_MS, log_size=10000):
+        self.game = game
+        self.das_ms = das_ms
+        self.arr_ms = arr_ms
+        self.soft_drop_ms = soft_drop_ms
+        # Game clock in ms: the start of the next tick
+        self.now = 0
+        # Pending key events as (time, sequence, pressed, action, received wall time)
+        self._events = []
+        self._sequence = 0
+        # Held repeating keys -> time of their next repeat (None while overridden)
+        self.held = {}
+        # Held horizontal keys, most recent last: the last one pressed wins
+        self._horizontal = []
+        # (time, action) of every input applied, for tests and diagnostics
+        self.applied = deque(maxlen=log_size)
+        # Wall times of applied presses still waiting to be presented
+        self._unpresented = []
+        self.latency_ms = deque(maxlen=log_size)
+
+    def press(self, action, t=None, received=None):
+        """A key went down at game time t (default: the start of the next tick)
+
+        received is the wall-clock time (time.perf_counter) the event was
+        read, used to measure input-to-photon latency.
+        """
+        self._queue(True, action, t, received)
+
+    def release(self, action, t=None):
+        self._queue(False, action, t, None)
+
+    def _queue(self, pressed, action, t, received):
+        # Events can't be applied in the past: late ones take effect at once
+        t = self.now if t is None else max(t, self.now)
+        heapq.heappush(self._events, (t, self._sequence, pressed, action, received))
+        self._sequence += 1
+
+    def _next_repeat(self):
+        """(time, action) of the earliest pending auto-repeat, or None"""
+        pending = [(t, action) for action, t in self.held.items() if t is not None]
+        return min(pending) if pending else None
+
+    def _apply(self, t, action):
+        self.applied.append((t, action))
+        try:
+            self.game.apply_input(action)
+        except Exception as e:
+            logger.error(f"Error applying input {action}: {e}")
+
+    def _on_press(self, t, action, received):
+        if received is not None:
+            self._unpresented.append(received)
+        if action in self.held:
+            return  # Key repeat from the OS: the engine makes its own repeats
+        if action not in REPEATING:
+            self._apply(t, action)
+            return
+        if action in HORIZONTAL:
+            for other in self._horizontal:
+                self.held[other] = None
+            self._horizontal.append(action)
+            self.held[action] = t + self.das_ms
+        else:
+            self.held[action] = t + self.soft_drop_ms
+        self._apply(t, action)
+
+    def _on_release(self, t, action):
+        if action not in self.held:
+            return
+        del self.held[action]
+        if action in self._horizontal:
+            was_active = self._horizontal[-1] == action
+            self._horizontal.remove(action)
+            if was_active and self._horizontal:
+                # The other direction is still held: it charges DAS afresh
+                self.held[self._horizontal[-1]] = t + self.das_ms
+
+    def _on_repeat(self, t, action):
+        if action == 'down':
+            self.held[action] = t + self.soft_drop_ms
+            self._apply(t, action)
+        elif self.arr_ms <= 0:
+            # Instant repeat: slide to the wall, then stop repeating
+            self.held[action] = None
+            for _ in range(self.game.width):
+                before = self.game.piece_x
+                self._apply(t, action)
+                if self.game.piece_x == before:
+                    break
+        else:
+            self.held[action] = t + self.arr_ms
+            self._apply(t, action)
+
+    def tick(self, dt):
+        """Advance the game by dt ms, applying events and repeats in time order"""
+        end = self.now + dt
+        cursor = self.now
+        while True:
+            event_time = self._events[0][0] if self._events else None
+            repeat = self._next_repeat()
+            # Events come before repeats at the same time (a release stops its repeat)
+            if event_time is not None and event_time <= end and (repeat is None or event_time <= repeat[0]):
+                t, _, pressed, action, received = heapq.heappop(self._events)
+            elif repeat is not None and repeat[0] <= end:
+                (t, action), pressed = repeat, None
+            else:
+                break
+            if t > cursor:
+                self.game.update(t - cursor)
+                cursor = t
+            if pressed is None:
+                self._on_repeat(t, action)
+            elif pressed:
+                self._on_press(t, action, received)
+            else:
+                self._on_release(t, action)
+        if end > cursor:
+            self.game.update(end - cursor)
+        self.now = end
+
+    def presented(self, wall_time=None):
+        """The frame showing every input applied so far is on screen"""
+        wall_time = time.perf_counter() if wall_time is None else wall_time
+        self.latency_ms.extend((wall_time - received) * 1000.0 for received in self._unpresented)
+        self._unpresented = []
+
+    def reset(self):
+        """Forget held keys and pending events (e.g. when the window loses focus)"""
+        self._events = []
+        self.held = {}
+        self._horizontal = []
+
+    def report(self):
+        return {'inputs_applied': len(self.applied), 'input_to_photon_ms': summarize(self.latency_ms)}
+
+
+def run_benchmark(seconds=3.0, flip_ms=(0, 30), seed=0):
+    """Input-to-photon latency through the engine, with and without a slow flip
+
+    Presses are timestamped when read, applied in the next tick, drawn with
+    GameUI and 'presented' after a simulated flip of flip_ms.
+    """
+    import random
+    import pygame
+    from main import Tetris
+    from config import FPS, WINDOW_WIDTH, WINDOW_HEIGHT
+    from ui_components import GameUI
+
+    results = []
+    for flip in flip_ms:
+        rng = random.Random(seed)
+        game = Tetris(seed=seed, headless=True)
+        engine = InputEngine(game)
+        ui = GameUI()
+        surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        clock = pygame.time.Clock()
+        frames = 0
+        tick_seconds = 0.0
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            dt = clock.tick(FPS)
+            # Stand-in for key events read this frame: arrived during the last one
+            if rng.random() < 0.2:
+                action = rng.choice(('left', 'right', 'rotate', 'down'))
+                engine.press(action, received=time.perf_counter() - rng.uniform(0, dt) / 1000.0)
+                engine.release(action, engine.now + rng.choice((10, 100, 300)))
+            start = time.perf_counter()
+            engine.tick(dt)
+            tick_seconds += time.perf_counter() - start
+            ui.draw(surface, game.get_draw_state())
+            if flip:
+                time.sleep(flip / 1000.0)
+            engine.presented()
+            frames += 1
+        report = engine.report()
+        latency = report['input_to_photon_ms']
+        results.append({
+            'flip_ms': flip,
+            'frames': frames,
+            'inputs_applied': report['inputs_applied'],
+            'tick_us': tick_seconds * 1e6 / frames,
+            'input_to_photon_mean_ms': latency['mean'],
+            'input_to_photon_p99_ms': latency['p99'],
+        })
+    return results
@@ -0,0 +1,125 @@
+"""
+Adaptive level of detail
+A frame-time controller that steps GameUI's detail level down when frames
+overrun their budget and back up when there is headroom again. Separate
+thresholds and frame counts for each direction (hysteresis), and a longer
+wait after a step up that did not fit, keep it from flickering between
+levels.
+"""
+
+import time
+import logging
+from config import FPS
+from ui_components import LOD_FULL, LOD_LEVELS
+
+logger = logging.getLogger(__name__)
+
+
+class LODController:
+    """Chooses a detail level from measured frame times"""
+
+    def __init__(self, budget_ms=1000.0 / FPS, max_level=LOD_LEVELS - 1, up_ratio=0.6,
+                 down_frames=3, up_frames=90):
+        """Step down after down_frames consecutive frames over budget_ms, and up
+        after up_frames consecutive frames under up_ratio * budget_ms"""
+        self.budget_ms = budget_ms
+        self.max_level = max_level
+        self.up_ratio = up_ratio
+        self.down_frames = down_frames
+        self.up_frames = up_frames
+        self.level = LOD_FULL
+        self.changes = 0
+        self.frames = 0
+        self._over = 0
+        self._under = 0
+        # Frames of headroom needed to step up; doubled when a step up overruns at once
+        self._up_wait = up_frames
+        self._last_up = None
+
+    def record(self, frame_ms):
+        """Account for one frame's render time; returns the level for the next frame"""
+        self.frames += 1
+        if frame_ms > self.budget_ms:
+            self._over += 1
+            self._under = 0
+        elif frame_ms < self.budget_ms * self.up_ratio:
+            self._under += 1
+            self._over = 0
+        else:
+            # Inside the dead band: neither direction builds up
+            self._over = self._under = 0
+
+        if self._over >= self.down_frames and self.level < self.max_level:
+            self._set_level(self.level + 1)
+        elif self._under >= self._up_wait and self.level > LOD_FULL:
+            self._set_level(self.level - 1)
+        return self.level
+
+    def _set_level(self, level):
+        if level < self.level:
+            self._last_up = self.frames
+        elif self._last_up is not None and self.frames - self._last_up <= self.up_frames:
+            # The last step up did not fit the budget: wait longer before trying again
+            self._up_wait = min(self._up_wait * 2, self.up_frames * 16)
+        logger.info(f"Detail level {self.level} -> {level}")
+        self.level = level
+        self.changes += 1
+        self._over = self._under = 0
+
+
+def run_benchmark(frames=1200, slowdowns=(1, 8, 16), seed=0):
+    """Render cost per detail level, and overrun rates with and without the controller
+
+    Slower hardware is emulated by busy-waiting (slowdown - 1) times each
+    frame's measured draw time, so cheaper detail levels also get cheaper.
+    """
+    import pygame
+    from main import Tetris
+    from bot import TetrisBot
+    from config import WINDOW_WIDTH, WINDOW_HEIGHT
+    from ui_components import GameUI
+
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    def play(ui, slowdown, controller=None):
+        game = Tetris(seed=seed, headless=True)
+        bot = TetrisBot(beam_width=1, lookahead=0)
+        times = []
+        levels = [0] * LOD_LEVELS
+        for frame in range(frames):
+            if frame % 20 == 19:
+                bot.play_piece(game)
+            game.update(1000.0 / FPS)
+            start = time.perf_counter()
+            ui.draw(surface, game.get_draw_state())
+            end = start + (time.perf_counter() - start) * slowdown
+            while time.perf_counter() < end:
+                pass
+            frame_ms = (time.perf_counter() - start) * 1000.0
+            times.append(frame_ms)
+            levels[ui.lod_level] += 1
+            if controller is not None:
+                ui.lod_level = controller.record(frame_ms)
+        return times, levels
+
+    results = []
+    for level in range(LOD_LEVELS):
+        ui = GameUI()
+        ui.lod_level = level
+        times, _ = play(ui, 1)
+        results.append({'lod_level': level, 'draw_ms': sum(times) / len(times)})
+
+    budget = 1000.0 / FPS
+    for slowdown in slowdowns:
+        for adaptive in (False, True):
+            controller = LODController() if adaptive else None
+            times, levels = play(GameUI(), slowdown, controller)
+            results.append({
+                'slowdown': slowdown,
+                'adaptive': adaptive,
+                'mean_frame_ms': sum(times) / len(times),
+                'over_budget_pct': 100.0 * sum(1 for t in times if t > budget) / len(times),
+                'frames_per_level': levels,
+                'level_changes': controller.changes if controller else 0,
+            })
+    return results
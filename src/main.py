@@ -2,9 +2,11 @@ import pygame
 import random
 import sys
 import logging
+from collections import deque
 from config import *
-from pieces import PIECES, get_piece_count, get_piece_name, get_piece_color, get_piece_border_color
+from pieces import PIECES, PIECE_GARBAGE, get_piece_count, get_piece_name, get_piece_color, get_piece_border_color
 from ui_components import GameUI
+from rotation import ROTATION_SYSTEMS, get_rotation_system, CW, CCW, HALF
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -19,7 +21,7 @@ except pygame.error as e:
     sys.exit(1)
 
 try:
-    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.RESIZABLE)
     pygame.display.set_caption(GAME_TITLE)
     clock = pygame.time.Clock()
     logger.info("Display initialized successfully")
@@ -28,6 +30,17 @@ except pygame.error as e:
     pygame.quit()
     sys.exit(1)
 
+# Keyboard controls as named inputs, so human games can be recorded and replayed
+KEY_ACTIONS = {
+    pygame.K_LEFT: 'left',
+    pygame.K_RIGHT: 'right',
+    pygame.K_DOWN: 'down',
+    pygame.K_UP: 'rotate',
+    pygame.K_z: 'rotate_ccw',
+    pygame.K_a: 'rotate_180',
+    pygame.K_SPACE: 'hard_drop',
+}
+
 class TetrisError(Exception):
     """Base exception for Tetris game errors"""
     pass
@@ -37,14 +50,33 @@ class InvalidMoveError(TetrisError):
     pass
 
 class Tetris:
-    def __init__(self):
+    def __init__(self, seed=None, headless=False, width=GRID_WIDTH, height=GRID_HEIGHT, rotation_system=None):
         try:
-            self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-            self.current_piece_type = random.randint(0, get_piece_count() - 1)
+            # Kick tables for rotate(); a name from rotation.ROTATION_SYSTEMS or a RotationSystem
+            self.rotation_system = get_rotation_system(rotation_system)
+            # Board size is per game so stress runs can use much larger boards
+            if not (4 <= width <= MAX_BOARD_WIDTH and 4 <= height <= MAX_BOARD_HEIGHT):
+                raise ValueError(f"unsupported board size {width}x{height}")
+            self.width = width
+            self.height = height
+            self.spawn_x = SPAWN_X + (width - GRID_WIDTH) // 2
+            # Per-game random source so games can be replayed from a seed
+            if seed is None:
+                seed = random.randrange(2 ** 31)
+            self.seed = seed
+            self.rng = random.Random(seed)
+            self.next_pieces = deque()
+            self.games_played = 0
+            self.last_game = None
+            self.listeners = []
+            
+            self.grid = [[0] * self.width for _ in range(self.height)]
+            self.current_piece_type = self.next_piece_type()
             self.current_rotation = 0
             self.current_piece = PIECES[self.current_piece_type][self.current_rotation]
-            self.piece_x, self.piece_y = SPAWN_X, SPAWN_Y
+            self.piece_x, self.piece_y = self.spawn_x, SPAWN_Y
             self.fall_time = 0
+            self.game_time = 0  # Milliseconds of play in the current game
             
             # Scoring system
             self.score = 0
@@ -52,24 +84,81 @@ class Tetris:
             self.lines_cleared = 0
             self.total_pieces = 0
             
-            # Initialize modular UI components
-            self.ui = GameUI()
-            
-            # Keep fonts for backward compatibility (some methods might still use them)
-            pygame.font.init()
-            self.font = pygame.font.Font(None, 24)
-            self.big_font = pygame.font.Font(None, 36)
-            self.small_font = pygame.font.Font(None, 18)
+            # Initialize modular UI components (headless games such as bots
+            # and server sessions skip them until something draws)
+            self.ui = None
+            if not headless:
+                self.init_ui()
             
             logger.info("Tetris game initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Tetris game: {e}")
             raise TetrisError(f"Game initialization failed: {e}")
+    
+    def add_listener(self, callback):
+        """Register callback(event, data) for engine events
+        
+        Events: tick and input (sent before they are applied), lock, garbage,
+        game_over and reset.
+        """
+        self.listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def notify(self, event, **data):
+        """Send an event to all listeners"""
+        for callback in self.listeners:
+            callback(event, data)
+    
+    def snapshot(self):
+        """Capture the simulation state (board, piece, scoring, queue and random source)
+        
+        The snapshot is immutable, so it can be restored any number of times.
+        """
+        return (tuple(tuple(row) for row in self.grid),
+                self.current_piece_type, self.current_rotation, self.piece_x, self.piece_y,
+                self.fall_time, self.game_time, self.score, self.level, self.lines_cleared,
+                self.total_pieces, tuple(self.next_pieces), self.rng.getstate(), self.seed,
+                self.games_played, self.last_game)
+    
+    def restore(self, snapshot):
+        """Return the game to a state captured by snapshot()"""
+        (grid, self.current_piece_type, self.current_rotation, self.piece_x, self.piece_y,
+         self.fall_time, self.game_time, self.score, self.level, self.lines_cleared,
+         self.total_pieces, next_pieces, rng_state, self.seed, self.games_played, self.last_game) = snapshot
+        self.grid = [list(row) for row in grid]
+        self.current_piece = PIECES[self.current_piece_type][self.current_rotation]
+        self.next_pieces = deque(next_pieces)
+        self.rng.setstate(rng_state)
+    
+    def init_ui(self):
+        """Create UI components and fonts"""
+        self.ui = GameUI(self.width, self.height)
+        
+        # Keep fonts for backward compatibility (some methods might still use them)
+        pygame.font.init()
+        self.font = pygame.font.Font(None, 24)
+        self.big_font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 18)
+    
+    def next_piece_type(self):
+        """Pop the next piece type from the preview queue, keeping it filled"""
+        while len(self.next_pieces) <= PREVIEW_PIECES:
+            self.next_pieces.append(self.rng.randint(0, get_piece_count() - 1))
+        return self.next_pieces.popleft()
+    
+    def get_next_pieces(self, count=PREVIEW_PIECES):
+        """Return the upcoming piece types without consuming them"""
+        while len(self.next_pieces) < count:
+            self.next_pieces.append(self.rng.randint(0, get_piece_count() - 1))
+        return list(self.next_pieces)[:count]
         
     def new_piece(self):
         """Generate a new random piece"""
         try:
-            self.current_piece_type = random.randint(0, get_piece_count() - 1)
+            self.current_piece_type = self.next_piece_type()
             self.current_rotation = 0
             self.current_piece = PIECES[self.current_piece_type][self.current_rotation]
             logger.debug(f"Generated new {get_piece_name(self.current_piece_type)}")
@@ -86,7 +175,7 @@ class Tetris:
                 if cell == '#':
                     nx, ny = x + px, y + py
                     # Fixed boundary checks
-                    if nx < 0 or nx >= GRID_WIDTH or ny >= GRID_HEIGHT:
+                    if nx < 0 or nx >= self.width or ny >= self.height:
                         return False
                     if ny >= 0 and self.grid[ny][nx]:
                         return False
@@ -104,24 +193,48 @@ class Tetris:
         # Track pieces placed
         self.total_pieces += 1
         
-        self.clear_lines()
+        cleared_rows = self.clear_lines()
+        if self.listeners:
+            self.notify('lock', piece_type=self.current_piece_type, rotation=self.current_rotation,
+                        x=self.piece_x, y=self.piece_y, cleared_rows=cleared_rows)
         self.new_piece()
-        self.piece_x, self.piece_y = SPAWN_X, SPAWN_Y
+        self.piece_x, self.piece_y = self.spawn_x, SPAWN_Y
         
         # Check game over
         if not self.valid_move(self.current_piece, self.piece_x, self.piece_y):
-            logger.info(f"Game Over! Final Score: {self.score}, Level: {self.level}, Lines: {self.lines_cleared}")
-            self.reset_game()
+            self.game_over()
+    
+    def game_over(self):
+        """Log the finished game and start a new one"""
+        logger.info(f"Game Over! Final Score: {self.score}, Level: {self.level}, Lines: {self.lines_cleared}")
+        self.last_game = {'score': self.score, 'level': self.level,
+                          'lines': self.lines_cleared, 'pieces': self.total_pieces,
+                          'duration_ms': self.game_time, 'seed': self.seed}
+        self.games_played += 1
+        self.notify('game_over', **self.last_game)
+        self.reset_game()
     
-    def reset_game(self):
-        """Properly reset game state without reinitializing the object"""
+    def reset_game(self, seed=None):
+        """Properly reset game state without reinitializing the object
+        
+        If a seed is given the piece sequence restarts from it, otherwise the
+        next seed is drawn from the current random source, so every game has
+        its own replayable seed and seeded sessions stay deterministic.
+        """
         try:
-            self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-            self.current_piece_type = random.randint(0, get_piece_count() - 1)
+            if seed is None:
+                seed = self.rng.randrange(2 ** 31)
+            self.seed = seed
+            self.rng.seed(seed)
+            self.next_pieces.clear()
+            
+            self.grid = [[0] * self.width for _ in range(self.height)]
+            self.current_piece_type = self.next_piece_type()
             self.current_rotation = 0
             self.current_piece = PIECES[self.current_piece_type][self.current_rotation]
-            self.piece_x, self.piece_y = SPAWN_X, SPAWN_Y
+            self.piece_x, self.piece_y = self.spawn_x, SPAWN_Y
             self.fall_time = 0
+            self.game_time = 0
             
             # Reset scoring
             self.score = 0
@@ -129,24 +242,29 @@ class Tetris:
             self.lines_cleared = 0
             self.total_pieces = 0
             
+            self.notify('reset', seed=self.seed)
             logger.info("Game reset successfully")
         except Exception as e:
             logger.error(f"Failed to reset game: {e}")
             raise TetrisError(f"Game reset failed: {e}")
     
     def clear_lines(self):
-        """Clear completed lines and update score using NES Tetris scoring"""
-        lines_cleared = 0
+        """Clear completed lines and update score using NES Tetris scoring
+        
+        Returns the indices of the cleared rows (top to bottom).
+        """
+        cleared_rows = []
         new_grid = []
-        for row in self.grid:
+        for y, row in enumerate(self.grid):
             if 0 in row:  # Keep rows that have empty spaces
                 new_grid.append(row)
             else:
-                lines_cleared += 1
+                cleared_rows.append(y)
+        lines_cleared = len(cleared_rows)
         
-        # Add empty rows at the top
-        while len(new_grid) < GRID_HEIGHT:
-            new_grid.insert(0, [0 for _ in range(GRID_WIDTH)])
+        # Add empty rows at the top (one concatenation rather than an insert per row)
+        if lines_cleared:
+            new_grid = [[0] * self.width for _ in range(lines_cleared)] + new_grid
         
         self.grid = new_grid
         
@@ -157,6 +275,29 @@ class Tetris:
             self.update_level()
             
             logger.info(f"Cleared {lines_cleared} lines. Score: {self.score}, Level: {self.level}")
+        
+        return cleared_rows
+    
+    def add_garbage(self, count, hole_x=None):
+        """Push garbage rows (one empty cell each) up from the bottom
+        
+        Used by versus play. Blocks pushed off the top, or a falling piece
+        that no longer fits, end the game.
+        """
+        if count <= 0:
+            return
+        count = min(count, self.height)
+        if hole_x is None:
+            hole_x = self.rng.randrange(self.width)
+        topped_out = any(any(row) for row in self.grid[:count])
+        
+        garbage_row = [PIECE_GARBAGE + 1] * self.width
+        garbage_row[hole_x] = 0
+        self.grid = self.grid[count:] + [garbage_row[:] for _ in range(count)]
+        self.notify('garbage', count=count, hole_x=hole_x)
+        
+        if topped_out or not self.valid_move(self.current_piece, self.piece_x, self.piece_y):
+            self.game_over()
     
     def add_score_for_lines(self, lines_cleared):
         """Add score based on NES Tetris scoring system"""
@@ -195,7 +336,10 @@ class Tetris:
     def update(self, dt):
         """Update game state with level-based speed"""
         try:
+            if self.listeners:
+                self.notify('tick', dt=dt)
             self.fall_time += dt
+            self.game_time += dt
             current_fall_speed = self.get_fall_speed()
             
             if self.fall_time >= current_fall_speed:
@@ -212,26 +356,38 @@ class Tetris:
         if self.valid_move(self.current_piece, self.piece_x + dx, self.piece_y):
             self.piece_x += dx
     
-    def rotate(self):
-        # Get the number of rotations for current piece
-        num_rotations = len(PIECES[self.current_piece_type])
-        if num_rotations > 1:  # Only rotate if piece has multiple rotations
-            new_rotation = (self.current_rotation + 1) % num_rotations
-            new_piece = PIECES[self.current_piece_type][new_rotation]
-            
-            # Try to rotate in current position
-            if self.valid_move(new_piece, self.piece_x, self.piece_y):
-                self.current_rotation = new_rotation
-                self.current_piece = new_piece
-            # Try wall kicks (move left/right to accommodate rotation)
-            elif self.valid_move(new_piece, self.piece_x - 1, self.piece_y):
-                self.current_rotation = new_rotation
-                self.current_piece = new_piece
-                self.piece_x -= 1
-            elif self.valid_move(new_piece, self.piece_x + 1, self.piece_y):
-                self.current_rotation = new_rotation
-                self.current_piece = new_piece
-                self.piece_x += 1
+    def rotate(self, direction=CW):
+        """Rotate clockwise (CW), counter-clockwise (CCW) or 180 degrees (HALF)
+        
+        The game's rotation system tries its kick offsets in order and the
+        first position that fits wins; if none fits the piece stays put.
+        """
+        result = self.rotation_system.rotate(self.grid, self.current_piece_type, self.current_rotation,
+                                             self.piece_x, self.piece_y, direction)
+        if result is not None:
+            self.current_rotation, self.piece_x, self.piece_y = result
+            self.current_piece = PIECES[self.current_piece_type][self.current_rotation]
+    
+    def apply_input(self, action):
+        """Apply a named player input (used by bots, replays and network play)"""
+        if action is None or action not in INPUT_ACTIONS:
+            raise InvalidMoveError(f"Unknown input: {action}")
+        if self.listeners:
+            self.notify('input', action=action)
+        if action == 'left':
+            self.move(-1)
+        elif action == 'right':
+            self.move(1)
+        elif action == 'down':
+            self.drop()
+        elif action == 'rotate':
+            self.rotate()
+        elif action == 'hard_drop':
+            self.hard_drop()
+        elif action == 'rotate_ccw':
+            self.rotate(CCW)
+        elif action == 'rotate_180':
+            self.rotate(HALF)
     
     def drop(self):
         """Soft drop piece and award points"""
@@ -258,84 +414,227 @@ class Tetris:
                 logger.debug(f"Hard drop: {drop_distance} cells, {hard_drop_points} points")
             
             # Immediately place the piece since it can't fall further
+            # (place_piece clears lines, spawns the next piece and checks game over)
             self.place_piece()
-            self.clear_lines()
-            
-            # Generate new piece and check for game over (same logic as update method)
-            self.new_piece()
-            self.piece_x, self.piece_y = SPAWN_X, SPAWN_Y
-            
-            # Check game over (same logic as existing code)
-            if not self.valid_move(self.current_piece, self.piece_x, self.piece_y):
-                logger.info(f"Game Over! Final Score: {self.score}, Level: {self.level}, Lines: {self.lines_cleared}")
-                self.reset_game()
             
         except Exception as e:
             logger.error(f"Error in hard_drop: {e}")
             # Fallback to regular drop behavior
             self.drop()
     
+    def get_draw_state(self):
+        """Game state as consumed by GameUI.draw and the other renderers"""
+        return {
+            'grid': self.grid,
+            'current_piece': self.current_piece,
+            'piece_x': self.piece_x,
+            'piece_y': self.piece_y,
+            'current_piece_type': self.current_piece_type,
+            'score': self.score,
+            'level': self.level,
+            'lines_cleared': self.lines_cleared,
+            'total_pieces': self.total_pieces,
+            'fall_speed': self.get_fall_speed()
+        }
+    
     def draw(self, screen):
         """Draw the game state using modular UI components"""
         try:
-            # Prepare game state for UI components
-            game_state = {
-                'grid': self.grid,
-                'current_piece': self.current_piece,
-                'piece_x': self.piece_x,
-                'piece_y': self.piece_y,
-                'current_piece_type': self.current_piece_type,
-                'score': self.score,
-                'level': self.level,
-                'lines_cleared': self.lines_cleared,
-                'total_pieces': self.total_pieces,
-                'fall_speed': self.get_fall_speed()
-            }
-            
             # Draw complete UI using modular components
-            self.ui.draw(screen, game_state)
+            if self.ui is None:
+                self.init_ui()
+            self.ui.draw(screen, self.get_draw_state())
             
         except Exception as e:
             logger.error(f"Error in draw method: {e}")
             # Continue execution, don't crash the game
     
-def main():
-    """Main game loop with error handling"""
+def parse_board_size(text):
+    """Parse a WxH board size for --board, within the supported stress limits"""
+    import argparse
     try:
-        game = Tetris()
+        width, height = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WxH, got {text!r}")
+    if not (4 <= width <= MAX_BOARD_WIDTH and 4 <= height <= MAX_BOARD_HEIGHT):
+        raise argparse.ArgumentTypeError(
+            f"board must be between 4x4 and {MAX_BOARD_WIDTH}x{MAX_BOARD_HEIGHT}, got {text}")
+    return width, height
+
+# Modules main() uses that log the errors they catch and carry on; named
+# rather than imported since main() only imports them when enabled
+ERROR_LOGGER_MODULES = ('input_engine', 'sim_thread', 'store')
+
+def error_loggers():
+    """Loggers that the game's caught errors are reported to
+
+    This module's, the UI's and those of the input engine, simulation
+    thread and score store that the main loop runs.
+    """
+    return (logger, logging.getLogger(GameUI.__module__),
+            *(logging.getLogger(name) for name in ERROR_LOGGER_MODULES))
+
+def main(argv=None, frame_clock=None, on_frame=None):
+    """Main game loop with error handling
+    
+    frame_clock stands in for the display clock (anything with tick(fps)
+    returning ms) and on_frame(game) is called at the top of every frame;
+    the soak harness uses both to drive the loop at an accelerated clock.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description=GAME_TITLE)
+    parser.add_argument('--threaded', action='store_true',
+                        help="run the simulation on its own thread at a fixed tick")
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=('cprofile', 'sample'),
+                        help="profile a window of frames with cProfile (main thread only) or "
+                             "the sampling profiler (all threads)")
+    parser.add_argument('--profile-start', type=int, default=0, metavar='FRAME',
+                        help="frames to skip before profiling starts")
+    parser.add_argument('--profile-frames', type=int, default=600, metavar='N',
+                        help="number of frames to profile")
+    parser.add_argument('--profile-replay', metavar='FILE',
+                        help="profile a headless re-simulation of the first replay in FILE and exit")
+    parser.add_argument('--profile-out', default='tetris-profile', metavar='PREFIX',
+                        help="write PREFIX.collapsed (flame graph input) and PREFIX.txt (summary)")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help="serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--board', type=parse_board_size, default=(GRID_WIDTH, GRID_HEIGHT), metavar='WxH',
+                        help=f"board size for stress play, up to {MAX_BOARD_WIDTH}x{MAX_BOARD_HEIGHT} "
+                             f"(default {GRID_WIDTH}x{GRID_HEIGHT})")
+    parser.add_argument('--rotation', choices=sorted(ROTATION_SYSTEMS), default=ROTATION_SYSTEM,
+                        help=f"rotation system and wall kicks (default {ROTATION_SYSTEM})")
+    args = parser.parse_args(argv)
+    
+    if args.profile_replay:
+        from replay import read_replays
+        from profiling import profile_replay
+        try:
+            replay = next(read_replays(args.profile_replay))
+            profile_replay(replay, args.profile or 'cprofile', args.profile_out)
+        except Exception as e:
+            logger.error(f"Could not profile replay {args.profile_replay}: {e}")
+        pygame.quit()
+        return
+    
+    frame_clock = frame_clock or clock
+    store = None
+    sim = None
+    profiler = None
+    metrics = None
+    metrics_server = None
+    try:
+        width, height = args.board
+        game = Tetris(width=width, height=height, rotation_system=args.rotation)
+        
+        # Keep finished games in the local high-score database (stress boards
+        # and other rotation systems are not comparable with standard games,
+        # so they are not saved)
+        try:
+            if args.board == (GRID_WIDTH, GRID_HEIGHT) and args.rotation == ROTATION_SYSTEM:
+                from store import GameStore
+                store = GameStore()
+                store.attach(game)
+        except Exception as e:
+            logger.error(f"High-score store unavailable, games will not be saved: {e}")
+        
+        # The UI draws at its logical size; the backbuffer is scaled to the window
+        from scaling import ScaledDisplay, frame_signature
+        if game.ui is None:
+            game.init_ui()
+        display = ScaledDisplay(game.ui, logical_size=game.ui.logical_size)
+        signature = None
+        
+        # Lower the level of detail when frames overrun their budget
+        from time import perf_counter
+        from lod import LODController
+        lod = LODController()
+        
+        # Key state, auto-repeat and timestamped inputs (the threaded mode applies presses directly)
+        from input_engine import InputEngine
+        engine = InputEngine(game, log_size=1000)
+        
+        # Optionally simulate on a separate thread; this loop then only renders
+        if args.threaded:
+            from sim_thread import SimulationThread
+            sim = SimulationThread(game)
+            sim.start()
+            logger.info("Simulation running on its own thread")
+        
+        # Optionally export counters and frame times for long-running hosts
+        if args.metrics_port is not None:
+            try:
+                from metrics import GameMetrics, MetricsServer
+                metrics = GameMetrics()
+                metrics.attach(game)
+                for error_logger in error_loggers():
+                    metrics.count_errors(error_logger)
+                metrics_server = MetricsServer(metrics.registry, port=args.metrics_port)
+                metrics_server.start()
+            except Exception as e:
+                logger.error(f"Metrics endpoint unavailable: {e}")
+        
+        # Optionally profile a window of frames
+        if args.profile:
+            from profiling import FrameProfiler
+            profiler = FrameProfiler(args.profile, start=args.profile_start, frames=args.profile_frames,
+                                     out=args.profile_out, classes=(Tetris, GameUI))
+        
         running = True
         logger.info("Starting main game loop")
         
         while running:
             try:
-                dt = clock.tick(FPS)
+                dt = frame_clock.tick(FPS)
+                if profiler is not None:
+                    profiler.frame()
+                if on_frame is not None:
+                    on_frame(game)
                 
                 # Handle events
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
                         running = False
-                    elif event.type == pygame.KEYDOWN:
+                    elif event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+                        display.invalidate()
+                    elif event.type == pygame.WINDOWFOCUSLOST:
+                        engine.reset()
+                    elif event.type in (pygame.KEYDOWN, pygame.KEYUP):
                         try:
-                            if event.key == pygame.K_LEFT:
-                                game.move(-1)
-                            elif event.key == pygame.K_RIGHT:
-                                game.move(1)
-                            elif event.key == pygame.K_DOWN:
-                                game.drop()
-                            elif event.key == pygame.K_UP:
-                                game.rotate()
-                            elif event.key == pygame.K_SPACE:
-                                game.hard_drop()
+                            action = KEY_ACTIONS.get(event.key)
+                            if action and sim is not None:
+                                if event.type == pygame.KEYDOWN:
+                                    sim.push_input(action)
+                            elif action and event.type == pygame.KEYDOWN:
+                                engine.press(action, received=perf_counter())
+                            elif action:
+                                engine.release(action)
                         except Exception as e:
                             logger.error(f"Error handling input: {e}")
                 
-                # Update game state
-                game.update(dt)
-                
-                # Draw everything using modular UI
-                game.draw(screen)
+                # Update game state (or take the simulation thread's latest snapshot)
+                if sim is None:
+                    engine.tick(dt)
+                    state = game.get_draw_state()
+                    current = frame_signature(state)
+                else:
+                    state = sim.buffer.latest()
+                    current = state['version']
                 
-                pygame.display.flip()
+                # Draw everything using modular UI, only when the frame changed
+                dirty = []
+                if current != signature:
+                    signature = current
+                    frame_start = perf_counter()
+                    game.ui.draw(display.surface, state)
+                    dirty = None
+                updated = display.present(pygame.display.get_surface(), dirty)
+                if updated:
+                    pygame.display.update(updated)
+                engine.presented()
+                if dirty is None:
+                    game.ui.lod_level = lod.record((perf_counter() - frame_start) * 1000.0)
+                if metrics is not None:
+                    metrics.frame(dt, dirty is None)
                 
             except pygame.error as e:
                 logger.error(f"Pygame error in main loop: {e}")
@@ -352,6 +651,19 @@ def main():
         logger.error(f"Critical error in main: {e}")
         print(f"Critical error: {e}")
     finally:
+        if profiler is not None:
+            try:
+                profiler.finish()
+            except Exception as e:
+                logger.error(f"Could not write profile: {e}")
+        if sim is not None:
+            sim.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if metrics is not None:
+            metrics.close()
+        if store is not None:
+            store.close()
         try:
             pygame.quit()
             logger.info("Pygame shut down successfully")
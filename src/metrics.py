@@ -0,0 +1,339 @@
+"""
+Metrics for long-running game hosts
+A small registry of counters, gauges and histograms, rendered in the
+Prometheus text exposition format and served from a local HTTP endpoint.
+Recording is a plain attribute increment (a bisect as well for histograms)
+with no locking, so each metric should only be written from one thread;
+the endpoint only reads them.
+"""
+
+import time
+import logging
+import threading
+from bisect import bisect_left
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = 9464
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Frame-time buckets in seconds, around the 60 FPS budget
+FRAME_TIME_BUCKETS = (0.005, 0.010, 0.0167, 0.025, 0.033, 0.050, 0.100, 0.250, 0.500, 1.0)
+
+LINE_CLEAR_TYPES = {1: 'single', 2: 'double', 3: 'triple', 4: 'tetris'}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+class Metric:
+    """Base for metrics; labelled metrics hand out one child per label value tuple"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labelnames=(), _values=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.labelvalues = _values
+        self._children = {}
+
+    def labels(self, *values):
+        """The child metric for these label values (keep it to skip the lookup on hot paths)"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._child(values)
+        return child
+
+    def _child(self, values):
+        return type(self)(self.name, self.help, self.labelnames, values)
+
+    def _series(self):
+        """The metrics holding values: the children if labelled, else this metric"""
+        if self.labelnames:
+            return list(self._children.values())
+        return [self]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for series in self._series():
+            lines.extend(series._samples())
+        return lines
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, self.labelvalues)} "
+                f"{_format_value(self.value)}"]
+
+
+class Counter(Metric):
+    """A value that only goes up"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=(), _values=()):
+        super().__init__(name, help_text, labelnames, _values)
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Gauge(Metric):
+    """A value that can go up and down"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=(), _values=()):
+        super().__init__(name, help_text, labelnames, _values)
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Histogram(Metric):
+    """Counts of observations per bucket (upper bounds, inclusive), with their sum"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=FRAME_TIME_BUCKETS, labelnames=(), _values=()):
+        super().__init__(name, help_text, labelnames, _values)
+        self.buckets = tuple(sorted(buckets))
+        # Per-bucket (not cumulative) counts; the last one is +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def _child(self, values):
+        return Histogram(self.name, self.help, self.buckets, self.labelnames, values)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def _samples(self):
+        counts = list(self.counts)
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            total += count
+            labels = _format_labels(self.labelnames + ('le',), self.labelvalues + (_format_value(float(bound)),))
+            lines.append(f"{self.name}_bucket{labels} {total}")
+        labels = _format_labels(self.labelnames, self.labelvalues)
+        lines.append(f"{self.name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self.register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, buckets=FRAME_TIME_BUCKETS, labelnames=()):
+        return self.register(Histogram(name, help_text, buckets, labelnames))
+
+    def render(self):
+        """All metrics in the Prometheus text format"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class ErrorCounter(logging.Handler):
+    """Counts ERROR records of a logger by the function that logged them
+
+    The engine's broad except blocks all log before carrying on, so this
+    counts them without touching the code paths that do not fail.
+    """
+
+    def __init__(self, counter):
+        super().__init__(level=logging.ERROR)
+        self.counter = counter
+
+    def emit(self, record):
+        self.counter.labels(record.funcName).inc()
+
+
+class GameMetrics:
+    """The game's metrics, fed by engine events and the main loop"""
+
+    def __init__(self, registry=None):
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+        self.frames_rendered = registry.counter('tetris_frames_rendered_total', "Frames drawn")
+        self.frame_time = registry.histogram('tetris_frame_time_seconds', "Time between frames")
+        self.ticks = registry.counter('tetris_logic_ticks_total', "Game logic updates")
+        self.pieces = registry.counter('tetris_pieces_placed_total', "Pieces locked into the board")
+        self.lines = registry.counter('tetris_lines_cleared_total', "Lines cleared")
+        line_clears = registry.counter('tetris_line_clears_total', "Line clears by type", ('type',))
+        self.line_clears = {count: line_clears.labels(name) for count, name in LINE_CLEAR_TYPES.items()}
+        self.game_overs = registry.counter('tetris_game_overs_total', "Games that topped out")
+        self.resets = registry.counter('tetris_resets_total', "Calls to reset_game")
+        self.errors = registry.counter('tetris_errors_total', "Errors caught and logged, by function",
+                                       ('function',))
+        self.start_time = registry.gauge('tetris_start_time_seconds', "Unix time the metrics started")
+        self.start_time.set(time.time())
+        self._handlers = []
+
+    def attach(self, game):
+        game.add_listener(self._on_event)
+
+    def detach(self, game):
+        game.remove_listener(self._on_event)
+
+    def count_errors(self, error_logger):
+        """Count the ERROR records error_logger emits"""
+        handler = ErrorCounter(self.errors)
+        error_logger.addHandler(handler)
+        self._handlers.append((error_logger, handler))
+
+    def close(self):
+        for error_logger, handler in self._handlers:
+            error_logger.removeHandler(handler)
+        self._handlers = []
+
+    def frame(self, frame_ms, rendered=True):
+        """One pass of the main loop that took frame_ms, drawing a frame if rendered"""
+        self.frame_time.observe(frame_ms / 1000.0)
+        if rendered:
+            self.frames_rendered.value += 1
+
+    def _on_event(self, event, data):
+        if event == 'tick':
+            self.ticks.value += 1
+        elif event == 'lock':
+            self.pieces.value += 1
+            cleared = len(data['cleared_rows'])
+            if cleared:
+                self.lines.value += cleared
+                clears = self.line_clears.get(cleared)
+                if clears is not None:
+                    clears.value += 1
+        elif event == 'game_over':
+            self.game_overs.value += 1
+        elif event == 'reset':
+            self.resets.value += 1
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Metrics request: {format % args}")
+
+
+class MetricsServer:
+    """Serves a registry at http://host:port/metrics on a background thread"""
+
+    def __init__(self, registry, host=METRICS_HOST, port=METRICS_PORT):
+        handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server',
+                                        daemon=True)
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Metrics at http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+def run_benchmark(updates=200000, seed=0):
+    """Cost of recording metrics on the hot path, and of rendering them"""
+    from main import Tetris
+
+    metrics = GameMetrics()
+    counter = metrics.ticks
+    start = time.perf_counter()
+    for _ in range(updates):
+        counter.inc()
+    inc_ns = (time.perf_counter() - start) * 1e9 / updates
+
+    start = time.perf_counter()
+    for i in range(updates):
+        metrics.frame(16.0 + (i & 7))
+    frame_ns = (time.perf_counter() - start) * 1e9 / updates
+
+    def game_updates(attach):
+        game = Tetris(seed=seed, headless=True)
+        if attach:
+            metrics.attach(game)
+        start = time.perf_counter()
+        for _ in range(updates):
+            game.update(16)
+        elapsed = time.perf_counter() - start
+        if attach:
+            metrics.detach(game)
+        return elapsed * 1e9 / updates
+
+    plain_ns = game_updates(False)
+    counted_ns = game_updates(True)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        text = metrics.registry.render()
+    render_us = (time.perf_counter() - start) * 1e6 / 100
+    return {
+        'counter_inc_ns': inc_ns,
+        'frame_record_ns': frame_ns,
+        'game_update_ns': plain_ns,
+        'game_update_with_metrics_ns': counted_ns,
+        'render_us': render_us,
+        'render_bytes': len(text),
+    }
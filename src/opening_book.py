@@ -0,0 +1,267 @@
+"""
+Opening book of precomputed bot moves
+The generator enumerates board surface profiles (the height difference
+between neighbouring columns, each within +-max_diff) for every piece type,
+solves each on a canonical board with that surface using the search bot
+(a single-piece greedy search, as the book key has no preview pieces), and
+writes the answers as a sorted table of fixed-size records. At runtime
+OpeningBook memory-maps the file and binary searches it, so lookups touch a
+few pages instead of loading the table. The empty board is profile zero,
+so the first pieces of a game are always in the book.
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import hashlib
+import logging
+import argparse
+import itertools
+import tempfile
+from config import GRID_WIDTH, GRID_HEIGHT
+from pieces import PIECES
+from bot import TetrisBot, Placement, DEFAULT_WEIGHTS, column_tops
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BOOK_PATH = 'tetris_opening.book'
+BOOK_MAGIC = b'TBK1'
+# magic, board width, max_diff, piece types, record count, rules/weights digest
+HEADER = struct.Struct('<4sBBHI32s')
+# key = profile index * piece types + piece type, rotation, x
+RECORD = struct.Struct('<IBb')
+KEY = struct.Struct('<I')
+MAX_DIFF_LIMIT = 4  # keeps keys within 32 bits
+
+
+class BookError(Exception):
+    """Raised for missing, corrupt or mismatched book files"""
+    pass
+
+
+def book_digest(weights=DEFAULT_WEIGHTS):
+    """Digest of everything a book's answers depend on"""
+    from tournament import rules_hash
+    return hashlib.sha256(json.dumps([rules_hash(), list(weights)]).encode('utf-8')).digest()
+
+
+def surface_profile(rows):
+    """Height differences between neighbouring columns of a row-bitmask board"""
+    heights = [GRID_HEIGHT - top for top in column_tops(rows)]
+    return tuple(heights[x + 1] - heights[x] for x in range(GRID_WIDTH - 1))
+
+
+def profile_index(profile, max_diff):
+    """Dense index of a profile among all profiles within +-max_diff, or None if outside"""
+    index = 0
+    base = 2 * max_diff + 1
+    for diff in profile:
+        if not -max_diff <= diff <= max_diff:
+            return None
+        index = index * base + diff + max_diff
+    return index
+
+
+def canonical_rows(profile):
+    """Board with the given surface, filled solid below it and the lowest column empty"""
+    heights = [0]
+    for diff in profile:
+        heights.append(heights[-1] + diff)
+    low = min(heights)
+    heights = [height - low for height in heights]
+    rows = []
+    for y in range(GRID_HEIGHT):
+        mask = 0
+        for x, height in enumerate(heights):
+            if y >= GRID_HEIGHT - height:
+                mask |= 1 << x
+        rows.append(mask)
+    return tuple(rows)
+
+
+def all_profiles(max_diff):
+    """Every profile within +-max_diff, in index order"""
+    return itertools.product(range(-max_diff, max_diff + 1), repeat=GRID_WIDTH - 1)
+
+
+def generate_book(path, max_diff=1, weights=DEFAULT_WEIGHTS, profiles=None, progress_every=0):
+    """Solve every (profile, piece type) pair and write the sorted table atomically
+
+    profiles limits the table to the given profiles (default: all within
+    +-max_diff). Pairs the bot cannot place (the stack blocks the spawn)
+    are left out. Returns the number of records written.
+    """
+    if not 1 <= max_diff <= MAX_DIFF_LIMIT:
+        raise ValueError(f"max_diff must be between 1 and {MAX_DIFF_LIMIT}")
+    bot = TetrisBot(weights=weights, beam_width=1, lookahead=0)
+    pieces = len(PIECES)
+    records = []
+    for solved, profile in enumerate(all_profiles(max_diff) if profiles is None else profiles):
+        index = profile_index(profile, max_diff)
+        if index is None:
+            raise ValueError(f"Profile {profile} is outside +-{max_diff}")
+        rows = canonical_rows(profile)
+        for piece_type in range(pieces):
+            placement = bot.search(rows, [piece_type])
+            if placement is not None:
+                records.append((index * pieces + piece_type, placement.rotation, placement.x))
+        if progress_every and solved % progress_every == 0:
+            logger.info(f"Solved {solved} profiles")
+    records.sort()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            out.write(HEADER.pack(BOOK_MAGIC, GRID_WIDTH, max_diff, pieces, len(records), book_digest(weights)))
+            for record in records:
+                out.write(RECORD.pack(*record))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return len(records)
+
+
+class OpeningBook:
+    """Read-only, memory-mapped book lookups"""
+
+    def __init__(self, path, weights=DEFAULT_WEIGHTS):
+        """Map a book file; raises BookError if it is corrupt or built for other rules"""
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError) as e:
+            self.file.close()
+            raise BookError(f"Cannot map {path}: {e}")
+        try:
+            if len(self.map) < HEADER.size:
+                raise BookError(f"{path} is too short for a book header")
+            magic, width, self.max_diff, self.pieces, self.count, digest = HEADER.unpack_from(self.map, 0)
+            if magic != BOOK_MAGIC or width != GRID_WIDTH:
+                raise BookError(f"{path} is not a book for a {GRID_WIDTH} wide board")
+            if len(self.map) != HEADER.size + self.count * RECORD.size:
+                raise BookError(f"{path} is truncated")
+            if digest != book_digest(weights):
+                raise BookError(f"{path} was built for other rules or bot weights")
+        except BookError:
+            self.close()
+            raise
+        self.hits = 0
+        self.misses = 0
+
+    def find(self, key):
+        """(rotation, x) stored for a key, by binary search over the mapped records"""
+        data = self.map
+        unpack_key = KEY.unpack_from
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            found, = unpack_key(data, HEADER.size + middle * RECORD.size)
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                _, rotation, x = RECORD.unpack_from(data, HEADER.size + middle * RECORD.size)
+                return rotation, x
+        return None
+
+    def lookup(self, rows, piece_type):
+        """Book placement for a row-bitmask board and piece, or None if it is not covered"""
+        index = profile_index(surface_profile(rows), self.max_diff)
+        found = None if index is None else self.find(index * self.pieces + piece_type)
+        if found is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return Placement(*found)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_benchmark(max_diff=1, pieces=300, seeds=(0, 1, 2), book_path=None):
+    """Book size and build time, lookup cost, and bot decision latency with and without the book
+
+    Without book_path a book is generated in a temporary directory first.
+    """
+    from main import Tetris
+    from bot import grid_to_rows
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_seconds = None
+        if book_path is None:
+            book_path = os.path.join(directory, 'bench.book')
+            start = time.perf_counter()
+            generate_book(book_path, max_diff=max_diff)
+            build_seconds = time.perf_counter() - start
+
+        with OpeningBook(book_path) as book:
+            results = [{
+                'max_diff': book.max_diff,
+                'records': book.count,
+                'file_kb': os.path.getsize(book_path) / 1024.0,
+                'build_seconds': build_seconds,
+            }]
+            rows = grid_to_rows(Tetris(seed=0, headless=True).grid)
+            start = time.perf_counter()
+            for piece_type in range(len(PIECES)):
+                for _ in range(2000):
+                    book.lookup(rows, piece_type)
+            results[0]['lookup_us'] = (time.perf_counter() - start) * 1e6 / (2000 * len(PIECES))
+
+            for use_book in (False, True):
+                latencies = []
+                lines = 0
+                hits = 0
+                for seed in seeds:
+                    game = Tetris(seed=seed, headless=True)
+                    bot = TetrisBot(book=book if use_book else None)
+                    for _ in range(pieces):
+                        bot.play_piece(game)
+                    latencies.extend(bot.latencies_ms)
+                    lines += game.lines_cleared
+                    hits += bot.book_hits
+                latencies.sort()
+                results.append({
+                    'bot': 'search + book' if use_book else 'search',
+                    'decisions': len(latencies),
+                    'book_hit_percent': 100.0 * hits / len(latencies),
+                    'mean_ms': sum(latencies) / len(latencies),
+                    'p50_ms': latencies[len(latencies) // 2],
+                    'p95_ms': latencies[int(len(latencies) * 0.95)],
+                    'lines': lines,
+                })
+    return results
+
+
+def main(argv=None):
+    """Command line entry point: build a book file"""
+    parser = argparse.ArgumentParser(description="Precompute bot moves for common stack surfaces")
+    parser.add_argument('--out', default=DEFAULT_BOOK_PATH, help="book file to write")
+    parser.add_argument('--max-diff', type=int, default=1,
+                        help=f"largest neighbouring column height difference covered (1-{MAX_DIFF_LIMIT})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    start = time.perf_counter()
+    count = generate_book(args.out, max_diff=args.max_diff, progress_every=2000)
+    print(f"Wrote {count} moves to {args.out} ({os.path.getsize(args.out) / 1024:.0f} KiB) "
+          f"in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -145,6 +145,9 @@ PIECE_S = 4
 PIECE_Z = 5
 PIECE_J = 6
 
+# Not a playable piece: grid cells filled by versus garbage lines
+PIECE_GARBAGE = 7
+
 # Piece names for debugging and logging
 PIECE_NAMES = {
     PIECE_T: "T-piece",
@@ -190,14 +193,20 @@ def get_piece_rotations(piece_type):
 
 def get_piece_name(piece_type):
     """Return the name of a piece type"""
+    if piece_type == PIECE_GARBAGE:
+        return "Garbage"
     return PIECE_NAMES.get(piece_type, f"Unknown piece {piece_type}")
 
 def get_piece_color(piece_type):
     """Return the color for a piece type"""
+    if piece_type == PIECE_GARBAGE:
+        return PieceColors.GARBAGE
     return PIECE_COLORS.get(piece_type, PieceColors.T_PIECE)
 
 def get_piece_border_color(piece_type):
     """Return the border color for a piece type"""
+    if piece_type == PIECE_GARBAGE:
+        return PieceColors.GARBAGE_BORDER
     return PIECE_BORDER_COLORS.get(piece_type, PieceColors.T_PIECE_BORDER)
 
 def validate_piece_definitions():
@@ -0,0 +1,332 @@
+"""
+Built-in profiling
+Captures either a cProfile session or stack samples from a low-overhead
+sampling thread, for a window of frames of a live game or for a headless
+replay. Both are written as collapsed stacks ("a;b;c value" lines, the
+input format of flamegraph.pl and speedscope) plus a per-function summary
+of the Tetris and GameUI methods.
+"""
+
+import os
+import sys
+import time
+import pstats
+import inspect
+import logging
+import cProfile
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cprofile', 'sample')
+
+# Call paths worth less than this many microseconds are left out of cProfile flame graphs
+MIN_COLLAPSED_US = 1
+
+
+def method_names(classes):
+    """Map cProfile function keys (file, line, name) of the classes' methods to 'Class.method'"""
+    names = {}
+    for cls in classes:
+        for name, member in vars(cls).items():
+            if isinstance(member, (staticmethod, classmethod)):
+                member = member.__func__
+            if inspect.isfunction(member):
+                code = member.__code__
+                names[(code.co_filename, code.co_firstlineno, code.co_name)] = f"{cls.__name__}.{name}"
+    return names
+
+
+def module_classes(classes):
+    """Every class defined in the same modules as the given classes"""
+    found = []
+    for module in {sys.modules[cls.__module__] for cls in classes}:
+        found.extend(member for member in vars(module).values()
+                     if inspect.isclass(member) and member.__module__ == module.__name__)
+    return found
+
+
+def _stats_label(func, names):
+    filename, _, name = func
+    if func in names:
+        name = names[func]
+    if filename == '~':
+        return name  # Built-in, e.g. "<built-in method time.sleep>"
+    return f"{os.path.basename(filename)}:{name}"
+
+
+def collapse_stats(stats, names=None):
+    """Collapsed stacks, in microseconds, from a pstats.Stats
+
+    cProfile only records caller -> callee edges, so every call path from a
+    root is rebuilt by splitting a function's time between its callers in
+    proportion to the time each call edge took (like gprof). Recursion is
+    cut at the first repeat of a function on a path.
+    """
+    names = names or {}
+    entries = stats.stats
+    children = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            children.setdefault(caller, []).append((func, edge_ct))
+
+    stacks = Counter()
+
+    def walk(func, path, seconds, seen):
+        _, _, own_tt, own_ct, _ = entries[func]
+        if own_ct <= 0:
+            return
+        share = min(seconds / own_ct, 1.0)
+        stacks[path] += own_tt * share * 1e6
+        for child, edge_ct in children.get(func, ()):
+            child_seconds = edge_ct * share
+            if child_seconds * 1e6 >= MIN_COLLAPSED_US and child not in seen:
+                walk(child, path + (_stats_label(child, names),), child_seconds, seen | {child})
+
+    for func, (_, _, _, ct, callers) in entries.items():
+        if not callers:
+            walk(func, (_stats_label(func, names),), ct, {func})
+    return Counter({path: int(round(us)) for path, us in stacks.items() if us >= MIN_COLLAPSED_US})
+
+
+def write_collapsed(stacks, path):
+    """Write collapsed stacks, heaviest first"""
+    with open(path, 'w') as out:
+        for stack, value in sorted(stacks.items(), key=lambda item: -item[1]):
+            out.write(f"{';'.join(stack)} {value}\n")
+
+
+def stats_summary(stats, names):
+    """Per-function rows for the named methods from a pstats.Stats, heaviest first"""
+    rows = []
+    for func, (_, calls, tt, ct, _) in stats.stats.items():
+        if func in names:
+            rows.append({
+                'function': names[func],
+                'calls': calls,
+                'self_ms': tt * 1000.0,
+                'total_ms': ct * 1000.0,
+            })
+    return sorted(rows, key=lambda row: -row['total_ms'])
+
+
+def format_summary(rows):
+    lines = [f"{'function':<32} {'calls':>8} {'self ms':>10} {'total ms':>10} {'us/call':>9}"]
+    for row in rows:
+        calls = row['calls']
+        per_call = f"{row['total_ms'] * 1000.0 / calls:9.1f}" if calls else f"{'-':>9}"
+        lines.append(f"{row['function']:<32} {calls if calls is not None else '-':>8} "
+                     f"{row['self_ms']:10.2f} {row['total_ms']:10.2f} {per_call}")
+    return '\n'.join(lines)
+
+
+class SamplingProfiler(threading.Thread):
+    """Samples the stacks of every other thread every interval_ms
+
+    Only the sampling thread does any work, and only between samples, so the
+    profiled code runs at close to full speed. Stacks are rooted at the
+    thread's name and labelled 'file:Qualified.name'.
+    """
+
+    def __init__(self, interval_ms=2.0):
+        super().__init__(name='sampling-profiler', daemon=True)
+        self.interval = interval_ms / 1000.0
+        self.stacks = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._labels = {}
+        self._stop_event = threading.Event()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            # co_qualname is new in Python 3.11
+            label = f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+            self._labels[code] = label
+        return label
+
+    def run(self):
+        own = threading.get_ident()
+        start = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(thread_names.get(ident, str(ident)))
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+            self.samples += 1
+        self.elapsed = time.perf_counter() - start
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def summary(self, classes):
+        """Per-method rows estimated from the samples (calls are not counted)"""
+        wanted = {f"{cls.__name__}.{name}" for cls in classes for name in vars(cls)}
+        sample_ms = self.elapsed * 1000.0 / self.samples if self.samples else 0.0
+        self_samples = Counter()
+        total_samples = Counter()
+        for stack, count in self.stacks.items():
+            methods = [label.split(':', 1)[-1] for label in stack[1:]]
+            if methods and methods[-1] in wanted:
+                self_samples[methods[-1]] += count
+            for method in set(methods) & wanted:
+                total_samples[method] += count
+        rows = [{
+            'function': method,
+            'calls': None,
+            'self_ms': self_samples[method] * sample_ms,
+            'total_ms': count * sample_ms,
+        } for method, count in total_samples.items()]
+        return sorted(rows, key=lambda row: -row['total_ms'])
+
+
+def default_classes():
+    from main import Tetris
+    from ui_components import GameUI
+    return (Tetris, GameUI)
+
+
+class FrameProfiler:
+    """Profiles frames start+1 .. start+frames of a loop that calls frame() once per frame
+
+    On finish the collapsed stacks go to <out>.collapsed and the summary to
+    <out>.txt; cProfile sessions are also saved as <out>.pstats.
+    """
+
+    def __init__(self, mode='cprofile', start=0, frames=600, out='tetris-profile',
+                 interval_ms=2.0, classes=None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {PROFILE_MODES}")
+        self.mode = mode
+        self.start = start
+        self.frames = frames
+        self.out = out
+        self.interval_ms = interval_ms
+        self.classes = classes
+        self.frame_count = 0
+        self.active = False
+        self.finished = False
+        self._profile = None
+        self._sampler = None
+
+    def frame(self):
+        """Call at the top of every frame"""
+        self.frame_count += 1
+        if self.frame_count == self.start + 1 and not self.finished:
+            self.begin()
+        elif self.frame_count == self.start + self.frames + 1:
+            self.finish()
+
+    def begin(self):
+        logger.info(f"Profiling ({self.mode}) for {self.frames} frames")
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = SamplingProfiler(self.interval_ms)
+            self._sampler.start()
+        self.active = True
+
+    def finish(self):
+        """Stop capturing and write the results; returns the summary rows (None if never started)"""
+        if not self.active:
+            return None
+        self.active = False
+        self.finished = True
+        classes = self.classes or default_classes()
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(f"{self.out}.pstats")
+            stats = pstats.Stats(self._profile)
+            stacks = collapse_stats(stats, method_names(module_classes(classes)))
+            rows = stats_summary(stats, method_names(classes))
+        else:
+            self._sampler.stop()
+            stacks = self._sampler.stacks
+            rows = self._sampler.summary(classes)
+        write_collapsed(stacks, f"{self.out}.collapsed")
+        with open(f"{self.out}.txt", 'w') as out:
+            out.write(format_summary(rows) + '\n')
+        logger.info(f"Profile written to {self.out}.collapsed and {self.out}.txt\n{format_summary(rows)}")
+        return rows
+
+
+def profile_replay(replay, mode='cprofile', out='tetris-profile', draw=True, interval_ms=2.0):
+    """Re-simulate a replay headlessly under the profiler, drawing every frame offscreen
+
+    Returns the summary rows.
+    """
+    from replay import play_replay, replay_game
+    from main import Tetris
+    from ui_components import GameUI
+
+    game = replay_game(replay)
+    draw_frame = None
+    if draw:
+        import pygame
+        ui = GameUI(game.width, game.height)
+        surface = pygame.Surface(ui.logical_size)
+
+        def draw_frame(game):
+            ui.draw(surface, game.get_draw_state())
+    profiler = FrameProfiler(mode, out=out, interval_ms=interval_ms, classes=(Tetris, GameUI))
+    profiler.begin()
+    try:
+        play_replay(replay, game, on_frame=draw_frame)
+    finally:
+        rows = profiler.finish()
+    return rows
+
+
+def run_benchmark(frames=600, seed=0):
+    """Frame time of a headless bot game with no profiler, the sampler and cProfile"""
+    import pygame
+    from main import Tetris
+    from bot import TetrisBot
+    from config import FPS, WINDOW_WIDTH, WINDOW_HEIGHT
+    from ui_components import GameUI
+    import tempfile
+
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in (None,) + PROFILE_MODES:
+            game = Tetris(seed=seed, headless=True)
+            bot = TetrisBot(beam_width=1, lookahead=0)
+            ui = GameUI()
+            profiler = None
+            if mode:
+                profiler = FrameProfiler(mode, frames=frames, out=os.path.join(directory, mode),
+                                         classes=(Tetris, GameUI))
+            start = time.perf_counter()
+            for frame in range(frames):
+                if profiler:
+                    profiler.frame()
+                if frame % 20 == 19:
+                    bot.play_piece(game)
+                game.update(1000.0 / FPS)
+                ui.draw(surface, game.get_draw_state())
+            elapsed = time.perf_counter() - start
+            stacks = 0
+            if profiler:
+                profiler.finish()
+                with open(os.path.join(directory, f"{mode}.collapsed")) as collapsed:
+                    stacks = sum(1 for _ in collapsed)
+            results.append({
+                'profiler': mode or 'none',
+                'frame_ms': elapsed * 1000.0 / frames,
+                'collapsed_stacks': stacks,
+            })
+    baseline = results[0]['frame_ms']
+    for result in results:
+        result['overhead_pct'] = 100.0 * (result['frame_ms'] / baseline - 1.0)
+    return results
@@ -0,0 +1,436 @@
+"""
+Delta-encoded binary state protocol
+Compact wire format for spectators and thin clients: a keyframe carries the
+full board, then each tick carries only what changed (piece moves, lock
+events with cleared row indices, garbage, score and preview changes)
+
+Frames are length-prefixed; all integers are LEB128 varints (zigzag for
+signed values), so typical deltas cost a few bytes.
+"""
+
+import json
+import time
+import logging
+from pieces import PIECES, PIECE_GARBAGE
+
+logger = logging.getLogger(__name__)
+
+# Operation codes inside a frame
+OP_KEYFRAME = 0x01
+OP_PIECE = 0x02        # piece type, rotation, x, y
+OP_MOVE = 0x03         # same piece moved by dx, dy
+OP_LOCK = 0x04         # piece locked (type, rotation, x, y) and cleared rows
+OP_SCORE = 0x05        # score delta
+OP_LEVEL = 0x06        # new level
+OP_GARBAGE = 0x07      # garbage rows pushed from the bottom (count, hole)
+OP_NEXT_SHIFT = 0x08   # preview queue advanced by one, new piece appended
+OP_NEXT_FULL = 0x09    # whole preview queue
+
+GARBAGE_CELL = PIECE_GARBAGE + 1
+
+
+class ProtocolError(Exception):
+    """Raised when a frame cannot be decoded"""
+    pass
+
+
+def write_varint(out, value):
+    """Append an unsigned LEB128 varint to a bytearray"""
+    if value < 0:
+        raise ValueError(f"Unsigned varint cannot encode {value}")
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def write_signed(out, value):
+    """Append a zigzag-encoded signed varint"""
+    write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+
+def read_varint(data, pos):
+    """Read an unsigned varint, returning (value, new_pos)"""
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ProtocolError("Truncated varint")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def read_signed(data, pos):
+    value, pos = read_varint(data, pos)
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1), pos
+
+
+class StateEncoder:
+    """Turns a live game into keyframe and delta frames, one per tick"""
+
+    def __init__(self, game, keyframe_interval=600):
+        """Attach to the game's events; keyframe_interval ticks between full frames
+
+        Periodic keyframes let late joiners start watching; 0 disables them.
+        """
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.ticks = 0
+        self._pending = bytearray()
+        self._need_keyframe = True
+        self._piece = None
+        self._score = 0
+        self._level = 0
+        self._next = []
+        game.add_listener(self._on_event)
+
+    def close(self):
+        self.game.remove_listener(self._on_event)
+
+    def request_keyframe(self):
+        """Send a full frame on the next tick (e.g. a spectator joined)"""
+        self._need_keyframe = True
+
+    def _on_event(self, event, data):
+        """Record board-changing events in the order they happen"""
+        if event == 'lock':
+            out = self._pending
+            out.append(OP_LOCK)
+            write_varint(out, data['piece_type'])
+            write_varint(out, data['rotation'])
+            write_signed(out, data['x'])
+            write_signed(out, data['y'])
+            write_varint(out, len(data['cleared_rows']))
+            for row in data['cleared_rows']:
+                write_varint(out, row)
+        elif event == 'garbage':
+            self._pending.append(OP_GARBAGE)
+            write_varint(self._pending, data['count'])
+            write_varint(self._pending, data['hole_x'])
+        elif event == 'reset':
+            self._need_keyframe = True
+
+    def _keyframe(self):
+        game = self.game
+        height = len(game.grid)
+        width = len(game.grid[0])
+        out = bytearray([OP_KEYFRAME])
+        write_varint(out, width)
+        write_varint(out, height)
+        # Cell values (0-8) packed two per byte
+        cells = [cell for row in game.grid for cell in row]
+        if len(cells) % 2:
+            cells.append(0)
+        out.extend((cells[i] << 4) | cells[i + 1] for i in range(0, len(cells), 2))
+        write_varint(out, game.current_piece_type)
+        write_varint(out, game.current_rotation)
+        write_signed(out, game.piece_x)
+        write_signed(out, game.piece_y)
+        write_varint(out, game.score)
+        write_varint(out, game.level)
+        write_varint(out, game.lines_cleared)
+        write_varint(out, game.total_pieces)
+        next_pieces = list(game.next_pieces)
+        write_varint(out, len(next_pieces))
+        for piece_type in next_pieces:
+            write_varint(out, piece_type)
+        return out
+
+    def encode_tick(self):
+        """Encode everything that changed since the last call as one frame
+
+        Returns the length-prefixed frame, or b'' when nothing changed.
+        """
+        game = self.game
+        self.ticks += 1
+        if self.keyframe_interval and self.ticks % self.keyframe_interval == 0:
+            self._need_keyframe = True
+
+        piece = (game.current_piece_type, game.current_rotation, game.piece_x, game.piece_y)
+        next_pieces = list(game.next_pieces)
+        if self._need_keyframe:
+            body = self._keyframe()
+            self._need_keyframe = False
+        else:
+            body = self._pending
+            if piece != self._piece:
+                old = self._piece
+                if old[0] == piece[0] and old[1] == piece[1]:
+                    body.append(OP_MOVE)
+                    write_signed(body, piece[2] - old[2])
+                    write_signed(body, piece[3] - old[3])
+                else:
+                    body.append(OP_PIECE)
+                    write_varint(body, piece[0])
+                    write_varint(body, piece[1])
+                    write_signed(body, piece[2])
+                    write_signed(body, piece[3])
+            if game.score != self._score:
+                body.append(OP_SCORE)
+                write_signed(body, game.score - self._score)
+            if game.level != self._level:
+                body.append(OP_LEVEL)
+                write_varint(body, game.level)
+            if next_pieces != self._next:
+                if next_pieces[:-1] == self._next[1:] and len(next_pieces) == len(self._next):
+                    body.append(OP_NEXT_SHIFT)
+                    write_varint(body, next_pieces[-1])
+                else:
+                    body.append(OP_NEXT_FULL)
+                    write_varint(body, len(next_pieces))
+                    for piece_type in next_pieces:
+                        write_varint(body, piece_type)
+
+        self._pending = bytearray()
+        self._piece = piece
+        self._score = game.score
+        self._level = game.level
+        self._next = next_pieces
+        if not body:
+            return b''
+        frame = bytearray()
+        write_varint(frame, len(body))
+        frame.extend(body)
+        return bytes(frame)
+
+
+class StateDecoder:
+    """Rebuilds game state from a stream of frames"""
+
+    def __init__(self):
+        self.grid = None
+        self.piece_type = 0
+        self.rotation = 0
+        self.piece_x = 0
+        self.piece_y = 0
+        self.score = 0
+        self.level = 0
+        self.lines_cleared = 0
+        self.total_pieces = 0
+        self.next_pieces = []
+        self.frames = 0
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Consume stream bytes, applying every complete frame; returns frames applied"""
+        self._buffer.extend(data)
+        applied = 0
+        pos = 0
+        buffer = self._buffer
+        while pos < len(buffer):
+            try:
+                length, start = read_varint(buffer, pos)
+            except ProtocolError:
+                break  # Length prefix not complete yet
+            if start + length > len(buffer):
+                break
+            self.apply_frame(bytes(buffer[start:start + length]))
+            pos = start + length
+            applied += 1
+        del buffer[:pos]
+        return applied
+
+    def apply_frame(self, body):
+        """Apply one frame body (without its length prefix)"""
+        pos = 0
+        while pos < len(body):
+            op = body[pos]
+            pos += 1
+            if op == OP_KEYFRAME:
+                pos = self._read_keyframe(body, pos)
+            elif self.grid is None:
+                raise ProtocolError("Delta received before any keyframe")
+            elif op == OP_PIECE:
+                self.piece_type, pos = read_varint(body, pos)
+                self.rotation, pos = read_varint(body, pos)
+                self.piece_x, pos = read_signed(body, pos)
+                self.piece_y, pos = read_signed(body, pos)
+            elif op == OP_MOVE:
+                dx, pos = read_signed(body, pos)
+                dy, pos = read_signed(body, pos)
+                self.piece_x += dx
+                self.piece_y += dy
+            elif op == OP_LOCK:
+                pos = self._read_lock(body, pos)
+            elif op == OP_SCORE:
+                delta, pos = read_signed(body, pos)
+                self.score += delta
+            elif op == OP_LEVEL:
+                self.level, pos = read_varint(body, pos)
+            elif op == OP_GARBAGE:
+                count, pos = read_varint(body, pos)
+                hole_x, pos = read_varint(body, pos)
+                width = len(self.grid[0])
+                row = [GARBAGE_CELL] * width
+                row[hole_x] = 0
+                self.grid = self.grid[count:] + [row[:] for _ in range(count)]
+            elif op == OP_NEXT_SHIFT:
+                piece_type, pos = read_varint(body, pos)
+                self.next_pieces = self.next_pieces[1:] + [piece_type]
+            elif op == OP_NEXT_FULL:
+                count, pos = read_varint(body, pos)
+                self.next_pieces = []
+                for _ in range(count):
+                    piece_type, pos = read_varint(body, pos)
+                    self.next_pieces.append(piece_type)
+            else:
+                raise ProtocolError(f"Unknown op code {op:#x}")
+        self.frames += 1
+
+    def _read_keyframe(self, body, pos):
+        width, pos = read_varint(body, pos)
+        height, pos = read_varint(body, pos)
+        packed = (width * height + 1) // 2
+        if pos + packed > len(body):
+            raise ProtocolError("Truncated keyframe")
+        cells = []
+        for byte in body[pos:pos + packed]:
+            cells.append(byte >> 4)
+            cells.append(byte & 0x0F)
+        pos += packed
+        self.grid = [cells[y * width:(y + 1) * width] for y in range(height)]
+        self.piece_type, pos = read_varint(body, pos)
+        self.rotation, pos = read_varint(body, pos)
+        self.piece_x, pos = read_signed(body, pos)
+        self.piece_y, pos = read_signed(body, pos)
+        self.score, pos = read_varint(body, pos)
+        self.level, pos = read_varint(body, pos)
+        self.lines_cleared, pos = read_varint(body, pos)
+        self.total_pieces, pos = read_varint(body, pos)
+        count, pos = read_varint(body, pos)
+        self.next_pieces = []
+        for _ in range(count):
+            piece_type, pos = read_varint(body, pos)
+            self.next_pieces.append(piece_type)
+        return pos
+
+    def _read_lock(self, body, pos):
+        piece_type, pos = read_varint(body, pos)
+        rotation, pos = read_varint(body, pos)
+        x, pos = read_signed(body, pos)
+        y, pos = read_signed(body, pos)
+        count, pos = read_varint(body, pos)
+        cleared = []
+        for _ in range(count):
+            row, pos = read_varint(body, pos)
+            cleared.append(row)
+
+        for py, row in enumerate(PIECES[piece_type][rotation]):
+            for px, cell in enumerate(row):
+                if cell == '#' and y + py >= 0:
+                    self.grid[y + py][x + px] = piece_type + 1
+        if cleared:
+            width = len(self.grid[0])
+            removed = set(cleared)
+            kept = [row for index, row in enumerate(self.grid) if index not in removed]
+            self.grid = [[0] * width for _ in cleared] + kept
+            self.lines_cleared += len(cleared)
+        self.total_pieces += 1
+        return pos
+
+    def state(self):
+        """Comparable view of the decoded state (see game_state)"""
+        return {
+            'grid': [row[:] for row in self.grid] if self.grid else None,
+            'piece': (self.piece_type, self.rotation, self.piece_x, self.piece_y),
+            'score': self.score,
+            'level': self.level,
+            'lines': self.lines_cleared,
+            'pieces': self.total_pieces,
+            'next': list(self.next_pieces),
+        }
+
+
+def game_state(game):
+    """The same view as StateDecoder.state() taken from a live game"""
+    return {
+        'grid': [row[:] for row in game.grid],
+        'piece': (game.current_piece_type, game.current_rotation, game.piece_x, game.piece_y),
+        'score': game.score,
+        'level': game.level,
+        'lines': game.lines_cleared,
+        'pieces': game.total_pieces,
+        'next': list(game.next_pieces),
+    }
+
+
+def json_state(game):
+    """Full-state JSON line, the format the game server sends, for comparison"""
+    state = game_state(game)
+    state['grid'] = ''.join(str(cell) for row in state['grid'] for cell in row)
+    return (json.dumps(state, separators=(',', ':')) + '\n').encode()
+
+
+def play_typical_game(game, ticks, tick_ms=1000 / 60, input_every=6):
+    """Drive a game like a human-paced player, yielding after every tick
+
+    The bot picks each placement; its rotate/shift inputs are spread over
+    ticks and the piece falls under gravity for a while before a hard drop.
+    """
+    from bot import TetrisBot
+
+    bot = TetrisBot(beam_width=2, lookahead=0)
+    plan = []
+    wait = 0
+    for _ in range(ticks):
+        if not plan and wait <= 0:
+            placement = bot.choose_move(game)
+            if placement is not None:
+                plan = ['rotate'] * placement.rotation
+                dx = placement.x - (game.piece_x)
+                plan += ['right' if dx > 0 else 'left'] * abs(dx)
+            plan.append('hard_drop')
+            wait = input_every
+        wait -= 1
+        if plan and wait <= 0:
+            action = plan.pop(0)
+            game.apply_input(action)
+            # Let gravity work before the drop, as a person would
+            wait = input_every * (4 if plan == ['hard_drop'] else 1)
+        game.update(tick_ms)
+        yield
+
+
+def run_benchmark(ticks=3600, seed=0):
+    """Encode/decode throughput and bytes per second for a typical game"""
+    from main import Tetris
+
+    game = Tetris(seed=seed, headless=True)
+    encoder = StateEncoder(game)
+    frames = []
+    json_bytes = 0
+    encode_seconds = 0.0
+    for _ in play_typical_game(game, ticks):
+        start = time.perf_counter()
+        frame = encoder.encode_tick()
+        encode_seconds += time.perf_counter() - start
+        frames.append(frame)
+        if frame:
+            # Baseline: a full JSON state message whenever anything changed
+            json_bytes += len(json_state(game))
+    encoder.close()
+
+    decoder = StateDecoder()
+    start = time.perf_counter()
+    for frame in frames:
+        if frame:
+            decoder.feed(frame)
+    decode_seconds = time.perf_counter() - start
+
+    total_bytes = sum(len(frame) for frame in frames)
+    game_seconds = ticks / 60.0
+    return {
+        'ticks': ticks,
+        'frames_sent': sum(1 for frame in frames if frame),
+        'encode_ticks_per_second': ticks / encode_seconds if encode_seconds > 0 else 0.0,
+        'decode_frames_per_second': decoder.frames / decode_seconds if decode_seconds > 0 else 0.0,
+        'decode_mb_per_second': total_bytes / decode_seconds / 1e6 if decode_seconds > 0 else 0.0,
+        'bytes_per_second': total_bytes / game_seconds,
+        'json_full_state_bytes_per_second': json_bytes / game_seconds,
+        'state_matches': decoder.state() == game_state(game),
+    }
+
@@ -0,0 +1,174 @@
+"""
+Reachability analysis for piece placements
+Breadth-first search over (x, y, rotation) piece states using the engine's
+collision check and rotation system, so slides under overhangs, tucks and
+wall-kick placements (in every turn direction the system allows) are found
+along with the shortest input sequence that reaches each of them
+"""
+
+import time
+import random
+import logging
+from collections import deque, namedtuple
+from config import GRID_WIDTH, GRID_HEIGHT
+from pieces import PIECES
+from rotation import TURN_ACTIONS
+
+logger = logging.getLogger(__name__)
+
+# Input names understood by Tetris.apply_input
+LEFT = 'left'
+RIGHT = 'right'
+DOWN = 'down'
+ROTATE = 'rotate'
+ROTATE_CCW = 'rotate_ccw'
+ROTATE_180 = 'rotate_180'
+HARD_DROP = 'hard_drop'
+
+# A lockable position and the shortest input sequence (ending in hard_drop) to it
+ReachablePlacement = namedtuple('ReachablePlacement', ['rotation', 'x', 'y', 'inputs'])
+
+# Piece boxes are 5x5, so x/y may go this far outside the grid while blocks stay inside
+_MARGIN = 4
+_X_SPAN = GRID_WIDTH + 2 * _MARGIN
+_Y_SPAN = GRID_HEIGHT + 2 * _MARGIN
+
+
+class StateBitset:
+    """Fixed-size bitset over encoded piece states"""
+
+    def __init__(self, size):
+        self.bits = bytearray((size + 7) // 8)
+
+    def add(self, index):
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, index):
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+
+def encode_state(rotation, x, y, x_span=_X_SPAN, y_span=_Y_SPAN):
+    """Pack a piece state into a dense integer index (spans default to the configured board)"""
+    return (rotation * y_span + (y + _MARGIN)) * x_span + (x + _MARGIN)
+
+
+def find_reachable(game, piece_type=None, start=None):
+    """Find every lockable position of a piece and the shortest inputs to reach it
+
+    Starts from the game's current piece state unless piece_type/start
+    (rotation, x, y) are given. Gravity is ignored: inputs are assumed to be
+    entered faster than the piece falls. Returns a list of ReachablePlacement.
+    """
+    if piece_type is None:
+        piece_type = game.current_piece_type
+    if start is None:
+        start = (game.current_rotation, game.piece_x, game.piece_y)
+
+    rotations = PIECES[piece_type]
+    valid_move = game.valid_move
+    rotate = game.rotation_system.rotate
+    turns = game.rotation_system.allowed
+    grid = game.grid
+    rotation, x, y = start
+    if not valid_move(rotations[rotation], x, y):
+        return []
+
+    x_span = game.width + 2 * _MARGIN
+    y_span = game.height + 2 * _MARGIN
+    visited = StateBitset(len(rotations) * x_span * y_span)
+    visited.add(encode_state(rotation, x, y, x_span, y_span))
+    # Each queue entry carries its input path; paths are short (tens of inputs)
+    queue = deque([(rotation, x, y, ())])
+    landings = {}
+
+    while queue:
+        rotation, x, y, path = queue.popleft()
+        piece = rotations[rotation]
+
+        # Hard drop from here; the first (shortest) path to land a spot wins
+        land_y = y
+        while valid_move(piece, x, land_y + 1):
+            land_y += 1
+        if (rotation, x, land_y) not in landings:
+            landings[(rotation, x, land_y)] = path + (HARD_DROP,)
+
+        neighbours = []
+        if valid_move(piece, x - 1, y):
+            neighbours.append((rotation, x - 1, y, LEFT))
+        if valid_move(piece, x + 1, y):
+            neighbours.append((rotation, x + 1, y, RIGHT))
+        if land_y > y:
+            neighbours.append((rotation, x, y + 1, DOWN))
+        for direction in turns:
+            turned = rotate(grid, piece_type, rotation, x, y, direction)
+            if turned is not None:
+                neighbours.append(turned + (TURN_ACTIONS[direction],))
+
+        for new_rotation, new_x, new_y, action in neighbours:
+            if new_y < -_MARGIN:
+                continue  # Kicked up out of the searched area
+            index = encode_state(new_rotation, new_x, new_y, x_span, y_span)
+            if index not in visited:
+                visited.add(index)
+                queue.append((new_rotation, new_x, new_y, path + (action,)))
+
+    return [ReachablePlacement(rotation, x, y, list(inputs))
+            for (rotation, x, y), inputs in landings.items()]
+
+
+def execute_inputs(game, inputs):
+    """Apply an input sequence to the game through its public methods"""
+    for action in inputs:
+        game.apply_input(action)
+
+
+def make_benchmark_boards(seed=0):
+    """Build empty, mid-game and garbage-heavy boards for benchmarking"""
+    rng = random.Random(seed)
+    empty = [[0] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+
+    # Mid-game: a ragged stack with two floating shelves that leave
+    # tuck and slide spots underneath
+    mid = [[0] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+    for x in range(GRID_WIDTH):
+        height = rng.randint(2, 6)
+        for y in range(GRID_HEIGHT - height, GRID_HEIGHT):
+            mid[y][x] = 1
+    for shelf_x in (0, GRID_WIDTH - 3):
+        for x in range(shelf_x, shelf_x + 3):
+            mid[GRID_HEIGHT - 9][x] = 1
+
+    # Garbage-heavy: twelve rows each missing one or two random cells
+    garbage = [[0] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+    for y in range(GRID_HEIGHT - 12, GRID_HEIGHT):
+        garbage[y] = [1] * GRID_WIDTH
+        for x in rng.sample(range(GRID_WIDTH), rng.randint(1, 2)):
+            garbage[y][x] = 0
+
+    return {'empty': empty, 'mid_game': mid, 'garbage_heavy': garbage}
+
+
+def run_benchmark(repeats=20):
+    """Searches per second and placements found for each board and piece"""
+    from main import Tetris
+
+    game = Tetris(seed=0)
+    results = []
+    for name, grid in make_benchmark_boards().items():
+        game.grid = grid
+        searches = 0
+        placements = 0
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for piece_type in range(len(PIECES)):
+                placements += len(find_reachable(game, piece_type, (0, game.piece_x, game.piece_y)))
+                searches += 1
+        elapsed = time.perf_counter() - start
+        results.append({
+            'board': name,
+            'searches': searches,
+            'mean_ms': elapsed * 1000.0 / searches,
+            'searches_per_second': searches / elapsed if elapsed > 0 else 0.0,
+            'placements_per_piece': placements / searches,
+        })
+    return results
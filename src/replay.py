@@ -0,0 +1,332 @@
+"""
+Game replays and event logs
+A replay is a game's seed plus every input and frame time, enough to
+re-simulate it exactly. An event log is a JSON-lines record of what happened
+(game starts, piece locks, game overs) that can be analyzed without
+re-simulating anything.
+"""
+
+import gzip
+import json
+import struct
+import logging
+import itertools
+from collections import namedtuple
+from config import INPUT_ACTIONS, GRID_WIDTH, GRID_HEIGHT, ROTATION_SYSTEM
+from protocol import write_varint, read_varint, ProtocolError
+
+logger = logging.getLogger(__name__)
+
+# Replay op codes: 1-7 are INPUT_ACTIONS codes, the rest advance the clock
+OP_TICK = 0x00         # varint dt in ms, varint repeat count
+OP_TICK_FLOAT = 0x10   # float64 dt in ms, varint repeat count
+
+REPLAY_MAGIC = b'TRP2'
+# Format version by file magic; version 1 headers have no rules (10x20 classic games)
+REPLAY_VERSIONS = {b'TRP1': 1, REPLAY_MAGIC: 2}
+REPLAY_VERSION = REPLAY_VERSIONS[REPLAY_MAGIC]
+
+INPUT_CODES = {action: code for code, action in enumerate(INPUT_ACTIONS)}
+
+# Wire codes of the rotation systems a replay can name; append only
+ROTATION_CODES = ('classic', 'nes', 'srs')
+
+# Header fields are stored as varints in this order: the stats, then (from
+# version 2) width, height and rotation system code, followed by the ops
+Replay = namedtuple('Replay', ['game_id', 'seed', 'score', 'level', 'lines', 'pieces',
+                               'duration_ms', 'ops', 'width', 'height', 'rotation_system'],
+                    defaults=(GRID_WIDTH, GRID_HEIGHT, ROTATION_SYSTEM))
+_STAT_FIELDS = Replay._fields.index('ops')
+
+
+def encode_replay(replay):
+    """Serialize a replay body (without the length prefix)"""
+    if replay.rotation_system not in ROTATION_CODES:
+        raise ValueError(f"Rotation system {replay.rotation_system!r} has no replay code")
+    out = bytearray()
+    for value in replay[:_STAT_FIELDS]:
+        write_varint(out, int(value))
+    write_varint(out, replay.width)
+    write_varint(out, replay.height)
+    write_varint(out, ROTATION_CODES.index(replay.rotation_system))
+    out.extend(replay.ops)
+    return bytes(out)
+
+
+def decode_replay(body, version=REPLAY_VERSION):
+    values = []
+    pos = 0
+    for _ in range(_STAT_FIELDS if version < 2 else _STAT_FIELDS + 3):
+        value, pos = read_varint(body, pos)
+        values.append(value)
+    rules = {}
+    if version >= 2:
+        width, height, code = values[_STAT_FIELDS:]
+        if code >= len(ROTATION_CODES):
+            raise ProtocolError(f"Unknown rotation system code {code}")
+        rules = {'width': width, 'height': height, 'rotation_system': ROTATION_CODES[code]}
+    return Replay(*values[:_STAT_FIELDS], ops=bytes(body[pos:]), **rules)
+
+
+def game_rules(game):
+    """(width, height, rotation system name) of a Tetris game, as stored in replays"""
+    return (game.width, game.height, game.rotation_system.name)
+
+
+def replay_game(replay):
+    """A fresh headless game with the replay's seed, board size and rotation system"""
+    from main import Tetris
+    return Tetris(seed=replay.seed, headless=True, width=replay.width, height=replay.height,
+                  rotation_system=replay.rotation_system)
+
+
+class ReplayWriter:
+    """Appends length-prefixed replays to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(REPLAY_MAGIC)
+        else:
+            with open(path, 'rb') as replay_file:
+                magic = replay_file.read(len(REPLAY_MAGIC))
+            if magic != REPLAY_MAGIC:
+                self._file.close()
+                raise ProtocolError(f"{path} is not a version {REPLAY_VERSION} replay file")
+        self.count = 0
+
+    def write(self, replay):
+        body = encode_replay(replay)
+        prefix = bytearray()
+        write_varint(prefix, len(body))
+        self._file.write(prefix)
+        self._file.write(body)
+        self.count += 1
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_replays(path):
+    """Yield the replays in a file one at a time"""
+    with open(path, 'rb') as replay_file:
+        version = REPLAY_VERSIONS.get(replay_file.read(len(REPLAY_MAGIC)))
+        if version is None:
+            raise ProtocolError(f"{path} is not a replay file")
+        while True:
+            length = 0
+            shift = 0
+            while True:
+                byte = replay_file.read(1)
+                if not byte:
+                    if shift:
+                        raise ProtocolError(f"Truncated replay in {path}")
+                    return
+                length |= (byte[0] & 0x7F) << shift
+                if byte[0] < 0x80:
+                    break
+                shift += 7
+            body = replay_file.read(length)
+            if len(body) != length:
+                raise ProtocolError(f"Truncated replay in {path}")
+            yield decode_replay(body, version)
+
+
+class ReplayRecorder:
+    """Records every game a Tetris instance plays as a replay
+
+    Attach before the first frame of a game: only inputs made through
+    apply_input() and time passed to update() are captured.
+    """
+
+    def __init__(self, game, on_replay, game_ids=None):
+        """on_replay(replay) receives each finished game (e.g. ReplayWriter.write)"""
+        from rotation import SYSTEMS
+        name = game.rotation_system.name
+        if name not in ROTATION_CODES or SYSTEMS.get(name) is not game.rotation_system:
+            raise ValueError(f"Games with a custom rotation system ({name}) cannot be recorded")
+        self.game = game
+        self.on_replay = on_replay
+        self.game_ids = game_ids if game_ids is not None else itertools.count()
+        self._start(game.seed)
+        game.add_listener(self._on_event)
+
+    def close(self):
+        self.game.remove_listener(self._on_event)
+
+    def _start(self, seed):
+        self.seed = seed
+        self.ops = bytearray()
+        self._tick_dt = None
+        self._tick_count = 0
+
+    def _flush_ticks(self):
+        """Write the pending run of equal frame times as one op"""
+        if not self._tick_count:
+            return
+        dt = self._tick_dt
+        if isinstance(dt, int):
+            self.ops.append(OP_TICK)
+            write_varint(self.ops, dt)
+        else:
+            self.ops.append(OP_TICK_FLOAT)
+            self.ops.extend(struct.pack('<d', dt))
+        write_varint(self.ops, self._tick_count)
+        self._tick_count = 0
+
+    def _on_event(self, event, data):
+        if event == 'tick':
+            dt = data['dt']
+            if self._tick_count and dt == self._tick_dt and type(dt) is type(self._tick_dt):
+                self._tick_count += 1
+            else:
+                self._flush_ticks()
+                self._tick_dt = dt
+                self._tick_count = 1
+        elif event == 'input':
+            self._flush_ticks()
+            self.ops.append(INPUT_CODES[data['action']])
+        elif event == 'game_over':
+            self._flush_ticks()
+            width, height, rotation_system = game_rules(self.game)
+            self.on_replay(Replay(next(self.game_ids), self.seed, data['score'], data['level'],
+                                  data['lines'], data['pieces'], int(data['duration_ms']),
+                                  bytes(self.ops), width, height, rotation_system))
+        elif event == 'reset':
+            self._start(data['seed'])
+
+
+def iter_ops(ops):
+    """Yield ('tick', dt, count) and ('input', action) from a replay's ops"""
+    pos = 0
+    while pos < len(ops):
+        op = ops[pos]
+        pos += 1
+        if op == OP_TICK:
+            dt, pos = read_varint(ops, pos)
+            count, pos = read_varint(ops, pos)
+            yield ('tick', dt, count)
+        elif op == OP_TICK_FLOAT:
+            dt, = struct.unpack_from('<d', ops, pos)
+            count, pos = read_varint(ops, pos + 8)
+            yield ('tick', dt, count)
+        elif 0 < op < len(INPUT_ACTIONS):
+            yield ('input', INPUT_ACTIONS[op])
+        else:
+            raise ProtocolError(f"Unknown replay op {op:#x}")
+
+
+def play_replay(replay, game=None, on_frame=None):
+    """Re-simulate a replay on a headless game and return the game
+
+    The game stops at the recorded game over; its last_game then matches the
+    replay's final stats. A given game must have the replay's board size and
+    rotation system. on_frame(game) is called after every update.
+    """
+    if game is None:
+        game = replay_game(replay)
+    elif game_rules(game) != (replay.width, replay.height, replay.rotation_system):
+        raise ValueError(f"Replay {replay.game_id} needs a {replay.width}x{replay.height} "
+                         f"{replay.rotation_system} game")
+    game.reset_game(seed=replay.seed)
+    games_before = game.games_played
+    for op in iter_ops(replay.ops):
+        if op[0] == 'input':
+            game.apply_input(op[1])
+        else:
+            _, dt, count = op
+            for _ in range(count):
+                game.update(dt)
+                if on_frame is not None:
+                    on_frame(game)
+                if game.games_played != games_before:
+                    break
+        if game.games_played != games_before:
+            break
+    return game
+
+
+class GameEvents:
+    """Turns engine events into event-log records for one game at a time"""
+
+    def __init__(self, game, on_event, game_ids=None, announce=True):
+        """on_event(record) receives each record dict
+
+        With announce a start record is sent for the game in progress;
+        otherwise the first record comes with the next reset.
+        """
+        self.game = game
+        self.on_event = on_event
+        self.game_ids = game_ids if game_ids is not None else itertools.count()
+        self.game_id = None
+        if announce:
+            self.game_id = next(self.game_ids)
+            on_event({'game': self.game_id, 'event': 'start', 't': game.game_time, 'seed': game.seed})
+        game.add_listener(self._on_event)
+
+    def close(self):
+        self.game.remove_listener(self._on_event)
+
+    def _on_event(self, event, data):
+        game = self.game
+        if event == 'lock':
+            self.on_event({'game': self.game_id, 'event': 'lock', 't': game.game_time,
+                           'piece': data['piece_type'], 'lines': len(data['cleared_rows']),
+                           'level': game.level})
+        elif event == 'game_over':
+            record = {'game': self.game_id, 'event': 'game_over', 't': data['duration_ms']}
+            record.update((key, data[key]) for key in ('score', 'level', 'lines', 'pieces'))
+            self.on_event(record)
+        elif event == 'reset':
+            self.game_id = next(self.game_ids)
+            self.on_event({'game': self.game_id, 'event': 'start', 't': 0, 'seed': data['seed']})
+
+
+def open_log(path, mode='r'):
+    """Open an event log, gzip-compressed when the name ends in .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class EventLogWriter:
+    """Writes a game's event records to a JSON-lines log"""
+
+    def __init__(self, game, path, game_ids=None):
+        self._file = open_log(path, 'a')
+        self.events = GameEvents(game, self.write, game_ids)
+
+    def write(self, record):
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    def close(self):
+        if self._file:
+            self.events.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_event_log(path):
+    """Yield the records of an event log one line at a time"""
+    with open_log(path) as log_file:
+        for line_number, line in enumerate(log_file, 1):
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                # A writer killed mid-line leaves a partial last record
+                logger.warning(f"Skipping bad event line {line_number} in {path}: {e}")
@@ -0,0 +1,321 @@
+"""
+Reinforcement learning environments for Tetris
+Gym-style reset()/step(action) wrapper around the headless game, plus a
+vectorized variant that runs environments in subprocesses and exchanges
+observations, rewards and actions through one shared memory block
+
+Requires numpy (optional dependency, not needed to play the game).
+"""
+
+import os
+import time
+import random
+import logging
+import multiprocessing
+from config import GRID_WIDTH, GRID_HEIGHT, FPS
+from pieces import PIECE_GARBAGE
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the RL environments
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Discrete action space
+NOOP = 0
+LEFT = 1
+RIGHT = 2
+ROTATE = 3
+SOFT_DROP = 4
+HARD_DROP = 5
+NUM_ACTIONS = 6
+
+# Observation cell values: 0 empty, 1-7 locked piece types, 8 garbage,
+# ACTIVE_CELL falling piece
+ACTIVE_CELL = PIECE_GARBAGE + 2
+
+# Game time advanced per step (one frame at the game's frame rate)
+STEP_MS = 1000 // FPS
+
+# Worker commands sent over the pipes (raw bytes, never pickled)
+_CMD_STEP = b'S'
+_CMD_RESET = b'R'
+_CMD_CLOSE = b'C'
+_ACK = b'K'
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The RL environments require numpy: pip install numpy")
+
+
+def apply_action(game, action):
+    """Apply a discrete action to the game"""
+    if action == LEFT:
+        game.move(-1)
+    elif action == RIGHT:
+        game.move(1)
+    elif action == ROTATE:
+        game.rotate()
+    elif action == SOFT_DROP:
+        game.drop()
+    elif action == HARD_DROP:
+        game.hard_drop()
+    elif action != NOOP:
+        raise ValueError(f"Unknown action: {action}")
+
+
+def write_observation(game, out):
+    """Write the board plus the falling piece into a (height, width) uint8 array"""
+    out[:, :] = game.grid
+    for py, row in enumerate(game.current_piece):
+        for px, cell in enumerate(row):
+            if cell == '#':
+                x, y = game.piece_x + px, game.piece_y + py
+                if 0 <= x < game.width and 0 <= y < game.height:
+                    out[y, x] = ACTIVE_CELL
+    return out
+
+
+class TetrisEnv:
+    """Single Tetris environment with a reset()/step(action) interface"""
+
+    def __init__(self, seed=None, step_ms=STEP_MS, width=GRID_WIDTH, height=GRID_HEIGHT):
+        """Create the headless game; seed fixes the piece sequence"""
+        _require_numpy()
+        from main import Tetris
+
+        self.seed = seed
+        self.step_ms = step_ms
+        self.game = Tetris(seed=seed, headless=True, width=width, height=height)
+        self.observation_shape = (self.game.height, self.game.width)
+        self.action_count = NUM_ACTIONS
+        self._obs = np.zeros(self.observation_shape, dtype=np.uint8)
+
+    def reset(self, seed=None):
+        """Start a new game and return the first observation
+
+        Without a seed the piece sequence continues from the game's random
+        source; with one it restarts from that seed.
+        """
+        if seed is not None:
+            self.seed = seed
+        self.game.reset_game(seed=seed)
+        return write_observation(self.game, self._obs).copy()
+
+    def step_into(self, action, out):
+        """Apply an action, advance one frame and write the observation to out
+
+        Returns (score_delta, done, lines, final). The game restarts itself
+        on game over, so after done the next step already plays a fresh
+        game; final holds the finished game's stats.
+        """
+        game = self.game
+        score_before = game.score
+        lines_before = game.lines_cleared
+        games_before = game.games_played
+
+        apply_action(game, action)
+        if game.games_played == games_before:
+            game.update(self.step_ms)
+
+        write_observation(game, out)
+        if game.games_played != games_before:
+            final = game.last_game
+            return final['score'] - score_before, True, final['lines'] - lines_before, final
+        return game.score - score_before, False, game.lines_cleared - lines_before, None
+
+    def step(self, action):
+        """Apply an action and advance one frame
+
+        Returns (observation, score_delta, done, info) with the lines
+        cleared this step and the finished game's stats in info.
+        """
+        reward, done, lines, final = self.step_into(action, self._obs)
+        return self._obs.copy(), reward, done, {'lines': lines, 'final': final}
+
+
+def _vector_worker(conn, shm_name, num_envs, env_indices, seeds, step_ms, width, height):
+    """Subprocess loop stepping a slice of the vectorized environments"""
+    from multiprocessing import shared_memory
+
+    logging.disable(logging.INFO)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    views = None
+    try:
+        views = _SharedViews(shm.buf, num_envs, height, width)
+        envs = [TetrisEnv(seed=seed, step_ms=step_ms, width=width, height=height) for seed in seeds]
+        while True:
+            command = conn.recv_bytes()
+            if command == _CMD_CLOSE:
+                break
+            for env, index in zip(envs, env_indices):
+                if command == _CMD_RESET:
+                    env.game.reset_game(seed=env.seed)
+                    write_observation(env.game, views.obs[index])
+                    views.rewards[index] = 0
+                    views.dones[index] = 0
+                    views.lines[index] = 0
+                else:
+                    reward, done, lines, _ = env.step_into(int(views.actions[index]), views.obs[index])
+                    views.rewards[index] = reward
+                    views.dones[index] = done
+                    views.lines[index] = lines
+            conn.send_bytes(_ACK)
+    finally:
+        del views
+        shm.close()
+        conn.close()
+
+
+class _SharedViews:
+    """numpy views laid out over one shared memory buffer"""
+
+    def __init__(self, buffer, num_envs, height, width):
+        offset = 0
+        layout = (
+            ('obs', np.uint8, (num_envs, height, width)),
+            ('rewards', np.float64, (num_envs,)),
+            ('lines', np.int32, (num_envs,)),
+            ('actions', np.int32, (num_envs,)),
+            ('dones', np.uint8, (num_envs,)),
+        )
+        for name, dtype, shape in layout:
+            # Keep every array aligned to its item size
+            itemsize = np.dtype(dtype).itemsize
+            offset = (offset + 7) // 8 * 8 if itemsize > 1 else offset
+            array = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            setattr(self, name, array)
+            offset += array.nbytes
+
+    @staticmethod
+    def size(num_envs, height, width):
+        cells = num_envs * height * width
+        return (cells + 7) // 8 * 8 + num_envs * (8 + 4 + 4 + 1) + 16
+
+
+class VectorTetrisEnv:
+    """K Tetris environments stepped in subprocesses over shared memory
+
+    Observations, rewards, line counts, done flags and actions all live in
+    one SharedMemory block; the pipes only carry one-byte commands, so
+    nothing is pickled per step. Finished games restart automatically.
+    Needs multiprocessing.shared_memory (Python 3.8+).
+    """
+
+    def __init__(self, num_envs, seeds=None, num_workers=None, step_ms=STEP_MS,
+                 width=GRID_WIDTH, height=GRID_HEIGHT):
+        """Start worker processes, each owning a slice of the environments"""
+        _require_numpy()
+        from multiprocessing import shared_memory
+
+        self.num_envs = num_envs
+        self.observation_shape = (height, width)
+        seeds = list(seeds) if seeds is not None else list(range(num_envs))
+        if len(seeds) != num_envs:
+            raise ValueError(f"Expected {num_envs} seeds, got {len(seeds)}")
+        self.num_workers = max(1, min(num_envs, num_workers or os.cpu_count() or 1))
+
+        self._shm = shared_memory.SharedMemory(create=True, size=_SharedViews.size(num_envs, height, width))
+        self._views = _SharedViews(self._shm.buf, num_envs, height, width)
+        self._conns = []
+        self._processes = []
+        self._closed = False
+        try:
+            for worker in range(self.num_workers):
+                indices = list(range(worker, num_envs, self.num_workers))
+                parent_conn, child_conn = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=_vector_worker,
+                    args=(child_conn, self._shm.name, num_envs, indices,
+                          [seeds[i] for i in indices], step_ms, width, height),
+                    daemon=True)
+                process.start()
+                child_conn.close()
+                self._conns.append(parent_conn)
+                self._processes.append(process)
+        except Exception:
+            self.close()
+            raise
+
+    def _broadcast(self, command):
+        for conn in self._conns:
+            conn.send_bytes(command)
+        for conn in self._conns:
+            conn.recv_bytes()
+
+    def reset(self):
+        """Reset every environment and return the (K, height, width) observations"""
+        self._broadcast(_CMD_RESET)
+        return self._views.obs
+
+    def step(self, actions):
+        """Step all environments with a length-K action array
+
+        Returns views (observations, rewards, dones, lines) into shared
+        memory; copy them if they must survive the next step.
+        """
+        self._views.actions[:] = actions
+        self._broadcast(_CMD_STEP)
+        return self._views.obs, self._views.rewards, self._views.dones, self._views.lines
+
+    def close(self):
+        """Stop the workers and release the shared memory block"""
+        if self._closed:
+            return
+        self._closed = True
+        for conn in self._conns:
+            try:
+                conn.send_bytes(_CMD_CLOSE)
+            except (OSError, ValueError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        del self._views
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_benchmark(env_counts=(1, 8, 64), steps=500, seed=0):
+    """Steps per second for the single and vectorized environments"""
+    _require_numpy()
+    rng = random.Random(seed)
+    results = []
+
+    env = TetrisEnv(seed=seed)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        env.step(rng.randrange(NUM_ACTIONS))
+    elapsed = time.perf_counter() - start
+    results.append({'variant': 'single', 'envs': 1, 'steps': steps,
+                    'steps_per_second': steps / elapsed if elapsed > 0 else 0.0})
+
+    for count in env_counts:
+        with VectorTetrisEnv(count, seeds=range(count)) as vector_env:
+            vector_env.reset()
+            actions = np.zeros(count, dtype=np.int32)
+            start = time.perf_counter()
+            for _ in range(steps):
+                actions[:] = [rng.randrange(NUM_ACTIONS) for _ in range(count)]
+                vector_env.step(actions)
+            elapsed = time.perf_counter() - start
+            results.append({
+                'variant': 'vector',
+                'envs': count,
+                'workers': vector_env.num_workers,
+                'steps': steps * count,
+                'steps_per_second': steps * count / elapsed if elapsed > 0 else 0.0,
+            })
+    return results
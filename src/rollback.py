@@ -0,0 +1,302 @@
+"""
+Rollback netcode for versus play
+GGPO-style sessions: each peer simulates both boards every frame, predicts
+the remote player's input, keeps a ring buffer of per-frame snapshots and
+resimulates from the mispredicted frame when the real input arrives late.
+Includes an in-process network with configurable latency, jitter and loss.
+"""
+
+import time
+import random
+import logging
+from config import FPS, INPUT_ACTIONS
+
+logger = logging.getLogger(__name__)
+
+# Input codes sent over the wire; 0 is "no input this frame"
+ACTIONS = INPUT_ACTIONS
+INPUT_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+# Garbage sent for lines cleared in one frame (same table as the game server)
+GARBAGE_FOR_LINES = {1: 0, 2: 1, 3: 2, 4: 4}
+
+FRAME_MS = 1000.0 / FPS
+
+# Most inputs resent per packet; older unacknowledged inputs follow later
+MAX_INPUTS_PER_PACKET = 64
+
+
+class VersusWorld:
+    """Both players' games, advanced in lockstep one frame at a time"""
+
+    def __init__(self, seed):
+        from main import Tetris
+
+        self.games = [Tetris(seed=seed, headless=True), Tetris(seed=seed, headless=True)]
+
+    def snapshot(self):
+        return tuple(game.snapshot() for game in self.games)
+
+    def restore(self, snapshot):
+        for game, state in zip(self.games, snapshot):
+            game.restore(state)
+
+    def simulate_frame(self, codes):
+        """Apply one input code per player, run gravity, then exchange garbage"""
+        cleared = []
+        for game, code in zip(self.games, codes):
+            lines_before = game.lines_cleared
+            games_before = game.games_played
+            if code:
+                game.apply_input(ACTIONS[code])
+            game.update(FRAME_MS)
+            # A reset zeroes the line count, so only count lines from the same game
+            cleared.append(game.lines_cleared - lines_before if game.games_played == games_before else 0)
+        for player, lines in enumerate(cleared):
+            garbage = GARBAGE_FOR_LINES.get(lines, 0)
+            if garbage:
+                self.games[1 - player].add_garbage(garbage)
+
+
+class RollbackSession:
+    """One peer's view of a two-player rollback match
+
+    Remote input is predicted as "no input": Tetris inputs are taps rather than
+    held buttons, so repeating the last input (the usual GGPO guess) would
+    mispredict far more often.
+    """
+
+    def __init__(self, local_player, seed, max_rollback=8, input_delay=2, world=None):
+        """Create the session; both peers must use the same seed
+
+        input_delay frames of local delay hide part of the latency, and the
+        session stalls instead of running more than max_rollback frames
+        ahead of the last confirmed remote input.
+        """
+        self.local_player = local_player
+        self.remote_player = 1 - local_player
+        self.max_rollback = max_rollback
+        self.input_delay = input_delay
+        self.world = world or VersusWorld(seed)
+        self.frame = 0
+
+        self.local_inputs = {}
+        self.remote_inputs = {}
+        self.predicted = {}
+        self.remote_received = 0   # Every remote input before this frame has arrived
+        self.remote_ack = -1       # Last local frame the remote peer has confirmed
+        self._local_sent = 0       # Next local frame that has no input recorded yet
+        self._rollback_from = None
+        self._snapshots = [None] * (max_rollback + 2)
+
+        self.stalled_frames = 0
+        self.rollbacks = []        # (depth, resimulation seconds) per rollback
+
+    def _input(self, player, frame):
+        if player == self.local_player:
+            return self.local_inputs.get(frame, 0)
+        code = self.remote_inputs.get(frame)
+        if code is None:
+            self.predicted[frame] = 0
+            return 0
+        return code
+
+    def _codes(self, frame):
+        return (self._input(0, frame), self._input(1, frame))
+
+    def _save(self, frame):
+        self._snapshots[frame % len(self._snapshots)] = (frame, self.world.snapshot())
+
+    def _load(self, frame):
+        saved_frame, snapshot = self._snapshots[frame % len(self._snapshots)]
+        if saved_frame != frame:
+            raise RuntimeError(f"No snapshot for frame {frame} (have {saved_frame})")
+        self.world.restore(snapshot)
+
+    def receive(self, packet):
+        """Take a packet (sender, ack, start_frame, codes) from the remote peer"""
+        sender, ack, start, codes = packet
+        if sender != self.remote_player:
+            return
+        self.remote_ack = max(self.remote_ack, ack)
+        for offset, code in enumerate(codes):
+            frame = start + offset
+            if frame in self.remote_inputs:
+                continue
+            self.remote_inputs[frame] = code
+            predicted = self.predicted.pop(frame, None)
+            if predicted is not None and predicted != code:
+                if self._rollback_from is None or frame < self._rollback_from:
+                    self._rollback_from = frame
+        while self.remote_received in self.remote_inputs:
+            self.remote_received += 1
+
+    def make_packet(self):
+        """Build the packet for the remote peer: every unacknowledged local input"""
+        start = self.remote_ack + 1
+        end = min(self._local_sent, start + MAX_INPUTS_PER_PACKET)
+        codes = [self.local_inputs.get(frame, 0) for frame in range(start, end)]
+        return (self.local_player, self.remote_received - 1, start, codes)
+
+    def can_advance(self):
+        return self.frame - self.remote_received < self.max_rollback
+
+    def advance_frame(self, action=None):
+        """Record this frame's local input and simulate one frame
+
+        Returns False (and drops the input) when stalled waiting for the
+        remote peer.
+        """
+        if not self.can_advance():
+            self.stalled_frames += 1
+            return False
+        # Local input is scheduled input_delay frames ahead; frames before it stay empty
+        target = self.frame + self.input_delay
+        self.local_inputs[target] = INPUT_CODES[action]
+        self._local_sent = target + 1
+
+        self.synchronize()
+        self._save(self.frame)
+        self.world.simulate_frame(self._codes(self.frame))
+        self.frame += 1
+        self._prune()
+        return True
+
+    def synchronize(self):
+        """Resimulate now if late remote input contradicted a prediction"""
+        if self._rollback_from is not None:
+            self._rollback(self._rollback_from)
+            self._rollback_from = None
+
+    def _rollback(self, frame):
+        """Restore the snapshot taken before frame and resimulate up to now"""
+        start = time.perf_counter()
+        depth = self.frame - frame
+        self._load(frame)
+        for resim_frame in range(frame, self.frame):
+            self._save(resim_frame)
+            self.world.simulate_frame(self._codes(resim_frame))
+        self.rollbacks.append((depth, time.perf_counter() - start))
+
+    def _prune(self):
+        """Forget inputs neither side can need again"""
+        if self.frame % 64:
+            return
+        oldest = min(self.remote_received, self.remote_ack + 1, self.frame) - 1
+        if oldest > 0:
+            for inputs in (self.local_inputs, self.remote_inputs):
+                for frame in [f for f in inputs if f < oldest - self.max_rollback]:
+                    del inputs[frame]
+
+    def confirmed(self):
+        """True once every simulated frame used real remote input"""
+        return self.remote_received >= self.frame and self._rollback_from is None
+
+    def report(self):
+        """Rollback depth and resimulation cost statistics"""
+        depths = sorted(depth for depth, _ in self.rollbacks)
+        costs = sorted(seconds * 1000.0 for _, seconds in self.rollbacks)
+
+        def percentile(values, fraction):
+            return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+        return {
+            'frames': self.frame,
+            'rollbacks': len(self.rollbacks),
+            'stalled_frames': self.stalled_frames,
+            'mean_depth': sum(depths) / len(depths) if depths else 0.0,
+            'max_depth': depths[-1] if depths else 0,
+            'mean_resim_ms': sum(costs) / len(costs) if costs else 0.0,
+            'p99_resim_ms': percentile(costs, 0.99),
+            'max_resim_ms': costs[-1] if costs else 0.0,
+        }
+
+
+class SimulatedNetwork:
+    """In-process packet delivery with latency, jitter and random loss"""
+
+    def __init__(self, latency_frames=4, jitter_frames=1, loss=0.0, seed=0):
+        self.latency_frames = latency_frames
+        self.jitter_frames = jitter_frames
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.in_flight = []
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, destination, packet, now):
+        self.sent += 1
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency_frames + self.rng.randint(0, self.jitter_frames)
+        self.in_flight.append((now + delay, destination, packet))
+
+    def deliver(self, destination, now):
+        """Pop the packets for destination that have arrived by frame now"""
+        arrived = [packet for due, dest, packet in self.in_flight if dest == destination and due <= now]
+        if arrived:
+            self.in_flight = [entry for entry in self.in_flight
+                              if not (entry[1] == destination and entry[0] <= now)]
+        return arrived
+
+
+def random_inputs(frames, seed, tap_chance=0.15):
+    """Deterministic per-frame player taps for testing and benchmarks"""
+    rng = random.Random(seed)
+    return [rng.choice(ACTIONS[1:]) if rng.random() < tap_chance else None
+            for _ in range(frames)]
+
+
+def run_match(frames=600, latency_frames=4, jitter_frames=1, loss=0.1, seed=0,
+              max_rollback=8, input_delay=2):
+    """Play both peers of a match over a simulated network
+
+    Each peer feeds its own scripted inputs; stalled frames retry the same
+    input. Returns the sessions and network once every frame is confirmed.
+    """
+    network = SimulatedNetwork(latency_frames, jitter_frames, loss, seed)
+    sessions = [RollbackSession(player, seed, max_rollback, input_delay) for player in (0, 1)]
+    scripts = [random_inputs(frames, seed * 2 + player + 1) for player in (0, 1)]
+
+    now = 0
+    while not all(session.frame >= frames and session.confirmed() for session in sessions):
+        for player, session in enumerate(sessions):
+            for packet in network.deliver(player, now):
+                session.receive(packet)
+            if session.frame < frames:
+                session.advance_frame(scripts[player][session.frame])
+            else:
+                session.synchronize()
+            network.send(1 - player, session.make_packet(), now)
+        now += 1
+        if now > frames * 20 + 1000:
+            raise RuntimeError("Simulated match failed to settle")
+    return sessions, network
+
+
+def run_benchmark(frames=1200, seed=0):
+    """Rollback depth and resimulation cost across network conditions"""
+    logging.disable(logging.INFO)
+    from main import Tetris
+
+    game = Tetris(seed=seed, headless=True)
+    repeats = 2000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        game.restore(game.snapshot())
+    snapshot_us = (time.perf_counter() - start) * 1e6 / repeats
+
+    results = []
+    for latency, loss in ((2, 0.0), (4, 0.05), (8, 0.2)):
+        sessions, network = run_match(frames, latency_frames=latency, jitter_frames=2,
+                                      loss=loss, seed=seed, max_rollback=12)
+        report = sessions[0].report()
+        report.update({
+            'latency_frames': latency,
+            'loss': loss,
+            'snapshot_restore_us': snapshot_us,
+            'in_sync': sessions[0].world.snapshot() == sessions[1].world.snapshot(),
+        })
+        results.append(report)
+    return results
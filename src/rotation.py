@@ -0,0 +1,314 @@
+"""
+Data-driven rotation systems
+Each system is plain data: kick offsets tried in order for every
+(from-state, to-state) transition, per piece where it differs. At load the
+data is compiled into per-(piece, from-rotation, turn) offset arrays, and
+per board width into a bit mask of the rotated piece and one shift per kick
+candidate, so a rotation builds a small bit window of the board once and
+then costs a single AND per candidate.
+
+Kicks are (dx, dy) with y pointing down the board, except for tables
+marked 'y_up' (the SRS guideline's convention), which are flipped when
+compiled. States follow the guideline numbering 0, R=1, 2, L=3; pieces with
+fewer rotation states (I, S, Z have two, O one) use the transition their
+current state would make in four-state numbering, and a turn that lands on
+the same shape (180 degrees on a two-state piece, any turn of O) does nothing.
+"""
+
+import time
+import random
+import logging
+from collections import namedtuple
+from config import ROTATION_KICKS, ROTATION_SYSTEM
+from pieces import PIECES, PIECE_T, PIECE_O, PIECE_L, PIECE_I, PIECE_S, PIECE_Z, PIECE_J
+
+logger = logging.getLogger(__name__)
+
+# Turn directions, as quarter turns clockwise
+CW = 1
+HALF = 2
+CCW = 3
+
+# Input names understood by Tetris.apply_input, per turn direction
+TURN_ACTIONS = {CW: 'rotate', CCW: 'rotate_ccw', HALF: 'rotate_180'}
+
+PIECE_LETTERS = {'T': PIECE_T, 'O': PIECE_O, 'L': PIECE_L, 'I': PIECE_I,
+                 'S': PIECE_S, 'Z': PIECE_Z, 'J': PIECE_J}
+
+# Guideline SRS wall kicks (y up), keyed by (from state, to state)
+SRS_JLSTZ_KICKS = {
+    (0, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (1, 0): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (1, 2): ((0, 0), (1, 0), (1, -1), (0, 2), (1, 2)),
+    (2, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
+    (2, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+    (3, 2): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (3, 0): ((0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)),
+    (0, 3): ((0, 0), (1, 0), (1, 1), (0, -2), (1, -2)),
+}
+SRS_I_KICKS = {
+    (0, 1): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (1, 0): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (1, 2): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+    (2, 1): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (2, 3): ((0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)),
+    (3, 2): ((0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)),
+    (3, 0): ((0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)),
+    (0, 3): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
+}
+# The guideline has no 180 degree kicks; this short table is the common extension
+SRS_HALF_KICKS = ((0, 0), (0, 1), (1, 1), (-1, 1), (1, 0), (-1, 0))
+
+CLASSIC_KICKS = tuple((dx, 0) for dx in ROTATION_KICKS)
+
+# System name -> definition. 'kicks' maps a piece letter (or '*' for the
+# rest) to a table keyed by (from, to) state, 'half' for any 180 degree turn
+# and '*' for any other transition; 'turns' lists the directions allowed.
+ROTATION_SYSTEMS = {
+    'classic': {
+        'description': "Original engine rotation: shift left or right by one to fit",
+        'turns': (CW, CCW, HALF),
+        'kicks': {'*': {'*': CLASSIC_KICKS}},
+    },
+    'srs': {
+        'description': "Super Rotation System with per-piece kick tables",
+        'turns': (CW, CCW, HALF),
+        'y_up': True,
+        'kicks': {
+            'I': dict(SRS_I_KICKS, half=SRS_HALF_KICKS),
+            'O': {'*': ((0, 0),)},
+            '*': dict(SRS_JLSTZ_KICKS, half=SRS_HALF_KICKS),
+        },
+    },
+    'nes': {
+        'description': "NES rotation: no kicks and no 180 degree turn",
+        'turns': (CW, CCW),
+        'kicks': {'*': {'*': ((0, 0),)}},
+    },
+}
+
+# Empty columns either side of the board in a collision window; any piece
+# cell outside the board but within the margin lands on a wall cell
+MARGIN = 8
+# Window cells are the grid's bytes as they are (0 empty, 1-8 filled), so a
+# piece cell masks the whole byte
+CELL = 0xFF
+
+Turn = namedtuple('Turn', ['to_rotation', 'kicks'])
+CompiledTurn = namedtuple('CompiledTurn', ['to_rotation', 'mask', 'top', 'rows', 'candidates'])
+
+
+class RotationSystem:
+    """A compiled rotation system"""
+
+    def __init__(self, name, definition):
+        self.name = name
+        self.description = definition.get('description', '')
+        self.allowed = tuple(definition['turns'])
+        flip = -1 if definition.get('y_up') else 1
+        kicks = definition['kicks']
+        # turns[piece][rotation] -> {direction: Turn}
+        self.turns = []
+        for piece_type, rotations in enumerate(PIECES):
+            letter = next(letter for letter, value in PIECE_LETTERS.items() if value == piece_type)
+            table = kicks.get(letter, kicks['*'])
+            states = len(rotations)
+            per_rotation = []
+            for rotation in range(states):
+                compiled = {}
+                for direction in self.allowed:
+                    to_rotation = (rotation + direction) % states
+                    if to_rotation == rotation:
+                        continue
+                    transition = (rotation, (rotation + direction) % 4)
+                    offsets = table.get(transition)
+                    if offsets is None and direction == HALF:
+                        offsets = table.get('half')
+                    if offsets is None:
+                        offsets = table['*']
+                    compiled[direction] = Turn(to_rotation, tuple((dx, dy * flip) for dx, dy in offsets))
+                per_rotation.append(compiled)
+            self.turns.append(per_rotation)
+        self._layouts = {}
+
+    def turn(self, piece_type, rotation, direction):
+        """The Turn for a rotation, or None if it is not allowed or changes nothing"""
+        return self.turns[piece_type][rotation].get(direction % 4)
+
+    def layout(self, width):
+        """Bit masks and kick shifts for boards of the given width (compiled once)"""
+        layout = self._layouts.get(width)
+        if layout is None:
+            layout = self._compile_layout(width)
+            self._layouts[width] = layout
+        return layout
+
+    def _compile_layout(self, width):
+        # One byte per cell, rows of MARGIN + width + MARGIN bytes
+        stride = width + 2 * MARGIN
+        compiled = []
+        for piece_type, rotations in enumerate(PIECES):
+            per_rotation = []
+            for turns in self.turns[piece_type]:
+                per_turn = {}
+                for direction, turn in turns.items():
+                    cells = [(px, py) for py, row in enumerate(rotations[turn.to_rotation])
+                             for px, cell in enumerate(row) if cell == '#']
+                    first_row = min(py for _, py in cells)
+                    last_row = max(py for _, py in cells)
+                    mask = 0
+                    for px, py in cells:
+                        mask |= CELL << (8 * ((py - first_row) * stride + px))
+                    low = min(dy for _, dy in turn.kicks)
+                    high = max(dy for _, dy in turn.kicks)
+                    candidates = tuple((8 * ((dy - low) * stride + dx + MARGIN), dx, dy)
+                                       for dx, dy in turn.kicks)
+                    per_turn[direction] = CompiledTurn(turn.to_rotation, mask, first_row + low,
+                                                       high - low + last_row - first_row + 1, candidates)
+                per_rotation.append(per_turn)
+            compiled.append(per_rotation)
+        wall = b'\x01' * MARGIN
+        return {'compiled': compiled, 'wall': wall, 'walls': wall * 2,
+                'open_row': wall + bytes(width) + wall, 'floor_row': b'\x01' * stride}
+
+    def rotate(self, grid, piece_type, rotation, x, y, direction):
+        """First kick that fits after turning the piece, as (rotation, x, y), or None
+
+        grid is a Tetris grid (rows of cells, 0 = empty); the board width
+        and height are taken from it.
+        """
+        height = len(grid)
+        layout = self.layout(len(grid[0]))
+        turn = layout['compiled'][piece_type][rotation].get(direction % 4)
+        if turn is None:
+            return None
+
+        # Bit window over the rows any candidate can touch: walls either
+        # side, open space above the board and solid floor below it
+        wall = layout['wall']
+        top = y + turn.top
+        bottom = top + turn.rows
+        if top >= 0 and bottom <= height:
+            window = wall + layout['walls'].join(map(bytes, grid[top:bottom])) + wall
+        else:
+            parts = []
+            for row_y in range(top, bottom):
+                if row_y < 0:
+                    parts.append(layout['open_row'])
+                elif row_y >= height:
+                    parts.append(layout['floor_row'])
+                else:
+                    parts.append(wall + bytes(grid[row_y]) + wall)
+            window = b''.join(parts)
+        board = int.from_bytes(window, 'little')
+
+        mask = turn.mask
+        base = 8 * x
+        for shift, dx, dy in turn.candidates:
+            if not board & (mask << (shift + base)):
+                return turn.to_rotation, x + dx, y + dy
+        return None
+
+
+def _load_systems():
+    systems = {}
+    for name, definition in ROTATION_SYSTEMS.items():
+        try:
+            systems[name] = RotationSystem(name, definition)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Invalid rotation system {name}: {e}")
+    return systems
+
+
+SYSTEMS = _load_systems()
+
+
+def get_rotation_system(system=None):
+    """Look up a compiled rotation system by name (default config.ROTATION_SYSTEM)"""
+    if isinstance(system, RotationSystem):
+        return system
+    name = system or ROTATION_SYSTEM
+    if name not in SYSTEMS:
+        raise ValueError(f"Unknown rotation system: {name} (available: {', '.join(SYSTEMS)})")
+    return SYSTEMS[name]
+
+
+def make_kick_boards(seed=0):
+    """Boards where most rotations need a kick: narrow wells, overhangs and full walls"""
+    from config import GRID_WIDTH, GRID_HEIGHT
+    rng = random.Random(seed)
+    boards = {'empty': [[0] * GRID_WIDTH for _ in range(GRID_HEIGHT)]}
+
+    # One-wide wells between tall columns
+    wells = [[0] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+    for x in range(0, GRID_WIDTH, 3):
+        for y in range(4, GRID_HEIGHT):
+            wells[y][x] = 1
+    boards['wells'] = wells
+
+    # Dense random rubble: about half the cells below the top rows filled
+    rubble = [[0] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+    for y in range(3, GRID_HEIGHT):
+        for x in range(GRID_WIDTH):
+            if rng.random() < 0.5:
+                rubble[y][x] = 1
+    boards['rubble'] = rubble
+    return boards
+
+
+def reference_rotate(game, system, direction):
+    """Rotation via one valid_move call per kick, for checks and benchmarks"""
+    turn = system.turn(game.current_piece_type, game.current_rotation, direction)
+    if turn is None:
+        return None
+    piece = PIECES[game.current_piece_type][turn.to_rotation]
+    for dx, dy in turn.kicks:
+        if game.valid_move(piece, game.piece_x + dx, game.piece_y + dy):
+            return turn.to_rotation, game.piece_x + dx, game.piece_y + dy
+    return None
+
+
+def run_benchmark(rotations=20000, seed=0):
+    """Rotations per second per system and board, bit-window test vs a valid_move per kick
+
+    Every piece state that fits on the board is tried in every direction,
+    so the kick-heavy boards mostly exercise later candidates and failures.
+    """
+    from main import Tetris
+
+    results = []
+    game = Tetris(seed=seed, headless=True)
+    for board_name, grid in make_kick_boards(seed).items():
+        game.grid = grid
+        states = [(piece_type, rotation, x, y)
+                  for piece_type, shapes in enumerate(PIECES)
+                  for rotation, shape in enumerate(shapes)
+                  for y in range(-2, len(grid))
+                  for x in range(-4, len(grid[0]))
+                  if game.valid_move(shape, x, y)]
+        rng = random.Random(seed)
+        sample = [rng.choice(states) + (rng.choice((CW, CCW, HALF)),) for _ in range(rotations)]
+        for name, system in SYSTEMS.items():
+            kicked = 0
+            start = time.perf_counter()
+            for piece_type, rotation, x, y, direction in sample:
+                result = system.rotate(grid, piece_type, rotation, x, y, direction)
+                if result is not None and (result[1], result[2]) != (x, y):
+                    kicked += 1
+            bitwise = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for piece_type, rotation, x, y, direction in sample:
+                game.current_piece_type, game.current_rotation = piece_type, rotation
+                game.piece_x, game.piece_y = x, y
+                reference_rotate(game, system, direction)
+            reference = time.perf_counter() - start
+            results.append({
+                'board': board_name,
+                'system': name,
+                'kicked_percent': 100.0 * kicked / rotations,
+                'rotations_per_second': rotations / bitwise,
+                'valid_move_per_kick_per_second': rotations / reference,
+                'speedup': reference / bitwise,
+            })
+    return results
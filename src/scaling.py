@@ -0,0 +1,175 @@
+"""
+Resolution-independent display
+The UI keeps drawing at its logical resolution (config.WINDOW_WIDTH x
+WINDOW_HEIGHT) into an off-screen backbuffer, which is scaled to whatever
+size the window has, letterboxed to keep the aspect ratio. The static layer
+is scaled once per window size and cached; after that only the UI's dynamic
+areas are rescaled, and only on frames where the game state changed.
+"""
+
+import time
+import logging
+from collections import OrderedDict
+import pygame
+from config import WINDOW_WIDTH, WINDOW_HEIGHT, FPS, Colors
+
+logger = logging.getLogger(__name__)
+
+
+def frame_signature(game_state):
+    """Cheap key that changes whenever the drawn frame would change
+
+    The grid is only mutated in place when a piece locks (total_pieces
+    changes); clears, garbage and resets replace the grid list.
+    """
+    return (id(game_state['grid']), game_state['total_pieces'], id(game_state['current_piece']),
+            game_state['current_piece_type'], game_state['piece_x'], game_state['piece_y'],
+            game_state['score'], game_state['level'], game_state['lines_cleared'],
+            game_state['fall_speed'])
+
+
+class ScaledDisplay:
+    """Logical-resolution backbuffer presented at any window size"""
+
+    def __init__(self, ui, logical_size=(WINDOW_WIDTH, WINDOW_HEIGHT), smooth=False, cache_size=4):
+        """ui supplies draw_static() and dynamic_rects() (a GameUI)"""
+        self.surface = pygame.Surface(logical_size)
+        self.smooth = smooth
+        self.cache_size = cache_size
+        self.static = pygame.Surface(logical_size)
+        ui.draw_static(self.static)
+        self.dynamic = ui.dynamic_rects()
+        # window size -> (letterboxed target rect, scaled static layer)
+        self._layers = OrderedDict()
+        self._presented_size = None
+
+    def fit(self, window_size):
+        """Largest rect with the logical aspect ratio, centred in the window"""
+        logical_width, logical_height = self.surface.get_size()
+        window_width, window_height = window_size
+        scale = min(window_width / logical_width, window_height / logical_height)
+        width = max(1, int(logical_width * scale))
+        height = max(1, int(logical_height * scale))
+        return pygame.Rect((window_width - width) // 2, (window_height - height) // 2, width, height)
+
+    def _scale(self, source, size, dest=None):
+        scale = pygame.transform.smoothscale if self.smooth else pygame.transform.scale
+        if dest is None:
+            return scale(source, size)
+        return scale(source, size, dest)
+
+    def _layer(self, window_size):
+        layer = self._layers.get(window_size)
+        if layer is None:
+            target = self.fit(window_size)
+            layer = (target, self._scale(self.static, target.size))
+            self._layers[window_size] = layer
+            if len(self._layers) > self.cache_size:
+                self._layers.popitem(last=False)
+        else:
+            self._layers.move_to_end(window_size)
+        return layer
+
+    def to_window(self, rect, target):
+        """Map a logical rect to window pixels inside the letterboxed target"""
+        logical_width, logical_height = self.surface.get_size()
+        scale_x, scale_y = target.width / logical_width, target.height / logical_height
+        left = target.x + int(rect.left * scale_x)
+        top = target.y + int(rect.top * scale_y)
+        right = target.x + int(rect.right * scale_x)
+        bottom = target.y + int(rect.bottom * scale_y)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def to_logical(self, position, window_size):
+        """Map a window position (e.g. the mouse) to logical coordinates"""
+        target = self.fit(window_size)
+        logical_width, logical_height = self.surface.get_size()
+        return ((position[0] - target.x) * logical_width // target.width,
+                (position[1] - target.y) * logical_height // target.height)
+
+    def present(self, window, dirty=None):
+        """Scale the backbuffer onto window; returns the window rects to update
+
+        dirty lists the logical rects that changed (default: the UI's
+        dynamic areas); pass [] when nothing changed. A new window size
+        starts again from the cached scaled static layer.
+        """
+        size = window.get_size()
+        target, static = self._layer(size)
+        updated = []
+        if size != self._presented_size:
+            window.fill(Colors.BLACK)
+            window.blit(static, target)
+            updated.append(window.get_rect())
+            self._presented_size = size
+            dirty = self.dynamic
+        elif dirty is None:
+            dirty = self.dynamic
+
+        for rect in dirty:
+            area = self.to_window(rect, target)
+            if area.width > 0 and area.height > 0:
+                self._scale(self.surface.subsurface(rect), area.size, window.subsurface(area))
+                updated.append(area)
+        return updated
+
+    def invalidate(self):
+        """Repaint the whole window on the next present (e.g. after an expose)"""
+        self._presented_size = None
+
+
+def run_benchmark(scales=(1, 2, 4), frames=600, seed=0):
+    """Per-frame draw and present cost at 1x, 2x and 4x window sizes
+
+    'full' rescales the whole backbuffer every frame; 'cached' uses the
+    cached static layer, rescales only the dynamic areas and skips frames
+    whose state did not change.
+    """
+    from main import Tetris
+    from bot import TetrisBot
+    from ui_components import GameUI
+
+    results = []
+    for scale in scales:
+        window = pygame.Surface((WINDOW_WIDTH * scale, WINDOW_HEIGHT * scale))
+        for mode in ('full', 'cached'):
+            game = Tetris(seed=seed, headless=True)
+            bot = TetrisBot(beam_width=1, lookahead=0)
+            ui = GameUI()
+            start = time.perf_counter()
+            display = ScaledDisplay(ui)
+            display.present(window)
+            setup = time.perf_counter() - start
+
+            elapsed = 0.0
+            presented = 0
+            signature = None
+            for frame in range(frames):
+                if frame % 20 == 19:
+                    bot.play_piece(game)
+                game.update(1000.0 / FPS)
+                state = game.get_draw_state()
+                start = time.perf_counter()
+                if mode == 'full':
+                    ui.draw(display.surface, state)
+                    target = display.fit(window.get_size())
+                    display._scale(display.surface, target.size, window.subsurface(target))
+                    presented += 1
+                else:
+                    current = frame_signature(state)
+                    if current != signature:
+                        signature = current
+                        ui.draw(display.surface, state)
+                        display.present(window)
+                        presented += 1
+                elapsed += time.perf_counter() - start
+            results.append({
+                'scale': scale,
+                'window': f"{window.get_width()}x{window.get_height()}",
+                'mode': mode,
+                'setup_ms': setup * 1000.0,
+                'frame_ms': elapsed * 1000.0 / frames,
+                'frames_scaled': presented,
+                'ms_per_scaled_frame': elapsed * 1000.0 / presented if presented else 0.0,
+            })
+    return results
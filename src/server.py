@@ -0,0 +1,517 @@
+"""
+Asyncio multiplayer game server
+Hosts many concurrent headless Tetris sessions over plain TCP sockets,
+applies client inputs on one shared tick scheduler, broadcasts state and
+sends garbage lines between versus opponents
+
+Protocol: one JSON object per line in both directions.
+  client -> server: {"type": "join", "mode": "marathon" | "versus", "seed": 1}
+                    {"type": "input", "action": "left" | "right" | "down" | "rotate" | "hard_drop"}
+                    {"type": "stats"}
+  server -> client: joined, state, garbage, game_over, result, stats, error
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import itertools
+from config import FPS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7777
+TICK_MS = 1000 / FPS
+
+# Garbage rows sent to the opponent per lines cleared in one lock
+GARBAGE_FOR_LINES = {1: 0, 2: 1, 3: 2, 4: 4}
+
+# Skip state broadcasts to clients that are this far behind on reading
+MAX_WRITE_BUFFER = 64 * 1024
+
+MAX_LINE_BYTES = 4096
+
+# Inputs a client may queue for one tick; the rest are dropped so no
+# client can outpace the tick or stall the other sessions
+MAX_INPUTS_PER_TICK = 8
+
+
+def encode_message(message):
+    """Serialize one protocol message"""
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode()
+
+
+class PlayerSession:
+    """One player's game on the server"""
+
+    def __init__(self, session_id, writer, mode, seed):
+        from main import Tetris
+
+        self.id = session_id
+        self.writer = writer
+        self.mode = mode
+        self.game = Tetris(seed=seed, headless=True)
+        self.opponent = None
+        self.inputs = []
+        self.pending_garbage = 0
+        self.last_signature = None
+
+    def queue_input(self, action):
+        """Queue an input for the next tick; False if this tick's queue is full"""
+        if len(self.inputs) >= MAX_INPUTS_PER_TICK:
+            return False
+        self.inputs.append(action)
+        return True
+
+    def signature(self):
+        """Cheap summary that changes whenever visible state changes"""
+        game = self.game
+        return (game.piece_x, game.piece_y, game.current_rotation, game.total_pieces,
+                game.score, game.games_played, self.pending_garbage)
+
+    def state_message(self):
+        game = self.game
+        return {
+            'type': 'state',
+            'player': self.id,
+            'grid': ''.join(str(cell) for row in game.grid for cell in row),
+            'piece': [game.current_piece_type, game.current_rotation, game.piece_x, game.piece_y],
+            'next': game.get_next_pieces(),
+            'score': game.score,
+            'level': game.level,
+            'lines': game.lines_cleared,
+            'garbage': self.pending_garbage,
+        }
+
+    def send(self, message):
+        """Queue a message without waiting; closed sockets are ignored"""
+        if not self.writer.is_closing():
+            self.writer.write(encode_message(message))
+
+
+class TickStats:
+    """Tick lateness (jitter) and processing cost samples"""
+
+    def __init__(self, max_samples=100000):
+        self.max_samples = max_samples
+        self.lateness_ms = []
+        self.cost_ms = []
+        self.ticks = 0
+
+    def record(self, lateness_ms, cost_ms):
+        self.ticks += 1
+        if len(self.cost_ms) >= self.max_samples:
+            # Keep memory bounded on long-running hosts
+            del self.lateness_ms[:self.max_samples // 2]
+            del self.cost_ms[:self.max_samples // 2]
+        self.lateness_ms.append(lateness_ms)
+        self.cost_ms.append(cost_ms)
+
+    @staticmethod
+    def _percentile(values, fraction):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def report(self):
+        count = len(self.cost_ms)
+        return {
+            'ticks': self.ticks,
+            'jitter_p50_ms': self._percentile(self.lateness_ms, 0.50),
+            'jitter_p99_ms': self._percentile(self.lateness_ms, 0.99),
+            'jitter_max_ms': max(self.lateness_ms) if count else 0.0,
+            'tick_cost_mean_ms': sum(self.cost_ms) / count if count else 0.0,
+            'tick_cost_p99_ms': self._percentile(self.cost_ms, 0.99),
+        }
+
+
+class GameServer:
+    """Hosts sessions and advances all of them on one shared tick"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, tick_ms=TICK_MS, metrics=None):
+        """metrics (a metrics.GameMetrics) is fed by every session's game if given"""
+        self.host = host
+        self.port = port
+        self.tick_ms = tick_ms
+        self.sessions = {}
+        self.waiting_versus = None
+        self.stats = TickStats()
+        self._ids = itertools.count(1)
+        self._server = None
+        self._tick_task = None
+        self._clients = {}
+        self.metrics = metrics
+        if metrics is not None:
+            self._sessions_gauge = metrics.registry.gauge('tetris_server_sessions', "Connected sessions")
+            metrics.count_errors(logger)
+
+    async def start(self):
+        """Open the listening socket and start the tick scheduler"""
+        # Import the engine (and pygame) now so the first join does not stall ticks
+        import main  # noqa: F401
+        self._server = await asyncio.start_server(self.handle_client, self.host, self.port,
+                                                  limit=MAX_LINE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._tick_task = asyncio.create_task(self.run_ticks())
+        logger.info(f"Game server listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self._tick_task:
+            self._tick_task.cancel()
+            try:
+                await self._tick_task
+            except asyncio.CancelledError:
+                pass
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        # Closing the sockets lets every client handler finish normally
+        for writer in self._clients.values():
+            writer.close()
+        if self._clients:
+            await asyncio.wait(list(self._clients), timeout=5)
+        self.sessions.clear()
+
+    async def handle_client(self, reader, writer):
+        """Read one client's messages until it disconnects"""
+        session = None
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(encode_message({'type': 'error', 'message': 'line too long'}))
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    kind = message.get('type')
+                except (ValueError, AttributeError):
+                    writer.write(encode_message({'type': 'error', 'message': 'bad json'}))
+                    continue
+
+                if kind == 'input' and session is not None:
+                    if not session.queue_input(message.get('action')):
+                        logger.debug(f"Dropped input from player {session.id}: too many this tick")
+                elif kind == 'join' and session is None:
+                    session = self.join(writer, message.get('mode', 'marathon'), message.get('seed'))
+                elif kind == 'stats':
+                    report = self.stats.report()
+                    report.update({'type': 'stats', 'sessions': len(self.sessions)})
+                    writer.write(encode_message(report))
+                else:
+                    writer.write(encode_message({'type': 'error', 'message': f'unexpected {kind}'}))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if session is not None:
+                self.leave(session)
+            self._clients.pop(task, None)
+            writer.close()
+
+    def join(self, writer, mode, seed):
+        """Create a session; versus players are paired in join order"""
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+        session_id = next(self._ids)
+        if mode == 'versus' and self.waiting_versus is not None:
+            # Opponents share the seed so both get the same pieces
+            opponent = self.waiting_versus
+            self.waiting_versus = None
+            session = PlayerSession(session_id, writer, mode, opponent.game.seed)
+            session.opponent = opponent
+            opponent.opponent = session
+            opponent.game.reset_game(seed=opponent.game.seed)
+        else:
+            session = PlayerSession(session_id, writer, mode, seed)
+            if mode == 'versus':
+                self.waiting_versus = session
+        self.sessions[session_id] = session
+        if self.metrics is not None:
+            self.metrics.attach(session.game)
+            self._sessions_gauge.set(len(self.sessions))
+        session.send({'type': 'joined', 'player': session_id, 'mode': mode,
+                      'seed': session.game.seed,
+                      'opponent': session.opponent.id if session.opponent else None})
+        if session.opponent:
+            session.opponent.send({'type': 'joined', 'player': session.opponent.id, 'mode': mode,
+                                   'seed': session.game.seed, 'opponent': session_id})
+        return session
+
+    def leave(self, session):
+        self.sessions.pop(session.id, None)
+        if self.metrics is not None:
+            self.metrics.detach(session.game)
+            self._sessions_gauge.set(len(self.sessions))
+        if self.waiting_versus is session:
+            self.waiting_versus = None
+        if session.opponent is not None:
+            session.opponent.send({'type': 'result', 'winner': session.opponent.id,
+                                   'reason': 'opponent left'})
+            session.opponent.opponent = None
+            session.opponent = None
+
+    async def run_ticks(self):
+        """Fixed-rate scheduler shared by every session"""
+        loop = asyncio.get_running_loop()
+        interval = self.tick_ms / 1000.0
+        next_tick = loop.time() + interval
+        while True:
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lateness = max(0.0, loop.time() - next_tick)
+            start = time.perf_counter()
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Error in server tick: {e}")
+            self.stats.record(lateness * 1000.0, (time.perf_counter() - start) * 1000.0)
+            next_tick += interval
+            if loop.time() - next_tick > interval * 10:
+                # Far behind (e.g. host suspended): resynchronize instead of bursting
+                next_tick = loop.time() + interval
+
+    def tick(self):
+        """Advance every session by one tick
+
+        Garbage sent during a tick lands on the next one, so the order in
+        which sessions are advanced never decides a versus round.
+        """
+        sessions = list(self.sessions.values())
+        for session in sessions:
+            self.apply_garbage(session)
+        for session in sessions:
+            self.advance(session)
+        for session in self.sessions.values():
+            self.broadcast(session)
+
+    def apply_garbage(self, session):
+        """Push garbage received since the last tick into the session's board"""
+        if not session.pending_garbage:
+            return
+        game = session.game
+        games_before = game.games_played
+        game.add_garbage(session.pending_garbage)
+        session.pending_garbage = 0
+        if game.games_played != games_before:
+            self.finish_game(session)
+
+    def advance(self, session):
+        """Apply queued inputs, then gravity, for one session
+
+        Inputs stop at game over: the rest were meant for the finished game.
+        """
+        game = session.game
+        inputs, session.inputs = session.inputs, []
+        for action in inputs:
+            if self.step(session, lambda: game.apply_input(action)):
+                return
+        self.step(session, lambda: game.update(self.tick_ms))
+
+    def step(self, session, operation):
+        """Run one engine operation and react to line clears and game over
+
+        Returns True if the operation ended the game.
+        """
+        game = session.game
+        lines_before = game.lines_cleared
+        games_before = game.games_played
+        try:
+            operation()
+        except Exception as e:
+            logger.debug(f"Rejected input from player {session.id}: {e}")
+            return False
+        if game.games_played != games_before:
+            self.finish_game(session)
+            return True
+        cleared = game.lines_cleared - lines_before
+        garbage = GARBAGE_FOR_LINES.get(cleared, 0)
+        if garbage and session.opponent is not None:
+            session.opponent.pending_garbage += garbage
+            session.opponent.send({'type': 'garbage', 'lines': garbage, 'from': session.id})
+
+    def finish_game(self, session):
+        """Report a topped-out game; in versus the opponent wins the round"""
+        session.inputs = []
+        session.send({'type': 'game_over', 'player': session.id, 'final': session.game.last_game})
+        opponent = session.opponent
+        if opponent is not None:
+            result = {'type': 'result', 'winner': opponent.id, 'loser': session.id}
+            session.send(result)
+            opponent.send(result)
+            opponent.inputs = []
+            # Start the next round from a fresh shared seed
+            seed = random.randrange(2 ** 31)
+            session.game.reset_game(seed=seed)
+            opponent.game.reset_game(seed=seed)
+            session.pending_garbage = opponent.pending_garbage = 0
+
+    def broadcast(self, session):
+        """Send state to the player and their opponent if it changed"""
+        signature = session.signature()
+        if signature == session.last_signature:
+            return
+        session.last_signature = signature
+        data = None
+        for target in (session, session.opponent):
+            if target is None or target.writer.is_closing():
+                continue
+            transport = target.writer.transport
+            if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                continue  # Slow reader: it gets the next state instead
+            if data is None:
+                data = encode_message(session.state_message())
+            target.writer.write(data)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None, metrics_port=None):
+    """Run a server until cancelled; ready (a multiprocessing Event) is set once listening
+
+    With metrics_port, Prometheus metrics are served at 127.0.0.1:metrics_port.
+    """
+    metrics = metrics_server = None
+    if metrics_port is not None:
+        from metrics import GameMetrics, MetricsServer
+        metrics = GameMetrics()
+        metrics_server = MetricsServer(metrics.registry, port=metrics_port)
+        metrics_server.start()
+    server = GameServer(host, port, metrics=metrics)
+    await server.start()
+    if ready is not None:
+        ready.set()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+            metrics.close()
+
+
+def _headless():
+    """Sessions never draw, so never ask SDL for a real display"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    # SDL otherwise turns SIGTERM into a quit event nobody reads here
+    os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+
+
+def _run_server_process(host, port, ready):
+    _headless()
+    logging.disable(logging.INFO)
+    try:
+        asyncio.run(serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _load_client(host, port, mode, seed, stop_at, input_interval, rng):
+    """Loopback client: joins, sends random inputs and drains state"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode_message({'type': 'join', 'mode': mode, 'seed': seed}))
+    actions = ('left', 'right', 'rotate', 'down', 'hard_drop')
+
+    async def drain():
+        while await reader.read(65536):
+            pass
+
+    drainer = asyncio.create_task(drain())
+    try:
+        loop = asyncio.get_running_loop()
+        # Spread clients over the interval so inputs do not arrive in bursts
+        await asyncio.sleep(rng.random() * input_interval)
+        while loop.time() < stop_at:
+            writer.write(encode_message({'type': 'input', 'action': rng.choice(actions)}))
+            await writer.drain()
+            await asyncio.sleep(input_interval)
+    finally:
+        drainer.cancel()
+        writer.close()
+
+
+async def _load_test(host, port, games, duration, input_interval, versus):
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + duration
+    mode = 'versus' if versus else 'marathon'
+    tasks = [asyncio.create_task(_load_client(host, port, mode, i, stop_at, input_interval,
+                                              random.Random(i)))
+             for i in range(games)]
+    # Ask for stats just before the clients stop
+    await asyncio.sleep(max(0.0, stop_at - loop.time() - 0.5))
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode_message({'type': 'stats'}))
+    stats = json.loads(await reader.readline())
+    writer.close()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return stats
+
+
+def run_load_test(games=1000, duration=10.0, input_interval=0.25, versus=False,
+                  host=DEFAULT_HOST, port=0):
+    """Start a server process, connect loopback clients and report tick stats
+
+    sessions_per_core extrapolates how many sessions one core could tick at
+    the configured rate from the measured mean tick cost. Clients run on the
+    same machine, so jitter includes their CPU use too.
+    """
+    import socket
+    import multiprocessing
+
+    if port == 0:
+        with socket.socket() as probe:
+            probe.bind((host, 0))
+            port = probe.getsockname()[1]
+
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=_run_server_process, args=(host, port, ready), daemon=True)
+    process.start()
+    try:
+        if not ready.wait(timeout=30):
+            raise RuntimeError("Game server did not start")
+        stats = asyncio.run(_load_test(host, port, games, duration, input_interval, versus))
+    finally:
+        process.terminate()
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    mean_cost = stats.get('tick_cost_mean_ms', 0.0)
+    stats.pop('type', None)
+    stats.update({
+        'games': games,
+        'mode': 'versus' if versus else 'marathon',
+        'tick_ms': TICK_MS,
+        'sessions_per_core': stats['sessions'] * TICK_MS / mean_cost if mean_cost > 0 else 0.0,
+    })
+    return stats
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run the Tetris game server")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--metrics-port', type=int, help="serve Prometheus metrics on this local port")
+    args = parser.parse_args(argv)
+    _headless()
+    try:
+        asyncio.run(serve(args.host, args.port, metrics_port=args.metrics_port))
+    except KeyboardInterrupt:
+        logger.info("Game server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Simulation thread with double-buffered state snapshots
+Runs the game at a fixed tick on its own thread so that a slow display flip
+no longer delays gravity or input handling. The simulation publishes
+immutable draw states into a double buffer which the render (main) thread
+reads; input reaches the simulation through a deque, whose append and
+popleft are atomic, so neither side takes a lock, and wakes the simulation
+so it is applied at once rather than on the next tick.
+"""
+
+import time
+import random
+import logging
+import threading
+from collections import deque
+from types import MappingProxyType
+from config import FPS, WINDOW_WIDTH, WINDOW_HEIGHT
+from scaling import frame_signature
+
+logger = logging.getLogger(__name__)
+
+
+def summarize(samples):
+    """Mean, p99 and max of a sample of milliseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {'mean': 0.0, 'p99': 0.0, 'max': 0.0}
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        'max': ordered[-1],
+    }
+
+
+def frozen_draw_state(game, version):
+    """Read-only copy of game.get_draw_state() that is safe to hand to another thread"""
+    state = game.get_draw_state()
+    state['grid'] = tuple(tuple(row) for row in state['grid'])
+    state['version'] = version
+    return MappingProxyType(state)
+
+
+class StateBuffer:
+    """Double buffer of immutable states: one writer, any number of readers"""
+
+    def __init__(self, state=None):
+        self._slots = [state, None]
+        self._front = 0
+
+    def publish(self, state):
+        back = 1 - self._front
+        self._slots[back] = state
+        # A single reference store: readers see the old state or the new one
+        self._front = back
+
+    def latest(self):
+        return self._slots[self._front]
+
+
+class SimulationThread(threading.Thread):
+    """Fixed-tick game simulation publishing snapshots to a StateBuffer"""
+
+    def __init__(self, game, tick_ms=1000.0 / FPS, max_catch_up=5):
+        super().__init__(name='tetris-simulation', daemon=True)
+        self.game = game
+        self.tick_ms = tick_ms
+        self.max_catch_up = max_catch_up
+        self.inputs = deque()
+        self.version = 0
+        self.buffer = StateBuffer(frozen_draw_state(game, self.version))
+        self.ticks = 0
+        self.tick_jitter_ms = deque(maxlen=10000)
+        self.input_latency_ms = deque(maxlen=10000)
+        self._signature = frame_signature(game.get_draw_state())
+        self._running = True
+        self._wake = threading.Event()
+
+    def push_input(self, action, queued_at=None):
+        """Queue an input (callable from any thread); it is applied without waiting for a tick"""
+        self.inputs.append((action, queued_at if queued_at is not None else time.perf_counter()))
+        self._wake.set()
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        self._wake.set()
+        self.join(timeout)
+
+    def _apply_inputs(self):
+        """Apply every queued input; returns their queue times"""
+        applied = []
+        while True:
+            try:
+                action, queued_at = self.inputs.popleft()
+            except IndexError:
+                return applied
+            try:
+                self.game.apply_input(action)
+            except Exception as e:
+                logger.error(f"Error applying input {action!r}: {e}")
+            applied.append(queued_at)
+
+    def _publish(self, applied):
+        # Only publish when the drawn frame changed, so the renderer can skip
+        signature = frame_signature(self.game.get_draw_state())
+        if signature != self._signature:
+            self._signature = signature
+            self.version += 1
+            self.buffer.publish(frozen_draw_state(self.game, self.version))
+        published = time.perf_counter()
+        self.input_latency_ms.extend((published - queued_at) * 1000.0 for queued_at in applied)
+        return published
+
+    def run(self):
+        period = self.tick_ms / 1000.0
+        next_tick = time.perf_counter()
+        last_start = None
+        while self._running:
+            now = time.perf_counter()
+            if now < next_tick:
+                if self.inputs:
+                    self._publish(self._apply_inputs())
+                else:
+                    self._wake.wait(next_tick - now)
+                    self._wake.clear()
+                continue
+            if last_start is not None:
+                self.tick_jitter_ms.append(abs(now - last_start - period) * 1000.0)
+            last_start = now
+
+            applied = self._apply_inputs()
+            self.game.update(self.tick_ms)
+            self.ticks += 1
+            published = self._publish(applied)
+
+            next_tick += period
+            if published - next_tick > period * self.max_catch_up:
+                # Too far behind to catch up: drop the missed ticks
+                next_tick = published
+
+    def report(self):
+        return {
+            'ticks': self.ticks,
+            'tick_jitter_ms': summarize(self.tick_jitter_ms),
+            'input_latency_ms': summarize(self.input_latency_ms),
+        }
+
+
+def _inject_inputs(events, stop, seed, interval_ms=40):
+    """Stand-in for the OS: timestamped key presses at random intervals"""
+    rng = random.Random(seed)
+    while not stop.wait(rng.uniform(0.5, 1.5) * interval_ms / 1000.0):
+        events.append((rng.choice(('left', 'right', 'rotate')), time.perf_counter()))
+
+
+def run_benchmark(seconds=3.0, flip_ms=(0, 30), seed=0):
+    """Input-to-state latency and tick jitter, serial loop vs simulation thread
+
+    The render side draws GameUI onto a Surface, then sleeps flip_ms to
+    stand in for a slow flip on a software display.
+    """
+    import pygame
+    from main import Tetris
+    from ui_components import GameUI
+
+    results = []
+    for flip in flip_ms:
+        for mode in ('serial', 'split'):
+            game = Tetris(seed=seed, headless=True)
+            ui = GameUI()
+            surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+            clock = pygame.time.Clock()
+            events = deque()
+            stop = threading.Event()
+            injector = threading.Thread(target=_inject_inputs, args=(events, stop, seed), daemon=True)
+            latency, jitter = [], []
+            sim = SimulationThread(game) if mode == 'split' else None
+            if sim is not None:
+                sim.start()
+            injector.start()
+            frames = 0
+            last_update = None
+            end = time.perf_counter() + seconds
+            try:
+                while time.perf_counter() < end:
+                    dt = clock.tick(FPS)
+                    pending = []
+                    while events:
+                        pending.append(events.popleft())
+                    if sim is not None:
+                        for action, queued_at in pending:
+                            sim.push_input(action, queued_at)
+                        state = sim.buffer.latest()
+                    else:
+                        for action, _ in pending:
+                            game.apply_input(action)
+                        game.update(dt)
+                        now = time.perf_counter()
+                        latency.extend((now - queued_at) * 1000.0 for _, queued_at in pending)
+                        if last_update is not None:
+                            jitter.append(abs(now - last_update - 1.0 / FPS) * 1000.0)
+                        last_update = now
+                        state = game.get_draw_state()
+                    ui.draw(surface, state)
+                    if flip:
+                        time.sleep(flip / 1000.0)
+                    frames += 1
+            finally:
+                stop.set()
+                injector.join()
+                if sim is not None:
+                    sim.stop()
+            if sim is not None:
+                report = sim.report()
+            else:
+                report = {'ticks': frames, 'tick_jitter_ms': summarize(jitter),
+                          'input_latency_ms': summarize(latency)}
+            results.append({
+                'mode': mode,
+                'flip_ms': flip,
+                'frames_drawn': frames,
+                'ticks': report['ticks'],
+                'input_latency_mean_ms': report['input_latency_ms']['mean'],
+                'input_latency_p99_ms': report['input_latency_ms']['p99'],
+                'tick_jitter_mean_ms': report['tick_jitter_ms']['mean'],
+                'tick_jitter_p99_ms': report['tick_jitter_ms']['p99'],
+            })
+    return results
@@ -0,0 +1,420 @@
+"""
+Soak test harness
+Drives the real main() loop headlessly at an accelerated clock through
+many reset_game cycles, with random key input or a bot pressing keys.
+Every sample_every frames it records RSS, traced Python memory, the number
+of live pygame surfaces and frame-time percentiles; at the end it compares
+the later half of the run with the earlier half, projects any growth over
+a 72 hour horizon and fails if memory, surfaces or frame times drift, or
+if any error was logged (the engine's error handlers otherwise swallow
+them and carry on).
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+from config import FPS
+
+logger = logging.getLogger(__name__)
+
+INPUT_MODES = ('random', 'bot')
+
+# Failure thresholds: growth projected over the horizon, and floors below
+# which a difference between the run's halves counts as noise
+HORIZON_HOURS = 72
+MAX_RSS_GROWTH_MB = 64
+RSS_NOISE_MB = 4
+MAX_TRACED_GROWTH_MB = 16
+TRACED_NOISE_MB = 0.5
+# Median frame time may rise by this factor (and absolute amount); the
+# tail is noisier, so p99 gets more room. Frame-time trends need at least
+# FRAME_TREND_SAMPLES samples in each half of the run
+FRAME_SLOWDOWN = {'frame_p50_ms': (1.5, 1.0), 'frame_p99_ms': (2.0, 5.0)}
+FRAME_TREND_SAMPLES = 4
+SURFACE_SLACK = 16
+
+
+def rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def count_surfaces():
+    """Live pygame surfaces referenced from Python objects
+
+    Surfaces are not tracked by the garbage collector themselves, so they
+    are found through the containers and instances that hold them.
+    """
+    import pygame
+    seen = set()
+    for obj in gc.get_objects():
+        for referent in gc.get_referents(obj):
+            if isinstance(referent, pygame.Surface):
+                seen.add(id(referent))
+    return len(seen)
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _median(values):
+    return percentile(sorted(values), 0.5)
+
+
+def projected_growth(samples, field, horizon_frames):
+    """(growth between the halves' medians, that growth's rate projected over horizon_frames)"""
+    half = len(samples) // 2
+    if half < 1:
+        return 0.0, 0.0
+    first, second = samples[:half], samples[-half:]
+    growth = _median([s[field] for s in second]) - _median([s[field] for s in first])
+    frames = _median([s['frame'] for s in second]) - _median([s['frame'] for s in first])
+    return growth, (growth / frames * horizon_frames if frames > 0 else 0.0)
+
+
+def find_failures(samples, errors, horizon_hours=HORIZON_HOURS):
+    """Reasons the soak failed: logged errors and growth trends after warm-up"""
+    failures = []
+    if errors:
+        failures.append(f"{sum(errors.values())} errors logged: "
+                        + ', '.join(f"{where} x{count}" for where, count in errors.most_common()))
+    if len(samples) < 2:
+        return failures
+    horizon_frames = horizon_hours * 3600 * FPS
+    mb = 1024 * 1024
+    for field, limit_mb, noise_mb in (('rss_bytes', MAX_RSS_GROWTH_MB, RSS_NOISE_MB),
+                                      ('traced_bytes', MAX_TRACED_GROWTH_MB, TRACED_NOISE_MB)):
+        growth, projected = projected_growth(samples, field, horizon_frames)
+        if growth > noise_mb * mb and projected > limit_mb * mb:
+            failures.append(f"{field} grew {growth / mb:.1f} MB, projecting "
+                            f"{projected / mb:.0f} MB over {horizon_hours} h (limit {limit_mb} MB)")
+    half = len(samples) // 2
+    surfaces_before = max(s['surfaces'] for s in samples[:half])
+    surfaces_after = samples[-1]['surfaces']
+    if surfaces_after > surfaces_before + SURFACE_SLACK:
+        failures.append(f"live surfaces grew from {surfaces_before} to {surfaces_after}")
+    if half < FRAME_TREND_SAMPLES:
+        return failures
+    for field, (ratio, noise_ms) in FRAME_SLOWDOWN.items():
+        before = _median([s[field] for s in samples[:half]])
+        after = _median([s[field] for s in samples[-half:]])
+        if after - before > noise_ms and after > before * ratio:
+            failures.append(f"{field} rose from {before:.2f} to {after:.2f} ms")
+    return failures
+
+
+class SoakClock:
+    """Accelerated stand-in for pygame's Clock: every frame is one full frame time, with no waiting"""
+
+    def __init__(self):
+        self.frames = 0
+
+    def tick(self, framerate=FPS):
+        self.frames += 1
+        return int(1000 / framerate)
+
+
+class ErrorLog(logging.Handler):
+    """Counts ERROR records by the function that logged them, keeping the first few messages"""
+
+    def __init__(self, keep=20):
+        super().__init__(level=logging.ERROR)
+        self.counts = Counter()
+        self.messages = []
+        self.keep = keep
+
+    def emit(self, record):
+        self.counts[record.funcName] += 1
+        if len(self.messages) < self.keep:
+            self.messages.append(f"{record.funcName}: {record.getMessage()}")
+
+
+class RandomKeys:
+    """Taps random keys, sometimes holding them long enough to auto-repeat"""
+
+    def __init__(self, seed=0, rate=0.5):
+        self.rng = random.Random(seed)
+        self.rate = rate
+        self._releases = []
+
+    def frame(self, game, frame):
+        import pygame
+        from main import KEY_ACTIONS
+        keys = list(KEY_ACTIONS)
+        for key in [key for release_at, key in self._releases if release_at <= frame]:
+            pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key))
+        self._releases = [(release_at, key) for release_at, key in self._releases if release_at > frame]
+        if self.rng.random() < self.rate:
+            key = self.rng.choice(keys)
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+            self._releases.append((frame + self.rng.choice((1, 1, 1, 20)), key))
+
+
+class BotKeys:
+    """Plays the bot's placements by tapping one key per frame; ends each game after pieces_per_game"""
+
+    def __init__(self, pieces_per_game=60):
+        from bot import TetrisBot
+        self.bot = TetrisBot(beam_width=1, lookahead=0)
+        self.pieces_per_game = pieces_per_game
+        self._piece = None
+        self._target = None
+        self._rotations = 0
+        self._last_x = None
+
+    def _tap(self, key):
+        import pygame
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key))
+
+    def frame(self, game, frame):
+        import pygame
+        if game.total_pieces >= self.pieces_per_game:
+            # Finish the game the way a top-out does, through the real game over and reset
+            game.game_over()
+            self._piece = None
+        if self._piece != (game.games_played, game.total_pieces):
+            self._piece = (game.games_played, game.total_pieces)
+            self._target = self.bot.choose_move(game)
+            self._rotations = self._target.rotation if self._target else 0
+            self._last_x = None
+        if self._rotations:
+            self._rotations -= 1
+            self._tap(pygame.K_UP)
+        elif self._target and game.piece_x != self._target.x and game.piece_x != self._last_x:
+            self._last_x = game.piece_x
+            self._tap(pygame.K_RIGHT if self._target.x > game.piece_x else pygame.K_LEFT)
+        else:
+            self._tap(pygame.K_SPACE)
+            self._target = None
+
+
+class SoakHarness:
+    """Runs main() until games reset cycles (or max_frames) have passed, sampling as it goes"""
+
+    def __init__(self, games=1000, max_frames=None, input_mode='random', seed=0, sample_every=500,
+                 warmup_samples=2, trace=True, argv=(), horizon_hours=HORIZON_HOURS):
+        if input_mode not in INPUT_MODES:
+            raise ValueError(f"Unknown input mode {input_mode!r}, expected one of {INPUT_MODES}")
+        self.games = games
+        self.max_frames = max_frames
+        self.input_mode = input_mode
+        self.seed = seed
+        self.sample_every = sample_every
+        self.warmup_samples = warmup_samples
+        self.trace = trace
+        self.argv = list(argv)
+        self.horizon_hours = horizon_hours
+        self.clock = SoakClock()
+        self.errors = ErrorLog()
+        self.samples = []
+        self.resets = 0
+        self.frame_ms = []
+        self.baseline = None
+        self.final_snapshot = None
+        self._driver = None
+        self._last_frame = None
+        self._drawn = 0
+        self._done = False
+
+    def _on_event(self, event, data):
+        if event == 'reset':
+            self.resets += 1
+
+    def _sample(self, frame):
+        ordered = sorted(self.frame_ms)
+        self.frame_ms = []
+        sample = {
+            'frame': frame,
+            'games': self.resets,
+            'rss_bytes': rss_bytes(),
+            'traced_bytes': tracemalloc.get_traced_memory()[0] if self.trace else 0,
+            'surfaces': count_surfaces(),
+            'frame_p50_ms': percentile(ordered, 0.50),
+            'frame_p99_ms': percentile(ordered, 0.99),
+            'frame_max_ms': ordered[-1] if ordered else 0.0,
+        }
+        logger.info(f"Soak frame {frame}: {self.resets} games, RSS {sample['rss_bytes'] / 2 ** 20:.1f} MB, "
+                    f"{sample['surfaces']} surfaces, p99 {sample['frame_p99_ms']:.2f} ms")
+        return sample
+
+    def on_frame(self, game):
+        import pygame
+        now = time.perf_counter()
+        frame = self.clock.frames
+        if self._driver is None:
+            game.add_listener(self._on_event)
+            if self.input_mode == 'bot':
+                self._driver = BotKeys()
+            else:
+                self._driver = RandomKeys(self.seed)
+        elif self._last_frame is not None and game.ui is not None and game.ui.frames_drawn != self._drawn:
+            # Only frames that drew: unchanged frames skip drawing and would hide slowdowns
+            self.frame_ms.append((now - self._last_frame) * 1000.0)
+        self._drawn = game.ui.frames_drawn if game.ui is not None else 0
+        if self._done:
+            self._last_frame = time.perf_counter()
+            return
+
+        if frame % self.sample_every == 0 and frame:
+            sample = self._sample(frame)
+            if self.warmup_samples > 0:
+                # Caches and pools fill up first: leave those samples out of the trends
+                self.warmup_samples -= 1
+            else:
+                if self.baseline is None and self.trace:
+                    self.baseline = tracemalloc.take_snapshot()
+                self.samples.append(sample)
+        finished = self.resets >= self.games or (self.max_frames and frame >= self.max_frames)
+        if finished:
+            if self.trace:
+                self.final_snapshot = tracemalloc.take_snapshot()
+            self._done = True
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        else:
+            self._driver.frame(game, frame)
+        self._last_frame = time.perf_counter()
+
+    def top_allocators(self, limit=10):
+        """Source lines whose traced memory grew most since warm-up"""
+        if self.baseline is None or self.final_snapshot is None:
+            return []
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = self.final_snapshot.filter_traces(filters).compare_to(
+            self.baseline.filter_traces(filters), 'lineno')
+        return [f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} "
+                f"{stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blocks)"
+                for stat in stats[:limit] if stat.size_diff > 0]
+
+    def run(self):
+        """Run the soak in a scratch directory (the game's score database goes there); returns the report"""
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        import main
+
+        # Errors the main loop and the modules it runs catch and log are soak failures
+        error_loggers = main.error_loggers()
+        levels = [error_logger.level for error_logger in error_loggers]
+        for error_logger in error_loggers:
+            error_logger.addHandler(self.errors)
+            error_logger.setLevel(logging.WARNING)
+        if self.trace:
+            tracemalloc.start()
+        cwd = os.getcwd()
+        start = time.perf_counter()
+        try:
+            with tempfile.TemporaryDirectory() as workdir:
+                os.chdir(workdir)
+                try:
+                    main.main(self.argv, frame_clock=self.clock, on_frame=self.on_frame)
+                except SystemExit:
+                    pass
+                finally:
+                    os.chdir(cwd)
+        finally:
+            if self.trace:
+                tracemalloc.stop()
+            for error_logger, level in zip(error_loggers, levels):
+                error_logger.removeHandler(self.errors)
+                error_logger.setLevel(level)
+        elapsed = time.perf_counter() - start
+        failures = find_failures(self.samples, self.errors.counts, self.horizon_hours)
+        return {
+            'frames': self.clock.frames,
+            'games': self.resets,
+            'seconds': elapsed,
+            'frames_per_second': self.clock.frames / elapsed if elapsed > 0 else 0.0,
+            'simulated_hours': self.clock.frames / FPS / 3600,
+            'samples': self.samples,
+            'top_allocators': self.top_allocators(),
+            'errors': dict(self.errors.counts),
+            'error_messages': self.errors.messages,
+            'failures': failures,
+            'passed': not failures,
+        }
+
+
+def format_report(report):
+    lines = [f"Soak: {report['frames']} frames ({report['simulated_hours']:.2f} h simulated), "
+             f"{report['games']} games in {report['seconds']:.0f} s "
+             f"({report['frames_per_second']:.0f} frames/s)",
+             f"{'frame':>8} {'games':>6} {'RSS MB':>8} {'traced MB':>10} {'surfaces':>9} "
+             f"{'p50 ms':>7} {'p99 ms':>7}"]
+    for s in report['samples']:
+        lines.append(f"{s['frame']:>8} {s['games']:>6} {s['rss_bytes'] / 2 ** 20:>8.1f} "
+                     f"{s['traced_bytes'] / 2 ** 20:>10.2f} {s['surfaces']:>9} "
+                     f"{s['frame_p50_ms']:>7.2f} {s['frame_p99_ms']:>7.2f}")
+    if report['top_allocators']:
+        lines.append("Top allocation growth since warm-up:")
+        lines.extend(f"   {line}" for line in report['top_allocators'])
+    lines.extend(f"   error {message}" for message in report['error_messages'])
+    lines.append("PASSED" if report['passed'] else "FAILED:\n" + '\n'.join(f"   {f}" for f in report['failures']))
+    return '\n'.join(lines)
+
+
+def run_benchmark(games=150, sample_every=300):
+    """Short random-input soak in a fresh process: loop speed and memory drift"""
+    import subprocess
+
+    command = [sys.executable, os.path.abspath(__file__), '--games', str(games),
+               '--sample-every', str(sample_every), '--json']
+    output = subprocess.run(command, capture_output=True, text=True, timeout=3600).stdout
+    report = json.loads(output[output.index('{'):])
+    samples = report['samples']
+    return {
+        'games': report['games'],
+        'frames': report['frames'],
+        'frames_per_second': report['frames_per_second'],
+        'simulated_hours': report['simulated_hours'],
+        'rss_growth_mb': (samples[-1]['rss_bytes'] - samples[0]['rss_bytes']) / 2 ** 20 if samples else 0.0,
+        'traced_growth_mb': (samples[-1]['traced_bytes'] - samples[0]['traced_bytes']) / 2 ** 20 if samples else 0.0,
+        'errors': sum(report['errors'].values()),
+        'passed': report['passed'],
+    }
+
+
+def main(argv=None):
+    """Command line entry point; exits 1 if the soak found a problem"""
+    parser = argparse.ArgumentParser(description="Soak test the game loop for leaks and slowdowns")
+    parser.add_argument('--games', type=int, default=1000, help="reset_game cycles to run")
+    parser.add_argument('--max-frames', type=int, default=None)
+    parser.add_argument('--input', choices=INPUT_MODES, default='random')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sample-every', type=int, default=500, metavar='FRAMES')
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="skip Python allocation tracing (faster, no allocator report)")
+    parser.add_argument('--threaded', action='store_true', help="soak the threaded main loop")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    harness = SoakHarness(games=args.games, max_frames=args.max_frames, input_mode=args.input,
+                          seed=args.seed, sample_every=args.sample_every, trace=not args.no_tracemalloc,
+                          argv=['--threaded'] if args.threaded else [])
+    report = harness.run()
+    print(json.dumps(report) if args.json else format_report(report))
+    return 0 if report['passed'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Persistent high-score and game-history store
+Finished games go to a local SQLite database in WAL mode. Inserts are queued
+and written in batches by a background thread, so the game loop never waits
+on disk; leaderboard queries (overall, per day, per level) use indexes.
+"""
+
+import os
+import time
+import queue
+import random
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = 'tetris_scores.db'
+
+COLUMNS = ('played_at', 'day', 'score', 'level', 'lines', 'pieces', 'duration_ms', 'seed', 'replay_ref')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    pieces INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    seed INTEGER,
+    replay_ref TEXT
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score DESC);
+CREATE INDEX IF NOT EXISTS games_by_day ON games (day, score DESC);
+CREATE INDEX IF NOT EXISTS games_by_level ON games (level, score DESC);
+"""
+
+_INSERT = f"INSERT INTO games ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+# Queue item that stops the writer thread
+_STOP = object()
+
+
+def day_of(timestamp):
+    """UTC calendar day (YYYY-MM-DD) used for daily leaderboards"""
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+
+def _connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    # WAL makes NORMAL safe against corruption; a crash may lose the last batch
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class GameStore:
+    """SQLite game history with a background batched writer"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=1000, flush_interval=0.5):
+        """Open (or create) the database and start the writer thread
+
+        Queued games are written once batch_size are waiting or
+        flush_interval seconds have passed, whichever comes first.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.write_errors = 0
+
+        self._reader = _connect(path)
+        self._reader.row_factory = sqlite3.Row
+        self._reader.executescript(_SCHEMA)
+        self._reader.commit()
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='game-store-writer', daemon=True)
+        self._writer.start()
+
+    def record_game(self, stats, replay_ref=None, played_at=None):
+        """Queue a finished game (Tetris.last_game-style stats); never blocks on disk"""
+        if self._closed:
+            raise RuntimeError("GameStore is closed")
+        played_at = time.time() if played_at is None else played_at
+        self._queue.put((played_at, day_of(played_at), stats['score'], stats['level'],
+                         stats['lines'], stats['pieces'], int(stats.get('duration_ms', 0)),
+                         stats.get('seed'), replay_ref))
+
+    def attach(self, game, replay_ref=None):
+        """Record every game the engine finishes; replay_ref(game) may name its replay
+
+        Returns the listener so it can be removed again.
+        """
+        def on_event(event, data):
+            if event == 'game_over':
+                self.record_game(data, replay_ref(game) if replay_ref else None)
+
+        game.add_listener(on_event)
+        return on_event
+
+    def _write_loop(self):
+        connection = _connect(self.path)
+        try:
+            running = True
+            while running:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                rows = []
+                waiters = []
+                # Gather games until a batch is full or flush_interval has
+                # passed since the first one; flush() and close() write at once
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is _STOP:
+                        running = False
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        rows.append(item)
+                    if len(rows) >= self.batch_size or waiters or not running:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = self._queue.get(timeout=remaining)
+                        except queue.Empty:
+                            break
+                if rows:
+                    self._write(connection, rows)
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            connection.close()
+
+    def _write(self, connection, rows):
+        try:
+            with connection:
+                connection.executemany(_INSERT, rows)
+            self.written += len(rows)
+        except sqlite3.Error as e:
+            self.write_errors += len(rows)
+            logger.error(f"Failed to store {len(rows)} games: {e}")
+
+    def flush(self, timeout=None):
+        """Wait until every game queued so far is on disk"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Write pending games and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _query(self, sql, params=()):
+        return [dict(row) for row in self._reader.execute(sql, params)]
+
+    def count(self):
+        return self._reader.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+
+    def top_scores(self, limit=10):
+        """Best games overall"""
+        return self._query('SELECT * FROM games ORDER BY score DESC LIMIT ?', (limit,))
+
+    def top_scores_for_day(self, day=None, limit=10):
+        """Best games on a UTC day (YYYY-MM-DD, default today)"""
+        day = day or day_of(time.time())
+        return self._query('SELECT * FROM games WHERE day = ? ORDER BY score DESC LIMIT ?',
+                           (day, limit))
+
+    def top_scores_for_level(self, level, limit=10):
+        """Best games that ended on the given level"""
+        return self._query('SELECT * FROM games WHERE level = ? ORDER BY score DESC LIMIT ?',
+                           (level, limit))
+
+
+def _synthetic_games(count, seed=0, days=30):
+    """Plausible finished-game stats spread over the last few days"""
+    rng = random.Random(seed)
+    now = time.time()
+    for _ in range(count):
+        lines = int(rng.expovariate(1 / 40.0))
+        yield ({'score': lines * rng.randint(40, 300), 'level': min(lines // 10, 29),
+                'lines': lines, 'pieces': lines * 5 // 2 + rng.randint(5, 30),
+                'duration_ms': rng.randint(10000, 900000), 'seed': rng.randrange(2 ** 31)},
+               now - rng.random() * days * 86400)
+
+
+def run_benchmark(sizes=(10000, 100000, 1000000), query_repeats=200):
+    """Write throughput and leaderboard query latency as the store grows"""
+    import tempfile
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = GameStore(os.path.join(tmp, 'scores.db'))
+        try:
+            total = 0
+            for size in sizes:
+                games = list(_synthetic_games(size - total, seed=size))
+                worst_enqueue = 0.0
+                start = time.perf_counter()
+                for stats, played_at in games:
+                    call_start = time.perf_counter()
+                    store.record_game(stats, played_at=played_at)
+                    worst_enqueue = max(worst_enqueue, time.perf_counter() - call_start)
+                enqueue_seconds = time.perf_counter() - start
+                store.flush()
+                write_seconds = time.perf_counter() - start
+                total = size
+
+                query_ms = {}
+                days = [day_of(played_at) for _, played_at in games[:query_repeats]]
+                for name, query in (('overall', lambda i: store.top_scores(10)),
+                                    ('per_day', lambda i: store.top_scores_for_day(days[i % len(days)], 10)),
+                                    ('per_level', lambda i: store.top_scores_for_level(i % 30, 10))):
+                    start = time.perf_counter()
+                    for i in range(query_repeats):
+                        query(i)
+                    query_ms[name] = (time.perf_counter() - start) * 1000.0 / query_repeats
+
+                results.append({
+                    'stored_games': store.count(),
+                    'inserted': len(games),
+                    'inserts_per_second': len(games) / write_seconds if write_seconds > 0 else 0.0,
+                    'record_call_mean_us': enqueue_seconds * 1e6 / max(1, len(games)),
+                    'record_call_max_us': worst_enqueue * 1e6,
+                    'top10_overall_ms': query_ms['overall'],
+                    'top10_per_day_ms': query_ms['per_day'],
+                    'top10_per_level_ms': query_ms['per_level'],
+                })
+        finally:
+            store.close()
+    return results
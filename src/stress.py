@@ -0,0 +1,277 @@
+"""
+Large-board stress mode and scaling benchmarks
+Times each engine and rendering operation on boards from the standard
+10x20 up to MAX_BOARD_WIDTH x MAX_BOARD_HEIGHT and fits cost against cell
+count on a log-log scale. The fitted exponent is ~1 for work linear in the
+board and ~0 for work that does not depend on it; anything above
+MAX_EXPONENT is reported as scaling badly, so a quadratic algorithm is
+caught before wide-board variants ship. The stress game plays random
+pieces on one large board, headless or rendered, and checks the board
+keeps its shape.
+"""
+
+import sys
+import math
+import time
+import random
+import logging
+import argparse
+from config import GRID_WIDTH, GRID_HEIGHT, MAX_BOARD_WIDTH, MAX_BOARD_HEIGHT, SPAWN_Y
+
+logger = logging.getLogger(__name__)
+
+BOARD_SIZES = ((GRID_WIDTH, GRID_HEIGHT), (20, 40), (40, 100), (100, 200), (MAX_BOARD_WIDTH, MAX_BOARD_HEIGHT))
+MAX_EXPONENT = 1.3          # cost may grow at most ~linearly with the number of cells
+HEADLESS_OPERATIONS = ('valid_move', 'update', 'hard_drop', 'clear_lines', 'add_garbage', 'reset_game')
+RENDERED_OPERATIONS = ('draw',)
+BAR_WIDTH = 40
+
+
+def make_board(width, height, filled=0.5, seed=0):
+    """Board whose lower `filled` fraction is ~70% occupied, one hole per row at least"""
+    rng = random.Random(seed)
+    grid = [[0] * width for _ in range(height)]
+    for y in range(height - int(height * filled), height):
+        row = grid[y]
+        for x in range(width):
+            if rng.random() < 0.7:
+                row[x] = rng.randint(1, 7)
+        row[rng.randrange(width)] = 0
+    return grid
+
+
+def copy_board(grid):
+    return [row[:] for row in grid]
+
+
+def operation(name, game, ui=None, surface=None):
+    """(setup, op) pair for a named operation; setup runs untimed before every op"""
+    width, height = game.width, game.height
+    empty = [[0] * width for _ in range(height)]
+    board = make_board(width, height)
+
+    def spawn(grid):
+        game.grid = copy_board(grid)
+        game.piece_x, game.piece_y = game.spawn_x, SPAWN_Y
+        game.fall_time = 0
+
+    if name == 'valid_move':
+        return (lambda: spawn(board)), (lambda: game.valid_move(game.current_piece, game.piece_x, game.piece_y + 1))
+    if name == 'update':
+        # One gravity step: the piece moves down a row
+        def setup():
+            spawn(board)
+            game.fall_time = game.get_fall_speed()
+        return setup, (lambda: game.update(0))
+    if name == 'hard_drop':
+        # Lock after the longest fall (an empty board), including the line scan and respawn
+        return (lambda: spawn(empty)), game.hard_drop
+    if name == 'clear_lines':
+        # A quarter of the rows are full and clear at once
+        full = [[1] * width for _ in range(height // 4)]
+        cleared = board[:height - len(full)] + full
+        return (lambda: spawn(cleared)), game.clear_lines
+    if name == 'add_garbage':
+        return (lambda: spawn(empty)), (lambda: game.add_garbage(1, hole_x=0))
+    if name == 'reset_game':
+        return (lambda: None), (lambda: game.reset_game(seed=0))
+    if name == 'draw':
+        return (lambda: spawn(board)), (lambda: ui.draw(surface, game.get_draw_state()))
+    raise ValueError(f"Unknown operation: {name}")
+
+
+def time_operation(setup, op, repeat):
+    """Median seconds per call of op, with setup run before each call"""
+    times = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        op()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def scaling_exponent(points):
+    """Least-squares slope of log(seconds) against log(cells) for (cells, seconds) points"""
+    xs = [math.log(cells) for cells, _ in points]
+    ys = [math.log(max(seconds, 1e-9)) for _, seconds in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def measure(sizes=BOARD_SIZES, rendered=True, repeat=25, seed=0):
+    """Time every operation on every board size
+
+    Returns {operation: [(width, height, seconds), ...]} in size order.
+    """
+    from main import Tetris
+    names = HEADLESS_OPERATIONS + (RENDERED_OPERATIONS if rendered else ())
+    results = {name: [] for name in names}
+    for width, height in sizes:
+        game = Tetris(seed=seed, headless=True, width=width, height=height)
+        ui = surface = None
+        if rendered:
+            import pygame
+            from ui_components import GameUI
+            ui = GameUI(width, height)
+            surface = pygame.Surface(ui.logical_size)
+        for name in names:
+            game.reset_game(seed=seed)
+            setup, op = operation(name, game, ui, surface)
+            results[name].append((width, height, time_operation(setup, op, repeat)))
+    return results
+
+
+def find_slow_scaling(results, max_exponent=MAX_EXPONENT):
+    """Operations whose cost grows faster than max_exponent with the cell count"""
+    slow = {}
+    for name, rows in results.items():
+        if len(rows) < 2:
+            continue
+        exponent = scaling_exponent([(width * height, seconds) for width, height, seconds in rows])
+        if exponent > max_exponent:
+            slow[name] = exponent
+    return slow
+
+
+def format_report(results, max_exponent=MAX_EXPONENT):
+    """Per-operation cost by board size as a log-scale bar plot"""
+    all_seconds = [seconds for rows in results.values() for _, _, seconds in rows]
+    low = math.log10(max(min(all_seconds), 1e-9))
+    high = math.log10(max(all_seconds))
+    span = (high - low) or 1.0
+    lines = []
+    for name, rows in results.items():
+        exponent = scaling_exponent([(width * height, seconds) for width, height, seconds in rows])
+        verdict = "SCALES BADLY" if exponent > max_exponent else "ok"
+        lines.append(f"{name}  (cost ~ cells^{exponent:.2f}, {verdict})")
+        for width, height, seconds in rows:
+            bar = '#' * max(1, round((math.log10(max(seconds, 1e-9)) - low) / span * BAR_WIDTH))
+            lines.append(f"  {width:>4}x{height:<5} {seconds * 1e6:>10.1f} us  {bar}")
+    return '\n'.join(lines)
+
+
+def write_csv(results, path):
+    """Write operation,width,height,cells,microseconds rows for external plotting"""
+    import csv
+    with open(path, 'w', newline='') as out:
+        writer = csv.writer(out)
+        writer.writerow(['operation', 'width', 'height', 'cells', 'microseconds'])
+        for name, rows in results.items():
+            for width, height, seconds in rows:
+                writer.writerow([name, width, height, width * height, round(seconds * 1e6, 3)])
+
+
+def stress_game(width=MAX_BOARD_WIDTH, height=MAX_BOARD_HEIGHT, pieces=500, rendered=False, seed=0):
+    """Play random pieces on one large board, drawing every piece when rendered
+
+    Each piece gets a random rotation and shift, a gravity tick and a hard
+    drop. Returns throughput, frame times and whether the board kept its size.
+    """
+    from main import Tetris
+    rng = random.Random(seed)
+    game = Tetris(seed=seed, headless=True, width=width, height=height)
+    ui = surface = None
+    if rendered:
+        import pygame
+        from ui_components import GameUI
+        ui = GameUI(width, height)
+        surface = pygame.Surface(ui.logical_size)
+    frame_times = []
+    board_ok = True
+    start = time.perf_counter()
+    for _ in range(pieces):
+        for _ in range(rng.randrange(4)):
+            game.apply_input('rotate')
+        shift = rng.randint(-width // 2, width // 2)
+        for _ in range(abs(shift)):
+            game.apply_input('left' if shift < 0 else 'right')
+        game.update(1000.0 / 60)
+        game.apply_input('hard_drop')
+        if rendered:
+            frame_start = time.perf_counter()
+            ui.draw(surface, game.get_draw_state())
+            frame_times.append(time.perf_counter() - frame_start)
+        board_ok = board_ok and len(game.grid) == height and all(len(row) == width for row in game.grid)
+    elapsed = time.perf_counter() - start
+    result = {
+        'board': f"{width}x{height}",
+        'mode': 'rendered' if rendered else 'headless',
+        'pieces_per_second': pieces / elapsed,
+        'lines': game.lines_cleared,
+        'games': game.games_played,
+        'board_ok': board_ok,
+    }
+    if frame_times:
+        frame_times.sort()
+        result['draw_p50_ms'] = frame_times[len(frame_times) // 2] * 1000.0
+        result['draw_max_ms'] = frame_times[-1] * 1000.0
+    return result
+
+
+def run_benchmark(sizes=BOARD_SIZES, repeat=25, pieces=300, seed=0):
+    """Per-operation cost at each board size with its scaling exponent,
+    then headless and rendered stress games on the largest board"""
+    results = measure(sizes, rendered=True, repeat=repeat, seed=seed)
+    rows = []
+    for name, timings in results.items():
+        row = {'operation': name}
+        for width, height, seconds in timings:
+            row[f"{width}x{height}_us"] = seconds * 1e6
+        row['exponent'] = scaling_exponent([(width * height, seconds) for width, height, seconds in timings])
+        row['ok'] = row['exponent'] <= MAX_EXPONENT
+        rows.append(row)
+    width, height = sizes[-1]
+    for rendered in (False, True):
+        rows.append(stress_game(width, height, pieces=pieces, rendered=rendered, seed=seed))
+    return rows
+
+
+def parse_sizes(text):
+    """Parse a comma separated list of WxH board sizes"""
+    from main import parse_board_size
+    return tuple(parse_board_size(size) for size in text.split(','))
+
+
+def main(argv=None):
+    """Command line entry point; exits 1 if an operation scales badly or a stress board breaks"""
+    parser = argparse.ArgumentParser(description="Benchmark per-operation cost against board size")
+    parser.add_argument('--sizes', type=parse_sizes, default=BOARD_SIZES, metavar='WxH,...',
+                        help="board sizes to measure, smallest first")
+    parser.add_argument('--headless', action='store_true', help="skip the rendering measurements")
+    parser.add_argument('--repeat', type=int, default=25, help="timed calls per operation and size")
+    parser.add_argument('--max-exponent', type=float, default=MAX_EXPONENT)
+    parser.add_argument('--csv', metavar='FILE', help="also write the timings as CSV for plotting")
+    parser.add_argument('--pieces', type=int, default=300,
+                        help="pieces in the stress game on the largest size (0 to skip)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # Game logging at INFO level would dominate the measurements
+    logging.disable(logging.INFO)
+    results = measure(args.sizes, rendered=not args.headless, repeat=args.repeat, seed=args.seed)
+    print(format_report(results, args.max_exponent))
+    if args.csv:
+        write_csv(results, args.csv)
+    slow = find_slow_scaling(results, args.max_exponent)
+
+    board_ok = True
+    if args.pieces:
+        width, height = args.sizes[-1]
+        game = stress_game(width, height, pieces=args.pieces, rendered=not args.headless, seed=args.seed)
+        print(f"\nstress game {game['board']} {game['mode']}: {game['pieces_per_second']:.0f} pieces/s, "
+              f"{game['lines']} lines" + (f", draw p50 {game['draw_p50_ms']:.2f} ms" if 'draw_p50_ms' in game else ''))
+        board_ok = game['board_ok']
+        if not board_ok:
+            print("board changed size during the stress game")
+    for name, exponent in slow.items():
+        print(f"{name} scales badly: cost ~ cells^{exponent:.2f} (limit {args.max_exponent})")
+    return 0 if board_ok and not slow else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Terminal renderer for watching games over SSH
+Draws the same state as GameUI.draw with ANSI escape sequences and, after the
+first frame, only rewrites the screen cells that changed, so it stays usable
+over slow links. Plain ANSI rather than curses keeps the output measurable.
+"""
+
+import sys
+import time
+import logging
+import argparse
+from collections import deque
+from config import GRID_HEIGHT, FPS
+from pieces import get_piece_color
+
+logger = logging.getLogger(__name__)
+
+CSI = '\x1b['
+RESET_STYLE = CSI + '0m'
+CLEAR_SCREEN = CSI + '2J'
+HIDE_CURSOR = CSI + '?25l'
+SHOW_CURSOR = CSI + '?25h'
+
+SIDEBAR_WIDTH = 12
+
+
+def xterm_color(rgb):
+    """Nearest colour in the xterm 256-colour 6x6x6 cube"""
+    r, g, b = (round(channel / 255 * 5) for channel in rgb)
+    return 16 + 36 * r + 6 * g + b
+
+
+# Background style for each grid cell value (0 empty, 1-8 piece types and garbage)
+_BLOCK_STYLES = [''] + [f'{CSI}48;5;{xterm_color(get_piece_color(value - 1))}m' for value in range(1, 9)]
+_LABEL_STYLE = CSI + '1m'
+_VALUE_STYLE = CSI + '33m'
+
+
+class TerminalRenderer:
+    """Diff-based ANSI renderer for one game"""
+
+    def __init__(self, stream=None, color=True, origin=(1, 1)):
+        """origin is the 1-based (row, column) of the top-left corner on screen"""
+        self.stream = stream or sys.stdout
+        self.color = color
+        self.origin = origin
+        self.frames = 0
+        self.bytes_written = 0
+        self.frame_bytes = deque(maxlen=10000)
+        self._previous = None
+        # Rows of the last drawing (the board plus its top and bottom border)
+        self.screen_rows = GRID_HEIGHT + 2
+
+    def compose(self, state):
+        """Build the screen as rows of (character, style) cells"""
+        grid = state['grid']
+        height, width = len(grid), len(grid[0])
+        cells = [row[:] for row in grid]
+        piece_value = state['current_piece_type'] + 1
+        for py, row in enumerate(state['current_piece'] or ()):
+            for px, cell in enumerate(row):
+                x, y = state['piece_x'] + px, state['piece_y'] + py
+                if cell == '#' and 0 <= x < width and 0 <= y < height:
+                    cells[y][x] = piece_value
+
+        sidebar = ['SCORE', f"{state['score']:08d}", '', 'LEVEL', str(state['level']), '',
+                   'LINES', str(state['lines_cleared']), '', 'PIECES', str(state['total_pieces']),
+                   '', 'SPEED', f"{state['fall_speed']}ms"]
+        border = [('+', '')] + [('-', '')] * (width * 2) + [('+', '')]
+        screen = [border]
+        for y in range(height):
+            line = [('|', '')]
+            for value in cells[y]:
+                if self.color:
+                    pair = (' ', _BLOCK_STYLES[value])
+                    line += (pair, pair)
+                elif value:
+                    line += (('[', ''), (']', ''))
+                else:
+                    line += ((' ', ''), ('.', ''))
+            line += [('|', ''), (' ', ''), (' ', '')]
+            text = sidebar[y] if y < len(sidebar) else ''
+            style = (_LABEL_STYLE if y % 3 == 0 else _VALUE_STYLE) if self.color and text else ''
+            line += [(char, style) for char in text.ljust(SIDEBAR_WIDTH)]
+            screen.append(line)
+        screen.append(border)
+        return screen
+
+    def render(self, state):
+        """Draw a frame, writing only what changed; returns the bytes written"""
+        screen = self.compose(state)
+        previous = self._previous
+        top, left = self.origin
+        out = []
+        if previous is None:
+            out.append(HIDE_CURSOR + CLEAR_SCREEN)
+        cursor = None
+        # Every frame ends with the default style
+        current_style = ''
+        for row_index, row in enumerate(screen):
+            old_row = previous[row_index] if previous is not None else None
+            if row == old_row:
+                continue
+            for column, cell in enumerate(row):
+                if old_row is not None and old_row[column] == cell:
+                    continue
+                if cursor != (row_index, column):
+                    out.append(f'{CSI}{top + row_index};{left + column}H')
+                char, style = cell
+                if style != current_style:
+                    out.append(RESET_STYLE + style if current_style or not style else style)
+                    current_style = style
+                out.append(char)
+                cursor = (row_index, column + 1)
+        if current_style:
+            out.append(RESET_STYLE)
+        self._previous = screen
+        self.screen_rows = len(screen)
+
+        data = ''.join(out)
+        if data:
+            self.stream.write(data)
+            self.stream.flush()
+        size = len(data.encode())
+        self.frames += 1
+        self.bytes_written += size
+        self.frame_bytes.append(size)
+        return size
+
+    def invalidate(self):
+        """Redraw everything on the next frame (e.g. after the terminal was resized)"""
+        self._previous = None
+
+    def close(self):
+        """Restore the cursor below the drawing"""
+        top, left = self.origin
+        self.stream.write(f'{RESET_STYLE}{CSI}{top + self.screen_rows};1H{SHOW_CURSOR}\n')
+        self.stream.flush()
+
+    def report(self):
+        sizes = sorted(self.frame_bytes)
+        if not sizes:
+            return {'frames': 0}
+        return {
+            'frames': self.frames,
+            'bytes_total': self.bytes_written,
+            'mean_bytes_per_frame': self.bytes_written / self.frames,
+            'p99_bytes_per_frame': sizes[min(len(sizes) - 1, int(len(sizes) * 0.99))],
+            'max_bytes_per_frame': sizes[-1],
+        }
+
+
+class _NullStream:
+    """Discards output (benchmarks only count bytes)"""
+
+    def write(self, data):
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def watch(game, renderer, frames=None, fps=FPS, bot=None, think_frames=20):
+    """Run a game in real time, drawing each frame; a bot plays if given
+
+    Stops after frames frames (or never) or on Ctrl-C.
+    """
+    frame_ms = 1000.0 / fps
+    count = 0
+    wait = think_frames
+    try:
+        while frames is None or count < frames:
+            start = time.perf_counter()
+            if bot is not None:
+                wait -= 1
+                if wait <= 0:
+                    bot.play_piece(game)
+                    wait = think_frames
+            game.update(frame_ms)
+            renderer.render(game.get_draw_state())
+            count += 1
+            time.sleep(max(0.0, frame_ms / 1000.0 - (time.perf_counter() - start)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        renderer.close()
+    return count
+
+
+def run_benchmark(frames=3600, seed=0):
+    """Bytes per frame for diff updates against full redraws, colour and plain"""
+    from main import Tetris
+    from bot import TetrisBot
+
+    results = []
+    for color in (True, False):
+        game = Tetris(seed=seed, headless=True)
+        diff = TerminalRenderer(_NullStream(), color=color)
+        full = TerminalRenderer(_NullStream(), color=color)
+        bot = TetrisBot(beam_width=1, lookahead=0)
+        start = time.perf_counter()
+        for frame in range(frames):
+            if frame % 20 == 19:
+                bot.play_piece(game)
+            game.update(1000.0 / FPS)
+            state = game.get_draw_state()
+            diff.render(state)
+            full.invalidate()
+            full.render(state)
+        elapsed = time.perf_counter() - start
+        report = diff.report()
+        report.update({
+            'color': color,
+            'full_redraw_mean_bytes': full.report()['mean_bytes_per_frame'],
+            'bytes_per_second_at_fps': report['mean_bytes_per_frame'] * FPS,
+            'render_ms_per_frame': elapsed * 1000.0 / frames / 2,
+        })
+        results.append(report)
+    return results
+
+
+def main(argv=None):
+    """Command line entry point: watch a bot game or a replay in the terminal"""
+    parser = argparse.ArgumentParser(description="Watch Tetris in a terminal")
+    parser.add_argument('--replay', help="replay file to play back instead of a live bot game")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--fps', type=int, default=FPS)
+    parser.add_argument('--no-color', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    from main import Tetris
+    renderer = TerminalRenderer(color=not args.no_color)
+    if args.replay:
+        from replay import read_replays, replay_game
+        from export import replay_frames, step_frame
+        try:
+            for replay in read_replays(args.replay):
+                game = replay_game(replay)
+                for frame in replay_frames(replay):
+                    start = time.perf_counter()
+                    if not step_frame(game, frame):
+                        break
+                    renderer.render(game.get_draw_state())
+                    time.sleep(max(0.0, 1.0 / args.fps - (time.perf_counter() - start)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            renderer.close()
+    else:
+        from bot import TetrisBot
+        watch(Tetris(seed=args.seed, headless=True), renderer, fps=args.fps, bot=TetrisBot())
+    report = renderer.report()
+    if report['frames']:
+        print(f"{report['frames']} frames, {report['mean_bytes_per_frame']:.0f} bytes/frame on average")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
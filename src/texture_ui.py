@@ -0,0 +1,221 @@
+"""
+Texture-based render backend
+Uploads the block sprites and the static parts of the UI (field, grid lines,
+panel backgrounds, labels, instructions) once as pygame._sdl2 textures, and
+composes each frame with texture copies through an SDL Renderer instead of
+drawing on a Surface. Falls back to SDL's software renderer when no GPU
+renderer is available, so it also runs on headless machines.
+"""
+
+import sys
+import time
+import logging
+import argparse
+import pygame
+from config import GRID_WIDTH, GRID_HEIGHT, WINDOW_WIDTH, WINDOW_HEIGHT, FPS, GAME_TITLE, Colors
+from pieces import get_piece_color, get_piece_border_color
+from ui_components import GameUI, ScoreBoard
+
+try:
+    from pygame._sdl2 import video
+    from pygame._sdl2.sdl2 import error as SDLError
+except ImportError:  # pygame builds without SDL2 render API support
+    video = None
+    SDLError = pygame.error
+
+logger = logging.getLogger(__name__)
+
+# Grid cell values with a block sprite: 1-7 pieces, 8 garbage
+BLOCK_VALUES = 8
+
+# ScoreBoard values as (state key, y offset, big font, colour, format); labels are static
+VALUE_FIELDS = tuple((key, offset + ScoreBoard.VALUE_OFFSET, big, color, fmt)
+                     for _, key, offset, big, color, fmt in ScoreBoard.FIELDS)
+
+
+class TextureUIError(Exception):
+    """Raised when no SDL renderer can be created"""
+    pass
+
+
+def create_renderer(window, software=False):
+    """An SDL renderer for window: accelerated if possible, else software
+
+    Returns (renderer, kind) with kind 'accelerated' or 'software'.
+    """
+    if video is None:
+        raise TextureUIError("pygame._sdl2 is not available in this pygame build")
+    if not software:
+        try:
+            return video.Renderer(window, accelerated=1), 'accelerated'
+        except (pygame.error, SDLError) as e:
+            logger.info(f"No accelerated renderer ({e}), using the software renderer")
+    try:
+        return video.Renderer(window, accelerated=0), 'software'
+    except (pygame.error, SDLError) as e:
+        raise TextureUIError(f"Could not create a software renderer: {e}")
+
+
+class TextureUI:
+    """Draws the same layout as GameUI with texture copies"""
+
+    def __init__(self, renderer, columns=GRID_WIDTH, rows=GRID_HEIGHT):
+        self.renderer = renderer
+        # The Surface components supply layout, fonts and the static artwork
+        self.layout = GameUI(columns, rows)
+        self.field = self.layout.game_field
+        self.static = video.Texture.from_surface(renderer, self._static_surface())
+
+        size = self.field.block_size
+        atlas = pygame.Surface((size * BLOCK_VALUES, size))
+        self.block_areas = [None]
+        for value in range(1, BLOCK_VALUES + 1):
+            area = pygame.Rect((value - 1) * size, 0, size, size)
+            atlas.fill(get_piece_color(value - 1), area)
+            if size >= 4:  # Same cut-off as GameField block borders
+                pygame.draw.rect(atlas, get_piece_border_color(value - 1), area, 2)
+            self.block_areas.append(area)
+        self.blocks = video.Texture.from_surface(renderer, atlas)
+
+        # key -> (text, texture, rect); text is re-rendered only when it changes
+        self._values = {}
+
+    def _static_surface(self):
+        """Everything that does not change between frames"""
+        surface = pygame.Surface(self.layout.logical_size)
+        self.layout.draw_static(surface)
+        board = self.layout.score_board
+        for label, _, offset, _, _, _ in ScoreBoard.FIELDS:
+            surface.blit(board.font.render(label, True, Colors.WHITE), (board.x, board.y + offset))
+        return surface
+
+    def _value_texture(self, key, text, offset, big, color):
+        cached = self._values.get(key)
+        if cached is None or cached[0] != text:
+            board = self.layout.score_board
+            font = board.big_font if big else board.font
+            image = font.render(text, True, color)
+            rect = pygame.Rect(board.x, board.y + offset, image.get_width(), image.get_height())
+            cached = (text, video.Texture.from_surface(self.renderer, image), rect)
+            self._values[key] = cached
+        return cached
+
+    def draw(self, game_state):
+        """Compose a frame on the renderer (call renderer.present() to show it)"""
+        renderer = self.renderer
+        renderer.draw_color = (0, 0, 0, 255)
+        renderer.clear()
+        self.static.draw()
+
+        blocks, areas = self.blocks, self.block_areas
+        field = self.field
+        left, top = field.x, field.y
+        size = field.block_size
+        for y, row in enumerate(game_state['grid']):
+            for x, value in enumerate(row):
+                if value:
+                    blocks.draw(areas[value], (left + x * size, top + y * size, size, size))
+
+        piece = game_state['current_piece']
+        if piece:
+            area = areas[game_state['current_piece_type'] + 1]
+            piece_x, piece_y = game_state['piece_x'], game_state['piece_y']
+            for py, row in enumerate(piece):
+                for px, cell in enumerate(row):
+                    x, y = piece_x + px, piece_y + py
+                    if cell == '#' and 0 <= x < field.columns and 0 <= y < field.rows:
+                        blocks.draw(area, (left + x * size, top + y * size, size, size))
+
+        for key, offset, big, color, fmt in VALUE_FIELDS:
+            _, texture, rect = self._value_texture(key, fmt.format(game_state[key]), offset, big, color)
+            texture.draw(None, rect)
+
+
+def run_benchmark(frames=600, seed=0):
+    """Frame time of the texture backend against GameUI drawing on a Surface"""
+    from main import Tetris
+    from bot import TetrisBot
+
+    if video is None:
+        return [{'backend': 'texture', 'error': 'pygame._sdl2 unavailable'}]
+
+    results = []
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    # The Surface backend, the best available renderer, then forced software
+    for backend, software in (('surface', None), ('texture', False), ('texture', True)):
+        if software and results[-1]['renderer'] == 'software':
+            continue
+        window = renderer = None
+        kind, ui = 'surface', GameUI()
+        if backend == 'texture':
+            window = video.Window('benchmark', size=(WINDOW_WIDTH, WINDOW_HEIGHT), hidden=True)
+            renderer, kind = create_renderer(window, software=software)
+            ui = TextureUI(renderer)
+        game = Tetris(seed=seed, headless=True)
+        bot = TetrisBot(beam_width=1, lookahead=0)
+        elapsed = 0.0
+        try:
+            for frame in range(frames):
+                if frame % 20 == 19:
+                    bot.play_piece(game)
+                game.update(1000.0 / FPS)
+                state = game.get_draw_state()
+                start = time.perf_counter()
+                if renderer is not None:
+                    ui.draw(state)
+                    renderer.present()
+                else:
+                    ui.draw(surface, state)
+                elapsed += time.perf_counter() - start
+        finally:
+            if window is not None:
+                window.destroy()
+        results.append({
+            'backend': backend,
+            'renderer': kind,
+            'frames': frames,
+            'frame_ms': elapsed * 1000.0 / frames,
+            'fps': frames / elapsed if elapsed > 0 else 0.0,
+        })
+    return results
+
+
+def main(argv=None):
+    """Command line entry point: play with the texture backend"""
+    parser = argparse.ArgumentParser(description="Play Tetris with the texture render backend")
+    parser.add_argument('--software', action='store_true', help="force SDL's software renderer")
+    args = parser.parse_args(argv)
+
+    from main import Tetris, KEY_ACTIONS
+    if video is None:
+        print("pygame._sdl2 is not available; run main.py for the Surface backend")
+        return 1
+    window = video.Window(GAME_TITLE, size=(WINDOW_WIDTH, WINDOW_HEIGHT))
+    try:
+        renderer, kind = create_renderer(window, software=args.software)
+        logger.info(f"Using the {kind} renderer")
+        game = Tetris()
+        ui = TextureUI(renderer, game.width, game.height)
+        clock = pygame.time.Clock()
+        running = True
+        while running:
+            dt = clock.tick(FPS)
+            for event in pygame.event.get():
+                if event.type in (pygame.QUIT, pygame.WINDOWCLOSE):
+                    running = False
+                elif event.type == pygame.KEYDOWN and KEY_ACTIONS.get(event.key):
+                    game.apply_input(KEY_ACTIONS[event.key])
+            game.update(dt)
+            ui.draw(game.get_draw_state())
+            renderer.present()
+    except TextureUIError as e:
+        logger.error(f"{e}")
+        return 1
+    finally:
+        window.destroy()
+        pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
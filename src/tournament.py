@@ -0,0 +1,381 @@
+"""
+Bot tournaments with cached results
+Plays every bot on the same fixed seed set across a process pool and ranks
+them with bootstrap confidence intervals. Each game's result is stored in a
+content-addressed cache keyed by a hash of the bot's code (with the local
+modules it imports) and options, a hash of the rules (Scoring, board size,
+spawn point and pieces) and of the engine's source, and the seed, so only
+games never played before under the same code and rules run.
+"""
+
+import os
+import ast
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import importlib.util
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import GRID_WIDTH, GRID_HEIGHT, SPAWN_X, SPAWN_Y, ROTATION_SYSTEM, Scoring
+from pieces import PIECES
+from rotation import get_rotation_system
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = '.tournament_cache'
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BOT_PATH = os.path.join(SOURCE_DIR, 'bot.py')
+# The game engine every bot plays on
+ENGINE_PATH = os.path.join(SOURCE_DIR, 'main.py')
+METRICS = ('lines', 'score', 'pieces')
+
+# A bot is a file defining TetrisBot plus the keyword arguments to build it with
+BotSpec = namedtuple('BotSpec', ['name', 'path', 'options'])
+
+DEFAULT_BOTS = (
+    BotSpec('greedy', DEFAULT_BOT_PATH, {'beam_width': 1, 'lookahead': 0}),
+    BotSpec('beam4', DEFAULT_BOT_PATH, {'beam_width': 4, 'lookahead': 1}),
+)
+
+
+def _sha256(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def rules_hash():
+    """Hash of the rules a game's result depends on"""
+    scoring = {name: value for name, value in vars(Scoring).items() if not name.startswith('_')}
+    rules = {'scoring': scoring, 'grid': [GRID_WIDTH, GRID_HEIGHT], 'spawn': [SPAWN_X, SPAWN_Y],
+             'pieces': PIECES, 'rotation': [ROTATION_SYSTEM, get_rotation_system().turns]}
+    return _sha256(json.dumps(rules, sort_keys=True))
+
+
+def _imported_names(tree, nested):
+    """Top-level package names imported in a module, at module level only unless nested"""
+    for node in (ast.walk(tree) if nested else tree.body):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name.split('.')[0]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            yield node.module.split('.')[0]
+
+
+def local_sources(path, nested=True):
+    """{module name: source} of the local modules a source file depends on
+
+    Imports anywhere in the file (only its module-level ones unless nested)
+    are resolved next to it or in this directory, then followed through
+    each module's own module-level imports.
+    """
+    directories = (os.path.dirname(os.path.abspath(path)), SOURCE_DIR)
+    sources = {}
+    with open(path, 'rb') as source:
+        pending = [(source.read(), nested)]
+    while pending:
+        code, follow_nested = pending.pop()
+        for name in _imported_names(ast.parse(code), follow_nested):
+            if name in sources:
+                continue
+            for directory in directories:
+                candidate = os.path.join(directory, f"{name}.py")
+                if os.path.isfile(candidate):
+                    with open(candidate, 'rb') as source:
+                        sources[name] = source.read()
+                    pending.append((sources[name], False))
+                    break
+    return sources
+
+
+def source_hash(path, nested=True):
+    """Hash of a source file and the local modules it depends on"""
+    with open(path, 'rb') as source:
+        code = source.read()
+    sources = local_sources(path, nested)
+    return _sha256(code, *(part for name in sorted(sources) for part in (name, sources[name])))
+
+
+def engine_hash():
+    """Hash of the game engine's source (gravity, locking, line clears, garbage)"""
+    return source_hash(ENGINE_PATH, nested=False)
+
+
+def bot_hash(spec):
+    """Hash of a bot's source file, the local modules it imports and its options"""
+    return _sha256(source_hash(spec.path), json.dumps(spec.options, sort_keys=True))
+
+
+class ResultCache:
+    """Content-addressed store of game results: one JSON file per key under directory/ab/"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    @staticmethod
+    def make_key(code_hash, rules, seed, max_pieces):
+        return _sha256(code_hash, rules, seed, max_pieces)
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self.path(key), 'r') as entry:
+                return json.load(entry)['stats']
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, OSError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {key}: {e}")
+            return None
+
+    def put(self, key, stats, **info):
+        """Store a result; written to a temporary file and renamed so readers never see half an entry"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as entry:
+            json.dump(dict(info, stats=stats), entry)
+        os.replace(temporary, path)
+
+
+# Per-process game and loaded bot modules, created lazily by the worker
+_worker_game = None
+_worker_modules = {}
+
+
+def _init_worker():
+    """Prepare a pool worker for headless play"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    logging.disable(logging.INFO)
+
+
+def load_bot_module(path):
+    """Import a bot file under its own module name, so several versions can coexist"""
+    module = _worker_modules.get(path)
+    if module is None:
+        name = f"tournament_bot_{_sha256(path)[:12]}"
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _worker_modules[path] = module
+    return module
+
+
+def play_seed(path, options, seed, max_pieces=500):
+    """Play one seeded game with the bot defined in path and return its stats"""
+    global _worker_game
+    from bot import play_game
+    if _worker_game is None:
+        from main import Tetris
+        _worker_game = Tetris(seed=seed, headless=True)
+    _worker_game.reset_game(seed=seed)
+    bot = load_bot_module(path).TetrisBot(**options)
+    return play_game(_worker_game, bot, max_pieces=max_pieces)
+
+
+def _play_job(job):
+    """Pool entry point: job is (path, options, seed, max_pieces)"""
+    return play_seed(*job)
+
+
+def bootstrap_interval(values, confidence=0.95, resamples=2000, rng=None):
+    """Percentile bootstrap confidence interval of the mean"""
+    if not values:
+        return (0.0, 0.0)
+    rng = rng or random.Random(0)
+    count = len(values)
+    means = sorted(sum(rng.choices(values, k=count)) / count for _ in range(resamples))
+    tail = (1.0 - confidence) / 2
+    return (means[int(tail * (resamples - 1))], means[int((1.0 - tail) * (resamples - 1))])
+
+
+class Tournament:
+    """Every bot plays every seed; only games missing from the cache are played"""
+
+    def __init__(self, bots, seeds, max_pieces=500, workers=None, cache_dir=DEFAULT_CACHE_DIR):
+        names = [bot.name for bot in bots]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Bot names must be unique, got {names}")
+        self.bots = list(bots)
+        self.seeds = list(seeds)
+        if not self.seeds:
+            raise ValueError("A tournament needs at least one seed")
+        self.max_pieces = max_pieces
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = ResultCache(cache_dir)
+        # Bot name -> {seed: stats}
+        self.results = {}
+        self.played = 0
+        self.cached = 0
+
+    def keys(self):
+        """Cache key of every (bot, seed) game"""
+        rules = _sha256(rules_hash(), engine_hash())
+        keys = {}
+        for bot in self.bots:
+            code = bot_hash(bot)
+            for seed in self.seeds:
+                keys[(bot.name, seed)] = ResultCache.make_key(code, rules, seed, self.max_pieces)
+        return keys
+
+    def run(self):
+        """Load cached results and play the rest; returns {bot name: {seed: stats}}"""
+        start = time.perf_counter()
+        bots = {bot.name: bot for bot in self.bots}
+        self.results = {name: {} for name in bots}
+        jobs = {}
+        for (name, seed), key in self.keys().items():
+            stats = self.cache.get(key)
+            if stats is None:
+                jobs[(name, seed)] = key
+            else:
+                self.results[name][seed] = stats
+        self.cached = sum(len(games) for games in self.results.values())
+
+        def record(name, seed, stats):
+            self.results[name][seed] = stats
+            self.cache.put(jobs[(name, seed)], stats, bot=name, seed=seed, max_pieces=self.max_pieces)
+
+        if jobs and self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+                futures = {executor.submit(_play_job, (bots[name].path, bots[name].options, seed,
+                                                       self.max_pieces)): (name, seed)
+                           for name, seed in jobs}
+                # Cache each game as it finishes so an interrupted run keeps it
+                for future in as_completed(futures):
+                    record(*futures[future], future.result())
+        else:
+            for name, seed in jobs:
+                record(name, seed, play_seed(bots[name].path, bots[name].options, seed, self.max_pieces))
+        self.played = len(jobs)
+        logger.info(f"Tournament: {self.played} games played, {self.cached} cached, "
+                    f"{time.perf_counter() - start:.1f} s")
+        return self.results
+
+    def leaderboard(self, metric='lines', confidence=0.95, resamples=2000):
+        """Bots ranked by mean metric, with bootstrap confidence intervals
+
+        delta_vs_leader is the mean per-seed difference to the top bot; as
+        every bot plays the same seeds its interval is a paired one, much
+        tighter than comparing the two means' intervals.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+        rng = random.Random(0)
+        values = {bot.name: [self.results[bot.name][seed][metric] for seed in self.seeds]
+                  for bot in self.bots}
+        ranked = sorted(values, key=lambda name: -sum(values[name]) / len(values[name]))
+        leader = values[ranked[0]] if ranked else []
+        rows = []
+        for rank, name in enumerate(ranked, 1):
+            games = values[name]
+            deltas = [value - best for value, best in zip(games, leader)]
+            ci_low, ci_high = bootstrap_interval(games, confidence, resamples, rng)
+            delta_low, delta_high = bootstrap_interval(deltas, confidence, resamples, rng)
+            rows.append({
+                'rank': rank,
+                'bot': name,
+                'games': len(games),
+                'mean': sum(games) / len(games),
+                'ci_low': ci_low,
+                'ci_high': ci_high,
+                'delta_vs_leader': sum(deltas) / len(deltas),
+                'delta_ci_low': delta_low,
+                'delta_ci_high': delta_high,
+            })
+        return rows
+
+
+def format_leaderboard(rows, metric='lines', confidence=0.95):
+    interval = f"{confidence * 100:.0f}% CI"
+    lines = [f"{'#':>3} {'bot':<16} {'games':>6} {'mean ' + metric:>14} {interval:>18} "
+             f"{'vs leader':>10} {interval:>18}"]
+    for row in rows:
+        mean_ci = f"[{row['ci_low']:.1f}, {row['ci_high']:.1f}]"
+        delta_ci = f"[{row['delta_ci_low']:.1f}, {row['delta_ci_high']:.1f}]"
+        lines.append(f"{row['rank']:>3} {row['bot']:<16} {row['games']:>6} {row['mean']:>14.1f} "
+                     f"{mean_ci:>18} {row['delta_vs_leader']:>10.1f} {delta_ci:>18}")
+    return '\n'.join(lines)
+
+
+def load_bots(path):
+    """Read bot specs from a JSON file: {"bots": [{"name", "path" (optional), "options"}]}
+
+    Relative bot paths are resolved from the file's directory.
+    """
+    with open(path, 'r') as config_file:
+        config = json.load(config_file)
+    base = os.path.dirname(os.path.abspath(path))
+    bots = []
+    for entry in config['bots']:
+        bot_path = entry.get('path')
+        bot_path = os.path.join(base, bot_path) if bot_path else DEFAULT_BOT_PATH
+        bots.append(BotSpec(entry['name'], os.path.abspath(bot_path), entry.get('options', {})))
+    return bots
+
+
+def run_benchmark(seeds=6, max_pieces=150, workers=None):
+    """Tournament time with a cold cache, a warm cache and one bot added"""
+    import tempfile
+
+    greedy, beam = DEFAULT_BOTS
+    added = BotSpec('beam2', DEFAULT_BOT_PATH, {'beam_width': 2, 'lookahead': 1})
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label, bots in (('cold', [greedy, beam]), ('warm', [greedy, beam]),
+                            ('one bot added', [greedy, beam, added])):
+            tournament = Tournament(bots, range(seeds), max_pieces=max_pieces, workers=workers,
+                                    cache_dir=cache_dir)
+            start = time.perf_counter()
+            tournament.run()
+            rows = tournament.leaderboard()
+            results.append({
+                'run': label,
+                'workers': tournament.workers,
+                'games': len(bots) * seeds,
+                'played': tournament.played,
+                'cached': tournament.cached,
+                'seconds': time.perf_counter() - start,
+                'leader': rows[0]['bot'],
+            })
+    return results
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Rank bot versions on a fixed seed set")
+    parser.add_argument('bots', nargs='?', help="JSON file of bots (default: built-in presets)")
+    parser.add_argument('--seeds', type=int, default=20, help="play seeds 0 .. SEEDS-1")
+    parser.add_argument('--max-pieces', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--metric', choices=METRICS, default='lines')
+    parser.add_argument('--output', help="also write the leaderboard as JSON")
+    args = parser.parse_args(argv)
+
+    _init_worker()
+    logging.disable(logging.NOTSET)
+    logging.getLogger('main').setLevel(logging.WARNING)
+    bots = load_bots(args.bots) if args.bots else list(DEFAULT_BOTS)
+    tournament = Tournament(bots, range(args.seeds), max_pieces=args.max_pieces,
+                            workers=args.workers, cache_dir=args.cache_dir)
+    tournament.run()
+    rows = tournament.leaderboard(args.metric)
+    print(format_leaderboard(rows, args.metric))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(rows, output, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Parallel weight tuner for the heuristic bot
+Evolves evaluation weight vectors with a diagonal CMA-style strategy, playing
+fixed seed sets through the headless Tetris engine across a process pool
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from bot import TetrisBot, FEATURES, DEFAULT_WEIGHTS, play_game
+
+logger = logging.getLogger(__name__)
+
+# Per-process game instance, created lazily by the worker
+_worker_game = None
+
+
+def _init_worker():
+    """Prepare a pool worker for headless play"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    logging.disable(logging.INFO)
+
+
+def play_seed(weights, seed, max_pieces=500, beam_width=1, lookahead=0):
+    """Play one seeded game with the given weights and return its stats"""
+    global _worker_game
+    if _worker_game is None:
+        from main import Tetris
+        _worker_game = Tetris(seed=seed, headless=True)
+    _worker_game.reset_game(seed=seed)
+    bot = TetrisBot(weights=weights, beam_width=beam_width, lookahead=lookahead)
+    return play_game(_worker_game, bot, max_pieces=max_pieces)
+
+
+def _play_job(job):
+    """Pool entry point: job is (weights, seed, max_pieces, beam_width, lookahead)"""
+    return play_seed(*job)
+
+
+class FitnessCache:
+    """Append-only on-disk cache of game results keyed by (weights, seed, settings)"""
+
+    def __init__(self, path):
+        """Load any results recorded by earlier (possibly interrupted) runs"""
+        self.path = path
+        self.results = {}
+        if path and os.path.exists(path):
+            with open(path, 'r') as cache_file:
+                for line in cache_file:
+                    try:
+                        entry = json.loads(line)
+                        self.results[entry['key']] = entry['stats']
+                    except (ValueError, KeyError) as e:
+                        # A run killed mid-write can leave a partial last line
+                        logger.warning(f"Skipping bad cache line in {path}: {e}")
+        self._file = open(path, 'a') if path else None
+
+    @staticmethod
+    def make_key(weights, seed, max_pieces, beam_width, lookahead):
+        """Build a stable cache key; weights are rounded so float noise still hits"""
+        rounded = ','.join(f"{w:.6f}" for w in weights)
+        return f"{rounded}|{seed}|{max_pieces}|{beam_width}|{lookahead}"
+
+    def get(self, key):
+        return self.results.get(key)
+
+    def put(self, key, stats):
+        """Record a result and flush it so an interrupted run keeps it"""
+        self.results[key] = stats
+        if self._file:
+            self._file.write(json.dumps({'key': key, 'stats': stats}) + '\n')
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return len(self.results)
+
+
+class WeightTuner:
+    """Diagonal CMA-style evolution strategy over bot evaluation weights"""
+
+    def __init__(self, seeds, population=16, elite_fraction=0.25, sigma=0.2,
+                 max_pieces=500, beam_width=1, lookahead=0, workers=None,
+                 cache_path=None, rng_seed=0, initial_weights=DEFAULT_WEIGHTS):
+        """Initialize tuner state
+
+        Every candidate plays the same fixed seeds, so fitness differences come
+        from the weights and not from piece luck.
+        """
+        self.seeds = list(seeds)
+        self.population = max(2, population)
+        self.elite_count = max(1, int(self.population * elite_fraction))
+        self.max_pieces = max_pieces
+        self.beam_width = beam_width
+        self.lookahead = lookahead
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = FitnessCache(cache_path)
+        self.rng = random.Random(rng_seed)
+
+        self.mean = list(initial_weights)
+        self.sigmas = [sigma] * len(FEATURES)
+        self.best_weights = tuple(initial_weights)
+        self.best_fitness = None
+        self.history = []
+
+    def sample_population(self):
+        """Draw candidate weight vectors around the current mean"""
+        candidates = [tuple(self.mean)]
+        while len(candidates) < self.population:
+            candidates.append(tuple(self.rng.gauss(m, s) for m, s in zip(self.mean, self.sigmas)))
+        return candidates
+
+    def evaluate(self, candidates, executor=None):
+        """Score each candidate by mean lines cleared over the seed set
+
+        Only (weights, seed) pairs missing from the cache are played; returns
+        (fitness per candidate, games played, pieces placed in those games).
+        """
+        settings = (self.max_pieces, self.beam_width, self.lookahead)
+        jobs = {}
+        for weights in candidates:
+            for seed in self.seeds:
+                key = FitnessCache.make_key(weights, seed, *settings)
+                if self.cache.get(key) is None and key not in jobs:
+                    jobs[key] = (weights, seed) + settings
+
+        pieces = 0
+        if jobs:
+            keys = list(jobs)
+            if executor is not None:
+                results = executor.map(_play_job, [jobs[key] for key in keys])
+            else:
+                results = map(_play_job, [jobs[key] for key in keys])
+            for key, stats in zip(keys, results):
+                self.cache.put(key, stats)
+                pieces += stats['pieces']
+
+        fitness = []
+        for weights in candidates:
+            games = [self.cache.get(FitnessCache.make_key(weights, seed, *settings))
+                     for seed in self.seeds]
+            fitness.append(sum(game['lines'] for game in games) / len(games))
+        return fitness, len(jobs), pieces
+
+    def step(self, executor=None):
+        """Run one generation and update the search distribution"""
+        start = time.perf_counter()
+        candidates = self.sample_population()
+        fitness, played, pieces = self.evaluate(candidates, executor)
+        elapsed = time.perf_counter() - start
+
+        ranked = sorted(zip(fitness, candidates), key=lambda entry: entry[0], reverse=True)
+        elites = [weights for _, weights in ranked[:self.elite_count]]
+        if self.best_fitness is None or ranked[0][0] > self.best_fitness:
+            self.best_fitness, self.best_weights = ranked[0]
+
+        # Refit mean and per-dimension spread to the elites, keeping a floor
+        # on sigma so the search does not collapse early
+        for i in range(len(self.mean)):
+            values = [weights[i] for weights in elites]
+            mean = sum(values) / len(values)
+            variance = sum((v - mean) ** 2 for v in values) / len(values)
+            self.mean[i] = mean
+            self.sigmas[i] = max(variance ** 0.5, 0.01)
+
+        report = {
+            'generation': len(self.history),
+            'best_fitness': ranked[0][0],
+            'mean_fitness': sum(fitness) / len(fitness),
+            'best_so_far': self.best_fitness,
+            'games_played': played,
+            'cache_hits': len(candidates) * len(self.seeds) - played,
+            'seconds': elapsed,
+            'games_per_second': played / elapsed if elapsed > 0 else 0.0,
+            'pieces_per_second': pieces / elapsed if elapsed > 0 and played else 0.0,
+        }
+        self.history.append(report)
+        logger.info(f"Generation {report['generation']}: best {report['best_fitness']:.1f}, "
+                    f"mean {report['mean_fitness']:.1f}, {played} games "
+                    f"({report['cache_hits']} cached), {report['games_per_second']:.2f} games/s")
+        return report
+
+    def run(self, generations):
+        """Run several generations across the process pool; may be called again to continue"""
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+                for _ in range(generations):
+                    self.step(executor)
+        else:
+            for _ in range(generations):
+                self.step()
+        return self.best_weights, self.best_fitness
+
+    def close(self):
+        """Close the fitness cache file"""
+        self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_benchmark(generations=2, population=8, seeds=(1, 2), max_pieces=150, workers=None):
+    """Tuner throughput with a cold and then a warm cache"""
+    import tempfile
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'fitness.jsonl')
+        for label in ('cold', 'warm'):
+            with WeightTuner(seeds, population=population, max_pieces=max_pieces,
+                             workers=workers, cache_path=cache_path) as tuner:
+                start = time.perf_counter()
+                tuner.run(generations)
+                elapsed = time.perf_counter() - start
+            results.append({
+                'cache': label,
+                'workers': tuner.workers,
+                'generations': generations,
+                'games_played': sum(r['games_played'] for r in tuner.history),
+                'cache_hits': sum(r['cache_hits'] for r in tuner.history),
+                'seconds': elapsed,
+                'best_fitness': tuner.best_fitness,
+            })
+    return results
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Tune bot evaluation weights")
+    parser.add_argument('--generations', type=int, default=10)
+    parser.add_argument('--population', type=int, default=16)
+    parser.add_argument('--seeds', type=int, nargs='+', default=list(range(8)))
+    parser.add_argument('--max-pieces', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache', default='tuner_cache.jsonl')
+    args = parser.parse_args(argv)
+
+    _init_worker()
+    logging.disable(logging.NOTSET)
+    logging.getLogger('main').setLevel(logging.WARNING)
+    with WeightTuner(args.seeds, population=args.population, max_pieces=args.max_pieces,
+                     workers=args.workers, cache_path=args.cache) as tuner:
+        best_weights, best_fitness = tuner.run(args.generations)
+    print(f"Best fitness {best_fitness:.1f} lines with weights:")
+    for name, weight in zip(FEATURES, best_weights):
+        print(f"   {name}: {weight:.6f}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -10,15 +10,34 @@ from pieces import PieceColors
 
 logger = logging.getLogger(__name__)
 
+# Detail levels, stepped down by lod.LODController when frames overrun their budget
+LOD_FULL = 0
+LOD_NO_GRID_LINES = 1       # skip the grid line overlay
+LOD_FLAT_BLOCKS = 2         # also skip the 3D border pass on blocks
+LOD_CACHED_TEXT = 3         # also reuse score board text between refreshes
+LOD_DYNAMIC_ONLY = 4        # also keep the background and instructions already on the target
+LOD_LEVELS = 5
+TEXT_REFRESH_FRAMES = 15    # score board refresh interval at LOD_CACHED_TEXT
+
+
+def fit_block_size(columns, rows):
+    """Largest block size (at most BLOCK_SIZE, at least 1 pixel) that keeps a
+    board within the standard field area; stress boards beyond it grow the layout"""
+    return max(1, min(BLOCK_SIZE, GRID_WIDTH * BLOCK_SIZE // columns, GRID_HEIGHT * BLOCK_SIZE // rows))
+
+
 class GameField:
     """Game field component - handles the main playing area with grid"""
     
-    def __init__(self, x=0, y=0):
+    def __init__(self, x=0, y=0, columns=GRID_WIDTH, rows=GRID_HEIGHT, block_size=BLOCK_SIZE):
         """Initialize game field at specified position"""
         self.x = x
         self.y = y
-        self.width = GRID_WIDTH * BLOCK_SIZE
-        self.height = GRID_HEIGHT * BLOCK_SIZE
+        self.columns = columns
+        self.rows = rows
+        self.block_size = block_size
+        self.width = columns * block_size
+        self.height = rows * block_size
         
         # Initialize fonts for any text in game field
         pygame.font.init()
@@ -39,17 +58,19 @@ class GameField:
     
     def draw_grid_lines(self, screen):
         """Draw grid lines only within the game field"""
+        if self.block_size < 4:
+            return  # Lines would cover the blocks on dense stress boards
         try:
             # Draw vertical lines (only within game field)
-            for x in range(GRID_WIDTH + 1):
-                line_x = self.x + (x * BLOCK_SIZE)
+            for x in range(self.columns + 1):
+                line_x = self.x + (x * self.block_size)
                 pygame.draw.line(screen, PieceColors.GRID_BORDER,
                                (line_x, self.y),
                                (line_x, self.y + self.height), 1)
             
             # Draw horizontal lines (only within game field)
-            for y in range(GRID_HEIGHT + 1):
-                line_y = self.y + (y * BLOCK_SIZE)
+            for y in range(self.rows + 1):
+                line_y = self.y + (y * self.block_size)
                 pygame.draw.line(screen, PieceColors.GRID_BORDER,
                                (self.x, line_y),
                                (self.x + self.width, line_y), 1)
@@ -57,29 +78,35 @@ class GameField:
         except Exception as e:
             logger.error(f"Error drawing game field grid: {e}")
     
-    def draw_pieces(self, screen, grid, current_piece, piece_x, piece_y, current_piece_type):
+    def draw_pieces(self, screen, grid, current_piece, piece_x, piece_y, current_piece_type, borders=True):
         """Draw placed pieces and current piece within game field"""
         try:
             # Import here to avoid circular imports
             from pieces import get_piece_color, get_piece_border_color
             
-            # Draw placed pieces
-            for y in range(GRID_HEIGHT):
-                for x in range(GRID_WIDTH):
-                    if grid[y][x] != 0:
-                        piece_type = grid[y][x] - 1
+            # Draw placed pieces (empty rows are skipped before any lookups);
+            # borders would cover the whole block on dense stress boards
+            size = self.block_size
+            borders = borders and size >= 4
+            for y, row in enumerate(grid):
+                if not any(row):
+                    continue
+                block_y = self.y + (y * size)
+                for x, cell in enumerate(row):
+                    if cell != 0:
+                        piece_type = cell - 1
                         color = get_piece_color(piece_type)
                         border_color = get_piece_border_color(piece_type)
                         
                         # Calculate position within game field
-                        block_x = self.x + (x * BLOCK_SIZE)
-                        block_y = self.y + (y * BLOCK_SIZE)
+                        block_x = self.x + (x * size)
                         
                         # Draw 3D block effect
                         pygame.draw.rect(screen, color, 
-                                       (block_x, block_y, BLOCK_SIZE, BLOCK_SIZE))
-                        pygame.draw.rect(screen, border_color, 
-                                       (block_x, block_y, BLOCK_SIZE, BLOCK_SIZE), 2)
+                                       (block_x, block_y, size, size))
+                        if borders:
+                            pygame.draw.rect(screen, border_color, 
+                                           (block_x, block_y, size, size), 2)
             
             # Draw current falling piece
             if current_piece:
@@ -90,32 +117,47 @@ class GameField:
                     for px, cell in enumerate(row):
                         if cell == '#':
                             # Calculate position within game field
-                            block_x = self.x + ((piece_x + px) * BLOCK_SIZE)
-                            block_y = self.y + ((piece_y + py) * BLOCK_SIZE)
+                            block_x = self.x + ((piece_x + px) * size)
+                            block_y = self.y + ((piece_y + py) * size)
                             
                             # Only draw if within game field bounds
-                            if (0 <= piece_x + px < GRID_WIDTH and 
-                                0 <= piece_y + py < GRID_HEIGHT):
+                            if (0 <= piece_x + px < self.columns and 
+                                0 <= piece_y + py < self.rows):
                                 
                                 # Draw 3D block effect
                                 pygame.draw.rect(screen, current_color, 
-                                               (block_x, block_y, BLOCK_SIZE, BLOCK_SIZE))
-                                pygame.draw.rect(screen, current_border, 
-                                               (block_x, block_y, BLOCK_SIZE, BLOCK_SIZE), 2)
+                                               (block_x, block_y, size, size))
+                                if borders:
+                                    pygame.draw.rect(screen, current_border, 
+                                                   (block_x, block_y, size, size), 2)
                                                
         except Exception as e:
             logger.error(f"Error drawing pieces in game field: {e}")
     
-    def draw(self, screen, grid, current_piece, piece_x, piece_y, current_piece_type):
-        """Draw complete game field"""
+    def draw(self, screen, grid, current_piece, piece_x, piece_y, current_piece_type,
+             grid_lines=True, borders=True):
+        """Draw complete game field, optionally without grid lines or block borders"""
         self.draw_background(screen)
-        self.draw_grid_lines(screen)
-        self.draw_pieces(screen, grid, current_piece, piece_x, piece_y, current_piece_type)
+        if grid_lines:
+            self.draw_grid_lines(screen)
+        self.draw_pieces(screen, grid, current_piece, piece_x, piece_y, current_piece_type, borders)
 
 
 class ScoreBoard:
     """Score board component - handles score, level, lines display"""
     
+    # One row per value: label, draw state key, y offset of the label, big
+    # value font, value colour and value format; values sit VALUE_OFFSET
+    # below their labels
+    FIELDS = (
+        ('SCORE', 'score', 0, True, Colors.YELLOW, '{:08d}'),
+        ('LEVEL', 'level', 70, True, Colors.CYAN, '{}'),
+        ('LINES', 'lines_cleared', 140, True, Colors.GREEN, '{}'),
+        ('PIECES', 'total_pieces', 210, False, Colors.LIGHT_GRAY, '{}'),
+        ('SPEED', 'fall_speed', 260, False, Colors.LIGHT_GRAY, '{}ms'),
+    )
+    VALUE_OFFSET = 20
+    
     def __init__(self, x, y, width=200):
         """Initialize score board at specified position"""
         self.x = x
@@ -128,6 +170,9 @@ class ScoreBoard:
         self.font = pygame.font.Font(None, 24)
         self.big_font = pygame.font.Font(None, 36)
         
+        # Rendered text and positions from the last refresh
+        self.text_cache = []
+        
     def draw_background(self, screen):
         """Draw score board background"""
         try:
@@ -142,49 +187,27 @@ class ScoreBoard:
     def draw_score_info(self, screen, score, level, lines_cleared, total_pieces, fall_speed):
         """Draw all score information"""
         try:
-            current_y = self.y
-            
-            # Score
-            score_text = self.font.render("SCORE", True, Colors.WHITE)
-            score_value = self.big_font.render(f"{score:08d}", True, Colors.YELLOW)
-            screen.blit(score_text, (self.x, current_y))
-            screen.blit(score_value, (self.x, current_y + 20))
-            current_y += 70
-            
-            # Level
-            level_text = self.font.render("LEVEL", True, Colors.WHITE)
-            level_value = self.big_font.render(f"{level}", True, Colors.CYAN)
-            screen.blit(level_text, (self.x, current_y))
-            screen.blit(level_value, (self.x, current_y + 20))
-            current_y += 70
+            values = (score, level, lines_cleared, total_pieces, fall_speed)
+            texts = []
+            for (label, _, offset, big, color, fmt), value in zip(self.FIELDS, values):
+                y = self.y + offset
+                font = self.big_font if big else self.font
+                texts.append((self.font.render(label, True, Colors.WHITE), (self.x, y)))
+                texts.append((font.render(fmt.format(value), True, color), (self.x, y + self.VALUE_OFFSET)))
             
-            # Lines
-            lines_text = self.font.render("LINES", True, Colors.WHITE)
-            lines_value = self.big_font.render(f"{lines_cleared}", True, Colors.GREEN)
-            screen.blit(lines_text, (self.x, current_y))
-            screen.blit(lines_value, (self.x, current_y + 20))
-            current_y += 70
-            
-            # Pieces (bonus info)
-            pieces_text = self.font.render("PIECES", True, Colors.WHITE)
-            pieces_value = self.font.render(f"{total_pieces}", True, Colors.LIGHT_GRAY)
-            screen.blit(pieces_text, (self.x, current_y))
-            screen.blit(pieces_value, (self.x, current_y + 20))
-            current_y += 50
-            
-            # Speed indicator
-            speed_text = self.font.render("SPEED", True, Colors.WHITE)
-            speed_value = self.font.render(f"{fall_speed}ms", True, Colors.LIGHT_GRAY)
-            screen.blit(speed_text, (self.x, current_y))
-            screen.blit(speed_value, (self.x, current_y + 20))
+            screen.blits(texts, doreturn=False)
+            self.text_cache = texts
             
         except Exception as e:
             logger.error(f"Error drawing score info: {e}")
     
-    def draw(self, screen, score, level, lines_cleared, total_pieces, fall_speed):
-        """Draw complete score board"""
+    def draw(self, screen, score, level, lines_cleared, total_pieces, fall_speed, refresh=True):
+        """Draw complete score board; refresh=False reuses the last rendered text"""
         self.draw_background(screen)
-        self.draw_score_info(screen, score, level, lines_cleared, total_pieces, fall_speed)
+        if refresh or not self.text_cache:
+            self.draw_score_info(screen, score, level, lines_cleared, total_pieces, fall_speed)
+        else:
+            screen.blits(self.text_cache, doreturn=False)
 
 
 class HowToPlayPanel:
@@ -230,7 +253,7 @@ class HowToPlayPanel:
             # Control instructions
             controls = [
                 "[LEFT] [RIGHT] - Move pieces",
-                "[UP] - Rotate pieces", 
+                "[UP] [Z] [A] - Rotate CW/CCW/180",
                 "[DOWN] - Soft drop (+1pt/cell)",
                 "[SPACE] - Hard drop (+2pt/cell)",
             ]
@@ -269,10 +292,15 @@ class HowToPlayPanel:
 class GameUI:
     """Main UI coordinator - manages all UI components"""
     
-    def __init__(self):
-        """Initialize all UI components with proper positioning"""
+    def __init__(self, columns=GRID_WIDTH, rows=GRID_HEIGHT):
+        """Initialize all UI components with proper positioning
+        
+        Boards larger than the standard one are drawn with smaller blocks;
+        past one pixel per cell the layout (logical_size) grows instead.
+        """
         # Game field positioned at top-left
-        self.game_field = GameField(x=10, y=10)
+        self.game_field = GameField(x=10, y=10, columns=columns, rows=rows,
+                                    block_size=fit_block_size(columns, rows))
         
         # Score board positioned to the right of game field
         score_x = self.game_field.x + self.game_field.width + 20
@@ -282,15 +310,45 @@ class GameUI:
         help_y = self.game_field.y + self.game_field.height + 20
         self.how_to_play = HowToPlayPanel(x=10, y=help_y)
         
+        # Level of detail (LOD_FULL .. LOD_DYNAMIC_ONLY), set by lod.LODController
+        self.lod_level = LOD_FULL
+        self.frames_drawn = 0
+        self._last_screen = None
+        
+        # Logical resolution: the standard window, extended by any field overflow
+        self.logical_size = (WINDOW_WIDTH + max(0, self.game_field.width - GRID_WIDTH * BLOCK_SIZE),
+                             WINDOW_HEIGHT + max(0, self.game_field.height - GRID_HEIGHT * BLOCK_SIZE))
+        
     def draw_background(self, screen):
         """Draw main window background"""
         screen.fill(Colors.BLACK)
     
+    def draw_static(self, screen):
+        """Draw the parts of the UI that never change, for cached layers"""
+        self.draw_background(screen)
+        self.game_field.draw_background(screen)
+        self.game_field.draw_grid_lines(screen)
+        self.score_board.draw_background(screen)
+        self.how_to_play.draw(screen)
+    
+    def dynamic_rects(self):
+        """Screen areas whose contents change during play"""
+        field = self.game_field
+        board = self.score_board
+        return [pygame.Rect(field.x, field.y, field.width, field.height),
+                pygame.Rect(board.x - 5, board.y - 5, board.width + 10, board.height + 10)]
+    
     def draw(self, screen, game_state):
         """Draw complete UI with all components"""
         try:
+            # Static parts can stay when redrawing the same persistent surface
+            lod = self.lod_level
+            full = lod < LOD_DYNAMIC_ONLY or screen is not self._last_screen
+            self._last_screen = screen
+            
             # Draw main background
-            self.draw_background(screen)
+            if full:
+                self.draw_background(screen)
             
             # Draw game field with pieces
             self.game_field.draw(screen, 
@@ -298,7 +356,9 @@ class GameUI:
                                 game_state['current_piece'],
                                 game_state['piece_x'], 
                                 game_state['piece_y'],
-                                game_state['current_piece_type'])
+                                game_state['current_piece_type'],
+                                grid_lines=lod < LOD_NO_GRID_LINES,
+                                borders=lod < LOD_FLAT_BLOCKS)
             
             # Draw score board
             self.score_board.draw(screen,
@@ -306,10 +366,13 @@ class GameUI:
                                  game_state['level'],
                                  game_state['lines_cleared'],
                                  game_state['total_pieces'],
-                                 game_state['fall_speed'])
+                                 game_state['fall_speed'],
+                                 refresh=lod < LOD_CACHED_TEXT or self.frames_drawn % TEXT_REFRESH_FRAMES == 0)
+            self.frames_drawn += 1
             
             # Draw how-to-play panel
-            self.how_to_play.draw(screen)
+            if full:
+                self.how_to_play.draw(screen)
             
         except Exception as e:
             logger.error(f"Error drawing game UI: {e}")
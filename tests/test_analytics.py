@@ -0,0 +1,64 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analytics import (ArchiveStats, analyze, archive_events, select, record_sample_games,
+                       file_kind)
+
+
+def long_games(replay):
+    """Module-level replay filter so it can be used with a process pool"""
+    return replay.pieces >= 20
+
+
+class TestAnalytics(unittest.TestCase):
+    """Test the streaming analytics pipeline"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.replay_path = os.path.join(cls.tmp.name, 'games.replay')
+        cls.log_path = os.path.join(cls.tmp.name, 'games.jsonl')
+        record_sample_games(cls.replay_path, cls.log_path, games=12, seed=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_file_detection(self):
+        """Test replay files are told apart from event logs"""
+        self.assertEqual(file_kind(self.replay_path), 'replay')
+        self.assertEqual(file_kind(self.log_path), 'event_log')
+
+    def test_replays_and_logs_agree(self):
+        """Test re-simulated replays give the same statistics as the event log"""
+        from_replays = analyze([self.replay_path]).summary()
+        from_log = analyze([self.log_path]).summary()
+        self.assertEqual(from_replays, from_log)
+        self.assertEqual(from_log['games'], 12)
+        self.assertAlmostEqual(sum(from_log['piece_distribution'].values()), 1.0)
+        self.assertGreater(from_log['pieces_per_second'], 0)
+
+    def test_merge_matches_single_pass(self):
+        """Test merged per-file aggregates equal one pass over all records"""
+        paths = [self.replay_path, self.log_path]
+        single = ArchiveStats().consume(archive_events(paths)).summary()
+        self.assertEqual(analyze(paths, workers=2).summary(), single)
+        self.assertEqual(single['games'], 24)
+
+    def test_filters(self):
+        """Test replay filters and record selection"""
+        stats = analyze([self.replay_path], replay_filter=long_games)
+        self.assertLessEqual(stats.games, 12)
+        overs = list(select(archive_events([self.log_path]), 'game_over'))
+        self.assertEqual(stats.games, sum(1 for r in overs if r['pieces'] >= 20))
+        first = list(select(archive_events([self.log_path]), 'lock', game=0))
+        self.assertTrue(all(r['game'] == 0 for r in first))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from archive import ArchiveWriter, ReplayArchive, ArchiveError
+from analytics import analyze, file_kind, record_sample_games
+from replay import Replay, read_replays, play_replay
+
+
+def make_replay(game_id, seed):
+    return Replay(game_id, seed, game_id * 10, 0, 0, 0, 0, bytes([1, 2, 3]) * (game_id % 7 + 1))
+
+
+class TestReplayArchive(unittest.TestCase):
+    """Test the indexed, compressed replay archive"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'games.tra')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookup_by_id_and_seed(self):
+        """Test random access across several small segments"""
+        with ArchiveWriter(self.path, segment_bytes=256) as writer:
+            for game_id in reversed(range(200)):
+                writer.add(make_replay(game_id, game_id % 13))
+        with ReplayArchive(self.path) as archive:
+            self.assertEqual(len(archive), 200)
+            for game_id in (0, 57, 58, 199, 3):
+                self.assertEqual(archive.get(game_id), make_replay(game_id, game_id % 13))
+            with self.assertRaises(KeyError):
+                archive.get(200)
+            found = archive.find_seed(5)
+            self.assertEqual(sorted(r.game_id for r in found), list(range(5, 200, 13)))
+            self.assertEqual(archive.find_seed(99), [])
+
+    def test_scan_and_append(self):
+        """Test reopening appends and scans return every replay in order"""
+        with ArchiveWriter(self.path, segment_bytes=100) as writer:
+            for game_id in range(50):
+                writer.add(make_replay(game_id, 1))
+        with open(self.path, 'rb') as archive_file:
+            first = archive_file.read()
+        with ArchiveWriter(self.path, segment_bytes=100) as writer:
+            for game_id in range(50, 80):
+                writer.add(make_replay(game_id, 2))
+        size = os.path.getsize(self.path)
+        with ArchiveWriter(self.path, segment_bytes=100) as writer:
+            pass
+        self.assertEqual(os.path.getsize(self.path), size)
+        with open(self.path, 'rb') as archive_file:
+            # Reopening only appends: the old segments and index stay in place
+            self.assertEqual(archive_file.read(len(first)), first)
+        with ReplayArchive(self.path) as archive:
+            self.assertEqual([r.game_id for r in archive.scan()], list(range(80)))
+            self.assertEqual(len(archive.find_seed(2)), 30)
+            self.assertEqual(archive.get(10), make_replay(10, 1))
+
+    def test_unclosed_archive_rejected(self):
+        """Test an archive without an index is reported"""
+        writer = ArchiveWriter(self.path)
+        writer.add(make_replay(1, 1))
+        writer._flush_segment()
+        writer._file.close()
+        with self.assertRaises(ArchiveError):
+            ReplayArchive(self.path)
+
+    def test_interrupted_append_keeps_earlier_games(self):
+        """Test a writer that dies mid-append leaves the previous index readable"""
+        with ArchiveWriter(self.path, segment_bytes=100) as writer:
+            for game_id in range(40):
+                writer.add(make_replay(game_id, 1))
+        writer = ArchiveWriter(self.path, segment_bytes=100)
+        for game_id in range(40, 60):
+            writer.add(make_replay(game_id, 2))
+        writer._flush_segment()
+        writer._file.close()
+        with ReplayArchive(self.path) as archive:
+            self.assertEqual(len(archive), 40)
+            self.assertEqual(archive.get(39), make_replay(39, 1))
+            self.assertEqual([r.game_id for r in archive.scan()], list(range(40)))
+        with ArchiveWriter(self.path, segment_bytes=100) as writer:
+            writer.add(make_replay(40, 2))
+        with ReplayArchive(self.path) as archive:
+            self.assertEqual([r.game_id for r in archive.scan()], list(range(41)))
+
+    def test_duplicate_game_id_rejected(self):
+        """Test a game id can only be archived once"""
+        with ArchiveWriter(self.path) as writer:
+            writer.add(make_replay(1, 1))
+            with self.assertRaises(ValueError):
+                writer.add(make_replay(1, 2))
+        with ArchiveWriter(self.path) as writer:
+            with self.assertRaises(ValueError):
+                writer.add(make_replay(1, 3))
+            writer.add(make_replay(2, 3))
+        with ReplayArchive(self.path) as archive:
+            self.assertEqual(len(archive), 2)
+
+    def test_archived_games_replay_and_analyze(self):
+        """Test real games come back playable and feed the analytics pipeline"""
+        replay_path = os.path.join(self.tmp.name, 'games.replay')
+        record_sample_games(replay_path, os.path.join(self.tmp.name, 'games.jsonl'), games=5, seed=1)
+        with ArchiveWriter(self.path) as writer:
+            for replay in read_replays(replay_path):
+                writer.add(replay)
+        self.assertEqual(file_kind(self.path), 'archive')
+        with ReplayArchive(self.path) as archive:
+            replay = archive.get(3)
+            self.assertEqual(play_replay(replay).last_game['score'], replay.score)
+        self.assertEqual(analyze([self.path]).summary(), analyze([replay_path]).summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
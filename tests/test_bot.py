@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import Tetris
+from bot import (TetrisBot, Placement, grid_to_rows, drop_placement, board_features,
+                 play_game, game_board, DECISION_BUDGET_MS)
+from config import GRID_WIDTH, GRID_HEIGHT, Scoring
+from pieces import PIECE_I
+
+
+class TestBotBoardModel(unittest.TestCase):
+    """Test the bot's bitmask board model against the engine"""
+
+    def test_grid_to_rows(self):
+        """Test grid conversion sets one bit per filled cell"""
+        game = Tetris(seed=1)
+        game.grid[GRID_HEIGHT - 1][0] = 1
+        game.grid[GRID_HEIGHT - 1][GRID_WIDTH - 1] = 3
+        rows = grid_to_rows(game.grid)
+        self.assertEqual(rows[GRID_HEIGHT - 1], 1 | (1 << (GRID_WIDTH - 1)))
+        self.assertEqual(sum(rows[:-1]), 0)
+
+    def test_drop_placement_clears_lines(self):
+        """Test that a vertical I-piece completes four prepared rows"""
+        full_but_last = (1 << (GRID_WIDTH - 1)) - 1
+        rows = tuple([0] * (GRID_HEIGHT - 4) + [full_but_last] * 4)
+        # Vertical I occupies column 2 of its 5x5 box
+        result = drop_placement(rows, PIECE_I, Placement(1, GRID_WIDTH - 3))
+        self.assertIsNotNone(result)
+        new_rows, cleared = result
+        self.assertEqual(cleared, 4)
+        self.assertEqual(sum(new_rows), 0)
+
+    def test_board_features_counts_holes(self):
+        """Test hole counting under an overhang"""
+        rows = [0] * GRID_HEIGHT
+        rows[GRID_HEIGHT - 2] = 1
+        features = dict(zip(('height', 'lines', 'holes', 'bumpiness'),
+                            board_features(tuple(rows), 0)))
+        self.assertEqual(features['holes'], 1)
+        self.assertEqual(features['height'], 2)
+
+    def test_bot_placement_matches_engine(self):
+        """Test that executing a placement gives the board the bot predicted"""
+        game = Tetris(seed=7)
+        bot = TetrisBot(beam_width=4, lookahead=1)
+        for _ in range(30):
+            rows = grid_to_rows(game.grid)
+            piece_type = game.current_piece_type
+            placement = bot.choose_move(game)
+            expected = drop_placement(rows, piece_type, placement)
+            bot.execute(game, placement)
+            self.assertEqual(grid_to_rows(game.grid), expected[0])
+
+    def test_non_default_board(self):
+        """Test the bot plays a wider, taller board using all of its columns"""
+        game = Tetris(seed=7, headless=True, width=20, height=40)
+        board = game_board(game)
+        self.assertEqual((board.width, board.height, board.spawn_x), (20, 40, game.spawn_x))
+        bot = TetrisBot(beam_width=4, lookahead=1)
+        used = set()
+        for _ in range(60):
+            rows = grid_to_rows(game.grid)
+            piece_type = game.current_piece_type
+            placement = bot.choose_move(game)
+            expected = drop_placement(rows, piece_type, placement, board)
+            self.assertIsNotNone(expected)
+            bot.execute(game, placement)
+            self.assertEqual(grid_to_rows(game.grid), expected[0])
+            used.add(placement.x)
+        self.assertEqual(game.games_played, 0)
+        self.assertGreater(max(used), GRID_WIDTH)
+
+
+class TestBotPlay(unittest.TestCase):
+    """Test the bot playing full games"""
+
+    def test_bot_clears_lines(self):
+        """Test that the bot clears lines without topping out early"""
+        game = Tetris(seed=3)
+        bot = TetrisBot(beam_width=4, lookahead=1)
+        stats = play_game(game, bot, max_pieces=120)
+        self.assertGreater(stats['lines'], 20)
+        self.assertEqual(game.games_played, 0)
+
+    def test_latency_report(self):
+        """Test that decision latency is measured against the level 29 budget"""
+        game = Tetris(seed=5)
+        bot = TetrisBot(beam_width=2, lookahead=0)
+        for _ in range(10):
+            bot.play_piece(game)
+        report = bot.latency_report()
+        self.assertEqual(report['decisions'], 10)
+        self.assertEqual(report['budget_ms'], Scoring.LEVEL_SPEEDS[29])
+        self.assertEqual(DECISION_BUDGET_MS, Scoring.LEVEL_SPEEDS[29])
+        self.assertLessEqual(report['mean_ms'], report['max_ms'])
+
+    def test_invalid_weights_rejected(self):
+        """Test that a weight vector of the wrong size is rejected"""
+        with self.assertRaises(ValueError):
+            TetrisBot(weights=(1.0, 2.0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
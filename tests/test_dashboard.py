@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from main import Tetris
+from pieces import PieceColors, get_piece_color
+from dashboard import Dashboard, BotFleet, draw_naive, HEADER_HEIGHT
+
+
+class TestDashboard(unittest.TestCase):
+    """Test cases for the multi-board dashboard"""
+
+    def setUp(self):
+        self.games = [Tetris(seed=i, headless=True) for i in range(4)]
+        self.dashboard = Dashboard(self.games, cell_size=4)
+        self.screen = pygame.Surface(self.dashboard.size)
+
+    def tearDown(self):
+        self.dashboard.close()
+
+    def test_only_changed_boards_redrawn(self):
+        """Test a frame redraws only the tiles whose game changed"""
+        self.assertEqual(self.dashboard.draw(self.screen), [self.screen.get_rect()])
+        self.assertEqual(self.dashboard.draw(self.screen), [])
+
+        self.games[2].apply_input('left')
+        dirty = self.dashboard.draw(self.screen)
+        self.assertEqual(len(dirty), 1)
+        self.assertEqual(dirty[0].topleft, self.dashboard.position(2))
+
+        self.dashboard.invalidate()
+        self.assertEqual(self.dashboard.draw(self.screen), [self.screen.get_rect()])
+
+    def test_locked_cells_redraw_board(self):
+        """Test locks and garbage refresh the cached board"""
+        game = self.games[0]
+        tile = self.dashboard.tiles[0]
+        self.dashboard.draw(self.screen)
+        game.apply_input('hard_drop')
+        game.add_garbage(1, hole_x=0)
+        self.dashboard.draw(self.screen)
+
+        size = self.dashboard.atlas.cell_size
+        bottom = (size + size // 2, (len(game.grid) - 1) * size + size // 2)
+        self.assertEqual(tuple(tile.board.get_at(bottom))[:3], get_piece_color(game.grid[-1][1] - 1))
+        hole = (size // 2, bottom[1])
+        self.assertEqual(tuple(tile.board.get_at(hole))[:3], PieceColors.GRID_BACKGROUND)
+
+    def test_matches_naive_drawing(self):
+        """Test the cached tiles show the same blocks as per-cell drawing"""
+        fleet = BotFleet(4, seed=3, think_frames=5)
+        dashboard = Dashboard(fleet.games, cell_size=4)
+        cached = pygame.Surface(dashboard.size)
+        naive = pygame.Surface(dashboard.size)
+        try:
+            for _ in range(60):
+                fleet.step(50)
+                dashboard.draw(cached)
+            draw_naive(naive, fleet.games, dashboard)
+            size = dashboard.atlas.cell_size
+            for index in range(len(fleet.games)):
+                left, top = dashboard.position(index)
+                for y in range(20):
+                    for x in range(10):
+                        point = (left + x * size + size // 2, top + HEADER_HEIGHT + y * size + size // 2)
+                        self.assertEqual(cached.get_at(point), naive.get_at(point))
+        finally:
+            dashboard.close()
+
+    def test_board_size_follows_game(self):
+        """Test tiles and naive drawing cover the whole of a larger board"""
+        games = [Tetris(seed=1, headless=True), Tetris(seed=2, headless=True, width=16, height=30)]
+        dashboard = Dashboard(games, cell_size=4)
+        cached = pygame.Surface(dashboard.size)
+        naive = pygame.Surface(dashboard.size)
+        try:
+            big = games[1]
+            for _ in range(big.width):
+                big.apply_input('right')
+            big.apply_input('hard_drop')
+            dashboard.draw(cached)
+            self.assertEqual(dashboard.tiles[1].board_size, (16 * 4, 30 * 4))
+            draw_naive(naive, games, dashboard)
+            size = dashboard.atlas.cell_size
+            left, top = dashboard.position(1)
+            filled = 0
+            for y in range(big.height):
+                for x in range(big.width):
+                    point = (left + x * size + size // 2, top + HEADER_HEIGHT + y * size + size // 2)
+                    self.assertEqual(cached.get_at(point), naive.get_at(point))
+                    filled += tuple(cached.get_at(point))[:3] != PieceColors.GRID_BACKGROUND
+            self.assertEqual(filled, 4 + 4)
+        finally:
+            dashboard.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import WINDOW_WIDTH, WINDOW_HEIGHT
+from analytics import record_sample_games
+from replay import read_replays, play_replay
+from export import export_replay, replay_frames, plan_segments, step_frame
+
+
+class TestExport(unittest.TestCase):
+    """Test replay frame export"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.tmp.name, 'games.replay')
+        record_sample_games(path, os.path.join(cls.tmp.name, 'games.jsonl'), games=2, seed=4)
+        cls.replay = next(read_replays(path))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_frames_reach_game_over(self):
+        """Test stepping the split frames ends the game like playback does"""
+        from main import Tetris
+        game = Tetris(seed=self.replay.seed, headless=True)
+        frames = replay_frames(self.replay)
+        steps = 0
+        while step_frame(game, frames[steps]):
+            steps += 1
+        self.assertEqual(game.last_game, play_replay(self.replay).last_game)
+        segments, played = plan_segments(self.replay, frames, 10)
+        self.assertEqual(played, steps)
+        self.assertEqual(segments[1][0], 10)
+
+    def test_parallel_raw_matches_serial(self):
+        """Test segmented pool rendering gives the same bytes as one pass"""
+        serial = os.path.join(self.tmp.name, 'serial.rgb')
+        pooled = os.path.join(self.tmp.name, 'pooled.rgb')
+        first = export_replay(self.replay, serial, fmt='raw', workers=1, segment_frames=1000, max_frames=30)
+        second = export_replay(self.replay, pooled, fmt='raw', workers=2, segment_frames=7, max_frames=30)
+        self.assertEqual(first['frames'], 30)
+        self.assertEqual(second['segments'], 5)
+        self.assertEqual(os.path.getsize(serial), 30 * WINDOW_WIDTH * WINDOW_HEIGHT * 3)
+        with open(serial, 'rb') as a, open(pooled, 'rb') as b:
+            self.assertTrue(a.read() == b.read())
+
+    def test_png_sequence(self):
+        """Test PNG export names frames by index and honours every"""
+        output = os.path.join(self.tmp.name, 'png')
+        report = export_replay(self.replay, output, workers=1, every=5, max_frames=20)
+        self.assertEqual(report['frames'], 4)
+        self.assertEqual(sorted(os.listdir(output)),
+                         [f'frame_{i:06d}.png' for i in (0, 5, 10, 15)])
+
+
+if __name__ == '__main__':
+    unittest.main()
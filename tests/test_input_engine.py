@@ -0,0 +1,125 @@
+import unittest
+import random
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import Tetris
+from replay import ReplayRecorder, play_replay
+from input_engine import InputEngine
+
+
+def scripted_session(seed, presses=300):
+    """Timestamped (time, pressed, action) key events of a made-up player"""
+    rng = random.Random(seed)
+    events = []
+    t = 0
+    for _ in range(presses):
+        t += rng.randint(20, 250)
+        action = rng.choice(('left', 'right', 'down', 'rotate', 'hard_drop'))
+        events.append((t, True, action))
+        events.append((t + rng.choice((30, 120, 400)), False, action))
+    return events
+
+
+def run_session(events, frame_times, seed=11, until_game_over=True):
+    """Feed the events through an engine in frames of the given lengths"""
+    game = Tetris(seed=seed, headless=True)
+    engine = InputEngine(game)
+    replays = []
+    recorder = ReplayRecorder(game, replays.append)
+    for t, pressed, action in events:
+        if pressed:
+            engine.press(action, t)
+        else:
+            engine.release(action, t)
+    for dt in frame_times:
+        engine.tick(dt)
+        if replays and until_game_over:
+            break
+    recorder.close()
+    return game, engine, replays
+
+
+class TestInputEngine(unittest.TestCase):
+    """Test cases for DAS/ARR input handling"""
+
+    def setUp(self):
+        self.game = Tetris(seed=3, headless=True)
+        self.engine = InputEngine(self.game, das_ms=170, arr_ms=50, soft_drop_ms=50)
+
+    def run_frames(self, frames, dt=16):
+        for _ in range(frames):
+            self.engine.tick(dt)
+
+    def test_delayed_auto_shift(self):
+        """Test a held key moves once, waits DAS, then repeats every ARR"""
+        self.engine.press('left', 0)
+        self.engine.release('left', 400)
+        self.run_frames(30)
+        self.assertEqual([t for t, _ in self.engine.applied], [0, 170, 220, 270, 320, 370])
+        self.assertEqual(self.engine.held, {})
+
+    def test_last_direction_wins(self):
+        """Test the most recent direction takes over and the other recharges DAS on its release"""
+        self.engine.press('left', 0)
+        self.engine.press('right', 100)
+        self.engine.release('right', 150)
+        self.engine.release('left', 400)
+        self.run_frames(30)
+        self.assertEqual(list(self.engine.applied),
+                         [(0, 'left'), (100, 'right'), (320, 'left'), (370, 'left')])
+
+    def test_instant_repeat(self):
+        """Test ARR 0 slides the piece to the wall"""
+        engine = InputEngine(self.game, das_ms=100, arr_ms=0)
+        engine.press('right', 0)
+        for _ in range(10):
+            engine.tick(16)
+        piece_width = max(len(row.rstrip('.')) for row in self.game.current_piece)
+        self.assertEqual(self.game.piece_x + piece_width, 10)
+
+    def test_soft_drop_and_single_shot_actions(self):
+        """Test soft drop repeats while held and rotate does not"""
+        self.engine.press('down', 0)
+        self.engine.press('rotate', 5)
+        self.engine.release('down', 120)
+        self.engine.release('rotate', 200)
+        self.run_frames(20)
+        self.assertEqual(list(self.engine.applied),
+                         [(0, 'down'), (5, 'rotate'), (50, 'down'), (100, 'down')])
+
+    def test_late_event_applied_now(self):
+        """Test an event timestamped in the past takes effect at the current time"""
+        self.run_frames(5)
+        self.engine.press('rotate', 10)
+        self.engine.tick(16)
+        self.assertEqual(list(self.engine.applied), [(80, 'rotate')])
+
+    def test_ordering_independent_of_frames(self):
+        """Test the same key events give the same inputs at any frame split"""
+        events = scripted_session(seed=1, presses=60)
+        rng = random.Random(2)
+        _, even, _ = run_session(events, [16] * 1500, until_game_over=False)
+        _, uneven, _ = run_session(events, [rng.randint(1, 50) for _ in range(1500)],
+                                   until_game_over=False)
+        self.assertGreater(len(even.applied), 60)
+        self.assertEqual(list(even.applied), list(uneven.applied))
+
+    def test_replay_determinism(self):
+        """Test an engine-driven game replays exactly and records identically twice"""
+        events = scripted_session(seed=4)
+        frames = [16, 17, 17] * 10000
+        game, _, replays = run_session(events, frames)
+        self.assertEqual(len(replays), 1)
+        replayed = play_replay(replays[0])
+        self.assertEqual(replayed.last_game, game.last_game)
+
+        _, _, again = run_session(events, frames)
+        self.assertEqual(again[0].ops, replays[0].ops)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from main import Tetris
+from config import WINDOW_WIDTH, WINDOW_HEIGHT, BLOCK_SIZE
+from pieces import PieceColors, get_piece_border_color
+from ui_components import (GameUI, LOD_NO_GRID_LINES, LOD_FLAT_BLOCKS, LOD_CACHED_TEXT,
+                           LOD_DYNAMIC_ONLY, TEXT_REFRESH_FRAMES)
+from lod import LODController
+
+
+class TestLODController(unittest.TestCase):
+    """Test cases for the frame-time controller"""
+
+    def test_steps_down_after_consecutive_overruns(self):
+        """Test the level drops only after down_frames overruns in a row"""
+        controller = LODController(budget_ms=16.0, down_frames=3)
+        for frame_ms in (20, 20, 12, 20, 20):
+            self.assertEqual(controller.record(frame_ms), 0)
+        self.assertEqual(controller.record(20), 1)
+
+    def test_hysteresis(self):
+        """Test frames in the dead band neither step down nor up"""
+        controller = LODController(budget_ms=16.0, up_ratio=0.5, down_frames=1, up_frames=5)
+        controller.record(30)
+        for _ in range(50):
+            self.assertEqual(controller.record(12), 1)
+        for _ in range(4):
+            controller.record(5)
+        self.assertEqual(controller.record(5), 0)
+
+    def test_backoff_after_failed_step_up(self):
+        """Test a step up that overruns at once doubles the wait for the next one"""
+        controller = LODController(budget_ms=16.0, down_frames=1, up_frames=5)
+        controller.record(30)
+        for _ in range(5):
+            controller.record(1)
+        self.assertEqual(controller.level, 0)
+        controller.record(30)
+        for _ in range(5):
+            controller.record(1)
+        self.assertEqual(controller.level, 1)
+        for _ in range(5):
+            controller.record(1)
+        self.assertEqual(controller.level, 0)
+
+    def test_max_level(self):
+        """Test the level never exceeds max_level"""
+        controller = LODController(down_frames=1, max_level=2)
+        for _ in range(10):
+            controller.record(100)
+        self.assertEqual(controller.level, 2)
+        self.assertEqual(controller.changes, 2)
+
+
+class TestDetailLevels(unittest.TestCase):
+    """Test cases for GameUI drawing at reduced detail"""
+
+    def setUp(self):
+        self.game = Tetris(seed=0, headless=True)
+        self.game.grid[19][0] = 1
+        self.ui = GameUI()
+        self.screen = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.field = self.ui.game_field
+
+    def draw(self, level):
+        self.ui.lod_level = level
+        self.ui.draw(self.screen, self.game.get_draw_state())
+
+    def test_grid_lines_and_borders(self):
+        """Test grid lines, then block borders, are dropped"""
+        line = (self.field.x + 5 * BLOCK_SIZE, self.field.y + 10 * BLOCK_SIZE + 5)
+        border = (self.field.x, self.field.y + 19 * BLOCK_SIZE + 15)
+        self.draw(0)
+        self.assertEqual(tuple(self.screen.get_at(line))[:3], PieceColors.GRID_BORDER)
+        self.assertEqual(tuple(self.screen.get_at(border))[:3], get_piece_border_color(0))
+        self.draw(LOD_NO_GRID_LINES)
+        self.assertEqual(tuple(self.screen.get_at(line))[:3], PieceColors.GRID_BACKGROUND)
+        self.assertEqual(tuple(self.screen.get_at(border))[:3], get_piece_border_color(0))
+        self.draw(LOD_FLAT_BLOCKS)
+        self.assertNotEqual(tuple(self.screen.get_at(border))[:3], get_piece_border_color(0))
+
+    def test_cached_score_text(self):
+        """Test score text is only refreshed every TEXT_REFRESH_FRAMES at LOD_CACHED_TEXT"""
+        self.ui.frames_drawn = 1
+        self.draw(LOD_CACHED_TEXT)
+        area = pygame.Rect(self.ui.score_board.x, self.ui.score_board.y + 20, 150, 30)
+        before = pygame.image.tostring(self.screen.subsurface(area), 'RGB')
+        self.game.score = 99999
+        self.draw(LOD_CACHED_TEXT)
+        self.assertEqual(pygame.image.tostring(self.screen.subsurface(area), 'RGB'), before)
+        self.ui.frames_drawn = TEXT_REFRESH_FRAMES
+        self.draw(LOD_CACHED_TEXT)
+        self.assertNotEqual(pygame.image.tostring(self.screen.subsurface(area), 'RGB'), before)
+
+    def test_dynamic_only_keeps_static_parts(self):
+        """Test the deepest level keeps the instructions already on the same surface"""
+        panel = (self.ui.how_to_play.x + 200, self.ui.how_to_play.y + 100)
+        self.draw(LOD_DYNAMIC_ONLY)
+        self.screen.set_at(panel, (1, 2, 3))
+        self.draw(LOD_DYNAMIC_ONLY)
+        self.assertEqual(tuple(self.screen.get_at(panel))[:3], (1, 2, 3))
+
+        fresh = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        fresh.fill((1, 2, 3))
+        self.ui.draw(fresh, self.game.get_draw_state())
+        self.assertNotEqual(tuple(fresh.get_at(panel))[:3], (1, 2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+import logging
+import urllib.request
+import urllib.error
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from main import Tetris, error_loggers
+from config import GRID_WIDTH, GRID_HEIGHT, WINDOW_WIDTH, WINDOW_HEIGHT
+from ui_components import GameUI
+from pieces import PIECES, PIECE_I
+from metrics import MetricsRegistry, GameMetrics, MetricsServer
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for metric types and the text format"""
+
+    def test_counter_with_labels(self):
+        """Test labelled counters render one series per label value"""
+        registry = MetricsRegistry()
+        counter = registry.counter('requests_total', "Requests", ('path',))
+        counter.labels('/a').inc()
+        counter.labels('/a').inc(2)
+        counter.labels('say "hi"').inc()
+        text = registry.render()
+        self.assertIn('# TYPE requests_total counter', text)
+        self.assertIn('requests_total{path="/a"} 3', text)
+        self.assertIn('requests_total{path="say \\"hi\\""} 1', text)
+        with self.assertRaises(ValueError):
+            counter.labels('/a', 'extra')
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets count observations up to and including each bound"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        lines = registry.render().splitlines()
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 3', lines)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_count 4', lines)
+        self.assertIn('latency_seconds_sum 3.65', lines)
+
+    def test_duplicate_names_rejected(self):
+        """Test a metric name can only be registered once"""
+        registry = MetricsRegistry()
+        registry.gauge('sessions', "Sessions")
+        with self.assertRaises(ValueError):
+            registry.counter('sessions', "Sessions")
+
+
+class TestGameMetrics(unittest.TestCase):
+    """Test cases for game event and error metrics"""
+
+    def setUp(self):
+        self.game = Tetris(seed=2, headless=True)
+        self.metrics = GameMetrics()
+        self.metrics.attach(self.game)
+
+    def tearDown(self):
+        self.metrics.close()
+
+    def test_ticks_pieces_and_line_clears(self):
+        """Test ticks, placed pieces and a tetris are counted"""
+        for y in range(GRID_HEIGHT - 4, GRID_HEIGHT):
+            self.game.grid[y] = [1] * (GRID_WIDTH - 1) + [0]
+        self.game.current_piece_type = PIECE_I
+        self.game.current_rotation = 1
+        self.game.current_piece = PIECES[PIECE_I][1]
+        column = next(row.index('#') for row in self.game.current_piece if '#' in row)
+        self.game.piece_x = GRID_WIDTH - 1 - column
+        self.game.hard_drop()
+        for _ in range(3):
+            self.game.update(16)
+        self.assertEqual(self.metrics.ticks.value, 3)
+        self.assertEqual(self.metrics.pieces.value, 1)
+        self.assertEqual(self.metrics.lines.value, 4)
+        text = self.metrics.registry.render()
+        self.assertIn('tetris_line_clears_total{type="tetris"} 1', text)
+        self.assertIn('tetris_line_clears_total{type="single"} 0', text)
+
+    def test_game_over_and_reset(self):
+        """Test a top-out counts one game over and one reset"""
+        self.game.reset_game(seed=4)
+        self.assertEqual(self.metrics.resets.value, 1)
+        while not self.game.games_played:
+            self.game.hard_drop()
+        self.assertEqual(self.metrics.game_overs.value, 1)
+        self.assertEqual(self.metrics.resets.value, 2)
+
+    def test_frames(self):
+        """Test frame times are observed every loop and frames counted when drawn"""
+        self.metrics.frame(16.0)
+        self.metrics.frame(40.0, rendered=False)
+        self.assertEqual(self.metrics.frames_rendered.value, 1)
+        self.assertEqual(self.metrics.frame_time.count, 2)
+
+    def test_logged_errors_counted_by_function(self):
+        """Test errors caught and logged by the engine are counted"""
+        main_logger = logging.getLogger('main')
+        self.metrics.count_errors(main_logger)
+        self.game.current_piece = None  # Breaks the next gravity step
+        self.game.fall_time = 10 ** 6
+        self.game.update(16)
+        self.assertEqual(self.metrics.errors.labels('update').value, 1)
+        self.metrics.close()
+        self.assertEqual(len([h for h in main_logger.handlers if h.level == logging.ERROR]), 0)
+
+    def test_ui_draw_errors_counted(self):
+        """Test errors logged by the UI components are counted with main's"""
+        for error_logger in error_loggers():
+            self.metrics.count_errors(error_logger)
+        state = self.game.get_draw_state()
+        del state['score']  # Breaks the score board part of the frame
+        GameUI().draw(pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)), state)
+        self.assertEqual(self.metrics.errors.labels('draw').value, 1)
+        self.metrics.close()
+
+    def test_input_engine_errors_counted(self):
+        """Test errors the main loop's input engine catches are counted too"""
+        from input_engine import InputEngine
+        for error_logger in error_loggers():
+            self.metrics.count_errors(error_logger)
+        engine = InputEngine(self.game)
+        engine.press('teleport')
+        engine.tick(16)
+        self.assertEqual(self.metrics.errors.labels('_apply').value, 1)
+        self.metrics.close()
+
+
+class TestMetricsServer(unittest.TestCase):
+    """Test the HTTP endpoint"""
+
+    def test_serves_metrics(self):
+        """Test the registry is served at /metrics and other paths are 404"""
+        metrics = GameMetrics()
+        metrics.frames_rendered.inc(7)
+        server = MetricsServer(metrics.registry, port=0)
+        server.start()
+        try:
+            url = f"http://{server.host}:{server.port}"
+            with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+                self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+                body = response.read().decode()
+            self.assertIn('tetris_frames_rendered_total 7', body)
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{url}/other", timeout=5)
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import Tetris
+from bot import TetrisBot, Placement, grid_to_rows, column_tops
+from config import GRID_WIDTH, GRID_HEIGHT
+from pieces import PIECES
+from opening_book import (OpeningBook, BookError, generate_book, surface_profile, profile_index,
+                          canonical_rows, all_profiles, HEADER, RECORD)
+
+FLAT = (0,) * (GRID_WIDTH - 1)
+STEP = (1, 0, 0, -1, 0, 1, 1, 0, -1)
+WELL = (0, 0, 0, 0, -1, 1, 0, 0, 0)
+
+
+class TestOpeningBook(unittest.TestCase):
+    """Test cases for building and reading the opening book"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.book')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_profiles(self):
+        """Test canonical boards have their profile and indices follow enumeration order"""
+        for profile in (FLAT, STEP, WELL):
+            rows = canonical_rows(profile)
+            self.assertEqual(surface_profile(rows), profile)
+            self.assertEqual(min(GRID_HEIGHT - top for top in column_tops(rows)), 0)
+        for expected, profile in enumerate(list(all_profiles(1))[:50]):
+            self.assertEqual(profile_index(profile, 1), expected)
+        self.assertIsNone(profile_index((2,) + FLAT[1:], 1))
+
+    def test_lookups_match_search(self):
+        """Test every stored move is the bot's own answer and uncovered boards miss"""
+        count = generate_book(self.path, profiles=[FLAT, STEP, WELL])
+        self.assertEqual(count, 3 * len(PIECES))
+        self.assertEqual(os.path.getsize(self.path), HEADER.size + count * RECORD.size)
+        solver = TetrisBot(beam_width=1, lookahead=0)
+        with OpeningBook(self.path) as book:
+            for profile in (FLAT, STEP, WELL):
+                rows = canonical_rows(profile)
+                for piece_type in range(len(PIECES)):
+                    self.assertEqual(book.lookup(rows, piece_type), solver.search(rows, [piece_type]))
+            self.assertIsNone(book.lookup(canonical_rows((1,) + FLAT[1:]), 0))
+            self.assertIsNone(book.lookup(canonical_rows((3,) + FLAT[1:]), 0))
+            self.assertEqual((book.hits, book.misses), (3 * len(PIECES), 2))
+
+    def test_bot_uses_book(self):
+        """Test the bot plays book moves on covered boards and searches otherwise"""
+        generate_book(self.path, profiles=[FLAT])
+        with OpeningBook(self.path) as book:
+            game = Tetris(seed=5, headless=True)
+            bot = TetrisBot(book=book)
+            expected = book.lookup(grid_to_rows(game.grid), game.current_piece_type)
+            self.assertIsInstance(expected, Placement)
+            self.assertEqual(bot.play_piece(game), expected)
+            self.assertEqual(bot.book_hits, 1)
+            for _ in range(5):
+                bot.play_piece(game)
+            self.assertEqual(game.total_pieces, 6)
+            self.assertEqual(len(bot.latencies_ms), 6)
+
+    def test_bad_files_rejected(self):
+        """Test truncated files, foreign files and books for other weights raise BookError"""
+        generate_book(self.path, profiles=[FLAT])
+        with self.assertRaises(BookError):
+            OpeningBook(self.path, weights=(-1.0, 1.0, -1.0, -1.0))
+        with open(self.path, 'rb') as book_file:
+            data = book_file.read()
+        with open(self.path, 'wb') as book_file:
+            book_file.write(data[:-1])
+        with self.assertRaises(BookError):
+            OpeningBook(self.path)
+        open(self.path, 'wb').close()
+        with self.assertRaises(BookError):
+            OpeningBook(self.path)
+        with self.assertRaises(ValueError):
+            generate_book(self.path, max_diff=1, profiles=[(2,) + FLAT[1:]])
+
+
+if __name__ == '__main__':
+    unittest.main()
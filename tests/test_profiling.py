@@ -0,0 +1,145 @@
+import unittest
+import tempfile
+import cProfile
+import pstats
+import time
+import sys
+import os
+from collections import namedtuple
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from main import Tetris
+from bot import TetrisBot
+from replay import ReplayRecorder
+from ui_components import GameUI
+from profiling import (FrameProfiler, SamplingProfiler, collapse_stats, method_names,
+                       stats_summary, format_summary, profile_replay)
+
+
+# A code object as Python 3.7-3.10 have it, without co_qualname
+OldCode = namedtuple('OldCode', ['co_filename', 'co_name'])
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def outer():
+    busy(0.02)
+    inner()
+
+
+def inner():
+    busy(0.03)
+
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for the built-in profilers"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.out = os.path.join(self.directory.name, 'profile')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_collapsed(self):
+        stacks = {}
+        with open(f"{self.out}.collapsed") as collapsed:
+            for line in collapsed:
+                stack, value = line.rsplit(' ', 1)
+                stacks[tuple(stack.split(';'))] = int(value)
+        return stacks
+
+    def test_collapsed_cprofile_paths(self):
+        """Test cProfile call edges are rebuilt into full call paths"""
+        profile = cProfile.Profile()
+        profile.enable()
+        outer()
+        profile.disable()
+        stacks = collapse_stats(pstats.Stats(profile))
+        labels = {stack[-1]: stack for stack in stacks}
+        self.assertEqual(labels['test_profiling.py:inner'][-2:],
+                         ('test_profiling.py:outer', 'test_profiling.py:inner'))
+        busy_callers = {stack[stack.index('test_profiling.py:busy') - 1] for stack in stacks
+                        if 'test_profiling.py:busy' in stack}
+        self.assertEqual(busy_callers, {'test_profiling.py:outer', 'test_profiling.py:inner'})
+        total = sum(value for stack, value in stacks.items() if 'test_profiling.py:outer' in stack)
+        self.assertAlmostEqual(total / 1e6, 0.05, delta=0.02)
+
+    def test_method_summary(self):
+        """Test the summary names Tetris methods and counts their calls"""
+        game = Tetris(seed=1, headless=True)
+        profile = cProfile.Profile()
+        profile.enable()
+        for _ in range(50):
+            game.update(16)
+        profile.disable()
+        rows = stats_summary(pstats.Stats(profile), method_names((Tetris, GameUI)))
+        update = next(row for row in rows if row['function'] == 'Tetris.update')
+        self.assertEqual(update['calls'], 50)
+        self.assertGreaterEqual(update['total_ms'], update['self_ms'])
+        self.assertIn('Tetris.update', format_summary(rows))
+
+    def test_sampling_profiler(self):
+        """Test the sampler sees a busy function in its caller's stack"""
+        sampler = SamplingProfiler(interval_ms=1.0)
+        sampler.start()
+        outer()
+        sampler.stop()
+        self.assertGreater(sampler.samples, 5)
+        self.assertTrue(any(stack[0] == 'MainThread' and 'test_profiling.py:inner' in stack
+                            for stack in sampler.stacks))
+        old_code = OldCode('/src/old.py', 'update')
+        self.assertEqual(sampler._label(old_code), 'old.py:update')
+
+    def test_frame_window(self):
+        """Test only the chosen frames are profiled and results are written on finish"""
+        game = Tetris(seed=2, headless=True)
+        profiler = FrameProfiler('cprofile', start=3, frames=4, out=self.out, classes=(Tetris,))
+        for frame in range(10):
+            profiler.frame()
+            self.assertEqual(profiler.active, 3 <= frame < 7)
+            game.update(16)
+        self.assertTrue(profiler.finished)
+        for suffix in ('.collapsed', '.txt', '.pstats'):
+            self.assertTrue(os.path.exists(self.out + suffix))
+        with open(f"{self.out}.txt") as summary:
+            self.assertIn('Tetris.update', summary.read())
+        self.assertIsNone(profiler.finish())
+
+    def test_profile_replay(self):
+        """Test a replay is profiled headlessly with both profilers"""
+        game = Tetris(seed=5, headless=True)
+        replays = []
+        recorder = ReplayRecorder(game, replays.append)
+        bot = TetrisBot(beam_width=1, lookahead=0)
+        while not replays:
+            bot.play_piece(game)
+            game.update(16)
+        recorder.close()
+
+        rows = profile_replay(replays[0], 'cprofile', out=self.out)
+        functions = {row['function'] for row in rows}
+        self.assertIn('GameUI.draw', functions)
+        self.assertIn('Tetris.update', functions)
+        self.assertTrue(any(value > 0 for value in self.read_collapsed().values()))
+
+        profile_replay(replays[0], 'sample', out=self.out, interval_ms=0.5)
+        self.assertTrue(any(stack[0] == 'MainThread' for stack in self.read_collapsed()))
+
+    def test_unknown_mode(self):
+        """Test an unknown profiler mode is rejected"""
+        with self.assertRaises(ValueError):
+            FrameProfiler('perf')
+
+
+if __name__ == '__main__':
+    unittest.main()
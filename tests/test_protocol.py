@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import Tetris
+from protocol import (StateEncoder, StateDecoder, ProtocolError, game_state, json_state,
+                      play_typical_game, write_varint, write_signed, read_varint, read_signed)
+from config import GRID_HEIGHT, GRID_WIDTH
+from pieces import PIECE_I, PIECES
+
+
+class TestProtocol(unittest.TestCase):
+    """Test the delta-encoded binary state protocol"""
+
+    def setUp(self):
+        self.game = Tetris(seed=3, headless=True)
+        self.encoder = StateEncoder(self.game)
+        self.decoder = StateDecoder()
+
+    def tearDown(self):
+        self.encoder.close()
+
+    def sync(self):
+        """Send one tick and check the decoder matches the game"""
+        frame = self.encoder.encode_tick()
+        self.decoder.feed(frame)
+        self.assertEqual(self.decoder.state(), game_state(self.game))
+        return frame
+
+    def test_varints(self):
+        """Test varint and zigzag round trips"""
+        for value in (0, 1, 127, 128, 300, 2 ** 40):
+            out = bytearray()
+            write_varint(out, value)
+            self.assertEqual(read_varint(out, 0), (value, len(out)))
+        for value in (0, -1, 1, -64, 64, -100000):
+            out = bytearray()
+            write_signed(out, value)
+            self.assertEqual(read_signed(out, 0), (value, len(out)))
+        with self.assertRaises(ProtocolError):
+            read_varint(bytearray([0x80]), 0)
+
+    def test_keyframe_then_quiet_ticks(self):
+        """Test the first frame is a full state and idle ticks send nothing"""
+        self.game.grid[GRID_HEIGHT - 1][0] = 3
+        self.sync()
+        self.assertEqual(self.encoder.encode_tick(), b'')
+
+    def test_lock_and_line_clear(self):
+        """Test lock events carry cleared rows the decoder removes"""
+        self.sync()
+        bottom = GRID_HEIGHT - 1
+        self.game.grid[bottom] = [1] * (GRID_WIDTH - 4) + [0] * 4
+        self.game.grid[bottom - 1][0] = 2
+        # Direct grid edits bypass the events, so resend the full state
+        self.encoder.request_keyframe()
+        self.sync()
+
+        # Lay a flat I piece into the gap
+        self.game.current_piece_type = PIECE_I
+        self.game.current_rotation = 0
+        self.game.current_piece = PIECES[PIECE_I][0]
+        self.game.piece_x = GRID_WIDTH - 4 - next(
+            i for i, cell in enumerate(PIECES[PIECE_I][0][2]) if cell == '#')
+        self.game.piece_y = 0
+        self.sync()
+        lines_before = self.game.lines_cleared
+        self.game.hard_drop()
+        frame = self.sync()
+        self.assertEqual(self.game.lines_cleared, lines_before + 1)
+        self.assertLess(len(frame), 30)
+
+    def test_garbage_and_reset(self):
+        """Test garbage rows and a reset keyframe reach the decoder"""
+        self.sync()
+        self.game.add_garbage(3, hole_x=4)
+        self.sync()
+        self.game.reset_game(seed=9)
+        self.sync()
+
+    def test_partial_stream(self):
+        """Test frames split across reads are applied once complete"""
+        self.game.add_garbage(2, hole_x=1)
+        frame = self.encoder.encode_tick()
+        self.assertEqual(self.decoder.feed(frame[:3]), 0)
+        self.assertEqual(self.decoder.feed(frame[3:]), 1)
+        self.assertEqual(self.decoder.state(), game_state(self.game))
+
+    def test_delta_before_keyframe(self):
+        """Test a delta without a keyframe is rejected"""
+        self.encoder.encode_tick()
+        self.game.move(1)
+        with self.assertRaises(ProtocolError):
+            self.decoder.feed(self.encoder.encode_tick())
+
+    def test_typical_game_round_trip(self):
+        """Test a played game with locks, clears and game overs stays in sync"""
+        decoder = StateDecoder()
+        total = 0
+        for _ in play_typical_game(self.game, 4000):
+            frame = self.encoder.encode_tick()
+            total += len(frame)
+            decoder.feed(frame)
+            self.assertEqual(decoder.state(), game_state(self.game))
+        self.assertGreater(self.game.total_pieces + self.game.games_played, 10)
+        self.assertLess(total, len(json_state(self.game)) * 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
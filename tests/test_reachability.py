@@ -0,0 +1,108 @@
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import Tetris, InvalidMoveError
+from reachability import (find_reachable, execute_inputs, StateBitset, encode_state,
+                          LEFT, HARD_DROP)
+from bot import PLACEMENTS, TetrisBot, game_board
+from config import GRID_WIDTH, GRID_HEIGHT, SPAWN_X, SPAWN_Y
+from pieces import PIECES, PIECE_O, get_piece_count
+
+
+class TestReachability(unittest.TestCase):
+    """Test the (x, y, rotation) reachability search"""
+
+    def setUp(self):
+        self.game = Tetris(seed=0)
+
+    def spawn(self, piece_type):
+        """Put a fresh piece of the given type at the spawn position"""
+        self.game.current_piece_type = piece_type
+        self.game.current_rotation = 0
+        self.game.current_piece = PIECES[piece_type][0]
+        self.game.piece_x, self.game.piece_y = SPAWN_X, SPAWN_Y
+
+    def test_bitset(self):
+        """Test that the visited bitset remembers encoded states"""
+        visited = StateBitset(4096)
+        index = encode_state(2, -1, 7)
+        self.assertNotIn(index, visited)
+        visited.add(index)
+        self.assertIn(index, visited)
+        self.assertNotIn(encode_state(2, 0, 7), visited)
+
+    def test_empty_board_matches_drop_placements(self):
+        """Test that an empty board has exactly the rotate-shift-drop placements"""
+        for piece_type in range(get_piece_count()):
+            with self.subTest(piece_type=piece_type):
+                found = find_reachable(self.game, piece_type, (0, SPAWN_X, SPAWN_Y))
+                self.assertEqual(len(found), len(PLACEMENTS[piece_type]))
+                for placement in found:
+                    self.assertEqual(placement.inputs[-1], HARD_DROP)
+
+    def test_finds_tuck_under_shelf(self):
+        """Test that an O-piece can slide under an overhang after dropping"""
+        for x in range(4):
+            self.game.grid[GRID_HEIGHT - 3][x] = 1
+        self.spawn(PIECE_O)
+        found = {(p.rotation, p.x, p.y): p for p in find_reachable(self.game)}
+
+        # O blocks sit at box columns 1-2 and rows 2-3
+        tuck = found.get((0, -1, GRID_HEIGHT - 4))
+        self.assertIsNotNone(tuck, "Tuck under the shelf should be reachable")
+        self.assertIn(LEFT, tuck.inputs[tuck.inputs.index('down'):])
+
+        execute_inputs(self.game, tuck.inputs)
+        self.assertTrue(self.game.grid[GRID_HEIGHT - 1][0])
+        self.assertTrue(self.game.grid[GRID_HEIGHT - 2][1])
+
+    def test_inputs_reach_predicted_position(self):
+        """Test that every input sequence locks the piece where predicted"""
+        for row in range(GRID_HEIGHT - 5, GRID_HEIGHT):
+            for x in range(0, GRID_WIDTH, 3):
+                self.game.grid[row][x] = 1
+        grid = [row[:] for row in self.game.grid]
+        for placement in find_reachable(self.game):
+            self.game.grid = [row[:] for row in grid]
+            self.spawn(self.game.current_piece_type)
+            moves = placement.inputs[:-1]
+            execute_inputs(self.game, moves)
+            self.assertEqual((self.game.current_rotation, self.game.piece_x), (placement.rotation, placement.x))
+            while self.game.valid_move(self.game.current_piece, self.game.piece_x, self.game.piece_y + 1):
+                self.game.piece_y += 1
+            self.assertEqual(self.game.piece_y, placement.y)
+
+    def test_unknown_input_rejected(self):
+        """Test that unknown inputs raise an error"""
+        with self.assertRaises(InvalidMoveError):
+            execute_inputs(self.game, ['jump'])
+
+    def test_bot_with_tucks_plays(self):
+        """Test that the bot can play using reachable placements"""
+        bot = TetrisBot(beam_width=2, lookahead=1, tucks=True)
+        for _ in range(10):
+            bot.play_piece(self.game)
+        self.assertEqual(self.game.total_pieces, 10)
+
+    def test_non_default_board(self):
+        """Test searches on a wider, taller board cover its columns and the tuck bot plays on it"""
+        game = Tetris(seed=4, headless=True, width=20, height=40)
+        board = game_board(game)
+        for piece_type in range(get_piece_count()):
+            with self.subTest(piece_type=piece_type):
+                found = find_reachable(game, piece_type, (0, game.spawn_x, SPAWN_Y))
+                self.assertEqual(sorted((p.rotation, p.x) for p in found),
+                                 sorted(board.placements[piece_type]))
+                self.assertTrue(all(p.y > GRID_HEIGHT for p in found if p.rotation == 0))
+        bot = TetrisBot(beam_width=2, lookahead=1, tucks=True)
+        for _ in range(40):
+            bot.play_piece(game)
+        self.assertEqual((game.total_pieces, game.games_played), (40, 0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
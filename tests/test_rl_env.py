@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import GRID_WIDTH, GRID_HEIGHT
+
+try:
+    import numpy as np
+    from rl_env import (TetrisEnv, VectorTetrisEnv, NOOP, LEFT, HARD_DROP,
+                        NUM_ACTIONS, ACTIVE_CELL)
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestTetrisEnv(unittest.TestCase):
+    """Test the single-game RL environment"""
+
+    def test_reset_observation(self):
+        """Test that reset returns an empty board with the falling piece marked"""
+        env = TetrisEnv(seed=1)
+        obs = env.reset()
+        self.assertEqual(obs.shape, (GRID_HEIGHT, GRID_WIDTH))
+        self.assertEqual(obs.dtype, np.uint8)
+        self.assertEqual(int((obs == ACTIVE_CELL).sum()), 4)
+
+    def test_hard_drop_rewards_score(self):
+        """Test that a hard drop gives its score as reward and locks the piece"""
+        env = TetrisEnv(seed=1)
+        env.reset()
+        obs, reward, done, info = env.step(HARD_DROP)
+        self.assertGreater(reward, 0)
+        self.assertFalse(done)
+        self.assertEqual(info['lines'], 0)
+        self.assertEqual(int(((obs > 0) & (obs < ACTIVE_CELL)).sum()), 4)
+
+    def test_game_over_sets_done(self):
+        """Test that topping out reports done with the final stats"""
+        env = TetrisEnv(seed=2)
+        env.reset()
+        for _ in range(200):
+            _, _, done, info = env.step(HARD_DROP)
+            if done:
+                self.assertIsNotNone(info['final'])
+                break
+        self.assertTrue(done, "Hard dropping in place should top out")
+
+    def test_board_size_follows_game(self):
+        """Test that observations cover the whole of a non-default board"""
+        env = TetrisEnv(seed=1, width=14, height=30)
+        self.assertIsNone(env.game.ui)
+        obs = env.reset()
+        self.assertEqual(obs.shape, (30, 14))
+        self.assertEqual(env.observation_shape, (30, 14))
+        obs, _, _, _ = env.step(HARD_DROP)
+        self.assertEqual(int(((obs[-2:] > 0) & (obs[-2:] < ACTIVE_CELL)).sum()), 4)
+
+    def test_invalid_action(self):
+        """Test that actions outside the action space are rejected"""
+        env = TetrisEnv(seed=1)
+        env.reset()
+        with self.assertRaises(ValueError):
+            env.step(NUM_ACTIONS)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestVectorTetrisEnv(unittest.TestCase):
+    """Test the shared-memory vectorized environment"""
+
+    def test_matches_single_environments(self):
+        """Test that vectorized steps give the same results as single envs"""
+        seeds = [3, 4, 5]
+        actions = [LEFT, HARD_DROP, NOOP, HARD_DROP, LEFT, HARD_DROP] * 5
+        singles = [TetrisEnv(seed=seed) for seed in seeds]
+        for env in singles:
+            env.reset(seed=env.seed)
+
+        with VectorTetrisEnv(len(seeds), seeds=seeds, num_workers=2) as vector_env:
+            obs = vector_env.reset()
+            for action in actions:
+                obs, rewards, dones, lines = vector_env.step([action] * len(seeds))
+                for i, env in enumerate(singles):
+                    expected_obs, expected_reward, expected_done, info = env.step(action)
+                    np.testing.assert_array_equal(obs[i], expected_obs)
+                    self.assertEqual(rewards[i], expected_reward)
+                    self.assertEqual(bool(dones[i]), expected_done)
+                    self.assertEqual(lines[i], info['lines'])
+
+    def test_board_size_shared(self):
+        """Test that shared observations take the environments' board size"""
+        single = TetrisEnv(seed=3, width=12, height=24)
+        single.reset(seed=3)
+        with VectorTetrisEnv(1, seeds=[3], width=12, height=24) as vector_env:
+            obs = vector_env.reset()
+            self.assertEqual(obs.shape, (1, 24, 12))
+            obs, _, _, _ = vector_env.step([HARD_DROP])
+            np.testing.assert_array_equal(obs[0], single.step(HARD_DROP)[0])
+
+    def test_seed_count_checked(self):
+        """Test that the number of seeds must match the number of envs"""
+        with self.assertRaises(ValueError):
+            VectorTetrisEnv(2, seeds=[1])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
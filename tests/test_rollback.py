@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rollback import (VersusWorld, RollbackSession, SimulatedNetwork, INPUT_CODES,
+                      random_inputs, run_match)
+
+
+def reference_world(frames, seed, input_delay):
+    """Simulate the match with every input known in advance"""
+    world = VersusWorld(seed)
+    scripts = [random_inputs(frames, seed * 2 + player + 1) for player in (0, 1)]
+    for frame in range(frames):
+        codes = [INPUT_CODES[script[frame - input_delay]] if frame >= input_delay else 0
+                 for script in scripts]
+        world.simulate_frame(codes)
+    return world
+
+
+class TestRollback(unittest.TestCase):
+    """Test rollback sessions over a simulated network"""
+
+    def test_lossy_match_matches_reference(self):
+        """Test both peers end on the state of a perfect-information run"""
+        sessions, network = run_match(frames=300, latency_frames=5, jitter_frames=2,
+                                      loss=0.25, seed=4)
+        self.assertGreater(network.dropped, 0)
+        expected = reference_world(300, 4, input_delay=2).snapshot()
+        for session in sessions:
+            self.assertEqual(session.frame, 300)
+            self.assertEqual(session.world.snapshot(), expected)
+        report = sessions[0].report()
+        self.assertGreater(report['rollbacks'], 0)
+        self.assertLessEqual(report['max_depth'], sessions[0].max_rollback)
+
+    def test_stalls_when_too_far_ahead(self):
+        """Test a session stops advancing without remote input"""
+        session = RollbackSession(0, seed=1, max_rollback=3)
+        advanced = [session.advance_frame('left') for _ in range(5)]
+        self.assertEqual(advanced, [True, True, True, False, False])
+        self.assertEqual(session.stalled_frames, 2)
+
+    def test_late_input_triggers_rollback(self):
+        """Test a mispredicted remote input resimulates from its frame"""
+        session = RollbackSession(0, seed=1, max_rollback=8, input_delay=0)
+        for _ in range(4):
+            session.advance_frame(None)
+        session.receive((1, -1, 0, [0, INPUT_CODES['rotate']]))
+        self.assertFalse(session.confirmed())
+        session.synchronize()
+        self.assertEqual(session.rollbacks[0][0], 3)
+        expected = VersusWorld(1)
+        for codes in ((0, 0), (0, INPUT_CODES['rotate']), (0, 0), (0, 0)):
+            expected.simulate_frame(codes)
+        self.assertEqual(session.world.snapshot(), expected.snapshot())
+
+    def test_network_loss_and_latency(self):
+        """Test packets arrive after the latency and some are dropped"""
+        network = SimulatedNetwork(latency_frames=3, jitter_frames=0, loss=0.5, seed=2)
+        for now in range(100):
+            network.send(1, now, now)
+        delivered = network.deliver(1, 50)
+        self.assertTrue(all(packet <= 47 for packet in delivered))
+        self.assertEqual(len(delivered) + len(network.in_flight) + network.dropped, 100)
+        self.assertGreater(network.dropped, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
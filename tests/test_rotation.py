@@ -0,0 +1,116 @@
+import unittest
+import random
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from main import Tetris
+from config import GRID_WIDTH, GRID_HEIGHT, INPUT_ACTIONS
+from pieces import PIECES, PIECE_T, PIECE_I, PIECE_S
+from rotation import SYSTEMS, CW, CCW, HALF, get_rotation_system, make_kick_boards, reference_rotate
+from reachability import find_reachable, execute_inputs
+
+
+def set_piece(game, piece_type, rotation, x, y):
+    game.current_piece_type, game.current_rotation = piece_type, rotation
+    game.current_piece = PIECES[piece_type][rotation]
+    game.piece_x, game.piece_y = x, y
+
+
+class TestRotationSystems(unittest.TestCase):
+    """Test cases for compiled rotation systems"""
+
+    def test_bitwise_matches_valid_move(self):
+        """Test the bit-window collision test agrees with valid_move for every kick"""
+        rng = random.Random(3)
+        for width, height in ((GRID_WIDTH, GRID_HEIGHT), (100, 40)):
+            game = Tetris(seed=1, headless=True, width=width, height=height)
+            boards = list(make_kick_boards().values()) if width == GRID_WIDTH else [
+                [[int(rng.random() < 0.4) for _ in range(width)] for _ in range(height)]]
+            for grid in boards:
+                game.grid = grid
+                for _ in range(1500):
+                    piece_type = rng.randrange(len(PIECES))
+                    rotation = rng.randrange(len(PIECES[piece_type]))
+                    x, y = rng.randint(-3, width), rng.randint(-3, height)
+                    if not game.valid_move(PIECES[piece_type][rotation], x, y):
+                        continue
+                    set_piece(game, piece_type, rotation, x, y)
+                    for system in SYSTEMS.values():
+                        for direction in (CW, CCW, HALF):
+                            self.assertEqual(system.rotate(grid, piece_type, rotation, x, y, direction),
+                                             reference_rotate(game, system, direction))
+
+    def test_classic_matches_original_rotation(self):
+        """Test the default system keeps the old clockwise rotation with sideways kicks"""
+        system = get_rotation_system()
+        self.assertEqual(system.name, 'classic')
+        for piece_type, rotations in enumerate(PIECES):
+            for rotation in range(len(rotations)):
+                turn = system.turn(piece_type, rotation, CW)
+                if len(rotations) == 1:
+                    self.assertIsNone(turn)
+                else:
+                    self.assertEqual(turn.to_rotation, (rotation + 1) % len(rotations))
+                    self.assertEqual(turn.kicks, ((0, 0), (-1, 0), (1, 0)))
+
+    def test_srs_kicks_i_piece_off_the_wall(self):
+        """Test SRS kicks a vertical I off the left wall where classic and NES cannot"""
+        game = Tetris(seed=1, headless=True)
+        results = {}
+        for name, system in SYSTEMS.items():
+            results[name] = system.rotate(game.grid, PIECE_I, 1, -2, 5, CW)
+        self.assertIsNone(results['classic'])
+        self.assertIsNone(results['nes'])
+        self.assertEqual(results['srs'], (0, 0, 5))
+
+    def test_turn_directions(self):
+        """Test counter-clockwise and 180 degree turns, and turns that change nothing"""
+        game = Tetris(seed=1, headless=True, rotation_system='srs')
+        set_piece(game, PIECE_T, 0, 3, 5)
+        game.apply_input('rotate_ccw')
+        self.assertEqual(game.current_rotation, 3)
+        game.apply_input('rotate')
+        self.assertEqual(game.current_rotation, 0)
+        game.apply_input('rotate_180')
+        self.assertEqual((game.current_rotation, game.piece_x, game.piece_y), (2, 3, 5))
+        self.assertIs(game.current_piece, PIECES[PIECE_T][2])
+        self.assertIsNone(game.rotation_system.turn(PIECE_S, 0, HALF))
+
+        nes = Tetris(seed=1, headless=True, rotation_system='nes')
+        set_piece(nes, PIECE_T, 0, 3, 5)
+        nes.apply_input('rotate_180')
+        self.assertEqual(nes.current_rotation, 0)
+
+    def test_input_codes_stable(self):
+        """Test new rotation inputs extend the wire codes without renumbering"""
+        self.assertEqual(INPUT_ACTIONS[:6], (None, 'left', 'right', 'down', 'rotate', 'hard_drop'))
+        self.assertEqual(INPUT_ACTIONS[6:], ('rotate_ccw', 'rotate_180'))
+        with self.assertRaises(ValueError):
+            get_rotation_system('ars')
+
+    def test_reachability_uses_game_rotation(self):
+        """Test SRS searches use every turn direction and their inputs reach the placement"""
+        grid = make_kick_boards()['rubble']
+        for system in ('classic', 'srs'):
+            game = Tetris(seed=1, headless=True, rotation_system=system)
+            game.grid = [row[:] for row in grid]
+            found = find_reachable(game, PIECE_T, (0, game.piece_x, game.piece_y))
+            self.assertTrue(found)
+            if system == 'srs':
+                self.assertTrue(any('rotate_ccw' in placement.inputs or 'rotate_180' in placement.inputs
+                                    for placement in found))
+            for placement in found[:20]:
+                game.grid = [row[:] for row in grid]
+                set_piece(game, PIECE_T, 0, game.spawn_x, 0)
+                execute_inputs(game, placement.inputs[:-1])
+                self.assertEqual((game.current_rotation, game.piece_x), (placement.rotation, placement.x))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from main import Tetris
+from bot import TetrisBot
+from config import WINDOW_WIDTH, WINDOW_HEIGHT
+from ui_components import GameUI
+from scaling import ScaledDisplay, frame_signature
+
+
+class TestScaledDisplay(unittest.TestCase):
+    """Test cases for the scaled backbuffer"""
+
+    def setUp(self):
+        self.game = Tetris(seed=2, headless=True)
+        self.ui = GameUI()
+        self.display = ScaledDisplay(self.ui)
+
+    def test_fit_letterboxes(self):
+        """Test the target keeps the aspect ratio and is centred"""
+        target = self.display.fit((WINDOW_WIDTH * 4, WINDOW_HEIGHT * 2))
+        self.assertEqual(target.size, (WINDOW_WIDTH * 2, WINDOW_HEIGHT * 2))
+        self.assertEqual(target.x, WINDOW_WIDTH)
+        self.assertEqual(self.display.to_logical(target.center, (WINDOW_WIDTH * 4, WINDOW_HEIGHT * 2)),
+                         (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
+
+    def test_present_matches_full_scale(self):
+        """Test dirty-area presents give the same image as scaling the whole frame"""
+        window = pygame.Surface((WINDOW_WIDTH * 2, WINDOW_HEIGHT * 2))
+        bot = TetrisBot(beam_width=1, lookahead=0)
+        self.ui.draw(self.display.surface, self.game.get_draw_state())
+        self.assertEqual(self.display.present(window), [window.get_rect()] + [
+            self.display.to_window(rect, window.get_rect()) for rect in self.ui.dynamic_rects()])
+        for _ in range(10):
+            bot.play_piece(self.game)
+            self.ui.draw(self.display.surface, self.game.get_draw_state())
+            self.assertEqual(len(self.display.present(window)), 2)
+
+        expected = pygame.transform.scale(self.display.surface, window.get_size())
+        for x in range(0, window.get_width(), 7):
+            for y in range(0, window.get_height(), 7):
+                self.assertEqual(window.get_at((x, y)), expected.get_at((x, y)))
+
+    def test_unchanged_frame_skipped(self):
+        """Test an empty dirty list presents nothing until the window changes"""
+        window = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.display.present(window)
+        self.assertEqual(self.display.present(window, []), [])
+        self.display.invalidate()
+        self.assertIn(window.get_rect(), self.display.present(window, []))
+
+    def test_static_layer_cached_per_size(self):
+        """Test scaled static layers are reused per window size and evicted when old"""
+        small = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.display.present(small)
+        layer = self.display._layers[small.get_size()][1]
+        for scale in (2, 3, 4, 5):
+            self.display.present(pygame.Surface((WINDOW_WIDTH * scale, WINDOW_HEIGHT)))
+        self.assertNotIn(small.get_size(), self.display._layers)
+        self.display.present(pygame.Surface((WINDOW_WIDTH * 5, WINDOW_HEIGHT)))
+        self.assertEqual(len(self.display._layers), 4)
+        self.assertIsNot(self.display._layer(small.get_size())[1], layer)
+
+    def test_frame_signature(self):
+        """Test the signature changes exactly when the drawn state changes"""
+        signature = frame_signature(self.game.get_draw_state())
+        self.assertEqual(frame_signature(self.game.get_draw_state()), signature)
+        self.game.apply_input('left')
+        self.assertNotEqual(frame_signature(self.game.get_draw_state()), signature)
+
+
+if __name__ == '__main__':
+    unittest.main()
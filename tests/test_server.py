@@ -0,0 +1,167 @@
+import unittest
+import sys
+import os
+import json
+import asyncio
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server import GameServer, encode_message, MAX_INPUTS_PER_TICK
+from metrics import GameMetrics
+from config import GRID_WIDTH, GRID_HEIGHT
+from pieces import PIECES, PIECE_O, PIECE_GARBAGE
+
+
+class FakeTransport:
+    def get_write_buffer_size(self):
+        return 0
+
+
+class FakeWriter:
+    """Collects messages written by the server"""
+
+    def __init__(self):
+        self.messages = []
+        self.transport = FakeTransport()
+        self.closed = False
+
+    def write(self, data):
+        for line in data.decode().splitlines():
+            self.messages.append(json.loads(line))
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    def of_type(self, kind):
+        return [message for message in self.messages if message['type'] == kind]
+
+
+class TestGameServerSessions(unittest.TestCase):
+    """Test session handling on the shared tick without sockets"""
+
+    def setUp(self):
+        self.server = GameServer(port=0)
+
+    def test_versus_players_are_paired(self):
+        """Test that two versus joins become opponents with the same seed"""
+        first = self.server.join(FakeWriter(), 'versus', 5)
+        second = self.server.join(FakeWriter(), 'versus', 9)
+        self.assertIs(first.opponent, second)
+        self.assertIs(second.opponent, first)
+        self.assertEqual(first.game.seed, second.game.seed)
+        self.assertIsNone(self.server.waiting_versus)
+
+    def test_double_clear_sends_garbage(self):
+        """Test that a double line clear sends one garbage row to the opponent"""
+        first = self.server.join(FakeWriter(), 'versus', 5)
+        second = self.server.join(FakeWriter(), 'versus', 5)
+        game = first.game
+        for y in (GRID_HEIGHT - 2, GRID_HEIGHT - 1):
+            game.grid[y] = [0, 0] + [1] * (GRID_WIDTH - 2)
+        game.current_piece_type = PIECE_O
+        game.current_rotation = 0
+        game.current_piece = PIECES[PIECE_O][0]
+        game.piece_x = -1  # O blocks sit in box columns 1-2
+
+        first.inputs.append('hard_drop')
+        self.server.tick()
+        self.assertEqual(game.lines_cleared, 2)
+        self.assertEqual(second.pending_garbage, 1)
+        self.assertEqual(len(second.writer.of_type('garbage')), 1)
+
+        self.server.tick()
+        garbage_row = second.game.grid[GRID_HEIGHT - 1]
+        self.assertEqual(garbage_row.count(PIECE_GARBAGE + 1), GRID_WIDTH - 1)
+
+    def test_state_broadcast_only_on_change(self):
+        """Test that unchanged sessions are not re-broadcast every tick"""
+        session = self.server.join(FakeWriter(), 'marathon', 1)
+        self.server.tick()
+        self.server.tick()
+        self.assertEqual(len(session.writer.of_type('state')), 1)
+        session.inputs.append('hard_drop')
+        self.server.tick()
+        self.assertEqual(len(session.writer.of_type('state')), 2)
+
+    def test_bad_input_is_ignored(self):
+        """Test that an unknown input does not break the tick"""
+        session = self.server.join(FakeWriter(), 'marathon', 1)
+        session.inputs.append('teleport')
+        self.server.tick()
+        self.assertEqual(session.game.total_pieces, 0)
+
+    def test_inputs_capped_per_tick(self):
+        """Test that a client cannot queue more than MAX_INPUTS_PER_TICK inputs"""
+        session = self.server.join(FakeWriter(), 'marathon', 1)
+        queued = [session.queue_input('hard_drop') for _ in range(MAX_INPUTS_PER_TICK * 10)]
+        self.assertEqual(queued.count(True), MAX_INPUTS_PER_TICK)
+        self.server.tick()
+        self.assertEqual(session.game.total_pieces, MAX_INPUTS_PER_TICK)
+        self.assertTrue(session.queue_input('hard_drop'))
+
+    def test_inputs_dropped_at_game_over(self):
+        """Test that inputs queued for a finished game never reach the next one"""
+        session = self.server.join(FakeWriter(), 'marathon', 1)
+        game = session.game
+        for y in range(2, GRID_HEIGHT):
+            game.grid[y] = [1] * (GRID_WIDTH - 1) + [0]
+        session.inputs.extend(['hard_drop', 'hard_drop', 'left', 'hard_drop'])
+        self.server.tick()
+        self.assertEqual(game.games_played, 1)
+        self.assertEqual(len(session.writer.of_type('game_over')), 1)
+        self.assertEqual(game.total_pieces, 0)
+        self.assertEqual(session.inputs, [])
+
+    def test_metrics_follow_sessions(self):
+        """Test that session games feed the server's metrics until they leave"""
+        metrics = GameMetrics()
+        server = GameServer(port=0, metrics=metrics)
+        session = server.join(FakeWriter(), 'marathon', 1)
+        session.inputs.append('hard_drop')
+        server.tick()
+        self.assertEqual(metrics.pieces.value, 1)
+        self.assertEqual(metrics.ticks.value, 1)
+        self.assertIn('tetris_server_sessions 1', metrics.registry.render())
+        server.leave(session)
+        server.tick()
+        session.game.update(16)
+        self.assertEqual(metrics.ticks.value, 1)
+        self.assertIn('tetris_server_sessions 0', metrics.registry.render())
+        metrics.close()
+
+
+class TestGameServerSockets(unittest.TestCase):
+    """Test the server over loopback TCP"""
+
+    def test_join_and_play_over_tcp(self):
+        """Test a client joining, dropping a piece and receiving state"""
+        async def scenario():
+            server = GameServer(port=0)
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                writer.write(encode_message({'type': 'join', 'mode': 'marathon', 'seed': 3}))
+                joined = json.loads(await reader.readline())
+                writer.write(encode_message({'type': 'input', 'action': 'hard_drop'}))
+                while True:
+                    message = json.loads(await asyncio.wait_for(reader.readline(), 5))
+                    if message['type'] == 'state' and message['score'] > 0:
+                        break
+                writer.close()
+                return joined, message
+            finally:
+                await server.stop()
+
+        joined, state = asyncio.run(scenario())
+        self.assertEqual(joined['type'], 'joined')
+        self.assertEqual(joined['seed'], 3)
+        self.assertEqual(len(state['grid']), GRID_WIDTH * GRID_HEIGHT)
+        self.assertEqual(sum(cell != '0' for cell in state['grid']), 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+import unittest
+import time
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import Tetris
+from sim_thread import SimulationThread, StateBuffer, frozen_draw_state, summarize
+
+
+class TestSimulationThread(unittest.TestCase):
+    """Test cases for the threaded simulation"""
+
+    def setUp(self):
+        self.game = Tetris(seed=4, headless=True)
+
+    def wait_for(self, condition, timeout=2.0):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                self.fail("Timed out waiting for the simulation thread")
+            time.sleep(0.005)
+
+    def test_frozen_state_is_read_only(self):
+        """Test published states are immutable copies"""
+        state = frozen_draw_state(self.game, 1)
+        self.game.grid[19][0] = 1
+        self.assertEqual(state['grid'][19][0], 0)
+        with self.assertRaises(TypeError):
+            state['score'] = 10
+        with self.assertRaises(TypeError):
+            state['grid'][0][0] = 1
+
+    def test_state_buffer(self):
+        """Test readers see the last published state"""
+        buffer = StateBuffer('first')
+        self.assertEqual(buffer.latest(), 'first')
+        buffer.publish('second')
+        buffer.publish('third')
+        self.assertEqual(buffer.latest(), 'third')
+
+    def test_inputs_reach_simulation(self):
+        """Test queued inputs are applied and published by the thread"""
+        sim = SimulationThread(self.game)
+        start_x = sim.buffer.latest()['piece_x']
+        sim.start()
+        try:
+            sim.push_input('left')
+            self.wait_for(lambda: sim.buffer.latest()['piece_x'] == start_x - 1)
+            self.wait_for(lambda: sim.ticks >= 5)
+        finally:
+            sim.stop()
+        self.assertFalse(sim.is_alive())
+        report = sim.report()
+        self.assertEqual(len(sim.input_latency_ms), 1)
+        self.assertGreater(report['ticks'], 0)
+        self.assertGreater(sim.buffer.latest()['version'], 0)
+
+    def test_bad_input_does_not_stop_thread(self):
+        """Test an invalid input is logged and the simulation keeps ticking"""
+        sim = SimulationThread(self.game)
+        sim.start()
+        try:
+            sim.push_input('teleport')
+            ticks = sim.ticks
+            self.wait_for(lambda: sim.ticks > ticks + 2)
+        finally:
+            sim.stop()
+
+    def test_summarize(self):
+        """Test latency summaries"""
+        self.assertEqual(summarize([]), {'mean': 0.0, 'p99': 0.0, 'max': 0.0})
+        summary = summarize([1.0, 3.0, 2.0])
+        self.assertEqual(summary['mean'], 2.0)
+        self.assertEqual(summary['max'], 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import subprocess
+import json
+import sys
+import os
+from collections import Counter
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from soak import SoakClock, find_failures, projected_growth, RSS_NOISE_MB
+
+SOAK_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'soak.py')
+MB = 1024 * 1024
+
+
+def make_samples(count=10, rss=None, traced=None, surfaces=None, p99=None):
+    """Samples every 1000 frames with flat values unless a function of the index is given"""
+    samples = []
+    for i in range(count):
+        samples.append({
+            'frame': (i + 1) * 1000,
+            'games': i * 10,
+            'rss_bytes': rss(i) if rss else 50 * MB,
+            'traced_bytes': traced(i) if traced else 2 * MB,
+            'surfaces': surfaces(i) if surfaces else 13,
+            'frame_p50_ms': 1.0,
+            'frame_p99_ms': p99(i) if p99 else 4.0,
+            'frame_max_ms': 10.0,
+        })
+    return samples
+
+
+class TestSoakTrends(unittest.TestCase):
+    """Test cases for the soak failure checks"""
+
+    def test_flat_run_passes(self):
+        """Test a steady run has no failures"""
+        self.assertEqual(find_failures(make_samples(), Counter()), [])
+
+    def test_steady_memory_growth_fails(self):
+        """Test linear RSS growth that would exceed the limit over the horizon fails"""
+        samples = make_samples(rss=lambda i: 50 * MB + i * MB)
+        growth, projected = projected_growth(samples, 'rss_bytes', 72 * 3600 * 60)
+        self.assertEqual(growth, 5 * MB)
+        self.assertGreater(projected, 1000 * MB)
+        failures = find_failures(samples, Counter())
+        self.assertEqual(len(failures), 1)
+        self.assertIn('rss_bytes', failures[0])
+
+    def test_small_step_is_noise(self):
+        """Test a one-off RSS step below the noise floor passes"""
+        step = (RSS_NOISE_MB - 1) * MB
+        samples = make_samples(rss=lambda i: 50 * MB + (step if i >= 5 else 0))
+        self.assertEqual(find_failures(samples, Counter()), [])
+
+    def test_traced_memory_surfaces_and_frame_time(self):
+        """Test traced memory, surface and frame-time growth each fail"""
+        failures = find_failures(make_samples(traced=lambda i: i * MB), Counter())
+        self.assertIn('traced_bytes', failures[0])
+        failures = find_failures(make_samples(surfaces=lambda i: 13 + i * 10), Counter())
+        self.assertIn('surfaces', failures[0])
+        failures = find_failures(make_samples(p99=lambda i: 4.0 if i < 5 else 12.0), Counter())
+        self.assertIn('frame_p99_ms', failures[0])
+
+    def test_logged_errors_fail(self):
+        """Test any logged error fails the soak even with no samples"""
+        failures = find_failures([], Counter({'update': 3}))
+        self.assertEqual(failures, ['3 errors logged: update x3'])
+
+    def test_clock_does_not_wait(self):
+        """Test the accelerated clock returns a full frame time at once"""
+        clock = SoakClock()
+        self.assertEqual([clock.tick(60), clock.tick(60)], [16, 16])
+        self.assertEqual(clock.frames, 2)
+
+
+class TestSoakRun(unittest.TestCase):
+    """Test short soaks of the real main loop in a fresh process"""
+
+    def soak(self, *args):
+        env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+        result = subprocess.run([sys.executable, SOAK_SCRIPT, '--json', '--sample-every', '100'] + list(args),
+                                capture_output=True, text=True, timeout=300, env=env)
+        output = result.stdout
+        return result.returncode, json.loads(output[output.index('{'):])
+
+    def test_random_input_soak(self):
+        """Test random keys drive main() through several reset cycles"""
+        code, report = self.soak('--games', '3', '--no-tracemalloc')
+        self.assertEqual(code, 0, report['failures'])
+        self.assertGreaterEqual(report['games'], 3)
+        self.assertTrue(report['passed'])
+        self.assertEqual(report['errors'], {})
+
+    def test_bot_input_soak(self):
+        """Test the bot plays through key presses and allocation growth is reported"""
+        code, report = self.soak('--games', '2', '--input', 'bot')
+        self.assertEqual(code, 0, report['failures'])
+        self.assertGreaterEqual(report['games'], 2)
+        self.assertGreater(len(report['samples']), 0)
+        self.assertGreater(report['samples'][-1]['surfaces'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import tempfile
+import time
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import Tetris
+from config import GRID_HEIGHT
+from store import GameStore, day_of
+
+
+class TestGameStore(unittest.TestCase):
+    """Test the SQLite game history store"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = GameStore(os.path.join(self.tmp.name, 'scores.db'), flush_interval=0.05)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def record(self, score, level=0, played_at=1700000000.0):
+        self.store.record_game({'score': score, 'level': level, 'lines': score // 100,
+                                'pieces': 10, 'duration_ms': 5000, 'seed': 7},
+                               replay_ref=f"replay-{score}", played_at=played_at)
+
+    def test_wal_mode(self):
+        """Test the database uses write-ahead logging"""
+        mode = self.store._reader.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_leaderboards(self):
+        """Test overall, per-day and per-level top scores"""
+        self.record(500, level=1)
+        self.record(900, level=2)
+        self.record(700, level=1, played_at=1700000000.0 + 86400)
+        self.assertTrue(self.store.flush(timeout=5))
+
+        self.assertEqual(self.store.count(), 3)
+        self.assertEqual([g['score'] for g in self.store.top_scores(2)], [900, 700])
+        self.assertEqual([g['score'] for g in self.store.top_scores_for_day(day_of(1700000000.0))],
+                         [900, 500])
+        self.assertEqual([g['score'] for g in self.store.top_scores_for_level(1)], [700, 500])
+        best = self.store.top_scores(1)[0]
+        self.assertEqual(best['seed'], 7)
+        self.assertEqual(best['replay_ref'], 'replay-900')
+
+    def test_close_writes_pending_games(self):
+        """Test games queued before close reach the database"""
+        for score in range(250):
+            self.record(score)
+        path = self.store.path
+        self.store.close()
+        reopened = GameStore(path)
+        try:
+            self.assertEqual(reopened.count(), 250)
+        finally:
+            reopened.close()
+
+    def test_games_written_in_batches(self):
+        """Test queued games wait for a full batch or the flush interval"""
+        self.store.close()
+        self.store = GameStore(os.path.join(self.tmp.name, 'batched.db'), batch_size=3, flush_interval=30)
+        for score in range(4):
+            self.record(score)
+        deadline = time.monotonic() + 5
+        while self.store.written < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        self.assertEqual(self.store.written, 3)
+        self.assertTrue(self.store.flush(timeout=5))
+        self.assertEqual(self.store.written, 4)
+
+    def test_attach_records_game_over(self):
+        """Test finished engine games are stored with seed and duration"""
+        game = Tetris(seed=3, headless=True)
+        self.store.attach(game, replay_ref=lambda g: f"seed-{g.seed}")
+        game.score = 1234
+        game.update(250)
+        game.add_garbage(GRID_HEIGHT, hole_x=0)
+        self.store.flush(timeout=5)
+        games = self.store.top_scores()
+        self.assertEqual(len(games), 1)
+        self.assertEqual(games[0]['score'], 1234)
+        self.assertEqual(games[0]['seed'], 3)
+        self.assertEqual(games[0]['duration_ms'], 250)
+        self.assertEqual(games[0]['replay_ref'], 'seed-3')
+
+
+if __name__ == '__main__':
+    unittest.main()
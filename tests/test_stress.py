@@ -0,0 +1,113 @@
+import unittest
+import argparse
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from main import Tetris, TetrisError, parse_board_size
+from config import (GRID_WIDTH, GRID_HEIGHT, SPAWN_X, WINDOW_WIDTH, WINDOW_HEIGHT, BLOCK_SIZE,
+                    MAX_BOARD_WIDTH, MAX_BOARD_HEIGHT)
+from pieces import PIECES, PIECE_I
+from ui_components import GameUI
+from stress import scaling_exponent, find_slow_scaling, measure, stress_game, make_board
+
+
+class TestLargeBoards(unittest.TestCase):
+    """Test cases for games on non-standard board sizes"""
+
+    def test_default_board_unchanged(self):
+        """Test the default game keeps the configured size and spawn column"""
+        game = Tetris(seed=1, headless=True)
+        self.assertEqual((game.width, game.height), (GRID_WIDTH, GRID_HEIGHT))
+        self.assertEqual(game.piece_x, SPAWN_X)
+
+    def test_large_board_walls_and_spawn(self):
+        """Test a wide board spawns centred and its walls are at its own edges"""
+        game = Tetris(seed=1, headless=True, width=MAX_BOARD_WIDTH, height=MAX_BOARD_HEIGHT)
+        self.assertEqual(len(game.grid), MAX_BOARD_HEIGHT)
+        self.assertEqual(game.piece_x, SPAWN_X + (MAX_BOARD_WIDTH - GRID_WIDTH) // 2)
+        piece = PIECES[PIECE_I][0]
+        self.assertTrue(game.valid_move(piece, MAX_BOARD_WIDTH - 4, MAX_BOARD_HEIGHT - 4))
+        self.assertFalse(game.valid_move(piece, MAX_BOARD_WIDTH - 3, 0))
+        game.hard_drop()
+        self.assertTrue(any(game.grid[-1]) or any(game.grid[-2]))
+        self.assertEqual(len(game.grid), MAX_BOARD_HEIGHT)
+
+    def test_clear_many_lines(self):
+        """Test hundreds of full rows clear at once and empty rows refill the top"""
+        game = Tetris(seed=1, headless=True, width=40, height=MAX_BOARD_HEIGHT)
+        game.grid = make_board(40, MAX_BOARD_HEIGHT)
+        kept = game.grid[:700]
+        game.grid = kept + [[1] * 40 for _ in range(300)]
+        cleared = game.clear_lines()
+        self.assertEqual(cleared, list(range(700, 1000)))
+        self.assertEqual(len(game.grid), MAX_BOARD_HEIGHT)
+        self.assertEqual(game.grid[:300], [[0] * 40] * 300)
+        self.assertEqual(len({id(row) for row in game.grid[:300]}), 300)
+        self.assertEqual(game.grid[300:], kept)
+        self.assertEqual(game.lines_cleared, 300)
+
+    def test_garbage_uses_board_width(self):
+        """Test garbage rows span the board"""
+        game = Tetris(seed=1, headless=True, width=30, height=60)
+        game.add_garbage(2, hole_x=29)
+        self.assertEqual(game.grid[-1], [8] * 29 + [0])
+        self.assertEqual(len(game.grid), 60)
+
+    def test_unsupported_sizes_rejected(self):
+        """Test boards outside the stress limits are rejected by the game and the CLI"""
+        with self.assertRaises(TetrisError):
+            Tetris(headless=True, width=MAX_BOARD_WIDTH + 1)
+        self.assertEqual(parse_board_size('100x1000'), (100, 1000))
+        for text in ('3x20', '10x1001', 'wide'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_board_size(text)
+
+    def test_ui_fits_large_boards(self):
+        """Test the field shrinks its blocks and the layout grows past one pixel per cell"""
+        self.assertEqual(GameUI().logical_size, (WINDOW_WIDTH, WINDOW_HEIGHT))
+        ui = GameUI(40, 80)
+        self.assertEqual(ui.game_field.block_size, 7)
+        self.assertEqual(ui.logical_size, (WINDOW_WIDTH, WINDOW_HEIGHT))
+        ui = GameUI(MAX_BOARD_WIDTH, MAX_BOARD_HEIGHT)
+        self.assertEqual(ui.game_field.block_size, 1)
+        self.assertEqual(ui.logical_size, (WINDOW_WIDTH, WINDOW_HEIGHT + MAX_BOARD_HEIGHT - GRID_HEIGHT * BLOCK_SIZE))
+
+
+class TestScaling(unittest.TestCase):
+    """Test cases for the scaling measurements"""
+
+    def test_scaling_exponent(self):
+        """Test linear and quadratic costs fit exponents of 1 and 2"""
+        cells = (200, 800, 4000, 100000)
+        self.assertAlmostEqual(scaling_exponent([(n, n * 1e-8) for n in cells]), 1.0)
+        self.assertAlmostEqual(scaling_exponent([(n, n * n * 1e-12) for n in cells]), 2.0)
+        results = {'linear': [(10, 20, 1e-6), (100, 1000, 5e-4)],
+                   'quadratic': [(10, 20, 1e-6), (100, 1000, 2.5e-1)]}
+        self.assertEqual(list(find_slow_scaling(results)), ['quadratic'])
+
+    def test_measure_every_operation(self):
+        """Test every operation is timed at every size, rendered included"""
+        sizes = ((10, 20), (MAX_BOARD_WIDTH, MAX_BOARD_HEIGHT))
+        results = measure(sizes, rendered=True, repeat=2)
+        self.assertIn('draw', results)
+        for rows in results.values():
+            self.assertEqual([(width, height) for width, height, _ in rows], list(sizes))
+            self.assertTrue(all(seconds > 0 for _, _, seconds in rows))
+
+    def test_stress_game(self):
+        """Test headless and rendered stress games keep the largest board intact"""
+        for rendered in (False, True):
+            result = stress_game(pieces=20, rendered=rendered)
+            self.assertTrue(result['board_ok'])
+            self.assertEqual(result['board'], f"{MAX_BOARD_WIDTH}x{MAX_BOARD_HEIGHT}")
+        self.assertIn('draw_p50_ms', result)
+
+
+if __name__ == '__main__':
+    unittest.main()
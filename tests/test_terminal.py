@@ -0,0 +1,94 @@
+import unittest
+import io
+import re
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import Tetris
+from bot import TetrisBot
+from terminal import TerminalRenderer, xterm_color
+
+_TOKEN = re.compile(r'\x1b\[(\d+);(\d+)H|\x1b\[[0-9;?]*[A-Za-z]|(.)', re.S)
+
+
+class VirtualTerminal:
+    """Just enough of a terminal to apply cursor moves and characters"""
+
+    def __init__(self, rows=30, columns=60):
+        self.screen = [[' '] * columns for _ in range(rows)]
+        self.row = self.column = 0
+
+    def feed(self, data):
+        for match in _TOKEN.finditer(data):
+            if match.group(1):
+                self.row, self.column = int(match.group(1)) - 1, int(match.group(2)) - 1
+            elif match.group(3):
+                self.screen[self.row][self.column] = match.group(3)
+                self.column += 1
+
+    def text(self):
+        return '\n'.join(''.join(row).rstrip() for row in self.screen)
+
+
+class TestTerminalRenderer(unittest.TestCase):
+    """Test the diff-based terminal renderer"""
+
+    def setUp(self):
+        self.game = Tetris(seed=2, headless=True)
+        self.stream = io.StringIO()
+        self.renderer = TerminalRenderer(self.stream, color=False)
+
+    def test_unchanged_frame_writes_nothing(self):
+        """Test only the first frame is a full redraw"""
+        first = self.renderer.render(self.game.get_draw_state())
+        self.assertIn('\x1b[2J', self.stream.getvalue())
+        self.assertEqual(self.renderer.render(self.game.get_draw_state()), 0)
+        self.game.move(1)
+        moved = self.renderer.render(self.game.get_draw_state())
+        self.assertGreater(moved, 0)
+        self.assertLess(moved, first / 5)
+
+    def test_diffs_rebuild_the_full_screen(self):
+        """Test applying every diff gives the same screen as a fresh full redraw"""
+        terminal = VirtualTerminal()
+        bot = TetrisBot(beam_width=1, lookahead=0)
+        for frame in range(300):
+            if frame % 10 == 9:
+                bot.play_piece(self.game)
+            self.game.update(50)
+            self.stream.seek(0)
+            self.stream.truncate()
+            self.renderer.render(self.game.get_draw_state())
+            terminal.feed(self.stream.getvalue())
+
+        reference = VirtualTerminal()
+        fresh = io.StringIO()
+        TerminalRenderer(fresh, color=False).render(self.game.get_draw_state())
+        reference.feed(fresh.getvalue())
+        self.assertEqual(terminal.text(), reference.text())
+        self.assertIn('[]', terminal.text())
+
+    def test_non_default_board(self):
+        """Test the frame and the cursor restore follow the game's board size"""
+        game = Tetris(seed=2, headless=True, width=16, height=24)
+        screen = self.renderer.compose(game.get_draw_state())
+        self.assertEqual(len(screen), 26)
+        self.assertEqual(len(screen[0]), 16 * 2 + 2)
+        self.renderer.render(game.get_draw_state())
+        self.renderer.close()
+        self.assertTrue(self.stream.getvalue().endswith('\x1b[27;1H\x1b[?25h\n'))
+
+    def test_color_output(self):
+        """Test colour mode paints blocks with 256-colour backgrounds"""
+        stream = io.StringIO()
+        TerminalRenderer(stream).render(self.game.get_draw_state())
+        self.assertIn('\x1b[48;5;', stream.getvalue())
+        self.assertEqual(xterm_color((255, 0, 0)), 196)
+        self.assertEqual(xterm_color((0, 0, 0)), 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ import os
 # Add the current directory to the path so we can import main
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from main import Tetris, TetrisError
+from main import Tetris, TetrisError, InvalidMoveError
 from pieces import (PIECES, get_piece_count, get_piece_name, get_piece_color, 
                    get_piece_border_color, validate_piece_definitions, PIECE_COLORS, PIECE_BORDER_COLORS)
 from config import GRID_WIDTH, GRID_HEIGHT, Scoring, PieceColors
@@ -190,6 +190,66 @@ class TestTetrisGameLogic(unittest.TestCase):
         # Should have new piece
         self.assertIsNotNone(self.game.current_piece)
 
+    def test_seeded_games_repeat_piece_sequence(self):
+        """Test that games with the same seed get the same pieces"""
+        first = Tetris(seed=42)
+        second = Tetris(seed=42)
+        self.assertEqual(first.current_piece_type, second.current_piece_type)
+        self.assertEqual(first.get_next_pieces(), second.get_next_pieces())
+    
+    def test_hard_drop_spawns_next_preview_piece(self):
+        """Test that hard drop consumes exactly one piece from the preview queue"""
+        upcoming = self.game.get_next_pieces()
+        self.game.hard_drop()
+        self.assertEqual(self.game.current_piece_type, upcoming[0])
+        self.assertEqual(self.game.get_next_pieces()[:-1], upcoming[1:])
+    
+    def test_game_over_records_last_game(self):
+        """Test that game over keeps the final stats and resets the board"""
+        self.game.score = 1234
+        self.game.lines_cleared = 12
+        self.game.game_over()
+        self.assertEqual(self.game.games_played, 1)
+        self.assertEqual(self.game.last_game['score'], 1234)
+        self.assertEqual(self.game.last_game['lines'], 12)
+        self.assertEqual(self.game.score, 0)
+
+    def test_add_garbage_pushes_rows_up(self):
+        """Test that garbage rows enter from the bottom with one hole"""
+        self.game.grid[GRID_HEIGHT - 1][0] = 1
+        self.game.add_garbage(2, hole_x=4)
+        self.assertEqual(self.game.grid[GRID_HEIGHT - 3][0], 1)
+        for y in (GRID_HEIGHT - 2, GRID_HEIGHT - 1):
+            self.assertEqual(self.game.grid[y][4], 0)
+            self.assertEqual(sum(1 for cell in self.game.grid[y] if cell), GRID_WIDTH - 1)
+        self.assertEqual(self.game.games_played, 0)
+    
+    def test_add_garbage_can_top_out(self):
+        """Test that garbage reaching the falling piece ends the game"""
+        self.game.add_garbage(GRID_HEIGHT, hole_x=0)
+        self.assertEqual(self.game.games_played, 1)
+    
+    def test_apply_input(self):
+        """Test named inputs and rejection of unknown ones"""
+        x = self.game.piece_x
+        self.game.apply_input('left')
+        self.assertEqual(self.game.piece_x, x - 1)
+        with self.assertRaises(InvalidMoveError):
+            self.game.apply_input('jump')
+    
+    def test_snapshot_restore(self):
+        """Test that restoring a snapshot replays the same future"""
+        self.game.hard_drop()
+        snapshot = self.game.snapshot()
+        for _ in range(3):
+            self.game.hard_drop()
+        after = self.game.snapshot()
+        self.game.restore(snapshot)
+        self.assertEqual(self.game.snapshot(), snapshot)
+        for _ in range(3):
+            self.game.hard_drop()
+        self.assertEqual(self.game.snapshot(), after)
+
 class TestTetrisPieceShapes(unittest.TestCase):
     """Test that each piece has the correct shape characteristics"""
     
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from main import Tetris
+from bot import TetrisBot
+from config import WINDOW_WIDTH, WINDOW_HEIGHT
+from ui_components import GameUI
+from texture_ui import TextureUI, create_renderer, video
+
+
+@unittest.skipIf(video is None, "pygame._sdl2 is not available")
+class TestTextureUI(unittest.TestCase):
+    """Test cases for the texture render backend"""
+
+    def setUp(self):
+        self.window = video.Window('test', size=(WINDOW_WIDTH, WINDOW_HEIGHT), hidden=True)
+        self.renderer, self.kind = create_renderer(self.window, software=True)
+        self.ui = TextureUI(self.renderer)
+
+    def tearDown(self):
+        self.window.destroy()
+
+    def test_software_renderer(self):
+        """Test forcing the software renderer"""
+        self.assertEqual(self.kind, 'software')
+
+    def test_matches_surface_backend(self):
+        """Test the texture backend draws the same frame as GameUI"""
+        game = Tetris(seed=5, headless=True)
+        bot = TetrisBot(beam_width=1, lookahead=0)
+        for _ in range(15):
+            bot.play_piece(game)
+        game.update(400)
+        game.add_garbage(2, hole_x=3)
+        state = game.get_draw_state()
+
+        expected = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        GameUI().draw(expected, state)
+        self.ui.draw(state)
+        actual = self.renderer.to_surface()
+
+        # Antialiased text edges may blend a level or two differently
+        worst = max(abs(a - b)
+                    for x in range(0, WINDOW_WIDTH, 3) for y in range(0, WINDOW_HEIGHT, 3)
+                    for a, b in zip(actual.get_at((x, y))[:3], expected.get_at((x, y))[:3]))
+        self.assertLessEqual(worst, 4)
+
+    def test_non_default_board(self):
+        """Test a larger board is drawn with the same shrunken blocks as GameUI"""
+        game = Tetris(seed=5, headless=True, width=40, height=80)
+        bot = TetrisBot(beam_width=1, lookahead=0)
+        for _ in range(30):
+            bot.play_piece(game)
+        state = game.get_draw_state()
+
+        expected_ui = GameUI(40, 80)
+        expected = pygame.Surface(expected_ui.logical_size)
+        expected_ui.draw(expected, state)
+        ui = TextureUI(self.renderer, 40, 80)
+        self.assertEqual(ui.field.block_size, expected_ui.game_field.block_size)
+        ui.draw(state)
+        actual = self.renderer.to_surface()
+        field = expected_ui.game_field
+        worst = max(abs(a - b)
+                    for x in range(field.x, field.x + field.width, 2) for y in range(field.y, field.y + field.height, 2)
+                    for a, b in zip(actual.get_at((x, y))[:3], expected.get_at((x, y))[:3]))
+        self.assertLessEqual(worst, 4)
+
+    def test_value_textures_cached(self):
+        """Test score text is only re-rendered when it changes"""
+        game = Tetris(seed=1, headless=True)
+        self.ui.draw(game.get_draw_state())
+        texture = self.ui._values['score'][1]
+        game.update(100)
+        self.ui.draw(game.get_draw_state())
+        self.assertIs(self.ui._values['score'][1], texture)
+        game.score += 40
+        self.ui.draw(game.get_draw_state())
+        self.assertIsNot(self.ui._values['score'][1], texture)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import Tetris
+from bot import TetrisBot, play_game
+from config import Scoring
+import tournament
+from tournament import (Tournament, BotSpec, ResultCache, DEFAULT_BOT_PATH, SOURCE_DIR, rules_hash, bot_hash,
+                        bootstrap_interval, format_leaderboard, load_bots)
+
+GREEDY = BotSpec('greedy', DEFAULT_BOT_PATH, {'beam_width': 1, 'lookahead': 0})
+BEAM = BotSpec('beam2', DEFAULT_BOT_PATH, {'beam_width': 2, 'lookahead': 1})
+
+
+class TestTournament(unittest.TestCase):
+    """Test cases for cached bot tournaments"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.directory, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def tournament(self, bots, seeds=(0, 1, 2), workers=1):
+        return Tournament(bots, seeds, max_pieces=30, workers=workers, cache_dir=self.cache_dir)
+
+    def test_rules_hash_follows_scoring(self):
+        """Test the rules hash changes when scoring changes"""
+        before = rules_hash()
+        original = Scoring.TETRIS
+        Scoring.TETRIS = original + 1
+        try:
+            self.assertNotEqual(rules_hash(), before)
+        finally:
+            Scoring.TETRIS = original
+        self.assertEqual(rules_hash(), before)
+
+    def test_bot_hash_follows_code_and_options(self):
+        """Test the bot hash changes with its options and its source"""
+        copy = os.path.join(self.directory, 'bot_v2.py')
+        shutil.copy(DEFAULT_BOT_PATH, copy)
+        self.assertEqual(bot_hash(GREEDY), bot_hash(GREEDY._replace(path=copy)))
+        self.assertNotEqual(bot_hash(GREEDY), bot_hash(BEAM))
+        with open(copy, 'a') as source:
+            source.write('\n# tweaked\n')
+        self.assertNotEqual(bot_hash(GREEDY), bot_hash(GREEDY._replace(path=copy)))
+
+    def test_bot_hash_follows_imported_modules(self):
+        """Test the bot hash changes when a module the bot imports changes"""
+        copy = os.path.join(self.directory, 'bot.py')
+        shutil.copy(DEFAULT_BOT_PATH, copy)
+        reachability = os.path.join(self.directory, 'reachability.py')
+        shutil.copy(os.path.join(SOURCE_DIR, 'reachability.py'), reachability)
+        self.assertEqual(bot_hash(GREEDY), bot_hash(GREEDY._replace(path=copy)))
+        with open(reachability, 'a') as source:
+            source.write('\n# tweaked\n')
+        self.assertNotEqual(bot_hash(GREEDY), bot_hash(GREEDY._replace(path=copy)))
+
+    def test_keys_follow_engine(self):
+        """Test every cache key changes when the engine's source changes"""
+        engine = os.path.join(self.directory, 'main.py')
+        shutil.copy(tournament.ENGINE_PATH, engine)
+        with open(engine, 'a') as source:
+            source.write('\n# tweaked\n')
+        before = self.tournament([GREEDY]).keys()
+        original = tournament.ENGINE_PATH
+        tournament.ENGINE_PATH = engine
+        try:
+            after = self.tournament([GREEDY]).keys()
+        finally:
+            tournament.ENGINE_PATH = original
+        self.assertEqual(set(before), set(after))
+        self.assertFalse(set(before.values()) & set(after.values()))
+
+    def test_seeds_required(self):
+        """Test a tournament without seeds is rejected"""
+        with self.assertRaises(ValueError):
+            self.tournament([GREEDY], seeds=())
+
+    def test_cache_round_trip(self):
+        """Test results are stored under their key and bad entries are ignored"""
+        cache = ResultCache(self.cache_dir)
+        key = ResultCache.make_key('code', 'rules', 3, 30)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'lines': 4}, bot='greedy', seed=3)
+        self.assertEqual(cache.get(key), {'lines': 4})
+        self.assertTrue(cache.path(key).startswith(os.path.join(self.cache_dir, key[:2])))
+        with open(cache.path(key), 'w') as entry:
+            entry.write('{"stats": ')
+        self.assertIsNone(cache.get(key))
+
+    def test_only_missing_games_are_played(self):
+        """Test a rerun plays nothing and a new bot plays only its own games"""
+        first = self.tournament([GREEDY])
+        first.run()
+        self.assertEqual((first.played, first.cached), (3, 0))
+
+        again = self.tournament([GREEDY])
+        again.run()
+        self.assertEqual((again.played, again.cached), (0, 3))
+        self.assertEqual(again.results, first.results)
+
+        more = self.tournament([GREEDY, BEAM])
+        more.run()
+        self.assertEqual((more.played, more.cached), (3, 3))
+
+    def test_results_match_direct_play(self):
+        """Test tournament games match playing the seed directly, in a pool as well"""
+        tournament = self.tournament([GREEDY], seeds=(5, 6), workers=2)
+        results = tournament.run()
+        for seed in (5, 6):
+            game = Tetris(seed=seed, headless=True)
+            game.reset_game(seed=seed)
+            expected = play_game(game, TetrisBot(beam_width=1, lookahead=0), max_pieces=30)
+            self.assertEqual(results['greedy'][seed], expected)
+
+    def test_leaderboard(self):
+        """Test ranking, intervals and paired deltas"""
+        tournament = self.tournament([GREEDY, BEAM])
+        tournament.results = {
+            'greedy': {0: {'lines': 10}, 1: {'lines': 12}, 2: {'lines': 14}},
+            'beam2': {0: {'lines': 20}, 1: {'lines': 21}, 2: {'lines': 25}},
+        }
+        rows = tournament.leaderboard('lines')
+        self.assertEqual([row['bot'] for row in rows], ['beam2', 'greedy'])
+        self.assertEqual(rows[0]['delta_vs_leader'], 0.0)
+        self.assertAlmostEqual(rows[1]['delta_vs_leader'], -10.0)
+        for row in rows:
+            self.assertLessEqual(row['ci_low'], row['mean'])
+            self.assertGreaterEqual(row['ci_high'], row['mean'])
+        self.assertLess(rows[1]['delta_ci_high'], 0)
+        self.assertIn('beam2', format_leaderboard(rows))
+        with self.assertRaises(ValueError):
+            tournament.leaderboard('style')
+
+    def test_bootstrap_interval(self):
+        """Test constant samples give a zero-width interval"""
+        self.assertEqual(bootstrap_interval([3.0] * 10), (3.0, 3.0))
+        low, high = bootstrap_interval(list(range(100)))
+        self.assertLess(low, 49.5)
+        self.assertGreater(high, 49.5)
+
+    def test_load_bots(self):
+        """Test bot files resolve relative paths and default to the built-in bot"""
+        config = os.path.join(self.directory, 'bots.json')
+        with open(config, 'w') as config_file:
+            config_file.write('{"bots": [{"name": "a", "options": {"beam_width": 1}},'
+                              ' {"name": "b", "path": "bot_v2.py"}]}')
+        bots = load_bots(config)
+        self.assertEqual(bots[0], BotSpec('a', DEFAULT_BOT_PATH, {'beam_width': 1}))
+        self.assertEqual(bots[1].path, os.path.join(self.directory, 'bot_v2.py'))
+        with self.assertRaises(ValueError):
+            Tournament([GREEDY, GREEDY], [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the current directory to the path so we can import main
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tuner import WeightTuner, FitnessCache, play_seed
+from bot import DEFAULT_WEIGHTS, FEATURES
+
+
+class TestFitnessCache(unittest.TestCase):
+    """Test the on-disk fitness cache"""
+
+    def test_results_survive_reopen(self):
+        """Test that results written by one run are loaded by the next"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.jsonl')
+            key = FitnessCache.make_key(DEFAULT_WEIGHTS, 3, 100, 1, 0)
+            cache = FitnessCache(path)
+            cache.put(key, {'lines': 5, 'pieces': 40})
+            cache.close()
+
+            reopened = FitnessCache(path)
+            self.assertEqual(reopened.get(key), {'lines': 5, 'pieces': 40})
+            reopened.close()
+
+    def test_partial_line_is_skipped(self):
+        """Test that a truncated last line from a killed run is ignored"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.jsonl')
+            with open(path, 'w') as cache_file:
+                cache_file.write('{"key": "a", "stats": {"lines": 1}}\n{"key": "b", "sta')
+            cache = FitnessCache(path)
+            self.assertEqual(len(cache), 1)
+            cache.close()
+
+
+class TestWeightTuner(unittest.TestCase):
+    """Test tuner generations and resume behaviour"""
+
+    def test_seeded_games_are_reproducible(self):
+        """Test that a (weights, seed) pair always gives the same result"""
+        first = play_seed(DEFAULT_WEIGHTS, 11, max_pieces=60)
+        second = play_seed(DEFAULT_WEIGHTS, 11, max_pieces=60)
+        self.assertEqual(first, second)
+
+    def test_resume_uses_cache(self):
+        """Test that a rerun with the same settings plays no new games"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.jsonl')
+            with WeightTuner([1, 2], population=3, max_pieces=40, workers=1, cache_path=path) as first:
+                first.run(1)
+            self.assertEqual(first.history[0]['games_played'], 6)
+
+            with WeightTuner([1, 2], population=3, max_pieces=40, workers=1, cache_path=path) as second:
+                second.run(1)
+            self.assertEqual(second.history[0]['games_played'], 0)
+            self.assertEqual(second.history[0]['cache_hits'], 6)
+            self.assertEqual(len(second.best_weights), len(FEATURES))
+
+    def test_pieces_counted_for_played_games_only(self):
+        """Test cached games add nothing to the pieces played in a generation"""
+        with WeightTuner([1, 2], population=2, max_pieces=40, workers=1) as tuner:
+            candidates = [tuple(DEFAULT_WEIGHTS)]
+            fitness, played, pieces = tuner.evaluate(candidates)
+            expected = sum(play_seed(DEFAULT_WEIGHTS, seed, max_pieces=40)['pieces'] for seed in (1, 2))
+            self.assertEqual((played, pieces), (2, expected))
+            self.assertEqual(tuner.evaluate(candidates), (fitness, 0, 0))
+
+    def test_repeated_runs_keep_saving(self):
+        """Test a second run() on the same tuner still appends results to the cache file"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.jsonl')
+            with WeightTuner([1], population=3, max_pieces=40, workers=1, cache_path=path) as tuner:
+                tuner.run(1)
+                tuner.run(1)
+                played = sum(report['games_played'] for report in tuner.history)
+            self.assertGreater(tuner.history[1]['games_played'], 0)
+            with open(path) as cache_file:
+                self.assertEqual(len(cache_file.readlines()), played)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)